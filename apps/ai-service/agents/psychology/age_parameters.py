@@ -305,6 +305,19 @@ class AgeGroupParameters:
         }
     }
 
+    # 年龄段 -> 代表年龄（框架缓存按年龄段共享，生成时使用代表年龄）
+    AGE_BANDS = {"3-5": 4, "6-8": 7, "9-11": 10}
+
+    @classmethod
+    def get_band(cls, age: int) -> str:
+        """获取年龄段标识（与 get_parameters 的分段一致）"""
+        if age < 6:
+            return "3-5"
+        elif age < 9:
+            return "6-8"
+        else:
+            return "9-11"
+
     @classmethod
     def get_parameters(cls, age: int) -> Dict[str, Any]:
         """
@@ -1,16 +1,20 @@
 import asyncio
 import json
-import hashlib
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel, Field
-from anthropic import AsyncAnthropic
 import redis
+import redis.asyncio as aioredis
 import logging
 import os
 
 from config import config
 from utils.cost_tracker import CostTracker
+from core.prompt_templates import PromptTemplate, register_template
+from core.response_parsing import ResponseSchema, parse_model
+from core.single_flight_cache import SingleFlightCache
+from .age_parameters import AgeGroupParameters
 from .emotional_regulation import EmotionalRegulationFramework
+from .framework_keys import framework_cache_key, framework_cell_id, neuro_conditions, normalize_framework_request
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +47,33 @@ class EducationalFramework(BaseModel):
     parent_guidance: List[str]
     emotional_development: Optional[Dict[str, Any]] = None  # 情绪发展框架
 
+# 模型输出缺省字段时的取值；neuro_adaptations 为空时视为未提供
+FRAMEWORK_RESPONSE_SCHEMA = ResponseSchema(
+    name="educational_framework",
+    model=EducationalFramework,
+    defaults={
+        "age_group": "3-5",
+        "cognitive_stage": "preoperational",
+        "attention_span_target": 5,
+        "learning_objectives": [],
+        "crowd_strategy": {},
+        "interaction_density": "medium",
+        "safety_considerations": [],
+        "cultural_adaptations": [],
+        "parent_guidance": [],
+    },
+    empty_as_none=("neuro_adaptations",),
+)
+
+# 各预热网格单元（年龄段|主题|特征）的请求次数，供离线预热按需求加权
+FRAMEWORK_REQUEST_COUNTS_KEY = "psychology_framework:request_counts"
+
+# 同一输入必然再次失败的上游错误（请求无效等），短期内不再重复调用
+DETERMINISTIC_FAILURE_STATUS_CODES = {400, 404, 413, 422}
+
+def _is_deterministic_failure(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) in DETERMINISTIC_FAILURE_STATUS_CODES
+
 class PsychologyExpert:
     """
     心理学专家Agent - 基于Claude
@@ -50,10 +81,31 @@ class PsychologyExpert:
     """
 
     def __init__(self):
+        # anthropic SDK 导入较慢，只在创建专家实例时加载
+        from anthropic import AsyncAnthropic
+
         self.client = AsyncAnthropic(api_key=config.anthropic_api_key)
         self.redis_client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
-        self.cost_tracker = CostTracker(self.redis_client)
+        # 框架缓存与成本记录走异步客户端：同键并发只调用一次Claude，过期后先返回旧框架再后台刷新
+        self.async_redis = aioredis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self.cost_tracker = CostTracker(self.async_redis)
         self.emotional_framework = EmotionalRegulationFramework()
+        self.framework_cache = SingleFlightCache(
+            self.async_redis,
+            namespace="psychology_framework:v2",
+            fresh_ttl_seconds=config.cache_ttl_hours * 3600,
+            stale_ttl_seconds=config.framework_cache_stale_hours * 3600,
+            negative_ttl_seconds=config.framework_cache_negative_ttl_seconds,
+            early_expiry_beta=config.framework_cache_early_expiry_beta,
+            is_deterministic_failure=_is_deterministic_failure,
+        )
+        # 提示词静态前缀按年龄段编译一次，同一年龄段的请求共享相同前缀
+        self.prompt_template = register_template(PromptTemplate(
+            "psychology_framework",
+            config.psychology_model,
+            self._build_psychology_prompt_prefix,
+            max_prefixes=len(AgeGroupParameters.AGE_BANDS),
+        ))
 
     async def generate_educational_framework(
         self,
@@ -64,71 +116,129 @@ class PsychologyExpert:
         生成个性化教育心理学框架
         """
 
-        # 生成缓存键
+        if not config.enable_framework_cache:
+            try:
+                framework, _ = await self._generate_framework(child_profile, story_request)
+                return framework
+            except Exception as e:
+                logger.error(f"Framework generation failed: {str(e)}")
+                return await self._get_fallback_framework(child_profile)
+
+        # 同一缓存键下统一使用规范化输入生成，缓存值与键一一对应
+        canonical_profile, canonical_request = normalize_framework_request(child_profile, story_request)
         cache_key = self._get_cache_key(child_profile, story_request)
+        await self._record_cell_request(canonical_profile, canonical_request)
+
+        async def compute() -> Dict[str, Any]:
+            framework, _ = await self._generate_framework(canonical_profile, canonical_request)
+            return framework.model_dump(mode="json")
+
+        try:
+            framework_data = await self.framework_cache.get_or_compute(cache_key, compute)
+            return EducationalFramework(**framework_data)
+        except Exception as e:
+            logger.error(f"Framework generation failed: {str(e)}")
+            # 返回基础框架作为后备
+            return await self._get_fallback_framework(child_profile)
+
+    async def is_framework_cached(self, child_profile: Dict[str, Any], story_request: Dict[str, Any]) -> bool:
+        return await self.framework_cache.contains(self._get_cache_key(child_profile, story_request))
+
+    async def warm_framework(self, child_profile: Dict[str, Any], story_request: Dict[str, Any]) -> float:
+        """生成框架并写入缓存（离线预热用），返回本次调用成本"""
+        canonical_profile, canonical_request = normalize_framework_request(child_profile, story_request)
+        cost = 0.0
+
+        async def compute() -> Dict[str, Any]:
+            nonlocal cost
+            framework, cost = await self._generate_framework(canonical_profile, canonical_request)
+            return framework.model_dump(mode="json")
 
-        # 检查缓存
-        if config.enable_framework_cache:
-            cached_framework = await self._get_cached_framework(cache_key)
-            if cached_framework:
-                logger.info(f"Framework cache hit: {cache_key}")
-                return cached_framework
+        await self.framework_cache.refresh(self._get_cache_key(child_profile, story_request), compute)
+        return cost
+
+    async def get_cell_request_counts(self) -> Dict[str, int]:
+        try:
+            counts = await self.async_redis.hgetall(FRAMEWORK_REQUEST_COUNTS_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to read framework request counts: {str(e)}")
+            return {}
+        return {
+            (field.decode() if isinstance(field, bytes) else field): int(value)
+            for field, value in counts.items()
+        }
+
+    async def _record_cell_request(self, canonical_profile: Dict[str, Any], canonical_request: Dict[str, Any]):
+        cell_id = framework_cell_id(
+            canonical_profile["age_group"],
+            canonical_request["theme"],
+            neuro_conditions(canonical_profile["neuro_profile"])
+        )
+        try:
+            await self.async_redis.hincrby(FRAMEWORK_REQUEST_COUNTS_KEY, cell_id, 1)
+        except Exception as e:
+            logger.debug(f"Failed to record framework request: {str(e)}")
+
+    async def _generate_framework(
+        self,
+        child_profile: Dict[str, Any],
+        story_request: Dict[str, Any]
+    ) -> Tuple[EducationalFramework, float]:
+        """调用Claude生成框架（不经过缓存），返回框架和调用成本"""
 
         # 构建专业心理学提示词
         prompt = await self._build_psychology_prompt(child_profile, story_request)
 
-        try:
-            # 调用Claude API
-            response = await self.client.messages.create(
-                model=config.psychology_model,
-                max_tokens=config.max_framework_tokens,
-                temperature=0.3,  # 保持专业一致性
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+        # 调用Claude API
+        response = await self.client.messages.create(
+            model=config.psychology_model,
+            max_tokens=config.max_framework_tokens,
+            temperature=0.3,  # 保持专业一致性
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        )
 
-            # 解析响应
-            framework = await self._parse_framework_response(response.content[0].text)
+        # 解析响应
+        framework = await self._parse_framework_response(response.content[0].text)
 
-            # 新增：情绪发展框架生成
-            emotional_framework = self.emotional_framework.generate_story_emotional_framework(
-                child_profile,
-                story_request
-            )
+        # 新增：情绪发展框架生成
+        emotional_framework = self.emotional_framework.generate_story_emotional_framework(
+            child_profile,
+            story_request
+        )
 
-            # 整合到教育框架中
-            framework.emotional_development = emotional_framework
-            
-            # 将情绪调节的交互提示整合到CROWD策略中
-            if emotional_framework.get('interaction_prompts'):
-                for prompt in emotional_framework['interaction_prompts']:
-                    if prompt['type'] == 'Completion':
-                        framework.crowd_strategy.completion_prompts.append(prompt['prompt'])
-                    elif prompt['type'] == 'Recall':
-                        framework.crowd_strategy.recall_questions.append(prompt['prompt'])
-                    elif prompt['type'] == 'Open_ended':
-                        framework.crowd_strategy.open_ended_prompts.append(prompt['prompt'])
-
-            # 缓存结果
-            if config.enable_framework_cache:
-                await self._cache_framework(cache_key, framework)
-
-            # 记录成本
+        # 整合到教育框架中
+        framework.emotional_development = emotional_framework
+
+        # 将情绪调节的交互提示整合到CROWD策略中
+        if emotional_framework.get('interaction_prompts'):
+            for prompt in emotional_framework['interaction_prompts']:
+                if prompt['type'] == 'Completion':
+                    framework.crowd_strategy.completion_prompts.append(prompt['prompt'])
+                elif prompt['type'] == 'Recall':
+                    framework.crowd_strategy.recall_questions.append(prompt['prompt'])
+                elif prompt['type'] == 'Open_ended':
+                    framework.crowd_strategy.open_ended_prompts.append(prompt['prompt'])
+
+        # 记录成本；记账失败不应丢弃已生成的框架
+        cost = CostTracker.calculate_cost(
+            config.psychology_model,
+            response.usage.input_tokens,
+            response.usage.output_tokens
+        )
+        try:
             await self.cost_tracker.record_usage(
                 model=config.psychology_model,
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens
             )
-
-            logger.info(f"Generated framework with emotional support for child age {child_profile.get('age', 'unknown')}")
-            return framework
-
         except Exception as e:
-            logger.error(f"Framework generation failed: {str(e)}")
-            # 返回基础框架作为后备
-            return await self._get_fallback_framework(child_profile)
+            logger.warning(f"Failed to record framework cost: {str(e)}")
+
+        logger.info(f"Generated framework with emotional support for child age {child_profile.get('age', 'unknown')}")
+        return framework, cost
 
     # ========== 辅助方法：用于构建详细的心理学prompt ==========
 
@@ -220,33 +330,69 @@ class PsychologyExpert:
         child_profile: Dict[str, Any],
         story_request: Dict[str, Any]
     ) -> str:
-        """构建科学细致的心理学提示词 - 基于年龄参数"""
+        """构建科学细致的心理学提示词 - 基于年龄参数
 
-        age = child_profile.get('age', 5)
+        年龄段参数决定的部分是缓存的静态前缀，儿童档案、主题与神经多样性适配追加在其后
+        """
 
-        # 导入年龄参数
-        from agents.psychology.age_parameters import AgeGroupParameters
+        age = child_profile.get('age', 5)
         params = AgeGroupParameters.get_parameters(age)
 
         neuro_profile = child_profile.get('neuro_profile', {})
         preferences = child_profile.get('preferences', {})
         theme = story_request.get('theme', '友谊')
 
-        prompt = f"""
-你是哈佛大学儿童发展心理学教授，专精皮亚杰和维果茨基理论，拥有20年临床经验。
+        suffix = f"""
+---
 
 ## 儿童认知档案
 - **年龄**: {age}岁
 - **认知阶段**: {params['cognitive_stage']}
 - **皮亚杰特征**: {', '.join(params['piaget_characteristics'])}
+- **注意力时长目标**: {max(3, age)}分钟
 - **神经多样性**: {json.dumps(neuro_profile, ensure_ascii=False) if neuro_profile else '无特殊需求'}
 - **阅读偏好**: {json.dumps(preferences, ensure_ascii=False) if preferences else '暂无数据'}
 
 ## 故事主题
 {theme}
+"""
+
+        # 神经多样性额外指导
+        if neuro_profile.get('adhd_indicators'):
+            suffix += """
+
+## ADHD专项适配
+- 每3-5页设置一个明显的"里程碑"奖励点
+- 使用视觉锚点(图标/颜色)标记重要内容
+- 句子短小精悍，避免长难句
+- 提供明确的进度指示
+"""
+
+        if neuro_profile.get('autism_indicators'):
+            suffix += """
+
+## 自闭谱系专项适配
+- 保持视觉风格高度一致
+- 情绪变化需要明确标注("小明感到开心")
+- 提供可预测的故事结构(开始-中间-结束明确)
+- 避免突然的场景转换，需要过渡提示
+"""
+
+        suffix += """
+现在开始设计框架！
+"""
+        return self.prompt_template.render((AgeGroupParameters.get_band(age),), suffix)
+
+    def _build_psychology_prompt_prefix(self, age_band: str) -> str:
+        """心理学提示词的静态前缀：只依赖年龄段参数"""
+
+        params = AgeGroupParameters.get_parameters(AgeGroupParameters.AGE_BANDS[age_band])
+
+        return f"""
+你是哈佛大学儿童发展心理学教授，专精皮亚杰和维果茨基理论，拥有20年临床经验。
 
 ## 你的任务
-基于 **{params['age_range']}** 儿童的认知发展水平，设计精确的教育心理学框架。
+基于 **{params['age_range']}** 儿童的认知发展水平，为文末的儿童档案和故事主题设计精确的教育心理学框架。
 
 ---
 
@@ -352,7 +498,7 @@ class PsychologyExpert:
 {{
     "age_group": "{params['age_range']}",
     "cognitive_stage": "{params['cognitive_stage']}",
-    "attention_span_target": {max(3, age)},
+    "attention_span_target": 儿童档案中的注意力时长目标(分钟),
 
     "content_structure": {{
         "page_count": {params['page_count']['recommended']},
@@ -383,7 +529,7 @@ class PsychologyExpert:
 
     "theme_specifications": {{
         "complexity_level": "{params['theme_complexity']}",
-        "recommended_theme": "基于'{theme}'具体化的主题描述",
+        "recommended_theme": "基于故事主题具体化的主题描述",
         "emotion_palette": {json.dumps(params['emotion_types'])},
         "educational_goals": ["具体学习目标1", "具体学习目标2", "具体学习目标3"]
     }},
@@ -422,33 +568,8 @@ class PsychologyExpert:
 2. 句式结构百分比必须精确匹配！
 3. 所有CROWD互动必须给出5-8个具体示例！
 4. 示例句子必须符合该年龄段的句长和复杂度要求！
-
-现在开始设计框架！
 """
 
-        # 神经多样性额外指导
-        if neuro_profile.get('adhd_indicators'):
-            prompt += """
-
-## ADHD专项适配
-- 每3-5页设置一个明显的"里程碑"奖励点
-- 使用视觉锚点(图标/颜色)标记重要内容
-- 句子短小精悍，避免长难句
-- 提供明确的进度指示
-"""
-
-        if neuro_profile.get('autism_indicators'):
-            prompt += """
-
-## 自闭谱系专项适配
-- 保持视觉风格高度一致
-- 情绪变化需要明确标注("小明感到开心")
-- 提供可预测的故事结构(开始-中间-结束明确)
-- 避免突然的场景转换，需要过渡提示
-"""
-
-        return prompt
-
     def _determine_cognitive_stage(self, age: int) -> str:
         """基于年龄确定认知发展阶段"""
         if age < 2:
@@ -463,91 +584,14 @@ class PsychologyExpert:
     async def _parse_framework_response(self, response_text: str) -> EducationalFramework:
         """解析Claude响应为教育框架"""
         try:
-            # 提取JSON部分
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start == -1 or json_end == 0:
-                raise ValueError("No JSON found in response")
-            
-            json_str = response_text[json_start:json_end]
-            framework_data = json.loads(json_str)
-            
-            # 构建CROWD策略
-            crowd_data = framework_data.get('crowd_strategy', {})
-            crowd_strategy = CROWDStrategy(
-                completion_prompts=crowd_data.get('completion_prompts', []),
-                recall_questions=crowd_data.get('recall_questions', []),
-                open_ended_prompts=crowd_data.get('open_ended_prompts', []),
-                wh_questions=crowd_data.get('wh_questions', []),
-                distancing_connections=crowd_data.get('distancing_connections', [])
-            )
-            
-            # 构建神经多样性适配
-            neuro_data = framework_data.get('neuro_adaptations', {})
-            neuro_adaptations = None
-            if neuro_data:
-                neuro_adaptations = NeuroAdaptation(
-                    attention_supports=neuro_data.get('attention_supports', {}),
-                    sensory_adjustments=neuro_data.get('sensory_adjustments', {}),
-                    interaction_modifications=neuro_data.get('interaction_modifications', {}),
-                    cognitive_scaffolding=neuro_data.get('cognitive_scaffolding', {})
-                )
-            
-            # 构建完整框架
-            framework = EducationalFramework(
-                age_group=framework_data.get('age_group', '3-5'),
-                cognitive_stage=framework_data.get('cognitive_stage', 'preoperational'),
-                attention_span_target=framework_data.get('attention_span_target', 5),
-                learning_objectives=framework_data.get('learning_objectives', []),
-                crowd_strategy=crowd_strategy,
-                neuro_adaptations=neuro_adaptations,
-                interaction_density=framework_data.get('interaction_density', 'medium'),
-                safety_considerations=framework_data.get('safety_considerations', []),
-                cultural_adaptations=framework_data.get('cultural_adaptations', []),
-                parent_guidance=framework_data.get('parent_guidance', [])
-            )
-            
-            return framework
-            
+            return parse_model(response_text, FRAMEWORK_RESPONSE_SCHEMA)
         except Exception as e:
             logger.error(f"Failed to parse framework response: {str(e)}")
             raise ValueError(f"Invalid framework response format: {str(e)}")
 
     def _get_cache_key(self, child_profile: Dict[str, Any], story_request: Dict[str, Any]) -> str:
-        """生成缓存键"""
-        cache_data = {
-            "age": child_profile.get('age'),
-            "neuro_profile": child_profile.get('neuro_profile', {}),
-            "theme": story_request.get('theme'),
-            "preferences": child_profile.get('preferences', {})
-        }
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        return f"psychology_framework:{hashlib.md5(cache_str.encode()).hexdigest()}"
-
-    async def _get_cached_framework(self, cache_key: str) -> Optional[EducationalFramework]:
-        """从缓存获取框架"""
-        try:
-            cached_data = await self.redis_client.get(cache_key)
-            if cached_data:
-                framework_data = json.loads(cached_data)
-                return EducationalFramework(**framework_data)
-        except Exception as e:
-            logger.warning(f"Cache read error: {str(e)}")
-        return None
-
-    async def _cache_framework(self, cache_key: str, framework: EducationalFramework):
-        """缓存框架"""
-        try:
-            framework_data = framework.dict()
-            cache_ttl = config.cache_ttl_hours * 3600
-            await self.redis_client.setex(
-                cache_key, 
-                cache_ttl, 
-                json.dumps(framework_data, default=str)
-            )
-        except Exception as e:
-            logger.warning(f"Cache write error: {str(e)}")
+        """生成缓存键（基于规范化输入）"""
+        return framework_cache_key(child_profile, story_request)
 
     async def _get_fallback_framework(self, child_profile: Dict[str, Any]) -> EducationalFramework:
         """获取后备框架"""
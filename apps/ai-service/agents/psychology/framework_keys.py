@@ -0,0 +1,109 @@
+"""
+心理学框架缓存键规范化
+框架只取决于年龄段、主题、神经多样性特征和少数阅读偏好；
+其余字段（喜欢的角色、界面开关等）不进入缓存键，避免缓存碎片化
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .age_parameters import AgeGroupParameters
+
+DEFAULT_THEME = "友谊"
+
+# 影响框架内容的阅读偏好字段
+FRAMEWORK_PREFERENCE_FIELDS = ("reading_style", "interaction_level")
+
+# 各端对同一特征的不同写法 -> 规范名称
+NEURO_CONDITION_ALIASES = {
+    "adhd": "adhd",
+    "adhd_indicators": "adhd",
+    "ADHD": "adhd",
+    "autism": "autism",
+    "autism_indicators": "autism",
+    "ASD": "autism",
+    "dyslexia": "dyslexia",
+}
+
+# 规范名称 -> 提示词与情绪框架读取的标记
+CANONICAL_NEURO_FLAGS = {
+    "adhd": {"adhd_indicators": True, "ADHD": True},
+    "autism": {"autism_indicators": True, "ASD": True},
+    "dyslexia": {"dyslexia": True},
+}
+
+
+def neuro_conditions(neuro_profile: Dict[str, Any]) -> List[str]:
+    conditions = {
+        NEURO_CONDITION_ALIASES[key]
+        for key, value in (neuro_profile or {}).items()
+        if key in NEURO_CONDITION_ALIASES and _is_present(value)
+    }
+    return sorted(conditions)
+
+
+def canonical_neuro_profile(conditions: Iterable[str]) -> Dict[str, Any]:
+    profile: Dict[str, Any] = {}
+    for condition in conditions:
+        profile.update(CANONICAL_NEURO_FLAGS[condition])
+    return profile
+
+
+def framework_cell_id(age_band: str, theme: str, conditions: Iterable[str]) -> str:
+    """预热网格中的单元标识（年龄段|主题|特征）"""
+    return f"{age_band}|{theme}|{'+'.join(sorted(conditions)) or 'none'}"
+
+
+def normalize_framework_request(
+    child_profile: Dict[str, Any],
+    story_request: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    返回规范化后的 (child_profile, story_request)
+
+    同一缓存键下的所有请求都用同一份规范输入生成框架，缓存值与键一一对应
+    """
+    age_band = age_band_for(child_profile.get("age", 5))
+    conditions = neuro_conditions(child_profile.get("neuro_profile", {}))
+    preferences = child_profile.get("preferences") or {}
+
+    canonical_profile = {
+        "age": AgeGroupParameters.AGE_BANDS[age_band],
+        "age_group": age_band,
+        "neuro_profile": canonical_neuro_profile(conditions),
+        "preferences": {
+            field: preferences[field]
+            for field in FRAMEWORK_PREFERENCE_FIELDS
+            if preferences.get(field) not in (None, "", [], {})
+        },
+    }
+    canonical_request = {"theme": str(story_request.get("theme") or DEFAULT_THEME).strip() or DEFAULT_THEME}
+    return canonical_profile, canonical_request
+
+
+def framework_cache_key(child_profile: Dict[str, Any], story_request: Dict[str, Any]) -> str:
+    canonical_profile, canonical_request = normalize_framework_request(child_profile, story_request)
+    cache_data = {
+        "age_group": canonical_profile["age_group"],
+        "neuro": neuro_conditions(canonical_profile["neuro_profile"]),
+        "theme": canonical_request["theme"],
+        "preferences": canonical_profile["preferences"],
+    }
+    cache_str = json.dumps(cache_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(cache_str.encode()).hexdigest()
+
+
+def age_band_for(age: Any) -> str:
+    try:
+        age_value = int(age)
+    except (TypeError, ValueError):
+        age_value = 5
+    return AgeGroupParameters.get_band(age_value)
+
+
+def _is_present(value: Any) -> bool:
+    # {"adhd": {"shortAttentionBlocks": false, ...}} 这类全为 false 的设置视为未标记
+    if isinstance(value, dict):
+        return any(_is_present(item) for item in value.values())
+    return bool(value)
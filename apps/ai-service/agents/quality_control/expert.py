@@ -1,12 +1,15 @@
 import asyncio
 import json
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel, Field
 import logging
 
 from config import config
 from utils.qwen_client import QwenClient
 from utils.cost_tracker import CostTracker
+from core.prompt_budget import BudgetedPrompt, PromptBudgeter, PromptSection
+from core.response_parsing import ResponseParseError, ResponseSchema, parse_json
 from agents.psychology.expert import EducationalFramework
 from agents.story_creation.expert import StoryContent
 
@@ -30,6 +33,23 @@ class EducationalAlignment(BaseModel):
     overall_educational_score: float = 0.0
     improvement_suggestions: List[str] = Field(default_factory=list)
 
+# 模型未给出的评分按 0.5 计；总分由本地按权重计算
+SAFETY_RESPONSE_SCHEMA = ResponseSchema(
+    name="safety_check",
+    model=SafetyCheck,
+    defaults={"age_appropriateness": 0.5, "cultural_sensitivity": 0.5},
+)
+EDUCATIONAL_RESPONSE_SCHEMA = ResponseSchema(
+    name="educational_alignment",
+    model=EducationalAlignment,
+    defaults={
+        "learning_objective_coverage": 0.5,
+        "cognitive_development_support": 0.5,
+        "attention_span_appropriateness": 0.5,
+        "interaction_effectiveness": 0.5,
+    },
+)
+
 class QualityControlReport(BaseModel):
     """质量控制报告"""
     overall_quality_score: float
@@ -42,6 +62,50 @@ class QualityControlReport(BaseModel):
     revision_requirements: List[str] = Field(default_factory=list)
     quality_metrics: Dict[str, float] = Field(default_factory=dict)
 
+# 期望输出结构，同时用于提示词中的格式示例和 max_tokens 估算
+SAFETY_OUTPUT_EXAMPLE = {
+    "violence_level": 0.0,
+    "inappropriate_content": False,
+    "age_appropriateness": 0.9,
+    "cultural_sensitivity": 0.8,
+    "safety_issues": ["具体的安全问题列表"]
+}
+
+EDUCATIONAL_OUTPUT_EXAMPLE = {
+    "learning_objective_coverage": 0.8,
+    "cognitive_development_support": 0.7,
+    "attention_span_appropriateness": 0.9,
+    "interaction_effectiveness": 0.8,
+    "improvement_suggestions": ["改进建议列表"]
+}
+
+# 批量审核中每个故事的结果：安全检查与教育对齐字段合并为一个对象
+BATCH_OUTPUT_EXAMPLE = {
+    "story_id": "S1",
+    **SAFETY_OUTPUT_EXAMPLE,
+    **EDUCATIONAL_OUTPUT_EXAMPLE
+}
+
+BATCH_SCORE_FIELDS = (
+    "violence_level",
+    "age_appropriateness",
+    "cultural_sensitivity",
+    "learning_objective_coverage",
+    "cognitive_development_support",
+    "attention_span_appropriateness",
+    "interaction_effectiveness",
+)
+
+# 可选的列表字段，出现时必须是字符串列表
+BATCH_LIST_FIELDS = ("safety_issues", "improvement_suggestions")
+
+@dataclass
+class BatchQualityStats:
+    """批量质量检查计数"""
+    batches: int = 0
+    stories: int = 0
+    individual_retries: int = 0
+
 class QualityController:
     """
     质量控制器Agent - 基于通义千问
@@ -57,6 +121,12 @@ class QualityController:
         self.cost_tracker = CostTracker(redis_client)
         self.safety_keywords = self._load_safety_keywords()
         self.educational_standards = self._load_educational_standards()
+        self.prompt_budgeter = PromptBudgeter(
+            config.quality_control_model,
+            input_budget_tokens=config.quality_input_token_budget,
+            baseline_max_tokens=config.max_quality_tokens
+        )
+        self.batch_stats = BatchQualityStats()
 
     async def comprehensive_quality_check(
         self,
@@ -70,66 +140,19 @@ class QualityController:
 
         try:
             # 并行执行多个检查
-            safety_task = self._safety_check(story_content, child_profile)
-            educational_task = self._educational_alignment_check(story_content, framework)
-            language_task = self._language_quality_check(story_content, framework)
-            narrative_task = self._narrative_coherence_check(story_content)
-            cultural_task = self._cultural_appropriateness_check(story_content)
-
-            # 等待所有检查完成
             results = await asyncio.gather(
-                safety_task, educational_task, language_task, 
-                narrative_task, cultural_task, return_exceptions=True
+                self._safety_check(story_content, child_profile),
+                self._educational_alignment_check(story_content, framework),
+                self._local_quality_scores(story_content, framework),
+                return_exceptions=True
             )
 
             safety_check = results[0] if not isinstance(results[0], Exception) else SafetyCheck()
             educational_alignment = results[1] if not isinstance(results[1], Exception) else EducationalAlignment()
-            language_quality = results[2] if not isinstance(results[2], Exception) else 0.5
-            narrative_coherence = results[3] if not isinstance(results[3], Exception) else 0.5
-            cultural_appropriateness = results[4] if not isinstance(results[4], Exception) else 0.5
-
-            # 计算总体质量分数
-            overall_score = (
-                safety_check.overall_safety_score * 0.3 +
-                educational_alignment.overall_educational_score * 0.25 +
-                language_quality * 0.2 +
-                narrative_coherence * 0.15 +
-                cultural_appropriateness * 0.1
-            )
-
-            # 确定审批状态
-            approval_status = self._determine_approval_status(
-                overall_score, safety_check, educational_alignment
-            )
-
-            # 生成修订要求
-            revision_requirements = self._generate_revision_requirements(
-                safety_check, educational_alignment, overall_score
-            )
+            local_scores = results[2] if not isinstance(results[2], Exception) else (0.5, 0.5, 0.5)
 
-            # 构建质量指标
-            quality_metrics = {
-                "safety_score": safety_check.overall_safety_score,
-                "educational_score": educational_alignment.overall_educational_score,
-                "language_score": language_quality,
-                "narrative_score": narrative_coherence,
-                "cultural_score": cultural_appropriateness,
-                "overall_score": overall_score
-            }
-
-            report = QualityControlReport(
-                overall_quality_score=overall_score,
-                safety_check=safety_check,
-                educational_alignment=educational_alignment,
-                language_quality=language_quality,
-                narrative_coherence=narrative_coherence,
-                cultural_appropriateness=cultural_appropriateness,
-                approval_status=approval_status,
-                revision_requirements=revision_requirements,
-                quality_metrics=quality_metrics
-            )
-
-            logger.info(f"Quality check completed: {approval_status}, Score: {overall_score:.2f}")
+            report = self._build_quality_report(safety_check, educational_alignment, *local_scores)
+            logger.info(f"Quality check completed: {report.approval_status}, Score: {report.overall_quality_score:.2f}")
             return report
 
         except Exception as e:
@@ -137,16 +160,209 @@ class QualityController:
             # 返回基础质量报告
             return self._get_fallback_quality_report()
 
+    async def batch_quality_check(
+        self,
+        items: List[Tuple[StoryContent, EducationalFramework, Dict[str, Any]]],
+        batch_size: Optional[int] = None
+    ) -> List[QualityControlReport]:
+        """
+        批量质量检查：每 batch_size 个故事的安全检查与教育对齐合并为一次模型调用，
+        按故事拆分结果；解析或校验失败的故事单独走 comprehensive_quality_check 重试
+        返回的报告与 items 顺序一致
+        """
+        batch_size = max(1, batch_size or config.quality_batch_size)
+        chunks = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+        chunk_reports = await asyncio.gather(*(self._quality_check_chunk(chunk) for chunk in chunks))
+        return [report for reports in chunk_reports for report in reports]
+
+    async def _quality_check_chunk(
+        self,
+        chunk: List[Tuple[StoryContent, EducationalFramework, Dict[str, Any]]]
+    ) -> List[QualityControlReport]:
+        if len(chunk) == 1:
+            return [await self.comprehensive_quality_check(*chunk[0])]
+
+        self.batch_stats.batches += 1
+        self.batch_stats.stories += len(chunk)
+        local_scores = await asyncio.gather(
+            *(self._local_quality_scores(story, framework) for story, framework, _ in chunk)
+        )
+
+        try:
+            response = await self._generate_budgeted(self._build_batch_prompt(chunk), temperature=0.1)
+            entries = self._parse_batch_response(response.get('text', ''), len(chunk))
+        except Exception as e:
+            logger.error(f"Batch quality check failed: {str(e)}")
+            entries = {}
+
+        reports: List[Optional[QualityControlReport]] = [None] * len(chunk)
+        for index, entry in entries.items():
+            # 单条结果构建失败只让该故事进入重试，不影响同批其他故事
+            try:
+                reports[index] = self._build_quality_report(
+                    self._safety_from_data(entry),
+                    self._educational_from_data(entry),
+                    *local_scores[index]
+                )
+            except Exception as e:
+                logger.warning(f"Batch quality check: entry S{index + 1} rejected: {str(e)}")
+
+        retry = [index for index, report in enumerate(reports) if report is None]
+        if retry:
+            self.batch_stats.individual_retries += len(retry)
+            logger.warning(f"Batch quality check: retrying {len(retry)}/{len(chunk)} stories individually")
+            retried = await asyncio.gather(*(self.comprehensive_quality_check(*chunk[index]) for index in retry))
+            for index, report in zip(retry, retried):
+                reports[index] = report
+
+        return reports
+
+    def _build_batch_prompt(
+        self,
+        chunk: List[Tuple[StoryContent, EducationalFramework, Dict[str, Any]]]
+    ) -> BudgetedPrompt:
+        """批量审核提示词：公共说明只出现一次，每个故事一段（安全审核需要完整正文，不裁剪）"""
+        sections = [PromptSection("task", f"""
+你是专业的儿童内容安全审核专家和儿童教育专家，请分别对以下{len(chunk)}个故事进行安全检查和教育价值评估。
+""")]
+        for index, (story, framework, child_profile) in enumerate(chunk, start=1):
+            sections.append(PromptSection(f"story_{index}", f"""### 故事 S{index}
+故事标题: {story.title}
+目标年龄: {child_profile.get('age', 5)}岁
+教育框架: 认知阶段 {framework.cognitive_stage}; 注意力时长目标 {framework.attention_span_target}分钟; 学习目标 {', '.join(framework.learning_objectives)}
+故事内容: {self._extract_story_text(story)}
+"""))
+        sections.append(PromptSection("rubric", f"""
+对每个故事检查：
+1. 暴力内容等级 (0-1分，0为无暴力，1为严重暴力)
+2. 不当内容检测 (是否有性暗示、恐怖、血腥等)
+3. 年龄适宜性与文化敏感性 (0-1分)
+4. 学习目标覆盖度、认知发展支持、注意力时长适宜性、互动有效性 (0-1分)
+
+请输出JSON数组，每个故事一个对象，story_id 与上面的编号一致：
+[
+{json.dumps(BATCH_OUTPUT_EXAMPLE, ensure_ascii=False, indent=4)}
+]
+"""))
+        return self.prompt_budgeter.build(
+            "batch_quality_check",
+            sections,
+            BATCH_OUTPUT_EXAMPLE,
+            output_list_items=config.quality_output_list_items,
+            output_repeat=len(chunk),
+            input_budget_tokens=config.quality_input_token_budget * len(chunk),
+        )
+
+    def _parse_batch_response(self, text: str, count: int) -> Dict[int, Dict[str, Any]]:
+        """解析批量审核的JSON数组，返回 故事序号 -> 通过校验的结果；同一 story_id 只取第一条"""
+        try:
+            parsed = parse_json(text, "batch_quality_check", container='[')
+        except ResponseParseError as e:
+            logger.warning(f"Batch JSON parsing failed: {str(e)}")
+            return {}
+
+        entries: Dict[int, Dict[str, Any]] = {}
+        for entry in parsed if isinstance(parsed, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            story_id = str(entry.get('story_id', ''))
+            index = int(story_id[1:]) - 1 if story_id[:1] == 'S' and story_id[1:].isdigit() else -1
+            if 0 <= index < count and index not in entries and self._is_valid_batch_entry(entry):
+                entries[index] = entry
+        return entries
+
+    @staticmethod
+    def _is_valid_batch_entry(entry: Dict[str, Any]) -> bool:
+        scores_valid = all(
+            isinstance(entry.get(field), (int, float)) and not isinstance(entry.get(field), bool)
+            and 0 <= entry[field] <= 1
+            for field in BATCH_SCORE_FIELDS
+        )
+        lists_valid = all(
+            isinstance(entry.get(field, []), list) and all(isinstance(item, str) for item in entry.get(field, []))
+            for field in BATCH_LIST_FIELDS
+        )
+        return scores_valid and lists_valid and isinstance(entry.get('inappropriate_content'), bool)
+
+    async def _local_quality_scores(
+        self,
+        story: StoryContent,
+        framework: EducationalFramework
+    ) -> Tuple[float, float, float]:
+        """语言质量、叙事连贯性、文化适宜性三项本地检查（不调用模型）"""
+        results = await asyncio.gather(
+            self._language_quality_check(story, framework),
+            self._narrative_coherence_check(story),
+            self._cultural_appropriateness_check(story),
+            return_exceptions=True
+        )
+        return tuple(0.5 if isinstance(result, Exception) else result for result in results)
+
+    def _build_quality_report(
+        self,
+        safety_check: SafetyCheck,
+        educational_alignment: EducationalAlignment,
+        language_quality: float,
+        narrative_coherence: float,
+        cultural_appropriateness: float
+    ) -> QualityControlReport:
+        """汇总各项检查结果为质量报告"""
+
+        # 计算总体质量分数
+        overall_score = (
+            safety_check.overall_safety_score * 0.3 +
+            educational_alignment.overall_educational_score * 0.25 +
+            language_quality * 0.2 +
+            narrative_coherence * 0.15 +
+            cultural_appropriateness * 0.1
+        )
+
+        # 确定审批状态
+        approval_status = self._determine_approval_status(
+            overall_score, safety_check, educational_alignment
+        )
+
+        # 生成修订要求
+        revision_requirements = self._generate_revision_requirements(
+            safety_check, educational_alignment, overall_score
+        )
+
+        # 构建质量指标
+        quality_metrics = {
+            "safety_score": safety_check.overall_safety_score,
+            "educational_score": educational_alignment.overall_educational_score,
+            "language_score": language_quality,
+            "narrative_score": narrative_coherence,
+            "cultural_score": cultural_appropriateness,
+            "overall_score": overall_score
+        }
+
+        return QualityControlReport(
+            overall_quality_score=overall_score,
+            safety_check=safety_check,
+            educational_alignment=educational_alignment,
+            language_quality=language_quality,
+            narrative_coherence=narrative_coherence,
+            cultural_appropriateness=cultural_appropriateness,
+            approval_status=approval_status,
+            revision_requirements=revision_requirements,
+            quality_metrics=quality_metrics
+        )
+
     async def _safety_check(self, story: StoryContent, child_profile: Dict[str, Any]) -> SafetyCheck:
         """安全检查"""
         
-        # 构建安全检查提示词
-        prompt = f"""
+        # 构建安全检查提示词；安全审核必须看到完整正文，故事段落不参与裁剪
+        budgeted = self.prompt_budgeter.build(
+            "safety_check",
+            [
+                PromptSection("task", f"""
 你是专业的儿童内容安全审核专家，请对以下故事内容进行安全检查：
 
 故事标题: {story.title}
-故事内容: {self._extract_story_text(story)}
-目标年龄: {child_profile.get('age', 5)}岁
+故事内容:"""),
+                PromptSection("story", self._extract_story_text(story)),
+                PromptSection("rubric", f"""目标年龄: {child_profile.get('age', 5)}岁
 
 请检查以下安全指标：
 1. 暴力内容等级 (0-1分，0为无暴力，1为严重暴力)
@@ -155,42 +371,18 @@ class QualityController:
 4. 文化敏感性 (是否包含不当文化内容)
 
 请以JSON格式输出检查结果：
-{{
-    "violence_level": 0.0,
-    "inappropriate_content": false,
-    "age_appropriateness": 0.9,
-    "cultural_sensitivity": 0.8,
-    "safety_issues": ["具体的安全问题列表"]
-}}
-        """
+{json.dumps(SAFETY_OUTPUT_EXAMPLE, ensure_ascii=False, indent=4)}
+"""),
+            ],
+            SAFETY_OUTPUT_EXAMPLE,
+            output_list_items=config.quality_output_list_items,
+        )
 
         try:
-            response = await self.qwen_client.generate(
-                model=config.quality_control_model,
-                prompt=prompt,
-                max_tokens=config.max_quality_tokens,
-                temperature=0.1  # 保持严格性
-            )
+            response = await self._generate_budgeted(budgeted, temperature=0.1)  # 保持严格性
 
             # 解析响应
-            safety_data = self._parse_json_response(response.get('text', '{}'))
-            
-            # 计算总体安全分数
-            overall_safety = (
-                (1 - safety_data.get('violence_level', 0)) * 0.3 +
-                (0 if safety_data.get('inappropriate_content', False) else 1) * 0.3 +
-                safety_data.get('age_appropriateness', 0.5) * 0.2 +
-                safety_data.get('cultural_sensitivity', 0.5) * 0.2
-            )
-
-            return SafetyCheck(
-                violence_level=safety_data.get('violence_level', 0),
-                inappropriate_content=safety_data.get('inappropriate_content', False),
-                age_appropriateness=safety_data.get('age_appropriateness', 0.5),
-                cultural_sensitivity=safety_data.get('cultural_sensitivity', 0.5),
-                overall_safety_score=overall_safety,
-                safety_issues=safety_data.get('safety_issues', [])
-            )
+            return self._safety_from_data(self._parse_json_response(response.get('text', '{}'), "safety_check"))
 
         except Exception as e:
             logger.error(f"Safety check failed: {str(e)}")
@@ -202,13 +394,47 @@ class QualityController:
         framework: EducationalFramework
     ) -> EducationalAlignment:
         """教育目标对齐检查"""
-        
-        prompt = f"""
-你是儿童教育专家，请评估以下故事的教育价值：
 
-故事内容: {self._extract_story_text(story)}
-教育框架: {framework.dict()}
+        # 只提交评估需要的框架字段；故事正文超出预算时按页摘要，情绪发展数据最先裁剪
+        sections = [
+            PromptSection("task", """
+你是儿童教育专家，请评估以下故事的教育价值：
 
+故事内容:"""),
+            PromptSection(
+                "story",
+                self._extract_story_text(story),
+                priority=2,
+                summarize=self.prompt_budgeter.segment_summarizer([page.text for page in story.pages]),
+            ),
+            PromptSection("framework", f"""教育框架:
+- 目标年龄: {framework.age_group}
+- 认知阶段: {framework.cognitive_stage}
+- 注意力时长目标: {framework.attention_span_target}分钟
+- 学习目标: {', '.join(framework.learning_objectives)}
+- 互动密度: {framework.interaction_density}"""),
+            PromptSection(
+                "crowd_strategy",
+                f"- CROWD策略: {json.dumps(framework.crowd_strategy.dict(), ensure_ascii=False)}",
+                priority=1,
+                max_tokens=300,
+            ),
+        ]
+        if framework.neuro_adaptations:
+            sections.append(PromptSection(
+                "neuro_adaptations",
+                f"- 神经多样性适配: {json.dumps(framework.neuro_adaptations.dict(), ensure_ascii=False)}",
+                priority=2,
+                max_tokens=150,
+            ))
+        if framework.emotional_development:
+            sections.append(PromptSection(
+                "emotional_development",
+                f"- 情绪发展框架: {json.dumps(framework.emotional_development, ensure_ascii=False, default=str)}",
+                priority=3,
+                max_tokens=200,
+            ))
+        sections.append(PromptSection("rubric", f"""
 请评估：
 1. 学习目标覆盖度 (故事是否支持设定的学习目标)
 2. 认知发展支持 (是否促进目标认知阶段发展)
@@ -216,45 +442,49 @@ class QualityController:
 4. 互动有效性 (CROWD策略是否有效嵌入)
 
 请以JSON格式输出：
-{{
-    "learning_objective_coverage": 0.8,
-    "cognitive_development_support": 0.7,
-    "attention_span_appropriateness": 0.9,
-    "interaction_effectiveness": 0.8,
-    "improvement_suggestions": ["改进建议列表"]
-}}
-        """
+{json.dumps(EDUCATIONAL_OUTPUT_EXAMPLE, ensure_ascii=False, indent=4)}
+"""))
+        budgeted = self.prompt_budgeter.build(
+            "educational_alignment_check",
+            sections,
+            EDUCATIONAL_OUTPUT_EXAMPLE,
+            output_list_items=config.quality_output_list_items,
+        )
 
         try:
-            response = await self.qwen_client.generate(
-                model=config.quality_control_model,
-                prompt=prompt,
-                max_tokens=config.max_quality_tokens,
-                temperature=0.2
-            )
+            response = await self._generate_budgeted(budgeted, temperature=0.2)
 
-            edu_data = self._parse_json_response(response.get('text', '{}'))
-            
-            overall_educational = (
-                edu_data.get('learning_objective_coverage', 0.5) * 0.3 +
-                edu_data.get('cognitive_development_support', 0.5) * 0.3 +
-                edu_data.get('attention_span_appropriateness', 0.5) * 0.2 +
-                edu_data.get('interaction_effectiveness', 0.5) * 0.2
-            )
-
-            return EducationalAlignment(
-                learning_objective_coverage=edu_data.get('learning_objective_coverage', 0.5),
-                cognitive_development_support=edu_data.get('cognitive_development_support', 0.5),
-                attention_span_appropriateness=edu_data.get('attention_span_appropriateness', 0.5),
-                interaction_effectiveness=edu_data.get('interaction_effectiveness', 0.5),
-                overall_educational_score=overall_educational,
-                improvement_suggestions=edu_data.get('improvement_suggestions', [])
-            )
+            return self._educational_from_data(self._parse_json_response(response.get('text', '{}'), "educational_alignment"))
 
         except Exception as e:
             logger.error(f"Educational alignment check failed: {str(e)}")
             return EducationalAlignment(overall_educational_score=0.5)
 
+    def _safety_from_data(self, safety_data: Dict[str, Any]) -> SafetyCheck:
+        """模型返回的安全检查字段 -> SafetyCheck"""
+        safety = SAFETY_RESPONSE_SCHEMA.validate(safety_data)
+
+        # 计算总体安全分数
+        overall_safety = (
+            (1 - safety.violence_level) * 0.3 +
+            (0 if safety.inappropriate_content else 1) * 0.3 +
+            safety.age_appropriateness * 0.2 +
+            safety.cultural_sensitivity * 0.2
+        )
+        return safety.model_copy(update={"overall_safety_score": overall_safety})
+
+    def _educational_from_data(self, edu_data: Dict[str, Any]) -> EducationalAlignment:
+        """模型返回的教育对齐字段 -> EducationalAlignment"""
+        alignment = EDUCATIONAL_RESPONSE_SCHEMA.validate(edu_data)
+
+        overall_educational = (
+            alignment.learning_objective_coverage * 0.3 +
+            alignment.cognitive_development_support * 0.3 +
+            alignment.attention_span_appropriateness * 0.2 +
+            alignment.interaction_effectiveness * 0.2
+        )
+        return alignment.model_copy(update={"overall_educational_score": overall_educational})
+
     async def _language_quality_check(self, story: StoryContent, framework: EducationalFramework) -> float:
         """语言质量检查"""
         # 简化的语言质量检查
@@ -300,22 +530,28 @@ class QualityController:
         
         return min(1.0, 0.5 + positive_count * 0.1)
 
+    async def _generate_budgeted(self, budgeted: BudgetedPrompt, temperature: float) -> Dict[str, Any]:
+        """按预算后的提示词与 max_tokens 调用模型，并记录本次 token 节省"""
+        response = await self.qwen_client.generate(
+            model=config.quality_control_model,
+            prompt=budgeted.prompt,
+            max_tokens=budgeted.max_tokens,
+            temperature=temperature
+        )
+        budgeted.report.record_usage(response.get('usage'))
+        logger.info(f"Prompt budget: {json.dumps(budgeted.report.as_dict(), ensure_ascii=False)}")
+        return response
+
     def _extract_story_text(self, story: StoryContent) -> str:
         """提取故事文本"""
         return ' '.join(page.text for page in story.pages)
 
-    def _parse_json_response(self, text: str) -> Dict[str, Any]:
+    def _parse_json_response(self, text: str, kind: str = "quality_check") -> Dict[str, Any]:
         """解析JSON响应"""
         try:
-            json_start = text.find('{')
-            json_end = text.rfind('}') + 1
-            
-            if json_start == -1 or json_end == 0:
-                return {}
-            
-            json_str = text[json_start:json_end]
-            return json.loads(json_str)
-        except Exception as e:
+            data = parse_json(text, kind)
+            return data if isinstance(data, dict) else {}
+        except ResponseParseError as e:
             logger.warning(f"JSON parsing failed: {str(e)}")
             return {}
 
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
 import logging
@@ -8,6 +9,9 @@ import logging
 from config import config
 from utils.qwen_client import QwenClient
 from utils.cost_tracker import CostTracker
+from core.prompt_templates import PromptTemplate, register_template
+from core.response_parsing import ResponseSchema, parse_model
+from agents.psychology.age_parameters import AgeGroupParameters
 from agents.psychology.expert import EducationalFramework
 from .rhythm_analyzer import ChineseRhythmAnalyzer
 
@@ -42,6 +46,31 @@ class StoryContent(BaseModel):
     educational_value_score: float = 0.0
     language_complexity_level: str = "适中"
 
+# 模型输出缺省字段时的取值，与原先逐字段构建时一致
+STORY_RESPONSE_SCHEMA = ResponseSchema(
+    name="story_content",
+    model=StoryContent,
+    defaults={
+        "title": "未命名故事",
+        "moral_theme": "",
+        "pages": [],
+        "characters": [],
+        "vocabulary_targets": [],
+        "extension_activities": [],
+        "cultural_elements": [],
+    },
+    item_defaults={
+        "pages": {"page_number": 0, "text": "", "illustration_prompt": ""},
+        "characters": {
+            "name": "",
+            "description": "",
+            "personality": "",
+            "visual_description": "",
+            "role_in_story": "",
+        },
+    },
+)
+
 class QualityReport(BaseModel):
     """文学质量报告"""
     overall_score: float
@@ -53,6 +82,119 @@ class QualityReport(BaseModel):
     needs_revision: bool = False
     revision_suggestions: List[str] = Field(default_factory=list)
 
+ILLUSTRATION_5_ELEMENTS_GUIDE = """
+**插图5要素结构** (每页必须完整包含):
+
+1. 场景 (Scene): 地点、时间(早晨/午后/夜晚)、天气、光线
+   示例: "温暖的午后阳光洒在森林空地上，微风轻拂"
+
+2. 角色 (Characters): 外貌、姿态、表情、服装 (必须与角色圣经一致!)
+   示例: "小兔子(白色毛发，粉色长耳朵，大眼睛，穿蓝色背心)"
+
+3. 动作 (Actions): 正在做什么，动态感
+   示例: "正跳跃着追逐五彩蝴蝶，耳朵随风飘动"
+
+4. 情绪 (Emotions): 通过表情和肢体语言传达
+   示例: "表情充满好奇和快乐，眼睛里闪烁着兴奋的光芒"
+
+5. 艺术风格 (Art Style): 画风、色调、构图、儿童友好性
+   示例: "水彩插画风格，柔和明亮的暖色调，画面温馨，适合3-5岁儿童，无任何恐怖元素"
+
+**完整示例**:
+"温暖的午后阳光洒在森林空地上，小兔子(白色毛发，粉色长耳朵，大眼睛，穿蓝色背心)正跳跃着追逐五彩蝴蝶，表情充满好奇和快乐，眼睛里闪烁着兴奋的光芒。背景是翠绿的树木和五彩的野花。水彩插画风格，柔和明亮的暖色调，画面温馨，适合3-5岁儿童，无任何恐怖元素。"
+"""
+
+
+@lru_cache(maxsize=32)
+def _example_sentences(age_group: str) -> str:
+    if "3-5" in age_group:
+        examples = [
+            "小兔子在花园里跳。(6字简单句)",
+            "它看到了一只蝴蝶。(8字简单句)",
+            "小兔子想和蝴蝶玩，但是蝴蝶飞走了。(16字复合句)"
+        ]
+    elif "6-8" in age_group:
+        examples = [
+            "小明和朋友们一起玩耍，他们非常开心。(15字复合句)",
+            "虽然遇到了困难，但是大家互相帮助，最后解决了问题。(22字复杂句)",
+            "这个故事告诉我们，真正的友谊需要互相理解和包容。(21字复杂句)"
+        ]
+    else:  # 9-11
+        examples = [
+            "十二岁的林晓站在阁楼的窗前，望着窗外淅淅沥沥的雨，心中涌起一股说不清的情绪。(32字复杂句)",
+            "她知道，今天的选择将会改变很多事情，但她还是决定勇敢地迈出那一步。(29字复杂句)",
+            "当她打开那扇尘封已久的木箱时，一个全新的世界在她眼前徐徐展开。(28字复杂句)"
+        ]
+
+    return "\n".join([f"   {ex}" for ex in examples])
+
+
+@lru_cache(maxsize=128)
+def _plot_point_guidance(plot_points: int, page_count: int) -> str:
+    if plot_points <= 5:
+        # 简单结构
+        return f"""
+第1页: 开篇引入 (介绍主角和环境)
+第{page_count // 3}页左右: 问题出现
+第{page_count // 2}页左右: 尝试解决
+第{page_count * 2 // 3}页左右: 高潮转折
+第{page_count}页: 圆满结局
+"""
+    elif plot_points <= 8:
+        # 中等复杂度
+        return f"""
+第1-2页: 开篇引入 (主角、环境、日常)
+第{page_count // 4}页: 冲突出现
+第{page_count // 3}页: 第一次尝试
+第{page_count // 2}页: 遇到挫折
+第{page_count * 2 // 3}页: 关键发现/转机
+第{page_count * 3 // 4}页: 高潮对决
+第{page_count - 1}页: 问题解决
+第{page_count}页: 升华主题
+"""
+    else:
+        # 复杂结构
+        return f"""
+第1-3页: 多线索开篇 (主角、环境、伏笔)
+第{page_count // 5}页: A线冲突
+第{page_count // 4}页: B线引入
+第{page_count // 3}页: 双线交织
+第{page_count // 2}页: 重大挫折
+第{page_count * 2 // 3}页: 关键线索
+第{page_count * 3 // 4}页: 真相揭露
+第{page_count * 4 // 5}页: 高潮冲突
+第{page_count - 2}页: 余波处理
+第{page_count}页: 深层主题升华
+"""
+
+
+@lru_cache(maxsize=128)
+def _crowd_distribution(page_count: int, has_distribution: bool) -> str:
+    if not has_distribution:
+        return "均匀分布在各页"
+
+    # 简化实现：建议在哪些页放哪种类型
+    pages_with_crowd = []
+    page_interval = max(1, page_count // 10)  # 每几页一个互动
+
+    for i in range(1, page_count + 1, page_interval):
+        if i <= page_count * 0.2:
+            pages_with_crowd.append(f"第{i}页: Completion 或 Recall")
+        elif i <= page_count * 0.5:
+            pages_with_crowd.append(f"第{i}页: Wh_questions")
+        elif i <= page_count * 0.8:
+            pages_with_crowd.append(f"第{i}页: Open_ended 或 Distancing")
+        else:
+            pages_with_crowd.append(f"第{i}页: Recall 或 Open_ended")
+
+    return "\n".join(pages_with_crowd)
+
+
+def _freeze(spec: Dict[str, Any]) -> str:
+    """规格字典 -> 可哈希的规范 JSON，用作提示词前缀的缓存键"""
+    return json.dumps(spec, ensure_ascii=False, sort_keys=True)
+
+
 class ChildrenLiteratureExpert:
     """
     儿童文学专家Agent - 基于通义千问
@@ -69,6 +211,12 @@ class ChildrenLiteratureExpert:
         self.rhythm_analyzer = ChineseRhythmAnalyzer()
         self.template_library = self._load_literature_templates()
         self.cultural_elements_db = self._load_cultural_elements()
+        # 提示词静态前缀按 (年龄段, 页数, 语言/情节规格) 编译一次，同参数的请求共享相同前缀
+        self.prompt_template = register_template(PromptTemplate(
+            "literature_story",
+            config.story_creation_model,
+            self._build_literature_prompt_prefix,
+        ))
 
     async def create_story_content(
         self,
@@ -160,93 +308,19 @@ class ChildrenLiteratureExpert:
             return await self._get_template_story(theme, framework)
 
     # ========== 辅助方法：用于构建详细的文学创作prompt ==========
+    # 输出只取决于年龄段、页数等参数，由模块级 LRU 缓存的函数生成
 
     def _generate_example_sentences(self, language_spec: Dict, age_group: str) -> str:
         """根据语言规格生成示例句子"""
-        examples = []
-
-        if "3-5" in age_group:
-            examples = [
-                "小兔子在花园里跳。(6字简单句)",
-                "它看到了一只蝴蝶。(8字简单句)",
-                "小兔子想和蝴蝶玩，但是蝴蝶飞走了。(16字复合句)"
-            ]
-        elif "6-8" in age_group:
-            examples = [
-                "小明和朋友们一起玩耍，他们非常开心。(15字复合句)",
-                "虽然遇到了困难，但是大家互相帮助，最后解决了问题。(22字复杂句)",
-                "这个故事告诉我们，真正的友谊需要互相理解和包容。(21字复杂句)"
-            ]
-        else:  # 9-11
-            examples = [
-                "十二岁的林晓站在阁楼的窗前，望着窗外淅淅沥沥的雨，心中涌起一股说不清的情绪。(32字复杂句)",
-                "她知道，今天的选择将会改变很多事情，但她还是决定勇敢地迈出那一步。(29字复杂句)",
-                "当她打开那扇尘封已久的木箱时，一个全新的世界在她眼前徐徐展开。(28字复杂句)"
-            ]
-
-        return "\n".join([f"   {ex}" for ex in examples])
+        return _example_sentences(age_group)
 
     def _format_plot_point_guidance(self, plot_points: int, page_count: int) -> str:
         """生成情节点布局指导"""
-        if plot_points <= 5:
-            # 简单结构
-            return f"""
-第1页: 开篇引入 (介绍主角和环境)
-第{page_count // 3}页左右: 问题出现
-第{page_count // 2}页左右: 尝试解决
-第{page_count * 2 // 3}页左右: 高潮转折
-第{page_count}页: 圆满结局
-"""
-        elif plot_points <= 8:
-            # 中等复杂度
-            return f"""
-第1-2页: 开篇引入 (主角、环境、日常)
-第{page_count // 4}页: 冲突出现
-第{page_count // 3}页: 第一次尝试
-第{page_count // 2}页: 遇到挫折
-第{page_count * 2 // 3}页: 关键发现/转机
-第{page_count * 3 // 4}页: 高潮对决
-第{page_count - 1}页: 问题解决
-第{page_count}页: 升华主题
-"""
-        else:
-            # 复杂结构
-            return f"""
-第1-3页: 多线索开篇 (主角、环境、伏笔)
-第{page_count // 5}页: A线冲突
-第{page_count // 4}页: B线引入
-第{page_count // 3}页: 双线交织
-第{page_count // 2}页: 重大挫折
-第{page_count * 2 // 3}页: 关键线索
-第{page_count * 3 // 4}页: 真相揭露
-第{page_count * 4 // 5}页: 高潮冲突
-第{page_count - 2}页: 余波处理
-第{page_count}页: 深层主题升华
-"""
+        return _plot_point_guidance(plot_points, page_count)
 
     def _generate_illustration_5_elements_guide(self) -> str:
         """生成5要素插图指导"""
-        return """
-**插图5要素结构** (每页必须完整包含):
-
-1. 场景 (Scene): 地点、时间(早晨/午后/夜晚)、天气、光线
-   示例: "温暖的午后阳光洒在森林空地上，微风轻拂"
-
-2. 角色 (Characters): 外貌、姿态、表情、服装 (必须与角色圣经一致!)
-   示例: "小兔子(白色毛发，粉色长耳朵，大眼睛，穿蓝色背心)"
-
-3. 动作 (Actions): 正在做什么，动态感
-   示例: "正跳跃着追逐五彩蝴蝶，耳朵随风飘动"
-
-4. 情绪 (Emotions): 通过表情和肢体语言传达
-   示例: "表情充满好奇和快乐，眼睛里闪烁着兴奋的光芒"
-
-5. 艺术风格 (Art Style): 画风、色调、构图、儿童友好性
-   示例: "水彩插画风格，柔和明亮的暖色调，画面温馨，适合3-5岁儿童，无任何恐怖元素"
-
-**完整示例**:
-"温暖的午后阳光洒在森林空地上，小兔子(白色毛发，粉色长耳朵，大眼睛，穿蓝色背心)正跳跃着追逐五彩蝴蝶，表情充满好奇和快乐，眼睛里闪烁着兴奋的光芒。背景是翠绿的树木和五彩的野花。水彩插画风格，柔和明亮的暖色调，画面温馨，适合3-5岁儿童，无任何恐怖元素。"
-"""
+        return ILLUSTRATION_5_ELEMENTS_GUIDE
 
     def _generate_crowd_embedding_guide(self, crowd_strategy, page_count: int) -> str:
         """生成CROWD互动嵌入指导"""
@@ -274,24 +348,7 @@ class ChildrenLiteratureExpert:
 
     def _calculate_crowd_distribution(self, page_count: int, distribution: Dict) -> str:
         """计算CROWD在各页的分布"""
-        if not distribution:
-            return "均匀分布在各页"
-
-        # 简化实现：建议在哪些页放哪种类型
-        pages_with_crowd = []
-        page_interval = max(1, page_count // 10)  # 每几页一个互动
-
-        for i in range(1, page_count + 1, page_interval):
-            if i <= page_count * 0.2:
-                pages_with_crowd.append(f"第{i}页: Completion 或 Recall")
-            elif i <= page_count * 0.5:
-                pages_with_crowd.append(f"第{i}页: Wh_questions")
-            elif i <= page_count * 0.8:
-                pages_with_crowd.append(f"第{i}页: Open_ended 或 Distancing")
-            else:
-                pages_with_crowd.append(f"第{i}页: Recall 或 Open_ended")
-
-        return "\n".join(pages_with_crowd)
+        return _crowd_distribution(page_count, bool(distribution))
 
     # ========== 重写的Literature Prompt构建方法 ==========
 
@@ -302,7 +359,10 @@ class ChildrenLiteratureExpert:
         series_bible: Optional[Dict],
         user_preferences: Optional[Dict]
     ) -> str:
-        """构建科学精确的儿童文学创作提示词 - 基于教育框架"""
+        """构建科学精确的儿童文学创作提示词 - 基于教育框架
+
+        由年龄段、页数与语言/情节规格决定的部分是缓存的静态前缀，主题、CROWD示例等请求相关内容追加在其后
+        """
 
         # 从framework提取精确参数
         content_spec = framework.content_structure if hasattr(framework, 'content_structure') else {}
@@ -331,13 +391,11 @@ class ChildrenLiteratureExpert:
 
         page_count = content_spec.get('page_count', 12)
         words_per_page = content_spec.get('words_per_page', 30)
-        plot_points = plot_spec.get('plot_points', 5)
 
-        # 构建详细的创作prompt
-        prompt = f"""
-你是曹文轩、秦文君级别的中国儿童文学作家，国际安徒生奖得主。
+        suffix = f"""
+---
 
-## 创作任务
+## 本次创作任务
 **主题**: {theme}
 **认知阶段**: {framework.cognitive_stage}
 **目标年龄**: {framework.age_group}
@@ -345,6 +403,93 @@ class ChildrenLiteratureExpert:
 
 ---
 
+### CROWD互动嵌入
+
+{self._generate_crowd_embedding_guide(framework.crowd_strategy, page_count)}
+
+---
+
+### 主题与情绪
+
+**主题复杂度**: {theme_spec.get('complexity_level', '适龄')}
+
+**情绪调色板**: 必须涵盖 {', '.join(theme_spec.get('emotion_palette', ['开心', '难过', '勇敢']))}
+
+**教育目标**: {', '.join(theme_spec.get('educational_goals', ['传递正向价值']))}
+"""
+
+        # 神经多样性适配
+        if framework.neuro_adaptations:
+            suffix += f"""
+
+---
+
+## 神经多样性友好设计
+
+{self._format_neuro_adaptations(framework.neuro_adaptations)}
+"""
+
+        # Series Bible一致性要求
+        if series_bible:
+            suffix += f"""
+
+---
+
+## 系列一致性要求
+
+**固定角色**:
+{json.dumps(series_bible.get('characters', []), ensure_ascii=False, indent=2)}
+
+**世界观**: {json.dumps(series_bible.get('world_settings', {}), ensure_ascii=False)}
+
+**视觉风格**: {series_bible.get('visual_style', '保持统一')}
+
+**重要**: 新故事必须与已有设定保持一致，角色外貌、性格不能改变！
+"""
+
+        # 用户偏好
+        if user_preferences:
+            suffix += f"""
+
+---
+
+## 用户偏好
+
+{json.dumps(user_preferences, ensure_ascii=False, indent=2)}
+"""
+
+        suffix += """
+**现在开始创作！严格按照以上所有参数执行！**
+"""
+
+        key = (
+            framework.age_group,
+            page_count,
+            words_per_page,
+            content_spec.get('total_words', page_count * words_per_page),
+            _freeze(language_spec),
+            _freeze(plot_spec),
+        )
+        return self.prompt_template.render(key, suffix)
+
+    def _build_literature_prompt_prefix(
+        self,
+        age_group: str,
+        page_count: int,
+        words_per_page: int,
+        total_words: int,
+        language_json: str,
+        plot_json: str
+    ) -> str:
+        """文学创作提示词的静态前缀：只依赖年龄段、页数与语言/情节规格"""
+
+        language_spec = json.loads(language_json)
+        plot_spec = json.loads(plot_json)
+        plot_points = plot_spec.get('plot_points', 5)
+
+        return f"""
+你是曹文轩、秦文君级别的中国儿童文学作家，国际安徒生奖得主。
+
 ## 严格执行的创作参数 (不可违背！)
 
 ### 一、内容结构 (精确到数字)
@@ -353,7 +498,7 @@ class ChildrenLiteratureExpert:
 
 **每页字数**: 平均 **{words_per_page}字** (允许±10%, 即{int(words_per_page*0.9)}-{int(words_per_page*1.1)}字)
 
-**故事总字数**: 约 **{content_spec.get('total_words', page_count * words_per_page)}字**
+**故事总字数**: 约 **{total_words}字**
 
 ---
 
@@ -374,7 +519,7 @@ class ChildrenLiteratureExpert:
 - **最长不超过**: {language_spec.get('sentence_length', {}).get('max', 12)}字
 
 #### 示例句子 (严格模仿这个复杂度！):
-{self._generate_example_sentences(language_spec, framework.age_group)}
+{self._generate_example_sentences(language_spec, age_group)}
 
 #### 词汇难度要求：
 {json.dumps(language_spec.get('vocabulary_level', {}), ensure_ascii=False, indent=2)}
@@ -406,23 +551,7 @@ class ChildrenLiteratureExpert:
 
 ---
 
-### 五、CROWD互动嵌入
-
-{self._generate_crowd_embedding_guide(framework.crowd_strategy, page_count)}
-
----
-
-### 六、主题与情绪
-
-**主题复杂度**: {theme_spec.get('complexity_level', '适龄')}
-
-**情绪调色板**: 必须涵盖 {', '.join(theme_spec.get('emotion_palette', ['开心', '难过', '勇敢']))}
-
-**教育目标**: {', '.join(theme_spec.get('educational_goals', ['传递正向价值']))}
-
----
-
-### 七、文化价值观
+### 五、文化价值观
 
 - 体现中华文化优秀传统
 - 传递积极正面的人生观
@@ -472,7 +601,7 @@ class ChildrenLiteratureExpert:
     "extension_activities": ["亲子活动建议3-5个"],
     "cultural_elements": ["文化元素3-5个"],
     "quality_self_assessment": {{
-        "language_complexity_match": "是否符合{framework.age_group}(是/否/原因)",
+        "language_complexity_match": "是否符合{age_group}(是/否/原因)",
         "plot_point_count": {plot_points},
         "actual_page_count": 实际页数,
         "avg_words_per_page": 实际平均字数,
@@ -488,7 +617,7 @@ class ChildrenLiteratureExpert:
 ## 创作前自检清单 (请逐项确认!)
 
 在开始创作前，你必须确认：
-- [ ] 我理解了{framework.age_group}儿童的认知特点
+- [ ] 我理解了{age_group}儿童的认知特点
 - [ ] 我记住了{page_count}页的精确页数要求
 - [ ] 我清楚{words_per_page}字/页的字数要求
 - [ ] 我理解句式结构的百分比分布
@@ -507,56 +636,11 @@ class ChildrenLiteratureExpert:
 3. **CROWD互动必须与内容紧密结合，不能生硬！**
 4. **最后的quality_self_assessment必须诚实填写！**
 
-**现在开始创作！严格按照以上所有参数执行！**
-"""
-
-        # 神经多样性适配
-        if framework.neuro_adaptations:
-            prompt += f"""
-
----
-
-## 神经多样性友好设计
-
-{self._format_neuro_adaptations(framework.neuro_adaptations)}
-"""
-
-        # Series Bible一致性要求
-        if series_bible:
-            prompt += f"""
-
----
-
-## 系列一致性要求
-
-**固定角色**:
-{json.dumps(series_bible.get('characters', []), ensure_ascii=False, indent=2)}
-
-**世界观**: {json.dumps(series_bible.get('world_settings', {}), ensure_ascii=False)}
-
-**视觉风格**: {series_bible.get('visual_style', '保持统一')}
-
-**重要**: 新故事必须与已有设定保持一致，角色外貌、性格不能改变！
+以下是本次创作的具体任务：
 """
 
-        # 用户偏好
-        if user_preferences:
-            prompt += f"""
-
----
-
-## 用户偏好
-
-{json.dumps(user_preferences, ensure_ascii=False, indent=2)}
-"""
-
-        return prompt
-
     def _get_word_count_by_age(self, age_group: str) -> int:
         """根据年龄组确定每页字数 - 使用科学参数"""
-        # 导入年龄参数
-        from agents.psychology.age_parameters import AgeGroupParameters
-
         # 从age_group提取年龄 (例如 "3-5" -> 4)
         if "3-5" in age_group:
             age = 4
@@ -592,56 +676,7 @@ class ChildrenLiteratureExpert:
     async def _parse_story_response(self, response: Dict[str, Any]) -> StoryContent:
         """解析故事响应"""
         try:
-            text = response.get('text', '')
-            
-            # 提取JSON部分
-            json_start = text.find('{')
-            json_end = text.rfind('}') + 1
-            
-            if json_start == -1 or json_end == 0:
-                raise ValueError("No JSON found in response")
-            
-            json_str = text[json_start:json_end]
-            story_data = json.loads(json_str)
-            
-            # 解析页面
-            pages = []
-            for page_data in story_data.get('pages', []):
-                page = StoryPage(
-                    page_number=page_data.get('page_number', 0),
-                    text=page_data.get('text', ''),
-                    illustration_prompt=page_data.get('illustration_prompt', ''),
-                    crowd_prompt=page_data.get('crowd_prompt'),
-                    reading_time_seconds=page_data.get('reading_time_seconds', 30),
-                    word_count=page_data.get('word_count', 0)
-                )
-                pages.append(page)
-            
-            # 解析角色
-            characters = []
-            for char_data in story_data.get('characters', []):
-                character = Character(
-                    name=char_data.get('name', ''),
-                    description=char_data.get('description', ''),
-                    personality=char_data.get('personality', ''),
-                    visual_description=char_data.get('visual_description', ''),
-                    role_in_story=char_data.get('role_in_story', '')
-                )
-                characters.append(character)
-            
-            # 构建故事内容
-            story_content = StoryContent(
-                title=story_data.get('title', '未命名故事'),
-                moral_theme=story_data.get('moral_theme', ''),
-                pages=pages,
-                characters=characters,
-                vocabulary_targets=story_data.get('vocabulary_targets', []),
-                extension_activities=story_data.get('extension_activities', []),
-                cultural_elements=story_data.get('cultural_elements', [])
-            )
-            
-            return story_content
-            
+            return parse_model(response.get('text', ''), STORY_RESPONSE_SCHEMA)
         except Exception as e:
             logger.error(f"Failed to parse story response: {str(e)}")
             raise ValueError(f"Invalid story response format: {str(e)}")
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+from config import config
+from core.response_parsing import ResponseParseError, parse_json
+from .expert import Character, StoryPage
+
+logger = logging.getLogger(__name__)
+
+# 逐页生成只需要一页的输出长度
+PAGE_MAX_TOKENS = 600
+
+_END_OF_STREAM = object()
+
+
+class IncrementalStoryEngine:
+    """
+    增量故事引擎 - 逐页生成故事
+    每页只携带最近几页全文和更早页面的梗概（滚动上下文窗口）以及角色圣经，
+    生产者在消费者处理第N页（如渲染插图）时继续预取第N+1页
+    """
+
+    def __init__(self, literature_expert, context_window: int = 3, prefetch_pages: int = 1):
+        self.literature_expert = literature_expert
+        self.context_window = context_window
+        self.prefetch_pages = prefetch_pages
+
+    async def generate_pages(
+        self,
+        framework: Dict[str, Any],
+        character_bible: Dict[str, Any],
+        existing_pages: List[Dict[str, Any]],
+        total_pages: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """按页产出事件：page_text（页面就绪）或 page_error（该页失败，继续下一页）"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch_pages)
+        producer = asyncio.create_task(
+            self._produce(queue, framework, character_bible, list(existing_pages), total_pages)
+        )
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is _END_OF_STREAM:
+                    break
+                yield event
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    async def write_page(
+        self,
+        framework: Dict[str, Any],
+        character_bible: Dict[str, Any],
+        prior_pages: List[Dict[str, Any]],
+        page_number: int,
+        total_pages: int,
+    ) -> StoryPage:
+        prompt = self.build_page_prompt(framework, character_bible, prior_pages, page_number, total_pages)
+        response = await self.literature_expert.qwen_client.generate(
+            model=config.story_creation_model,
+            prompt=prompt,
+            max_tokens=PAGE_MAX_TOKENS,
+            temperature=0.7,
+        )
+        page = self._parse_page(response.get("text", ""), page_number)
+
+        characters = self._characters(character_bible)
+        enhanced_prompt = self.literature_expert.enhance_illustration_prompt_for_page(
+            page_text=page.text,
+            page_number=page_number,
+            characters=characters,
+            overall_style=framework.get("illustration_style") or {
+                "illustration_style": "watercolor",
+                "color_palette": "warm and bright",
+            },
+            age_group=framework.get("age_group", "6-8"),
+        )
+        page.illustration_prompt = (
+            f"{page.illustration_prompt} {enhanced_prompt}" if page.illustration_prompt else enhanced_prompt
+        )
+        return page
+
+    def build_page_prompt(
+        self,
+        framework: Dict[str, Any],
+        character_bible: Dict[str, Any],
+        prior_pages: List[Dict[str, Any]],
+        page_number: int,
+        total_pages: int,
+    ) -> str:
+        """构建单页提示词；提示词长度随窗口大小而不是已生成页数增长"""
+        recent = prior_pages[-self.context_window:] if self.context_window else []
+        earlier = prior_pages[: len(prior_pages) - len(recent)]
+
+        sections = [
+            f"你是儿童文学作家，请续写一个共{total_pages}页的儿童故事的第{page_number}页。",
+            f"目标年龄：{framework.get('age_group', '')}",
+        ]
+        if framework.get("learning_objectives"):
+            sections.append(f"教育目标：{'；'.join(map(str, framework['learning_objectives']))}")
+
+        characters = character_bible.get("characters", [])
+        if characters:
+            sections.append(
+                "角色设定（保持一致）：\n"
+                + "\n".join(
+                    f"- {item.get('name', '')}：{item.get('description', '')}（外形：{item.get('visual_description', '')}）"
+                    for item in characters
+                )
+            )
+
+        if earlier:
+            sections.append(
+                "前情梗概：\n"
+                + "\n".join(f"第{page.get('page_number')}页：{self._summarize(page.get('text', ''))}" for page in earlier)
+            )
+        if recent:
+            sections.append(
+                "最近几页原文：\n"
+                + "\n".join(f"第{page.get('page_number')}页：{page.get('text', '')}" for page in recent)
+            )
+
+        if page_number == total_pages:
+            sections.append("这是最后一页，请给故事一个温暖的结局。")
+        sections.append('只输出JSON：{"text": "本页正文", "illustration_prompt": "本页插图描述"}')
+        return "\n\n".join(sections)
+
+    async def _produce(
+        self,
+        queue: asyncio.Queue,
+        framework: Dict[str, Any],
+        character_bible: Dict[str, Any],
+        pages: List[Dict[str, Any]],
+        total_pages: int,
+    ) -> None:
+        for page_number in range(len(pages) + 1, total_pages + 1):
+            try:
+                page = await self.write_page(framework, character_bible, pages, page_number, total_pages)
+            except Exception as e:
+                logger.error(f"Incremental page {page_number} generation failed: {str(e)}")
+                await queue.put({"type": "page_error", "page_number": page_number, "message": str(e)})
+                continue
+
+            page_data = page.model_dump()
+            pages.append(page_data)
+            # 队列容量即预取深度：消费者处理上一页时，这里已在生成下一页
+            await queue.put({"type": "page_text", "page_number": page_number, "page": page_data})
+
+        await queue.put(_END_OF_STREAM)
+
+    @staticmethod
+    def _parse_page(text: str, page_number: int) -> StoryPage:
+        try:
+            data = parse_json(text, "story_page")
+        except ResponseParseError:
+            data = None
+
+        if not isinstance(data, dict):
+            # 模型未按JSON输出时把整段文本当作正文
+            data = {"text": text.strip(), "illustration_prompt": ""}
+
+        page_text = str(data.get("text", "")).strip()
+        if not page_text:
+            raise ValueError("Empty page text")
+
+        return StoryPage(
+            page_number=page_number,
+            text=page_text,
+            illustration_prompt=str(data.get("illustration_prompt", "")),
+            crowd_prompt=data.get("crowd_prompt"),
+            word_count=len(page_text),
+        )
+
+    @staticmethod
+    def _summarize(text: str, limit: int = 40) -> str:
+        ends = [index for index in (text.find(mark) for mark in ("。", "！", "？")) if 0 <= index < limit]
+        return text[: min(ends) + 1] if ends else text[:limit]
+
+    @staticmethod
+    def _characters(character_bible: Dict[str, Any]) -> List[Character]:
+        characters = []
+        for item in character_bible.get("characters", []):
+            characters.append(
+                Character(
+                    name=item.get("name", ""),
+                    description=item.get("description", ""),
+                    personality=item.get("personality", ""),
+                    visual_description=item.get("visual_description", ""),
+                    role_in_story=item.get("role_in_story", ""),
+                )
+            )
+        return characters
@@ -21,14 +21,27 @@ class AIServiceConfig(BaseSettings):
     max_framework_tokens: int = 2000
     max_story_tokens: int = 4000
     max_quality_tokens: int = 1500
+    quality_input_token_budget: int = 2500      # 质量检查提示词的输入 token 上限，超出时裁剪低优先级段落
+    quality_output_list_items: int = 5          # 估算 max_tokens 时每个列表字段的期望条目数
+    quality_batch_size: int = 4                 # 批量质量检查时合并到一次模型调用的故事数
 
     # Cache Configuration
     enable_framework_cache: bool = True
     cache_ttl_hours: int = 24
+    framework_cache_stale_hours: int = 6            # 过期后仍可返回旧值并后台刷新的时长
+    framework_cache_negative_ttl_seconds: int = 300
+    framework_cache_early_expiry_beta: float = 1.0  # 0 关闭概率提前刷新
+
+    # Provider Warm-up
+    provider_warmup_enabled: bool = os.getenv("PROVIDER_WARMUP_ENABLED", "true").lower() == "true"
 
     # Cost Control
     max_daily_cost_usd: float = 100.0
     cost_alert_threshold: float = 80.0
+    cost_calibration_window: int = 500          # 每个 (模型, 请求类型) 保留的最近样本数
+    cost_calibration_min_samples: int = 20      # 少于该样本数时 p95 沿用 1.2 倍先验
+    cost_calibration_refresh_seconds: int = 300
+    cost_reservation_ttl_seconds: int = 600      # 未结算的预算预留过期退回时间
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,258 @@
+"""
+预算预留与结算
+请求前用一次 Lua 脚本原子地检查日/月限额并预留估算成本，完成后再用一次脚本按实际成本结算（多退少补），
+同时写入使用日志、成本校准样本与用户/天、全局/小时成本汇总；进程崩溃遗留的预留到期后在该用户下一次预留时自动退回
+"""
+
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from core import cost_rollups
+
+# KEYS: tier, daily, monthly, reservations(hash), reservation_expiry(zset), previous_daily, previous_monthly
+# ARGV: limits_json, default_tier, reservation_id, amount, now, reservation_ttl, daily_ttl, monthly_ttl
+# 脚本只访问声明的键：过期预留只能退回到今天/昨天的日键、本月/上月的月键，更早的周期已不参与限额判断，直接丢弃
+# 返回 {granted, daily_before, monthly_before, daily_limit, monthly_limit, tier}（数值以字符串返回，避免被截断为整数）
+RESERVE_SCRIPT = """
+local limits = cjson.decode(ARGV[1])
+local tier = redis.call('GET', KEYS[1])
+if not tier or not limits[tier] then
+  tier = ARGV[2]
+end
+local daily_limit = tonumber(limits[tier]['daily'])
+local monthly_limit = tonumber(limits[tier]['monthly'])
+local amount = tonumber(ARGV[4])
+local now = tonumber(ARGV[5])
+local refundable = {[KEYS[2]] = KEYS[2], [KEYS[3]] = KEYS[3], [KEYS[6]] = KEYS[6], [KEYS[7]] = KEYS[7]}
+
+local expired = redis.call('ZRANGEBYSCORE', KEYS[5], '-inf', now)
+for _, reservation_id in ipairs(expired) do
+  local raw = redis.call('HGET', KEYS[4], reservation_id)
+  if raw then
+    local reservation = cjson.decode(raw)
+    for _, stored_key in ipairs({reservation['daily_key'], reservation['monthly_key']}) do
+      local key = refundable[stored_key]
+      if key and redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBYFLOAT', key, -reservation['amount'])
+      end
+    end
+    redis.call('HDEL', KEYS[4], reservation_id)
+  end
+end
+if #expired > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[5], '-inf', now)
+end
+
+local daily = tonumber(redis.call('GET', KEYS[2]) or '0')
+local monthly = tonumber(redis.call('GET', KEYS[3]) or '0')
+if daily + amount > daily_limit or monthly + amount > monthly_limit then
+  return {0, tostring(daily), tostring(monthly), tostring(daily_limit), tostring(monthly_limit), tier}
+end
+
+redis.call('INCRBYFLOAT', KEYS[2], amount)
+redis.call('EXPIRE', KEYS[2], ARGV[7])
+redis.call('INCRBYFLOAT', KEYS[3], amount)
+redis.call('EXPIRE', KEYS[3], ARGV[8])
+redis.call('HSET', KEYS[4], ARGV[3], cjson.encode({amount = amount, daily_key = KEYS[2], monthly_key = KEYS[3]}))
+redis.call('ZADD', KEYS[5], now + tonumber(ARGV[6]), ARGV[3])
+redis.call('EXPIRE', KEYS[4], ARGV[7])
+redis.call('EXPIRE', KEYS[5], ARGV[7])
+return {1, tostring(daily), tostring(monthly), tostring(daily_limit), tostring(monthly_limit), tier}
+"""
+
+# KEYS: reservations(hash), reservation_expiry(zset), daily, monthly, usage_log, calibration, user_day_rollup, hour_rollup,
+#       reserved_daily, reserved_monthly
+# ARGV: reservation_id, actual_cost, daily_ttl, monthly_ttl, log_entry, log_ttl, calibration_ratio, calibration_window,
+#       rollup_model_field, rollup_ttl
+# reserved_* 是预留当天/当月的键（由预留ID中的日期在客户端推出，跨天时与当前键不同）。
+# 预留仍在时按差额结算并计入 reserved_*；预留不存在（未预留或已过期退回）时全额计入当前键。返回实际计入的差额
+SETTLE_SCRIPT = """
+local actual = tonumber(ARGV[2])
+local delta = actual
+local daily_key = KEYS[3]
+local monthly_key = KEYS[4]
+
+if ARGV[1] ~= '' then
+  local raw = redis.call('HGET', KEYS[1], ARGV[1])
+  if raw then
+    local reservation = cjson.decode(raw)
+    delta = actual - reservation['amount']
+    daily_key = KEYS[9]
+    monthly_key = KEYS[10]
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[2], ARGV[1])
+  end
+end
+
+if delta ~= 0 then
+  redis.call('INCRBYFLOAT', daily_key, delta)
+  redis.call('INCRBYFLOAT', monthly_key, delta)
+end
+redis.call('EXPIRE', daily_key, ARGV[3])
+redis.call('EXPIRE', monthly_key, ARGV[4])
+
+redis.call('LPUSH', KEYS[5], ARGV[5])
+redis.call('EXPIRE', KEYS[5], ARGV[6])
+
+if ARGV[7] ~= '' then
+  redis.call('LPUSH', KEYS[6], ARGV[7])
+  redis.call('LTRIM', KEYS[6], 0, tonumber(ARGV[8]) - 1)
+end
+
+for _, rollup_key in ipairs({KEYS[7], KEYS[8]}) do
+  redis.call('HINCRBYFLOAT', rollup_key, 'total', actual)
+  redis.call('HINCRBYFLOAT', rollup_key, ARGV[9], actual)
+  redis.call('HINCRBY', rollup_key, 'requests', 1)
+  redis.call('EXPIRE', rollup_key, ARGV[10])
+end
+return tostring(delta)
+"""
+
+DAILY_TTL_SECONDS = 86400 * 2     # 2天过期
+MONTHLY_TTL_SECONDS = 86400 * 35  # 35天过期
+USAGE_LOG_TTL_SECONDS = 86400 * 7  # 7天日志保留
+
+
+@dataclass(frozen=True)
+class ReservationResult:
+    """预留结果；current_* 为预留前的已用额度"""
+    granted: bool
+    reservation_id: Optional[str]
+    amount: float
+    tier: str
+    current_daily: float
+    current_monthly: float
+    daily_limit: float
+    monthly_limit: float
+
+
+class BudgetReservationManager:
+    """
+    Atomic per-user budget reservations over the cost:daily / cost:monthly keys.
+
+    reserve() and settle() are one EVALSHA each, so a request costs exactly two
+    Redis round-trips for budgeting however many run concurrently.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        budget_limits: Dict[str, Dict[str, float]],
+        default_tier: str = 'standard',
+        reservation_ttl_seconds: int = 600,
+    ):
+        self.redis = redis_client
+        self.budget_limits = budget_limits
+        self.default_tier = default_tier
+        self.reservation_ttl_seconds = reservation_ttl_seconds
+        self._reserve_script = redis_client.register_script(RESERVE_SCRIPT)
+        self._settle_script = redis_client.register_script(SETTLE_SCRIPT)
+
+    def reserve(self, user_id: str, amount: float) -> ReservationResult:
+        """原子地检查限额并预留 amount；额度不足时不预留"""
+        now = datetime.now()
+        # 预留ID带上预留日期，结算时据此声明预留当天的键
+        reservation_id = f"{uuid.uuid4().hex}:{now.strftime('%Y-%m-%d')}"
+        daily_key, monthly_key = self.usage_keys(user_id, now)
+        previous_daily_key, _ = self.usage_keys(user_id, now - timedelta(days=1))
+        _, previous_monthly_key = self.usage_keys(user_id, now.replace(day=1) - timedelta(days=1))
+        result = self._reserve_script(
+            keys=[
+                f"user:tier:{user_id}",
+                daily_key,
+                monthly_key,
+                f"cost:reservations:{user_id}",
+                f"cost:reservation_expiry:{user_id}",
+                previous_daily_key,
+                previous_monthly_key,
+            ],
+            args=[
+                json.dumps(self.budget_limits),
+                self.default_tier,
+                reservation_id,
+                amount,
+                time.time(),
+                self.reservation_ttl_seconds,
+                DAILY_TTL_SECONDS,
+                MONTHLY_TTL_SECONDS,
+            ],
+        )
+        granted, daily, monthly, daily_limit, monthly_limit, tier = result
+        granted = int(granted) == 1
+        return ReservationResult(
+            granted=granted,
+            reservation_id=reservation_id if granted else None,
+            amount=amount,
+            tier=tier.decode() if isinstance(tier, bytes) else tier,
+            current_daily=float(daily),
+            current_monthly=float(monthly),
+            daily_limit=float(daily_limit),
+            monthly_limit=float(monthly_limit),
+        )
+
+    def settle(
+        self,
+        user_id: str,
+        reservation_id: Optional[str],
+        actual_cost: float,
+        usage_log: Dict[str, Any],
+        calibration_key: Optional[str] = None,
+        calibration_ratio: Optional[float] = None,
+        calibration_window: int = 500,
+    ) -> float:
+        """按实际成本结算预留（无预留时全额计入），返回本次计入的差额"""
+        daily_key, monthly_key = self.usage_keys(user_id)
+        today = daily_key.rsplit(':', 1)[-1]
+        reserved_daily_key, reserved_monthly_key = self._reserved_keys(user_id, reservation_id, daily_key, monthly_key)
+        has_sample = calibration_key is not None and calibration_ratio is not None
+        delta = self._settle_script(
+            keys=[
+                f"cost:reservations:{user_id}",
+                f"cost:reservation_expiry:{user_id}",
+                daily_key,
+                monthly_key,
+                f"cost:log:{user_id}:{today}",
+                calibration_key or "cost:calibration:none",
+                cost_rollups.user_day_key(user_id, today),
+                cost_rollups.hour_key(cost_rollups.current_hour()),
+                reserved_daily_key,
+                reserved_monthly_key,
+            ],
+            args=[
+                reservation_id or '',
+                actual_cost,
+                DAILY_TTL_SECONDS,
+                MONTHLY_TTL_SECONDS,
+                json.dumps(usage_log),
+                USAGE_LOG_TTL_SECONDS,
+                round(calibration_ratio, 4) if has_sample else '',
+                calibration_window,
+                cost_rollups.model_field(usage_log.get('model')),
+                cost_rollups.ROLLUP_TTL_SECONDS,
+            ],
+        )
+        return float(delta)
+
+    @staticmethod
+    def usage_keys(user_id: str, now: Optional[datetime] = None) -> Tuple[str, str]:
+        now = now or datetime.now()
+        return f"cost:daily:{user_id}:{now.strftime('%Y-%m-%d')}", f"cost:monthly:{user_id}:{now.strftime('%Y-%m')}"
+
+    @classmethod
+    def _reserved_keys(
+        cls,
+        user_id: str,
+        reservation_id: Optional[str],
+        daily_key: str,
+        monthly_key: str,
+    ) -> Tuple[str, str]:
+        """预留当天/当月的键；无预留或预留ID不含日期时沿用当前键"""
+        _, _, day = (reservation_id or '').partition(':')
+        try:
+            return cls.usage_keys(user_id, datetime.strptime(day, '%Y-%m-%d'))
+        except ValueError:
+            return daily_key, monthly_key
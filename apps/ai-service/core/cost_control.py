@@ -10,7 +10,11 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import redis
-import json
+
+from config import config
+from core import cost_rollups
+from core.budget_reservation import BudgetReservationManager, ReservationResult
+from core.token_estimator import OutputLengthCalibrator, PromptTokenCounter, prior_token_estimate
 
 class CostLevel(Enum):
     """成本等级"""
@@ -28,12 +32,17 @@ class BudgetStatus(Enum):
 
 @dataclass
 class CostEstimate:
-    """成本估算"""
+    """成本估算（estimated_cost 为 p50；预算检查按 p95 预留）"""
     total_tokens: int
     estimated_cost: float
     processing_time: float
     confidence: float
     breakdown: Dict[str, float]
+    p95_cost: float = 0.0
+    input_tokens: int = 0
+    output_tokens_p50: int = 0
+    output_tokens_p95: int = 0
+    calibration_samples: int = 0
 
 @dataclass
 class BudgetInfo:
@@ -55,6 +64,13 @@ class EnhancedCostController:
     def __init__(self, redis_client):
         self.redis = redis_client
         self.logger = logging.getLogger(__name__)
+        self.token_counter = PromptTokenCounter()
+        self.output_calibrator = OutputLengthCalibrator(
+            redis_client,
+            window=config.cost_calibration_window,
+            min_samples=config.cost_calibration_min_samples,
+            refresh_seconds=config.cost_calibration_refresh_seconds,
+        )
 
         # 模型成本配置 (每1000 tokens)
         self.model_costs = {
@@ -90,6 +106,12 @@ class EnhancedCostController:
             ]
         }
 
+        self.reservations = BudgetReservationManager(
+            redis_client,
+            self.budget_limits,
+            reservation_ttl_seconds=config.cost_reservation_ttl_seconds,
+        )
+
     async def pre_request_budget_check(self, user_id: str, request_details: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
         """
         请求前预算检查
@@ -100,33 +122,37 @@ class EnhancedCostController:
 
         Returns:
             (是否允许请求, 决策信息)
-        """
-        # 1. 获取用户预算信息
-        budget_info = await self._get_budget_info(user_id)
 
-        # 2. 估算请求成本
+        允许时已按 p95 预留预算，decision_info['reservation_id'] 需在完成后传给 record_actual_cost 结算；
+        未结算的预留在 cost_reservation_ttl_seconds 后自动退回
+        """
+        # 1. 估算请求成本
         cost_estimate = self._estimate_request_cost(request_details)
 
-        # 3. 预算充足性检查
-        can_proceed = self._check_budget_sufficiency(budget_info, cost_estimate)
+        # 2. 原子检查并预留（一次往返，同时取回用户预算信息）
+        reservation = self.reservations.reserve(user_id, cost_estimate.p95_cost)
+        budget_info = self._budget_info_from_reservation(reservation)
+        can_proceed = reservation.granted
 
-        # 4. 生成决策信息
+        # 3. 生成决策信息
         decision_info = {
             'can_proceed': can_proceed,
+            'reservation_id': reservation.reservation_id,
             'budget_status': budget_info.status.value,
             'estimated_cost': cost_estimate.estimated_cost,
+            'estimated_cost_p95': cost_estimate.p95_cost,
             'remaining_budget': budget_info.remaining_daily,
             'suggested_action': None,
             'alternative_options': []
         }
 
-        # 5. 如果预算不足，提供替代方案
+        # 4. 如果预算不足，提供替代方案
         if not can_proceed:
             alternatives = await self._generate_alternatives(request_details, budget_info)
             decision_info['alternative_options'] = alternatives
             decision_info['suggested_action'] = '预算不足，建议选择替代方案'
 
-        # 6. 如果预算警告，提供优化建议
+        # 5. 如果预算警告，提供优化建议
         elif budget_info.status in [BudgetStatus.WARNING, BudgetStatus.CRITICAL]:
             optimization = await self._suggest_cost_optimization(request_details)
             decision_info['suggested_action'] = '预算紧张，建议成本优化'
@@ -154,17 +180,6 @@ class EnhancedCostController:
         remaining_daily = max(0, limits['daily'] - current_daily)
         remaining_monthly = max(0, limits['monthly'] - current_monthly)
 
-        # 确定预算状态
-        daily_usage_ratio = current_daily / limits['daily']
-        if daily_usage_ratio >= 1.0:
-            status = BudgetStatus.EXCEEDED
-        elif daily_usage_ratio >= 0.9:
-            status = BudgetStatus.CRITICAL
-        elif daily_usage_ratio >= 0.7:
-            status = BudgetStatus.WARNING
-        else:
-            status = BudgetStatus.SAFE
-
         return BudgetInfo(
             daily_limit=limits['daily'],
             monthly_limit=limits['monthly'],
@@ -172,57 +187,87 @@ class EnhancedCostController:
             current_monthly_usage=current_monthly,
             remaining_daily=remaining_daily,
             remaining_monthly=remaining_monthly,
-            status=status
+            status=self._budget_status(current_daily / limits['daily'])
+        )
+
+    def _budget_info_from_reservation(self, reservation: ReservationResult) -> BudgetInfo:
+        """由预留脚本返回的预留前用量构造预算信息"""
+        return BudgetInfo(
+            daily_limit=reservation.daily_limit,
+            monthly_limit=reservation.monthly_limit,
+            current_daily_usage=reservation.current_daily,
+            current_monthly_usage=reservation.current_monthly,
+            remaining_daily=max(0, reservation.daily_limit - reservation.current_daily),
+            remaining_monthly=max(0, reservation.monthly_limit - reservation.current_monthly),
+            status=self._budget_status(reservation.current_daily / reservation.daily_limit)
         )
 
+    def _budget_status(self, daily_usage_ratio: float) -> BudgetStatus:
+        """确定预算状态"""
+        if daily_usage_ratio >= 1.0:
+            return BudgetStatus.EXCEEDED
+        elif daily_usage_ratio >= 0.9:
+            return BudgetStatus.CRITICAL
+        elif daily_usage_ratio >= 0.7:
+            return BudgetStatus.WARNING
+        return BudgetStatus.SAFE
+
     def _estimate_request_cost(self, request_details: Dict[str, Any]) -> CostEstimate:
-        """估算请求成本"""
+        """
+        估算请求成本
+
+        输入 token 有提示词时用本地 tokenizer 计数，否则按内容长度估算；
+        输出 token 为先验估计乘以该 (模型, 请求类型) 实测比值的 p50/p95
+        """
         model = request_details.get('model', 'qwen-plus')
-        content_length = request_details.get('content_length', 1000)
         request_type = request_details.get('type', 'story_generation')
 
-        # 基于内容长度估算 token 数量
-        if request_type == 'story_generation':
-            # 故事生成：输入较少，输出较多
-            input_tokens = min(content_length * 0.5, 2000)  # 输入提示词
-            output_tokens = content_length * 2              # 生成的故事内容
-        elif request_type == 'illustration':
-            # 插画生成：固定成本
-            input_tokens = 500
-            output_tokens = 100
-        else:
-            # 其他类型：均衡估算
-            input_tokens = content_length * 0.8
-            output_tokens = content_length * 0.3
-
-        # 计算成本
-        if model in self.model_costs:
-            cost_config = self.model_costs[model]
-            input_cost = (input_tokens / 1000) * cost_config['input']
-            output_cost = (output_tokens / 1000) * cost_config['output']
-            total_cost = input_cost + output_cost
-        else:
-            # 未知模型，使用平均成本
-            total_cost = ((input_tokens + output_tokens) / 1000) * 0.05
+        input_tokens = self._estimate_input_tokens(request_details)
+        _, prior_output_tokens = prior_token_estimate(request_details)
+        calibration = self.output_calibrator.get(model, request_type)
+        output_p50 = prior_output_tokens * calibration.p50_ratio
+        output_p95 = prior_output_tokens * max(calibration.p95_ratio, calibration.p50_ratio)
 
-        # 添加处理时间估算
-        processing_time = self._estimate_processing_time(model, input_tokens + output_tokens)
+        input_cost, output_cost = self._token_costs(model, input_tokens, output_p50)
+        _, output_cost_p95 = self._token_costs(model, input_tokens, output_p95)
+        total_cost = input_cost + output_cost
 
-        # 置信度：基于历史数据的准确性（简化版）
-        confidence = 0.85
+        # 添加处理时间估算
+        processing_time = self._estimate_processing_time(model, input_tokens + output_p50)
 
         return CostEstimate(
-            total_tokens=int(input_tokens + output_tokens),
+            total_tokens=int(input_tokens + output_p50),
             estimated_cost=round(total_cost, 4),
             processing_time=processing_time,
-            confidence=confidence,
+            # 置信度：历史请求中实际成本落在 p50 ±20% 内的比例，样本不足时为 0
+            confidence=round(calibration.within_20pct, 4),
             breakdown={
                 'input_cost': round(input_cost, 4),
                 'output_cost': round(output_cost, 4),
                 'model': model
-            }
+            },
+            p95_cost=round(input_cost + output_cost_p95, 4),
+            input_tokens=int(input_tokens),
+            output_tokens_p50=int(output_p50),
+            output_tokens_p95=int(output_p95),
+            calibration_samples=calibration.samples
         )
 
+    def _estimate_input_tokens(self, request_details: Dict[str, Any]) -> float:
+        prompt = request_details.get('prompt')
+        if prompt:
+            return self.token_counter.count(prompt, request_details.get('model', 'qwen-plus'))
+        input_tokens, _ = prior_token_estimate(request_details)
+        return input_tokens
+
+    def _token_costs(self, model: str, input_tokens: float, output_tokens: float) -> Tuple[float, float]:
+        """(输入成本, 输出成本)"""
+        if model in self.model_costs:
+            cost_config = self.model_costs[model]
+            return (input_tokens / 1000) * cost_config['input'], (output_tokens / 1000) * cost_config['output']
+        # 未知模型，使用平均成本
+        return (input_tokens / 1000) * 0.05, (output_tokens / 1000) * 0.05
+
     def _estimate_processing_time(self, model: str, total_tokens: int) -> float:
         """估算处理时间（秒）"""
         # 不同模型的处理速度（tokens/秒）
@@ -244,9 +289,8 @@ class EnhancedCostController:
 
     def _check_budget_sufficiency(self, budget_info: BudgetInfo, cost_estimate: CostEstimate) -> bool:
         """检查预算充足性"""
-        # 保守检查：确保有余量应对估算误差
-        safety_margin = 1.2  # 20%安全边际
-        required_budget = cost_estimate.estimated_cost * safety_margin
+        # 按 p95 预留：估算误差已体现在校准后的分位数中，不再额外乘安全边际
+        required_budget = cost_estimate.p95_cost
 
         # 检查日预算和月预算
         daily_sufficient = budget_info.remaining_daily >= required_budget
@@ -357,24 +401,20 @@ class EnhancedCostController:
 
         return optimizations
 
-    async def record_actual_cost(self, user_id: str, request_details: Dict[str, Any], actual_cost: float):
-        """记录实际成本"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        month = datetime.now().strftime('%Y-%m')
-
-        # 更新使用统计
-        daily_key = f"cost:daily:{user_id}:{today}"
-        monthly_key = f"cost:monthly:{user_id}:{month}"
-
-        # 原子性更新
-        pipe = self.redis.pipeline()
-        pipe.incrbyfloat(daily_key, actual_cost)
-        pipe.expire(daily_key, 86400 * 2)  # 2天过期
-        pipe.incrbyfloat(monthly_key, actual_cost)
-        pipe.expire(monthly_key, 86400 * 35)  # 35天过期
-        pipe.execute()
+    async def record_actual_cost(
+        self,
+        user_id: str,
+        request_details: Dict[str, Any],
+        actual_cost: float,
+        reservation_id: Optional[str] = None
+    ):
+        """
+        记录实际成本
 
-        # 记录详细使用日志
+        有 reservation_id 时按差额结算该预留，否则全额计入；
+        用量、使用日志与校准样本在同一个脚本中写入（一次往返）
+        """
+        estimated_cost = request_details.get('estimated_cost') or actual_cost
         usage_log = {
             'timestamp': datetime.now().isoformat(),
             'user_id': user_id,
@@ -382,47 +422,53 @@ class EnhancedCostController:
             'type': request_details.get('type'),
             'actual_cost': actual_cost,
             'estimated_cost': request_details.get('estimated_cost'),
-            'accuracy': actual_cost / request_details.get('estimated_cost', actual_cost)
+            'accuracy': actual_cost / estimated_cost if estimated_cost else 1.0
         }
 
-        log_key = f"cost:log:{user_id}:{today}"
-        self.redis.lpush(log_key, json.dumps(usage_log))
-        self.redis.expire(log_key, 86400 * 7)  # 7天日志保留
+        model = request_details.get('model', 'qwen-plus')
+        request_type = request_details.get('type', 'story_generation')
+        self.reservations.settle(
+            user_id,
+            reservation_id,
+            actual_cost,
+            usage_log,
+            calibration_key=self.output_calibrator.redis_key(model, request_type),
+            calibration_ratio=self._output_calibration_ratio(request_details, actual_cost),
+            calibration_window=self.output_calibrator.window,
+        )
 
         self.logger.info(f"Cost recorded for user {user_id}: ${actual_cost}")
 
-    async def get_cost_analytics(self, user_id: str) -> Dict[str, Any]:
-        """获取成本分析报告"""
-        today = datetime.now().strftime('%Y-%m-%d')
+    def _output_calibration_ratio(self, request_details: Dict[str, Any], actual_cost: float) -> Optional[float]:
+        """本次实际输出 token 与先验估计之比，无法推算时返回 None"""
+        model = request_details.get('model', 'qwen-plus')
+        _, prior_output_tokens = prior_token_estimate(request_details)
+        if prior_output_tokens <= 0:
+            return None
+
+        actual_output_tokens = request_details.get('output_tokens')
+        if actual_output_tokens is None:
+            # 没有上报输出 token 时按单价从实际成本反推
+            if model not in self.model_costs:
+                return None
+            input_cost, _ = self._token_costs(model, self._estimate_input_tokens(request_details), 0)
+            actual_output_tokens = max(0.0, actual_cost - input_cost) / self.model_costs[model]['output'] * 1000
+
+        return actual_output_tokens / prior_output_tokens
 
-        # 获取最近7天的详细日志
-        analytics = {
-            'daily_breakdown': {},
-            'model_usage': {},
+    async def get_cost_analytics(self, user_id: str) -> Dict[str, Any]:
+        """获取成本分析报告（读取结算时维护的汇总，一次流水线往返）"""
+        dates = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+        rollups = cost_rollups.read_user_rollups(self.redis, user_id, dates)
+
+        return {
+            'daily_breakdown': {date: rollups[date]['total'] for date in dates},
+            'daily_requests': {date: rollups[date]['requests'] for date in dates},
+            'model_usage': rollups[dates[0]]['models'],
             'cost_trends': {},
             'efficiency_metrics': {}
         }
 
-        for i in range(7):
-            date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-            log_key = f"cost:log:{user_id}:{date}"
-            logs = self.redis.lrange(log_key, 0, -1)
-
-            daily_cost = 0
-            model_usage = {}
-
-            for log_data in logs:
-                log = json.loads(log_data)
-                daily_cost += log['actual_cost']
-                model = log['model']
-                model_usage[model] = model_usage.get(model, 0) + log['actual_cost']
-
-            analytics['daily_breakdown'][date] = daily_cost
-            if date == today:
-                analytics['model_usage'] = model_usage
-
-        return analytics
-
     async def _get_user_tier(self, user_id: str) -> str:
         """获取用户订阅等级（简化版）"""
         # 这里应该从数据库获取，暂时返回默认值
@@ -444,8 +490,9 @@ def with_cost_control(cost_controller: EnhancedCostController):
                 user_id, request_details
             )
 
+            reservation_id = decision_info.get('reservation_id')
             if not can_proceed:
-                # 尝试自动降级
+                # 尝试自动降级（替代方案未预留，完成后全额计入）
                 alternatives = decision_info.get('alternative_options', [])
                 if alternatives:
                     best_alternative = alternatives[0]
@@ -462,13 +509,13 @@ def with_cost_control(cost_controller: EnhancedCostController):
                 result = await func(*args, **kwargs)
                 # 记录成功的成本
                 actual_cost = result.get('actual_cost', request_details.get('estimated_cost', 0))
-                await cost_controller.record_actual_cost(user_id, request_details, actual_cost)
+                await cost_controller.record_actual_cost(user_id, request_details, actual_cost, reservation_id)
                 return result
             except Exception as e:
                 # 记录失败（部分成本可能已产生）
                 processing_time = (datetime.now() - start_time).total_seconds()
                 partial_cost = min(processing_time * 0.01, request_details.get('estimated_cost', 0) * 0.3)
-                await cost_controller.record_actual_cost(user_id, request_details, partial_cost)
+                await cost_controller.record_actual_cost(user_id, request_details, partial_cost, reservation_id)
                 raise e
 
         return wrapper
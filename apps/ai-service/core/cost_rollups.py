@@ -0,0 +1,120 @@
+"""
+成本汇总（rollup）
+结算时按 用户/天 与 全局/小时 用 HINCRBYFLOAT 累加，分析接口一次流水线读取；
+cost:log:* 原始日志只做审计保留，rebuild_rollups 可从原始日志重建汇总
+"""
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TTL_SECONDS = 86400 * 35  # 与月度用量同周期
+TOTAL_FIELD = "total"
+REQUESTS_FIELD = "requests"
+MODEL_FIELD_PREFIX = "model:"
+
+
+def user_day_key(user_id: str, date: str) -> str:
+    return f"cost:rollup:user:{user_id}:{date}"
+
+
+def hour_key(hour: str) -> str:
+    """hour 形如 2024-05-01T13"""
+    return f"cost:rollup:hour:{hour}"
+
+
+def model_field(model: Optional[str]) -> str:
+    return f"{MODEL_FIELD_PREFIX}{model or 'unknown'}"
+
+
+def current_hour(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now()).strftime('%Y-%m-%dT%H')
+
+
+def parse_rollup(raw: Dict[Any, Any]) -> Dict[str, Any]:
+    """HGETALL 结果 -> {total, requests, models}"""
+    fields = {_text(key): _text(value) for key, value in (raw or {}).items()}
+    return {
+        "total": float(fields.get(TOTAL_FIELD, 0)),
+        "requests": int(float(fields.get(REQUESTS_FIELD, 0))),
+        "models": {
+            key[len(MODEL_FIELD_PREFIX):]: float(value)
+            for key, value in fields.items()
+            if key.startswith(MODEL_FIELD_PREFIX)
+        },
+    }
+
+
+def read_user_rollups(redis_client, user_id: str, dates: List[str]) -> Dict[str, Dict[str, Any]]:
+    """一次流水线读取多天的用户汇总"""
+    pipe = redis_client.pipeline(transaction=False)
+    for date in dates:
+        pipe.hgetall(user_day_key(user_id, date))
+    return {date: parse_rollup(raw) for date, raw in zip(dates, pipe.execute())}
+
+
+def read_hour_rollups(redis_client, hours: List[str]) -> Dict[str, Dict[str, Any]]:
+    pipe = redis_client.pipeline(transaction=False)
+    for hour in hours:
+        pipe.hgetall(hour_key(hour))
+    return {hour: parse_rollup(raw) for hour, raw in zip(hours, pipe.execute())}
+
+
+def aggregate_usage_logs(entries: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+    """把原始使用日志聚合成汇总哈希的字段"""
+    fields: Dict[str, float] = defaultdict(float)
+    for entry in entries:
+        cost = float(entry.get('actual_cost') or 0)
+        fields[TOTAL_FIELD] += cost
+        fields[REQUESTS_FIELD] += 1
+        fields[model_field(entry.get('model'))] += cost
+    return dict(fields)
+
+
+def rebuild_rollups(redis_client, days: int = 7, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    从 cost:log:{user}:{date} 原始日志重建最近 days 天的用户/天与全局/小时汇总
+
+    只改写有日志的汇总键：每个键先删除再整体写入（同一事务），可重复执行；
+    日志已过期的日期保留现有汇总
+    """
+    now = now or datetime.now()
+    dates = {(now - timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days)}
+
+    user_entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    hour_entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for raw_key in redis_client.scan_iter(match="cost:log:*", count=500):
+        log_key = _text(raw_key)
+        user_id, date = log_key[len("cost:log:"):].rsplit(':', 1)
+        if date not in dates:
+            continue
+        for raw_entry in redis_client.lrange(log_key, 0, -1):
+            try:
+                entry = json.loads(raw_entry)
+            except (TypeError, ValueError):
+                logger.warning(f"Skipping malformed usage log entry in {log_key}")
+                continue
+            user_entries[user_day_key(user_id, date)].append(entry)
+            timestamp = entry.get('timestamp') or f"{date}T00"
+            hour_entries[hour_key(timestamp[:13])].append(entry)
+
+    pipe = redis_client.pipeline(transaction=True)
+    for key, entries in {**user_entries, **hour_entries}.items():
+        pipe.delete(key)
+        pipe.hset(key, mapping=aggregate_usage_logs(entries))
+        pipe.expire(key, ROLLUP_TTL_SECONDS)
+    pipe.execute()
+
+    return {
+        "user_day_rollups": len(user_entries),
+        "hour_rollups": len(hour_entries),
+        "log_entries": sum(len(entries) for entries in user_entries.values()),
+    }
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
@@ -0,0 +1,280 @@
+"""
+提示词 token 预算
+提示词由带优先级与 token 预算的段落组成：超出段落预算的段落先被裁剪，总量仍超出输入预算时
+按优先级从低到高继续裁剪或摘要；max_tokens 按期望输出的 JSON 结构估算，
+每次调用生成一份输入/输出 token 节省报告
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.prompt_templates import shared_token_counter
+from core.token_estimator import PromptTokenCounter
+
+logger = logging.getLogger(__name__)
+
+# 裁剪后的段落末尾标记，提示模型内容不完整
+TRUNCATION_MARKER = "……"
+# 期望输出之外留给代码块标记、说明文字的余量
+OUTPUT_HEADROOM = 1.5
+MIN_OUTPUT_TOKENS = 128
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    """
+    提示词段落
+
+    priority 为 0 的段落始终完整保留；数值越大越先被裁剪。
+    summarize(text, token_budget) 返回压缩到预算内的文本，未提供时按 token 截断
+    """
+    name: str
+    text: str
+    priority: int = 0
+    max_tokens: Optional[int] = None
+    summarize: Optional[Callable[[str, int], str]] = None
+
+
+@dataclass
+class PromptBudgetReport:
+    """单次调用的 token 预算报告"""
+    call: str
+    model: str
+    input_tokens: int
+    original_input_tokens: int
+    max_output_tokens: int
+    baseline_max_output_tokens: int
+    trimmed_sections: Dict[str, int] = field(default_factory=dict)  # 段落 -> 裁掉的 token 数
+    actual_input_tokens: Optional[int] = None
+    actual_output_tokens: Optional[int] = None
+
+    @property
+    def input_tokens_saved(self) -> int:
+        return self.original_input_tokens - self.input_tokens
+
+    @property
+    def output_tokens_saved(self) -> int:
+        """相对原先统一 max_tokens 少预留的输出 token"""
+        return self.baseline_max_output_tokens - self.max_output_tokens
+
+    def record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """记录服务商返回的实际用量（通义千问 usage 字段）"""
+        if not usage:
+            return
+        self.actual_input_tokens = usage.get('input_tokens')
+        self.actual_output_tokens = usage.get('output_tokens')
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "call": self.call,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "input_tokens_saved": self.input_tokens_saved,
+            "max_output_tokens": self.max_output_tokens,
+            "output_tokens_saved": self.output_tokens_saved,
+            "trimmed_sections": self.trimmed_sections,
+            "actual_input_tokens": self.actual_input_tokens,
+            "actual_output_tokens": self.actual_output_tokens,
+        }
+
+
+@dataclass(frozen=True)
+class BudgetedPrompt:
+    prompt: str
+    max_tokens: int
+    report: PromptBudgetReport
+
+
+@dataclass
+class _CallTotals:
+    calls: int = 0
+    input_tokens: int = 0
+    input_tokens_saved: int = 0
+    output_tokens_saved: int = 0
+    trimmed_calls: int = 0
+
+
+class PromptBudgeter:
+    """
+    Fits prompt sections into an input token budget and sizes max_tokens from
+    the expected output JSON.
+
+    Sections keep their declared order in the final prompt; only their
+    content is trimmed, lowest priority first.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        input_budget_tokens: int,
+        baseline_max_tokens: int,
+        list_item_tokens: int = 40,
+        token_counter: Optional[PromptTokenCounter] = None,
+    ):
+        self.model = model
+        self.input_budget_tokens = input_budget_tokens
+        self.baseline_max_tokens = baseline_max_tokens
+        self.list_item_tokens = list_item_tokens
+        self.token_counter = token_counter or shared_token_counter
+        self._totals: Dict[str, _CallTotals] = {}
+
+    def build(
+        self,
+        call: str,
+        sections: Sequence[PromptSection],
+        output_example: Dict[str, Any],
+        output_list_items: int = 5,
+        output_repeat: int = 1,
+        input_budget_tokens: Optional[int] = None,
+    ) -> BudgetedPrompt:
+        """
+        output_repeat: 期望输出包含几份 output_example（如批量请求的 JSON 数组）
+        input_budget_tokens: 覆盖本次调用的输入预算
+        """
+        texts = [section.text for section in sections]
+        original = [self.count(text) for text in texts]
+        tokens = list(original)
+
+        # 先执行各段自身的预算
+        for index, section in enumerate(sections):
+            if section.priority > 0 and section.max_tokens is not None and tokens[index] > section.max_tokens:
+                texts[index], tokens[index] = self._shrink(section, texts[index], section.max_tokens)
+
+        # 总量超出时按优先级从低到高裁剪，同优先级先裁最长的段落
+        overflow = sum(tokens) - (input_budget_tokens or self.input_budget_tokens)
+        trimmable = sorted(
+            (index for index, section in enumerate(sections) if section.priority > 0),
+            key=lambda index: (-sections[index].priority, -tokens[index]),
+        )
+        for index in trimmable:
+            if overflow <= 0:
+                break
+            before = tokens[index]
+            texts[index], tokens[index] = self._shrink(sections[index], texts[index], max(0, before - overflow))
+            overflow -= before - tokens[index]
+
+        prompt = "\n".join(text for text in texts if text)
+        report = PromptBudgetReport(
+            call=call,
+            model=self.model,
+            input_tokens=sum(tokens),
+            original_input_tokens=sum(original),
+            max_output_tokens=self.output_tokens_for(output_example, output_list_items, output_repeat),
+            baseline_max_output_tokens=self.baseline_max_tokens * output_repeat,
+            trimmed_sections={
+                section.name: original[index] - tokens[index]
+                for index, section in enumerate(sections)
+                if texts[index] != section.text
+            },
+        )
+        if overflow > 0:
+            logger.warning(f"Prompt for {call} exceeds input budget by {overflow} tokens after trimming")
+        self._record(report)
+        return BudgetedPrompt(prompt=prompt, max_tokens=report.max_output_tokens, report=report)
+
+    def output_tokens_for(self, output_example: Dict[str, Any], list_items: int = 5, repeat: int = 1) -> int:
+        """按期望输出结构估算 max_tokens：标量字段按示例计数，列表字段按条目数 × 单条 token 数"""
+        skeleton = {key: [] if isinstance(value, list) else value for key, value in output_example.items()}
+        list_fields = sum(1 for value in output_example.values() if isinstance(value, list))
+        expected = self.count(json.dumps(skeleton, ensure_ascii=False, indent=4))
+        expected += list_fields * list_items * self.list_item_tokens
+        return min(self.baseline_max_tokens * repeat, max(MIN_OUTPUT_TOKENS, math.ceil(expected * repeat * OUTPUT_HEADROOM)))
+
+    def count(self, text: str) -> int:
+        return self.token_counter.count(text, self.model)
+
+    def truncate(self, text: str, token_budget: int) -> str:
+        """截断到 token_budget 以内（二分查找字符位置）"""
+        if token_budget <= 0:
+            return ""
+        if self.count(text) <= token_budget:
+            return text
+        budget = token_budget - self.count(TRUNCATION_MARKER)
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low] + TRUNCATION_MARKER if low else ""
+
+    def segment_summarizer(self, segments: List[str], separator: str = " ") -> Callable[[str, int], str]:
+        """
+        按片段（如故事各页）摘要：优先保留首尾片段，其余片段等距选取，
+        按原顺序拼接并在省略处加标记
+        """
+        def summarize(_text: str, token_budget: int) -> str:
+            order = _spread_order(len(segments))
+            kept: List[int] = []
+            used = 0
+            for index in order:
+                cost = self.count(segments[index]) + 1
+                if used + cost > token_budget:
+                    continue
+                kept.append(index)
+                used += cost
+            kept.sort()
+
+            parts: List[str] = []
+            previous = -1
+            for index in kept:
+                if index != previous + 1:
+                    parts.append(TRUNCATION_MARKER)
+                parts.append(segments[index])
+                previous = index
+            if kept and previous != len(segments) - 1:
+                parts.append(TRUNCATION_MARKER)
+            return separator.join(parts)
+
+        return summarize
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """按调用名汇总的 token 节省"""
+        return {
+            call: {
+                "calls": totals.calls,
+                "avg_input_tokens": round(totals.input_tokens / totals.calls, 1),
+                "input_tokens_saved": totals.input_tokens_saved,
+                "output_tokens_saved": totals.output_tokens_saved,
+                "trimmed_calls": totals.trimmed_calls,
+            }
+            for call, totals in sorted(self._totals.items())
+        }
+
+    def _shrink(self, section: PromptSection, text: str, token_budget: int):
+        if section.summarize is not None:
+            shrunk = section.summarize(text, token_budget)
+            # 摘要函数未能压到预算内时再截断
+            shrunk = self.truncate(shrunk, token_budget)
+        else:
+            shrunk = self.truncate(text, token_budget)
+        return shrunk, self.count(shrunk)
+
+    def _record(self, report: PromptBudgetReport) -> None:
+        totals = self._totals.setdefault(report.call, _CallTotals())
+        totals.calls += 1
+        totals.input_tokens += report.input_tokens
+        totals.input_tokens_saved += report.input_tokens_saved
+        totals.output_tokens_saved += report.output_tokens_saved
+        if report.trimmed_sections:
+            totals.trimmed_calls += 1
+
+
+def _spread_order(count: int) -> List[int]:
+    """首、尾，然后按二分方式等距展开中间位置"""
+    if count <= 2:
+        return list(range(count))
+    order = [0, count - 1]
+    seen = set(order)
+    step = count - 1
+    while len(order) < count:
+        step = max(1, step // 2)
+        for index in range(step, count - 1, step):
+            if index not in seen:
+                seen.add(index)
+                order.append(index)
+    return order
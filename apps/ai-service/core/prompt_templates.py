@@ -0,0 +1,130 @@
+"""
+提示词模板
+提示词拆成“静态前缀 + 请求相关后缀”：前缀只依赖年龄段、页数等生成参数，按参数编译一次后 LRU 缓存，
+同一参数组合的请求共享逐字节相同的前缀，模型服务商的前缀缓存（prompt/context cache）可以命中；
+每个模板记录渲染次数、字符数与 token 数，用于跟踪提示词开销
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.token_estimator import PromptTokenCounter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TemplateSizeStats:
+    """单个模板的渲染规模统计"""
+    renders: int = 0
+    prefix_hits: int = 0
+    prefix_misses: int = 0
+    total_chars: int = 0
+    max_chars: int = 0
+    total_tokens: int = 0
+    max_tokens: int = 0
+    prefix_tokens_total: int = 0
+
+    def record(self, chars: int, tokens: int, prefix_tokens: int) -> None:
+        self.renders += 1
+        self.total_chars += chars
+        self.max_chars = max(self.max_chars, chars)
+        self.total_tokens += tokens
+        self.max_tokens = max(self.max_tokens, tokens)
+        self.prefix_tokens_total += prefix_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.prefix_hits + self.prefix_misses
+        return {
+            "renders": self.renders,
+            "prefix_hit_rate": round(self.prefix_hits / lookups, 4) if lookups else 0.0,
+            "avg_chars": round(self.total_chars / self.renders, 1) if self.renders else 0.0,
+            "max_chars": self.max_chars,
+            "avg_tokens": round(self.total_tokens / self.renders, 1) if self.renders else 0.0,
+            "max_tokens": self.max_tokens,
+            # 可被服务商前缀缓存复用的 token 占比
+            "prefix_token_share": round(self.prefix_tokens_total / self.total_tokens, 4) if self.total_tokens else 0.0,
+        }
+
+
+class PromptTemplate:
+    """
+    Prompt assembled from a compiled static prefix and a per-request suffix.
+
+    build_prefix(*key) is called once per distinct key; the compiled prefix and
+    its token count are kept in an LRU, so a render only formats the suffix and
+    counts its tokens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        build_prefix: Callable[..., str],
+        max_prefixes: int = 64,
+        token_counter: Optional[PromptTokenCounter] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.build_prefix = build_prefix
+        self.max_prefixes = max_prefixes
+        self.token_counter = token_counter or shared_token_counter
+        self.stats = TemplateSizeStats()
+        self._prefixes: "OrderedDict[Tuple[Hashable, ...], Tuple[str, int]]" = OrderedDict()
+
+    def prefix(self, key: Tuple[Hashable, ...]) -> str:
+        return self._compiled_prefix(key)[0]
+
+    def render(self, key: Tuple[Hashable, ...], suffix: str) -> str:
+        prefix, prefix_tokens = self._compiled_prefix(key)
+        prompt = prefix + suffix
+        self.stats.record(len(prompt), prefix_tokens + self._count_tokens(suffix), prefix_tokens)
+        return prompt
+
+    def size_report(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "cached_prefixes": len(self._prefixes),
+            **self.stats.snapshot(),
+        }
+
+    def _compiled_prefix(self, key: Tuple[Hashable, ...]) -> Tuple[str, int]:
+        compiled = self._prefixes.get(key)
+        if compiled is not None:
+            self._prefixes.move_to_end(key)
+            self.stats.prefix_hits += 1
+            return compiled
+
+        self.stats.prefix_misses += 1
+        prefix = self.build_prefix(*key)
+        compiled = (prefix, self._count_tokens(prefix))
+        self._prefixes[key] = compiled
+        if len(self._prefixes) > self.max_prefixes:
+            self._prefixes.popitem(last=False)
+        return compiled
+
+    def _count_tokens(self, text: str) -> int:
+        try:
+            return self.token_counter.count(text, self.model)
+        except Exception as e:
+            # 统计失败不影响提示词本身
+            logger.debug(f"Prompt token count failed for {self.name}: {str(e)}")
+            return 0
+
+
+shared_token_counter = PromptTokenCounter()
+
+# 模板名 -> 最近注册的模板实例；同名重复注册（如重建专家实例）时替换
+_templates: Dict[str, PromptTemplate] = {}
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    _templates[template.name] = template
+    return template
+
+
+def prompt_size_report() -> Dict[str, Dict[str, Any]]:
+    """各模板的提示词规模报告"""
+    return {name: template.size_report() for name, template in sorted(_templates.items())}
@@ -0,0 +1,101 @@
+"""
+提供方注册表
+编排器、模型客户端和分词词典在首次使用时才初始化，服务启动后可在后台线程预热
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """Lazily builds named providers once per process and records their init cost."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._init_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._lock:
+            if name not in self._instances:
+                started_at = time.perf_counter()
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._init_seconds[name] = time.perf_counter() - started_at
+                self._errors.pop(name, None)
+                self._instances[name] = instance
+                logger.info(f"Provider {name} initialized in {self._init_seconds[name] * 1000:.1f}ms")
+        return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        """供异步处理函数使用：未初始化时在线程中构建（或等待预热线程完成），不阻塞事件循环"""
+        if name in self._instances:
+            return self._instances[name]
+        return await asyncio.to_thread(self.get, name)
+
+    def start_warmup(self, names: Optional[Iterable[str]] = None) -> None:
+        """在守护线程中依次初始化；失败只记录日志，首次使用时会重试"""
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return
+
+        pending: List[str] = list(names) if names is not None else list(self._factories)
+        self._warmup_thread = threading.Thread(
+            target=self._warm_up,
+            args=(pending,),
+            name="provider-warmup",
+            daemon=True,
+        )
+        self._warmup_thread.start()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "initialized": name in self._instances,
+                "init_ms": round(self._init_seconds[name] * 1000, 3) if name in self._init_seconds else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._factories
+        }
+
+    def _warm_up(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Provider {name} warm-up failed: {e}")
+
+
+def _create_orchestrator():
+    from orchestrator import AIOrchestrator
+
+    return AIOrchestrator()
+
+
+def _load_jieba_dictionary():
+    # jieba 默认在第一次分词时加载词典（约1秒），预热时提前完成
+    import jieba
+
+    jieba.initialize()
+    return jieba
+
+
+providers = ProviderRegistry()
+providers.register("orchestrator", _create_orchestrator)
+providers.register("jieba", _load_jieba_dictionary)
@@ -0,0 +1,252 @@
+"""
+模型响应解析
+- 从带说明文字、代码块的响应中找出第一个完整的顶层 JSON 值（按括号与字符串状态扫描，而非 find/rfind）
+- 修复常见错误：尾随逗号、字符串内换行、输出被 max_tokens 截断（补全引号与括号，必要时回退到上一个完整元素）
+- 按 ResponseSchema 一次性校验为 pydantic 模型
+- 按响应类型计数：旧的 find/rfind + json.loads 会失败而这里解析成功的次数，即避免的重新生成次数
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {'{': '}', '[': ']'}
+_strict_decoder = json.JSONDecoder()
+_tolerant_decoder = json.JSONDecoder(strict=False)  # 允许字符串内出现换行等控制字符
+# 截断修复时最多回退的逗号位置数
+MAX_REPAIR_CUTS = 32
+
+
+class ResponseParseError(ValueError):
+    """响应中没有可解析的 JSON，或解析结果未通过校验"""
+
+
+@dataclass
+class ParseCounters:
+    """单一响应类型的解析计数"""
+    responses: int = 0
+    clean: int = 0
+    failures_avoided: int = 0  # 旧的 find/rfind + json.loads 会失败、这里解析并校验成功
+    failed: int = 0
+    validation_errors: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "clean": self.clean,
+            "failures_avoided": self.failures_avoided,
+            "failed": self.failed,
+            "validation_errors": self.validation_errors,
+        }
+
+
+_counters: Dict[str, ParseCounters] = {}
+
+
+def parse_stats() -> Dict[str, Dict[str, Any]]:
+    """各响应类型的解析计数"""
+    return {kind: counters.snapshot() for kind, counters in sorted(_counters.items())}
+
+
+@dataclass(frozen=True)
+class ResponseSchema:
+    """
+    响应到 pydantic 模型的映射
+
+    defaults 补齐模型要求而响应可能缺失的顶层字段，item_defaults 为列表字段的每一项补齐字段，
+    empty_as_none 中的字段为空值时按未提供处理
+    """
+    name: str
+    model: Type[BaseModel]
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    item_defaults: Mapping[str, Mapping[str, Any]] = field(default_factory=dict)
+    empty_as_none: Tuple[str, ...] = ()
+
+    def validate(self, data: Dict[str, Any]) -> BaseModel:
+        merged = {**self.defaults, **data}
+        for name, defaults in self.item_defaults.items():
+            items = merged.get(name)
+            if isinstance(items, list):
+                merged[name] = [{**defaults, **item} if isinstance(item, dict) else item for item in items]
+        for name in self.empty_as_none:
+            if not merged.get(name):
+                merged.pop(name, None)
+        return self.model.model_validate(merged)
+
+
+def parse_json(text: str, kind: str, container: str = '{') -> Any:
+    """解析响应中的第一个 JSON 对象（container='{'）或数组（container='['）"""
+    counters = _counters.setdefault(kind, ParseCounters())
+    counters.responses += 1
+    try:
+        value, legacy_ok = _extract(text or '', container)
+    except ResponseParseError:
+        counters.failed += 1
+        raise
+    _record_success(counters, legacy_ok)
+    return value
+
+
+def parse_model(text: str, schema: ResponseSchema) -> BaseModel:
+    """解析并校验为 schema.model"""
+    counters = _counters.setdefault(schema.name, ParseCounters())
+    counters.responses += 1
+    try:
+        data, legacy_ok = _extract(text or '', '{')
+    except ResponseParseError:
+        counters.failed += 1
+        raise
+
+    try:
+        model = schema.validate(data)
+    except ValidationError as e:
+        counters.validation_errors += 1
+        raise ResponseParseError(f"{schema.name} response failed validation: {e.error_count()} errors") from e
+    _record_success(counters, legacy_ok)
+    return model
+
+
+def extract_json(text: str, container: str = '{') -> Any:
+    """不计数的提取，供不关心统计的调用方使用"""
+    return _extract(text or '', container)[0]
+
+
+def _record_success(counters: ParseCounters, legacy_ok: bool) -> None:
+    if legacy_ok:
+        counters.clean += 1
+    else:
+        counters.failures_avoided += 1
+        logger.info("Recovered a model response that plain json.loads would have rejected")
+
+
+def _extract(text: str, container: str) -> Tuple[Any, bool]:
+    """返回 (值, 旧方法是否也能解析)"""
+    start = text.find(container)
+    first_start = start
+    while start != -1:
+        try:
+            value, end = _strict_decoder.raw_decode(text, start)
+            legacy_ok = start == first_start and end == text.rfind(_CLOSERS[container]) + 1
+            return value, legacy_ok or _legacy_parses(text, container)
+        except json.JSONDecodeError:
+            pass
+
+        try:
+            value, _ = _tolerant_decoder.raw_decode(text, start)
+            return value, _legacy_parses(text, container)
+        except json.JSONDecodeError:
+            pass
+
+        end, closed = _scan(text, start)
+        value = _repair(text[start:end])
+        if value is not None:
+            return value, _legacy_parses(text, container)
+        if not closed:
+            break
+        # 这一段不是 JSON（如说明文字里的花括号），从它之后继续找
+        start = text.find(container, end)
+
+    raise ResponseParseError("No parsable JSON found in response")
+
+
+def _legacy_parses(text: str, container: str) -> bool:
+    """旧实现：首个开括号到最后一个闭括号之间整体 json.loads"""
+    start = text.find(container)
+    end = text.rfind(_CLOSERS[container]) + 1
+    if start == -1 or end == 0:
+        return False
+    try:
+        json.loads(text[start:end])
+        return True
+    except ValueError:
+        return False
+
+
+def _scan(text: str, start: int) -> Tuple[int, bool]:
+    """从 start 处的开括号扫描到与之匹配的闭括号之后；未闭合（被截断）时返回 (len(text), False)"""
+    depth = 0
+    in_string = escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return index + 1, True
+    return len(text), False
+
+
+def _repair(fragment: str) -> Optional[Any]:
+    """去掉尾随逗号、补全截断的字符串与括号；整体仍无法解析时回退到较早的逗号处截断"""
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, Tuple[str, ...]]] = []
+    in_string = escape = False
+
+    for char in fragment:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append(_CLOSERS[char])
+        elif char in '}]':
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+        elif char == ',':
+            cuts.append((len(out), tuple(stack)))
+        out.append(char)
+
+    body = ''.join(out)
+    if in_string:
+        body = (body[:-1] if escape else body) + '"'
+
+    candidates = [_close(body, stack)]
+    candidates.extend(_close(''.join(out[:position]), list(cut_stack)) for position, cut_stack in reversed(cuts[-MAX_REPAIR_CUTS:]))
+    for candidate in candidates:
+        try:
+            return _tolerant_decoder.decode(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ',':
+        del out[index]
+
+
+def _close(body: str, stack: List[str]) -> str:
+    body = body.rstrip()
+    if body.endswith(','):
+        body = body[:-1]
+    elif body.endswith(':'):
+        body += ' null'
+    return body + ''.join(reversed(stack))
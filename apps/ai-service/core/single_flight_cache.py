@@ -0,0 +1,244 @@
+"""
+单飞缓存
+同键并发未命中只触发一次生成；过期后先返回旧值并在后台刷新（stale-while-revalidate），
+临近过期时按概率提前刷新（XFetch），确定性失败写入负缓存
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class CachedFailure(Exception):
+    """负缓存命中：该键最近以确定性错误失败，冷却期内不再重试"""
+
+
+@dataclass
+class CacheMetrics:
+    """缓存指标"""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    collapsed: int = 0            # 并发未命中被合并到进行中的生成
+    negative_hits: int = 0
+    early_refreshes: int = 0      # 概率提前刷新次数
+    refreshes: int = 0
+    refresh_failures: int = 0
+    refresh_seconds_total: float = 0.0
+    refresh_seconds_max: float = 0.0
+    recent_refresh_seconds: list = field(default_factory=list)
+
+    def record_refresh(self, seconds: float, window: int = 100) -> None:
+        self.refreshes += 1
+        self.refresh_seconds_total += seconds
+        self.refresh_seconds_max = max(self.refresh_seconds_max, seconds)
+        self.recent_refresh_seconds.append(seconds)
+        if len(self.recent_refresh_seconds) > window:
+            del self.recent_refresh_seconds[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses + self.negative_hits
+        recent = sorted(self.recent_refresh_seconds)
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "stampede_collapses": self.collapsed,
+            "early_refreshes": self.early_refreshes,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refresh_latency_ms": {
+                "avg": round(self.refresh_seconds_total / self.refreshes * 1000, 3) if self.refreshes else None,
+                "p95": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3) if recent else None,
+                "max": round(self.refresh_seconds_max * 1000, 3) if self.refreshes else None,
+            },
+        }
+
+
+class SingleFlightCache:
+    """
+    Redis-backed JSON cache with per-key single-flight, stale-while-revalidate,
+    probabilistic early expiration and a negative cache.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        namespace: str,
+        fresh_ttl_seconds: int,
+        stale_ttl_seconds: int,
+        negative_ttl_seconds: int = 300,
+        early_expiry_beta: float = 1.0,
+        is_deterministic_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.redis = redis_client
+        self.namespace = namespace
+        self.fresh_ttl_seconds = fresh_ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.early_expiry_beta = early_expiry_beta
+        self.is_deterministic_failure = is_deterministic_failure or (lambda exc: False)
+        self.metrics = CacheMetrics()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        返回缓存值；compute 必须返回可JSON序列化的值
+        负缓存命中时抛出 CachedFailure，生成失败时原样抛出异常
+        """
+        entry = await self._read(key)
+        now = time.time()
+
+        if entry is not None:
+            if entry.get("negative"):
+                self.metrics.negative_hits += 1
+                raise CachedFailure(entry.get("error", "cached failure"))
+
+            if now >= entry["fresh_until"]:
+                # 已过新鲜期但仍在宽限期：先返回旧值，后台刷新
+                self.metrics.stale_hits += 1
+                self._refresh_in_background(key, compute)
+            else:
+                self.metrics.hits += 1
+                if self._should_refresh_early(entry, now):
+                    self.metrics.early_refreshes += 1
+                    self._refresh_in_background(key, compute)
+            return entry["value"]
+
+        self.metrics.misses += 1
+        return await self._single_flight(key, compute)
+
+    async def contains(self, key: str) -> bool:
+        """是否存在仍在新鲜期内的缓存值"""
+        entry = await self._read(key)
+        return bool(entry) and not entry.get("negative") and time.time() < entry["fresh_until"]
+
+    async def refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """强制重新生成并写入（与同键的进行中生成合并）"""
+        return await self._single_flight(key, compute)
+
+    async def invalidate(self, key: str) -> None:
+        try:
+            await self.redis.delete(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Cache invalidate error: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics.snapshot(), "in_flight": len(self._in_flight)}
+
+    def _should_refresh_early(self, entry: Dict[str, Any], now: float) -> bool:
+        # XFetch：生成越慢、越接近过期，越可能由某个请求提前刷新，热点键不会同时失效
+        delta = entry.get("compute_seconds", 0.0)
+        if delta <= 0 or self.early_expiry_beta <= 0:
+            return False
+        return now - delta * self.early_expiry_beta * math.log(1.0 - random.random()) >= entry["fresh_until"]
+
+    async def _single_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_failure: bool = True,
+    ) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.metrics.collapsed += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 被取消的是生成方而不是本请求时，由本请求接手重新生成
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self._single_flight(key, compute, cache_failure)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await self._compute_and_store(key, compute, cache_failure)
+        except Exception as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            # 生成方被取消（客户端断开、超时、关闭）时同样结束共享 future，合并的等待者不会永久挂起
+            if not future.done():
+                future.cancel()
+            self._in_flight.pop(key, None)
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._in_flight:
+            return
+
+        async def refresh():
+            try:
+                # 后台刷新失败时保留旧值，不用负缓存覆盖
+                await self._single_flight(key, compute, cache_failure=False)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key}: {str(e)}")
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cache_failure: bool,
+    ) -> Any:
+        started_at = time.perf_counter()
+        try:
+            value = await compute()
+        except Exception as e:
+            self.metrics.refresh_failures += 1
+            if cache_failure and self.is_deterministic_failure(e):
+                await self._write(
+                    key,
+                    {"negative": True, "error": str(e)},
+                    self.negative_ttl_seconds,
+                )
+            raise
+
+        compute_seconds = time.perf_counter() - started_at
+        self.metrics.record_refresh(compute_seconds)
+        await self._write(
+            key,
+            {
+                "value": value,
+                "fresh_until": time.time() + self.fresh_ttl_seconds,
+                "compute_seconds": compute_seconds,
+            },
+            self.fresh_ttl_seconds + self.stale_ttl_seconds,
+        )
+        return value
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self.redis.get(self._redis_key(key))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"Cache read error: {str(e)}")
+            return None
+
+    async def _write(self, key: str, entry: Dict[str, Any], ttl_seconds: int) -> None:
+        try:
+            await self.redis.set(self._redis_key(key), json.dumps(entry, default=str), ex=max(1, int(ttl_seconds)))
+        except Exception as e:
+            logger.warning(f"Cache write error: {str(e)}")
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
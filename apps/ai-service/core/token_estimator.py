@@ -0,0 +1,191 @@
+"""
+Token 与成本估算
+- 提示词 token：Claude 使用 anthropic SDK 自带的本地 tokenizer；通义千问按其分词特点（汉字多字一词、数字逐位）近似计数
+- 输出长度：按 (模型, 请求类型) 从实际用量中在线校准，用滑动窗口分位数给出 p50/p95
+"""
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 近似分词：汉字串、拉丁字母串、数字串、换行、其他单个符号
+_PRETOKEN_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+|[A-Za-z]+|\d+|\n+|[^\sA-Za-z\d\u3400-\u4dbf\u4e00-\u9fff]")
+
+
+@dataclass(frozen=True)
+class TokenizerProfile:
+    """近似分词参数：每个 token 平均覆盖的字符数"""
+    cjk_chars_per_token: float
+    latin_chars_per_token: float
+    digits_per_token: float
+
+
+TOKENIZER_PROFILES = {
+    # 通义千问词表收录大量常用词，平均约 1.4 个汉字一个 token；数字逐位切分
+    "qwen": TokenizerProfile(cjk_chars_per_token=1.4, latin_chars_per_token=4.0, digits_per_token=1.0),
+    "gpt": TokenizerProfile(cjk_chars_per_token=1.0, latin_chars_per_token=4.0, digits_per_token=3.0),
+    # anthropic tokenizer 不可用时的退路
+    "claude": TokenizerProfile(cjk_chars_per_token=0.8, latin_chars_per_token=4.0, digits_per_token=1.0),
+}
+
+
+class PromptTokenCounter:
+    """本地提示词 token 计数（不发起网络请求）"""
+
+    def __init__(self):
+        self._claude_tokenizer = None
+        self._claude_tokenizer_failed = False
+
+    def count(self, text: str, model: str) -> int:
+        if not text:
+            return 0
+        family = model_family(model)
+        if family == "claude":
+            tokenizer = self._get_claude_tokenizer()
+            if tokenizer is not None:
+                return len(tokenizer.encode(text).ids)
+        return self._approximate(text, TOKENIZER_PROFILES.get(family, TOKENIZER_PROFILES["gpt"]))
+
+    def _approximate(self, text: str, profile: TokenizerProfile) -> int:
+        tokens = 0
+        for piece in _PRETOKEN_PATTERN.findall(text):
+            first = piece[0]
+            if "\u3400" <= first <= "\u9fff":
+                tokens += math.ceil(len(piece) / profile.cjk_chars_per_token)
+            elif first.isascii() and first.isalpha():
+                tokens += math.ceil(len(piece) / profile.latin_chars_per_token)
+            elif first.isdigit():
+                tokens += math.ceil(len(piece) / profile.digits_per_token)
+            else:
+                tokens += 1
+        return tokens
+
+    def _get_claude_tokenizer(self):
+        # tokenizer.json 随 SDK 分发，首次使用时加载
+        if self._claude_tokenizer is None and not self._claude_tokenizer_failed:
+            try:
+                from anthropic._tokenizers import sync_get_tokenizer
+                self._claude_tokenizer = sync_get_tokenizer()
+            except Exception as e:
+                self._claude_tokenizer_failed = True
+                logger.warning(f"Claude tokenizer unavailable, using approximation: {str(e)}")
+        return self._claude_tokenizer
+
+
+def model_family(model: str) -> str:
+    model = (model or "").lower()
+    for family in ("claude", "qwen", "gpt"):
+        if model.startswith(family):
+            return family
+    return "other"
+
+
+def quantile(sorted_values: List[float], q: float) -> float:
+    """线性插值分位数，sorted_values 需已排序且非空"""
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+@dataclass(frozen=True)
+class OutputCalibration:
+    """实际输出 token / 先验估计 的分位数"""
+    samples: int
+    p50_ratio: float
+    p95_ratio: float
+    within_20pct: float  # 按 p50 估算时，实际落在 ±20% 内的比例
+
+    @property
+    def calibrated(self) -> bool:
+        return self.samples > 0
+
+
+class OutputLengthCalibrator:
+    """
+    Per-(model, request type) output-length calibration.
+
+    Each settled request contributes one sample, the ratio of actual output
+    tokens to the prior estimate, to a capped Redis list shared by all
+    workers (written by the settlement script). Quantiles are computed over that sliding window and cached in
+    process for refresh_seconds.
+    """
+
+    KEY_PREFIX = "cost:calibration"
+
+    def __init__(
+        self,
+        redis_client,
+        window: int = 500,
+        min_samples: int = 20,
+        refresh_seconds: float = 300,
+        default_p95_ratio: float = 1.2,
+    ):
+        self.redis = redis_client
+        self.window = window
+        self.min_samples = min_samples
+        self.refresh_seconds = refresh_seconds
+        # 样本不足时沿用原先的 20% 安全边际作为 p95
+        self.uncalibrated = OutputCalibration(samples=0, p50_ratio=1.0, p95_ratio=default_p95_ratio, within_20pct=0.0)
+        self._cache: Dict[Tuple[str, str], Tuple[float, OutputCalibration]] = {}
+
+    def get(self, model: str, request_type: str) -> OutputCalibration:
+        key = (model, request_type)
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        calibration = self._load(model, request_type)
+        self._cache[key] = (now + self.refresh_seconds, calibration)
+        return calibration
+
+    def invalidate(self, model: str, request_type: str) -> None:
+        """丢弃本进程缓存的分位数，下次估算时重新读取"""
+        self._cache.pop((model, request_type), None)
+
+    def _load(self, model: str, request_type: str) -> OutputCalibration:
+        try:
+            raw_samples = self.redis.lrange(self.redis_key(model, request_type), 0, self.window - 1)
+        except Exception as e:
+            logger.warning(f"Calibration read error: {str(e)}")
+            return self.uncalibrated
+
+        ratios = sorted(float(value) for value in raw_samples)
+        if len(ratios) < self.min_samples:
+            return self.uncalibrated
+
+        p50 = quantile(ratios, 0.5)
+        within = sum(1 for ratio in ratios if abs(ratio - p50) <= 0.2 * p50) / len(ratios)
+        return OutputCalibration(
+            samples=len(ratios),
+            p50_ratio=p50,
+            p95_ratio=quantile(ratios, 0.95),
+            within_20pct=within,
+        )
+
+    def redis_key(self, model: str, request_type: str) -> str:
+        return f"{self.KEY_PREFIX}:{model}:{request_type}"
+
+
+def prior_token_estimate(request_details: Dict[str, Any]) -> Tuple[float, float]:
+    """按请求类型与内容长度给出的先验 (输入, 输出) token 数"""
+    content_length = request_details.get('content_length', 1000)
+    request_type = request_details.get('type', 'story_generation')
+
+    if request_type == 'story_generation':
+        # 故事生成：输入较少，输出较多
+        return min(content_length * 0.5, 2000), content_length * 2
+    if request_type == 'illustration':
+        # 插画生成：固定成本
+        return 500, 100
+    # 其他类型：均衡估算
+    return content_length * 0.8, content_length * 0.3
+
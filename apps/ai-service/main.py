@@ -1,29 +1,58 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Body
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import json
 import logging
 import redis
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from config import config
 from orchestrator import AIOrchestrator, StoryGenerationRequest, StoryGenerationResponse
 from core.cost_control import EnhancedCostController, BudgetExceededException
+from core.providers import providers
+from core.prompt_templates import prompt_size_report
+from core.response_parsing import parse_stats
 
 class RhythmAnalysisRequest(BaseModel):
     story_text: str
     target_age: str
 
+class BatchQualityCheckItem(BaseModel):
+    story_content: Dict[str, Any]
+    framework: Dict[str, Any]
+    child_profile: Dict[str, Any] = {}
+
+class BatchQualityCheckRequest(BaseModel):
+    items: List[BatchQualityCheckItem]
+    batch_size: Optional[int] = None
+
+class IncrementalPagesRequest(BaseModel):
+    framework: Dict[str, Any]
+    character_bible: Dict[str, Any] = {}
+    existing_pages: List[Dict[str, Any]] = []
+    total_pages: int = 8
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 编排器与分词词典按需初始化；服务开始接收请求后在后台预热
+    if config.provider_warmup_enabled:
+        providers.start_warmup()
+    yield
+
 app = FastAPI(
     title="LumosReading AI Service",
     description="AI专家Agent系统 - 儿童故事生成和质量控制",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS中间件
@@ -35,8 +64,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 初始化AI编排器和成本控制器
-orchestrator = AIOrchestrator()
+async def get_orchestrator() -> AIOrchestrator:
+    """获取AI编排器（首次调用时在线程中创建，预热进行中时等待其完成）"""
+    return await providers.aget("orchestrator")
+
+# 初始化成本控制器
 redis_client = redis.Redis.from_url(config.redis_url)
 cost_controller = EnhancedCostController(redis_client)
 
@@ -49,7 +81,8 @@ def health_check():
     return {
         "status": "healthy", 
         "service": "lumosreading-ai-service",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "providers": providers.status()
     }
 
 @app.post("/generate-story", response_model=StoryGenerationResponse)
@@ -68,6 +101,7 @@ async def generate_story(request: StoryGenerationRequest):
             raise HTTPException(status_code=400, detail="Theme is required")
         
         # 生成故事
+        orchestrator = await get_orchestrator()
         response = await orchestrator.generate_story(request)
         
         # 缓存结果
@@ -86,6 +120,7 @@ async def get_story_status(story_id: str):
     获取故事生成状态
     """
     try:
+        orchestrator = await get_orchestrator()
         status = await orchestrator.get_generation_status(story_id)
         if not status:
             raise HTTPException(status_code=404, detail="Story not found")
@@ -102,6 +137,7 @@ async def get_cost_summary(days: int = 7):
     获取AI服务成本摘要
     """
     try:
+        orchestrator = await get_orchestrator()
         summary = await orchestrator.get_cost_summary(days)
         return summary
         
@@ -118,6 +154,7 @@ async def generate_psychology_framework(
     生成心理学教育框架
     """
     try:
+        orchestrator = await get_orchestrator()
         framework = await orchestrator.psychology_expert.generate_educational_framework(
             child_profile, story_request
         )
@@ -127,6 +164,27 @@ async def generate_psychology_framework(
         logger.error(f"Psychology framework generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Psychology framework generation failed: {str(e)}")
 
+@app.get("/psychology/framework/cache-stats")
+def get_framework_cache_stats():
+    """
+    框架缓存指标：命中率、并发合并次数、刷新耗时
+    """
+    return providers.get("orchestrator").psychology_expert.framework_cache.stats()
+
+@app.get("/prompts/size-report")
+def get_prompt_size_report():
+    """
+    各提示词模板的规模：平均/最大字符与token数、静态前缀命中率与可缓存token占比
+    """
+    return prompt_size_report()
+
+@app.get("/responses/parse-stats")
+def get_response_parse_stats():
+    """
+    各类模型响应的解析计数：直接解析、经修复后解析（避免的重新生成）、失败与校验失败
+    """
+    return parse_stats()
+
 @app.post("/psychology/emotional-framework")
 async def generate_emotional_framework(
     child_profile: Dict[str, Any],
@@ -136,6 +194,7 @@ async def generate_emotional_framework(
     生成情绪调节发展框架
     """
     try:
+        orchestrator = await get_orchestrator()
         emotional_framework = orchestrator.psychology_expert.emotional_framework.generate_story_emotional_framework(
             child_profile, story_context
         )
@@ -151,6 +210,7 @@ async def get_emotional_skills(age_group: str, neuro_profile: Dict[str, Any] = N
     获取年龄适宜的情绪技能
     """
     try:
+        orchestrator = await get_orchestrator()
         skills = orchestrator.psychology_expert.emotional_framework.get_neuro_adapted_skills(
             age_group, neuro_profile or {}
         )
@@ -181,6 +241,7 @@ async def create_story_content(
         # 转换framework为EducationalFramework对象
         edu_framework = EducationalFramework(**framework)
         
+        orchestrator = await get_orchestrator()
         story_content = await orchestrator.literature_expert.create_story_content(
             edu_framework, theme, series_bible, user_preferences
         )
@@ -191,6 +252,27 @@ async def create_story_content(
         logger.error(f"Story content creation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Story content creation failed: {str(e)}")
 
+@app.post("/literature/pages/stream")
+async def stream_story_pages(request: IncrementalPagesRequest):
+    """
+    逐页生成剩余页面，每页就绪即以一行JSON（NDJSON）推送
+    """
+    from agents.story_creation.incremental import IncrementalStoryEngine
+
+    orchestrator = await get_orchestrator()
+    engine = IncrementalStoryEngine(orchestrator.literature_expert)
+
+    async def page_lines():
+        async for event in engine.generate_pages(
+            request.framework,
+            request.character_bible,
+            request.existing_pages,
+            request.total_pages
+        ):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(page_lines(), media_type="application/x-ndjson")
+
 @app.post("/quality/check")
 async def quality_check(
     story_content: Dict[str, Any],
@@ -208,6 +290,7 @@ async def quality_check(
         edu_framework = EducationalFramework(**framework)
         story = StoryContent(**story_content)
         
+        orchestrator = await get_orchestrator()
         quality_report = await orchestrator.quality_controller.comprehensive_quality_check(
             story, edu_framework, child_profile
         )
@@ -218,12 +301,41 @@ async def quality_check(
         logger.error(f"Quality check failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Quality check failed: {str(e)}")
 
+@app.post("/quality/check-batch")
+async def quality_check_batch(request: BatchQualityCheckRequest):
+    """
+    批量质量检查（工作室批量重新审核）：多个故事合并为一次模型调用，报告顺序与请求一致
+    """
+    try:
+        from agents.psychology.expert import EducationalFramework
+        from agents.story_creation.expert import StoryContent
+
+        items = [
+            (StoryContent(**item.story_content), EducationalFramework(**item.framework), item.child_profile)
+            for item in request.items
+        ]
+        orchestrator = await get_orchestrator()
+        reports = await orchestrator.quality_controller.batch_quality_check(items, request.batch_size)
+        return {"reports": [report.dict() for report in reports]}
+
+    except Exception as e:
+        logger.error(f"Batch quality check failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch quality check failed: {str(e)}")
+
+@app.get("/quality/prompt-budget-report")
+def get_quality_prompt_budget_report():
+    """
+    质量检查各调用的输入token、裁剪次数与节省的输入/输出token
+    """
+    return providers.get("orchestrator").quality_controller.prompt_budgeter.stats()
+
 @app.post("/literature/rhythm-analysis")
 async def analyze_rhythm(request: RhythmAnalysisRequest):
     """
     韵律分析
     """
     try:
+        orchestrator = await get_orchestrator()
         rhythm_analysis = await orchestrator.literature_expert.analyze_story_rhythm(
             request.story_text, request.target_age
         )
@@ -242,6 +354,7 @@ async def budget_check(
 ):
     """
     预算检查 - 请求前检查预算充足性
+    通过时按 p95 预留预算，返回的 reservation_id 在 /cost/record 中结算
     """
     try:
         can_proceed, decision_info = await cost_controller.pre_request_budget_check(
@@ -287,6 +400,12 @@ async def estimate_cost(request_details: Dict[str, Any]):
         return {
             "total_tokens": cost_estimate.total_tokens,
             "estimated_cost": cost_estimate.estimated_cost,
+            "estimated_cost_p50": cost_estimate.estimated_cost,
+            "estimated_cost_p95": cost_estimate.p95_cost,
+            "input_tokens": cost_estimate.input_tokens,
+            "output_tokens_p50": cost_estimate.output_tokens_p50,
+            "output_tokens_p95": cost_estimate.output_tokens_p95,
+            "calibration_samples": cost_estimate.calibration_samples,
             "processing_time": cost_estimate.processing_time,
             "confidence": cost_estimate.confidence,
             "breakdown": cost_estimate.breakdown
@@ -313,13 +432,14 @@ async def get_cost_analytics(user_id: str):
 async def record_cost(
     user_id: str,
     request_details: Dict[str, Any],
-    actual_cost: float
+    actual_cost: float,
+    reservation_id: Optional[str] = None
 ):
     """
-    记录实际成本
+    记录实际成本（传入预算检查返回的 reservation_id 时结算该预留）
     """
     try:
-        await cost_controller.record_actual_cost(user_id, request_details, actual_cost)
+        await cost_controller.record_actual_cost(user_id, request_details, actual_cost, reservation_id)
         return {"status": "success", "message": "Cost recorded successfully"}
         
     except Exception as e:
@@ -4,6 +4,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import redis
+import redis.asyncio as aioredis
 from pydantic import BaseModel
 
 from config import config
@@ -42,7 +43,7 @@ class AIOrchestrator:
 
     def __init__(self):
         self.redis_client = redis.Redis.from_url(config.redis_url)
-        self.cost_tracker = CostTracker(self.redis_client)
+        self.cost_tracker = CostTracker(aioredis.Redis.from_url(config.redis_url))
         self.cost_controller = EnhancedCostController(self.redis_client)
         
         # 初始化各个Agent
@@ -2,9 +2,11 @@ import asyncio
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Any
-import redis
+import redis.asyncio as aioredis
 import logging
 
+from core import cost_rollups
+
 logger = logging.getLogger(__name__)
 
 class CostTracker:
@@ -20,10 +22,19 @@ class CostTracker:
         "gpt-3.5-turbo": {"input": 0.001, "output": 0.002}
     }
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: aioredis.Redis):
         self.redis = redis_client
         self.daily_cost_key = "ai_daily_cost"
         self.cost_history_key = "ai_cost_history"
+        self.hourly_cost_key = "ai_hourly_cost"
+    
+    @classmethod
+    def calculate_cost(cls, model: str, input_tokens: int, output_tokens: int) -> float:
+        """按模型单价计算成本（不记录）"""
+        costs = cls.MODEL_COSTS.get(model)
+        if not costs:
+            return 0.0
+        return (input_tokens / 1000) * costs["input"] + (output_tokens / 1000) * costs["output"]
     
     async def record_usage(
         self, 
@@ -37,25 +48,23 @@ class CostTracker:
             logger.warning(f"Unknown model cost: {model}")
             return 0.0
         
-        costs = self.MODEL_COSTS[model]
-        input_cost = (input_tokens / 1000) * costs["input"]
-        output_cost = (output_tokens / 1000) * costs["output"]
-        total_cost = input_cost + output_cost
-        
-        # 记录到Redis
-        today = datetime.now().strftime("%Y-%m-%d")
-        await self._increment_daily_cost(today, total_cost)
+        total_cost = self.calculate_cost(model, input_tokens, output_tokens)
         
-        # 记录详细使用历史
+        # 日成本、小时汇总与使用历史在一次流水线中写入
+        now = datetime.now()
         usage_record = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "model": model,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "cost": total_cost
         }
         
-        await self._record_usage_history(usage_record)
+        pipe = self.redis.pipeline(transaction=False)
+        self._increment_daily_cost(pipe, now.strftime("%Y-%m-%d"), total_cost)
+        self._increment_hourly_rollup(pipe, cost_rollups.current_hour(now), model, total_cost)
+        self._record_usage_history(pipe, usage_record)
+        await pipe.execute()
         
         logger.info(f"Recorded usage: {model}, Cost: ${total_cost:.4f}")
         return total_cost
@@ -73,14 +82,10 @@ class CostTracker:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        total_cost = 0.0
-        daily_costs = {}
-        
-        for i in range(days):
-            date = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
-            cost = await self.get_daily_cost(date)
-            daily_costs[date] = cost
-            total_cost += cost
+        dates = [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+        values = await self.redis.hmget(self.daily_cost_key, dates)
+        daily_costs = {date: float(value) if value else 0.0 for date, value in zip(dates, values)}
+        total_cost = sum(daily_costs.values())
         
         return {
             "period_days": days,
@@ -90,19 +95,37 @@ class CostTracker:
             "cost_alerts": await self._check_cost_alerts(total_cost)
         }
     
-    async def _increment_daily_cost(self, date: str, cost: float):
+    async def get_hourly_costs(self, hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """最近若干小时的成本汇总（一次流水线读取）"""
+        now = datetime.now()
+        hour_keys = [cost_rollups.current_hour(now - timedelta(hours=i)) for i in range(hours)]
+        pipe = self.redis.pipeline(transaction=False)
+        for hour in hour_keys:
+            pipe.hgetall(f"{self.hourly_cost_key}:{hour}")
+        results = await pipe.execute()
+        return {hour: cost_rollups.parse_rollup(raw) for hour, raw in zip(hour_keys, results)}
+    
+    def _increment_daily_cost(self, pipe, date: str, cost: float):
         """增加日成本"""
-        await self.redis.hincrbyfloat(self.daily_cost_key, date, cost)
-        await self.redis.expire(self.daily_cost_key, 86400 * 30)  # 30天过期
+        pipe.hincrbyfloat(self.daily_cost_key, date, cost)
+        pipe.expire(self.daily_cost_key, 86400 * 30)  # 30天过期
+    
+    def _increment_hourly_rollup(self, pipe, hour: str, model: str, cost: float):
+        """全局小时汇总：总成本、分模型成本、请求数"""
+        hourly_key = f"{self.hourly_cost_key}:{hour}"
+        pipe.hincrbyfloat(hourly_key, cost_rollups.TOTAL_FIELD, cost)
+        pipe.hincrbyfloat(hourly_key, cost_rollups.model_field(model), cost)
+        pipe.hincrby(hourly_key, cost_rollups.REQUESTS_FIELD, 1)
+        pipe.expire(hourly_key, cost_rollups.ROLLUP_TTL_SECONDS)
     
-    async def _record_usage_history(self, usage_record: Dict[str, Any]):
-        """记录使用历史"""
-        await self.redis.lpush(
+    def _record_usage_history(self, pipe, usage_record: Dict[str, Any]):
+        """记录使用历史（仅供审计）"""
+        pipe.lpush(
             self.cost_history_key, 
             json.dumps(usage_record)
         )
-        await self.redis.ltrim(self.cost_history_key, 0, 9999)  # 保留最近10000条
-        await self.redis.expire(self.cost_history_key, 86400 * 7)  # 7天过期
+        pipe.ltrim(self.cost_history_key, 0, 9999)  # 保留最近10000条
+        pipe.expire(self.cost_history_key, 86400 * 7)  # 7天过期
     
     async def _check_cost_alerts(self, total_cost: float) -> list:
         """检查成本警报"""
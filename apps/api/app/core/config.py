@@ -26,11 +26,28 @@ class Settings(BaseSettings):
     secret_key: str = Field(..., env="SECRET_KEY")
     algorithm: str = Field(default="HS256", env="ALGORITHM")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    auth_principal_cache_ttl_seconds: float = Field(default=30.0, env="AUTH_PRINCIPAL_CACHE_TTL_SECONDS")
+    auth_principal_cache_max_entries: int = Field(default=10000, env="AUTH_PRINCIPAL_CACHE_MAX_ENTRIES")
+    auth_token_memo_enabled: bool = Field(default=True, env="AUTH_TOKEN_MEMO_ENABLED")
+    auth_token_memo_max_entries: int = Field(default=10000, env="AUTH_TOKEN_MEMO_MAX_ENTRIES")
+    password_scrypt_n: int = Field(default=2 ** 14, env="PASSWORD_SCRYPT_N")
+    password_scrypt_r: int = Field(default=8, env="PASSWORD_SCRYPT_R")
+    password_scrypt_p: int = Field(default=1, env="PASSWORD_SCRYPT_P")
+    password_hash_max_workers: int = Field(default=2, env="PASSWORD_HASH_MAX_WORKERS")
+    password_verify_max_in_flight: int = Field(default=16, env="PASSWORD_VERIFY_MAX_IN_FLIGHT")
+    password_verify_max_in_flight_per_identifier: int = Field(
+        default=1,
+        env="PASSWORD_VERIFY_MAX_IN_FLIGHT_PER_IDENTIFIER"
+    )
     
     # 数据库配置
     database_url: str = Field(..., env="DATABASE_URL")
     database_pool_size: int = Field(default=10, env="DATABASE_POOL_SIZE")
     database_max_overflow: int = Field(default=20, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: float = Field(default=30.0, env="DATABASE_POOL_TIMEOUT")  # 秒
+    database_pool_recycle: int = Field(default=1800, env="DATABASE_POOL_RECYCLE")  # 秒
+    database_pool_pre_ping: bool = Field(default=True, env="DATABASE_POOL_PRE_PING")
+    database_use_null_pool: bool = Field(default=False, env="DATABASE_USE_NULL_POOL")  # 外部连接池(pgbouncer)时启用
     
     # Redis配置
     redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
@@ -39,6 +56,8 @@ class Settings(BaseSettings):
     # AI服务配置
     ai_service_url: str = Field(default="http://localhost:8001", env="AI_SERVICE_URL")
     ai_service_timeout: int = Field(default=300, env="AI_SERVICE_TIMEOUT")
+    # 提供方首次使用时初始化；开启后在应用开始接收流量后后台预热
+    provider_warmup_enabled: bool = Field(default=True, env="PROVIDER_WARMUP_ENABLED")
     
     # 文件存储配置
     upload_dir: str = Field(default="./uploads", env="UPLOAD_DIR")
@@ -64,7 +83,18 @@ class Settings(BaseSettings):
         default=0.5,
         env="RATE_LIMIT_BACKEND_TIMEOUT_SECONDS"
     )
-    
+    rate_limit_local_lease_size: int = Field(default=10, env="RATE_LIMIT_LOCAL_LEASE_SIZE")
+    rate_limit_local_max_keys: int = Field(default=10000, env="RATE_LIMIT_LOCAL_MAX_KEYS")
+    rate_limit_breaker_failure_threshold: int = Field(default=5, env="RATE_LIMIT_BREAKER_FAILURE_THRESHOLD")
+    rate_limit_breaker_reset_seconds: float = Field(default=30.0, env="RATE_LIMIT_BREAKER_RESET_SECONDS")
+    
+    # 阻塞调用执行池配置 (V2路由)
+    v2_offload_blocking_calls: bool = Field(default=True, env="V2_OFFLOAD_BLOCKING_CALLS")
+    v2_read_pool_max_workers: int = Field(default=8, env="V2_READ_POOL_MAX_WORKERS")
+    v2_write_pool_max_workers: int = Field(default=2, env="V2_WRITE_POOL_MAX_WORKERS")
+    event_loop_lag_interval_seconds: float = Field(default=0.5, env="EVENT_LOOP_LAG_INTERVAL_SECONDS")
+    event_loop_lag_warn_ms: float = Field(default=100.0, env="EVENT_LOOP_LAG_WARN_MS")
+
     # 日志配置
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_format: str = Field(
@@ -73,7 +103,11 @@ class Settings(BaseSettings):
     )
     
     # 监控配置
-    enable_metrics: bool = Field(default=True, env="ENABLE_METRICS")
+    # /metrics 默认关闭；开启后如配置了 METRICS_TOKEN 则要求 Bearer 认证
+    enable_metrics: bool = Field(default=False, env="ENABLE_METRICS")
+    metrics_token: Optional[str] = Field(default=None, env="METRICS_TOKEN")
+    access_log_sample_rate: float = Field(default=0.01, env="ACCESS_LOG_SAMPLE_RATE")
+    access_log_slow_request_ms: float = Field(default=1000.0, env="ACCESS_LOG_SLOW_REQUEST_MS")
     metrics_port: int = Field(default=9090, env="METRICS_PORT")
     
     # 微信支付配置
@@ -0,0 +1,198 @@
+"""
+阻塞调用执行层
+V2路由通过有界线程池执行同步服务调用，避免阻塞事件循环
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExecutionPoolSnapshot:
+    name: str
+    max_workers: int
+    in_flight: int
+    completed: int
+    failed: int
+    last_queue_wait_ms: float
+    max_queue_wait_ms: float
+
+
+class BlockingCallPool:
+    """Bounded thread pool for synchronous service calls issued from async routes."""
+
+    def __init__(self, name: str, max_workers: int, always_offload: bool = False):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.always_offload = always_offload
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._last_queue_wait_ms = 0.0
+        self._max_queue_wait_ms = 0.0
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        if not (self.always_offload or settings.v2_offload_blocking_calls):
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        context = copy_context()
+        submitted_at = time.perf_counter()
+
+        def call() -> T:
+            self._record_start(submitted_at)
+            succeeded = False
+            try:
+                result = context.run(func, *args, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                self._record_finish(succeeded)
+
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def snapshot(self) -> ExecutionPoolSnapshot:
+        with self._lock:
+            return ExecutionPoolSnapshot(
+                name=self.name,
+                max_workers=self.max_workers,
+                in_flight=self._in_flight,
+                completed=self._completed,
+                failed=self._failed,
+                last_queue_wait_ms=round(self._last_queue_wait_ms, 3),
+                max_queue_wait_ms=round(self._max_queue_wait_ms, 3),
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                )
+            return self._executor
+
+    def _record_start(self, submitted_at: float) -> None:
+        queue_wait_ms = (time.perf_counter() - submitted_at) * 1000
+        with self._lock:
+            self._in_flight += 1
+            self._last_queue_wait_ms = queue_wait_ms
+            self._max_queue_wait_ms = max(self._max_queue_wait_ms, queue_wait_ms)
+
+    def _record_finish(self, succeeded: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed-interval sleep."""
+
+    def __init__(self, interval_seconds: float, warn_threshold_ms: float):
+        self.interval_seconds = interval_seconds
+        self.warn_threshold_ms = warn_threshold_ms
+        self._task: asyncio.Task | None = None
+        self._samples = 0
+        self._last_lag_ms = 0.0
+        self._max_lag_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag_ms: float) -> None:
+        self._samples += 1
+        self._last_lag_ms = lag_ms
+        self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+
+        if lag_ms >= self.warn_threshold_ms:
+            logger.warning("Event loop lag %.1fms exceeded %.1fms", lag_ms, self.warn_threshold_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "samples": self._samples,
+            "last_lag_ms": round(self._last_lag_ms, 3),
+            "max_lag_ms": round(self._max_lag_ms, 3),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            expected_wakeup = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.record(max(0.0, loop.time() - expected_wakeup) * 1000)
+
+
+read_pool = BlockingCallPool("v2-read", settings.v2_read_pool_max_workers)
+write_pool = BlockingCallPool("v2-write", settings.v2_write_pool_max_workers)
+event_loop_lag_monitor = EventLoopLagMonitor(
+    interval_seconds=settings.event_loop_lag_interval_seconds,
+    warn_threshold_ms=settings.event_loop_lag_warn_ms,
+)
+
+
+async def run_read(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking read-side service call on the read pool."""
+    return await read_pool.run(func, *args, **kwargs)
+
+
+async def run_write(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking mutation (builds, releases, generation) on the write pool."""
+    return await write_pool.run(func, *args, **kwargs)
+
+
+def get_execution_snapshot() -> dict[str, Any]:
+    return {
+        "offload_enabled": settings.v2_offload_blocking_calls,
+        "pools": [asdict(read_pool.snapshot()), asdict(write_pool.snapshot())],
+        "event_loop": event_loop_lag_monitor.snapshot(),
+    }
+
+
+def shutdown_execution_pools() -> None:
+    read_pool.shutdown()
+    write_pool.shutdown()
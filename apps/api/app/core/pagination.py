@@ -0,0 +1,100 @@
+"""
+键集分页
+按 (created_at, id) 倒序翻页，游标编码上一页最后一行的键；配合列投影避免加载大字段
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: list[Any]
+    next_cursor: str | None
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+
+
+def encode_key_cursor(*values: str) -> str:
+    """编码任意排序键（如内存二级索引的 (排序值, id)）"""
+    payload = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_key_cursor(cursor: str, size: int) -> list[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(value, str) for value in values):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def projected_columns(model, exclude: Iterable[str] = ()) -> list:
+    """返回模型的列属性，排除指定的大字段（如JSONB content）"""
+    excluded = set(exclude)
+    return [getattr(model, column.key) for column in model.__table__.columns if column.key not in excluded]
+
+
+def keyset_paginate(
+    query: Query,
+    created_at_column,
+    id_column,
+    cursor: str | None,
+    limit: int,
+) -> KeysetPage:
+    """
+    对查询应用键集分页
+
+    行值比较 (created_at, id) < (:created_at, :id) 可直接命中 (created_at, id) 复合索引，
+    翻到任意深度的代价都与第一页相同
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        try:
+            id_type = id_column.type.python_type
+        except NotImplementedError:
+            id_type = str
+        try:
+            row_id = id_type(row_id)
+        except ValueError as exc:
+            raise InvalidCursorError("Invalid pagination cursor") from exc
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+
+    # 多取一行判断是否还有下一页
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return KeysetPage(items=rows, next_cursor=None)
+
+    items = rows[:limit]
+    last = items[-1]
+    return KeysetPage(
+        items=items,
+        next_cursor=encode_cursor(getattr(last, created_at_column.key), getattr(last, id_column.key)),
+    )
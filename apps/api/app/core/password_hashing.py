@@ -0,0 +1,146 @@
+"""
+密码哈希
+scrypt（内存困难）哈希在独立有界线程池中执行，兼容旧的 pbkdf2 "salt:hash" 格式并在登录时透明升级
+"""
+
+import hashlib
+import hmac
+import secrets
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from threading import Lock
+
+from app.core.config import settings
+from app.core.execution import BlockingCallPool
+
+SCRYPT_PREFIX = "scrypt"
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+
+class CredentialVerificationThrottledError(RuntimeError):
+    """Raised when too many password checks are already running for an identifier or overall."""
+
+
+@dataclass(frozen=True)
+class ScryptParameters:
+    n: int
+    r: int
+    p: int
+
+    @property
+    def max_memory_bytes(self) -> int:
+        # hashlib.scrypt需要约 128 * n * r 字节，留出余量
+        return 256 * self.n * self.r
+
+
+class PasswordHasher:
+    """Hashes with scrypt and verifies both scrypt and legacy pbkdf2 hashes in constant time."""
+
+    def __init__(self, parameters: ScryptParameters):
+        self.parameters = parameters
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(16)
+        digest = self._scrypt(password, salt, self.parameters)
+        params = self.parameters
+        return f"{SCRYPT_PREFIX}${params.n}${params.r}${params.p}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        try:
+            if stored_hash.startswith(f"{SCRYPT_PREFIX}$"):
+                _, n, r, p, salt_hex, hash_hex = stored_hash.split("$")
+                expected = bytes.fromhex(hash_hex)
+                actual = self._scrypt(password, bytes.fromhex(salt_hex), ScryptParameters(int(n), int(r), int(p)))
+            else:
+                salt, hash_hex = stored_hash.split(":")
+                expected = bytes.fromhex(hash_hex)
+                actual = hashlib.pbkdf2_hmac(
+                    "sha256",
+                    password.encode("utf-8"),
+                    salt.encode("utf-8"),
+                    LEGACY_PBKDF2_ITERATIONS,
+                )
+        except (ValueError, TypeError):
+            return False
+
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        if not stored_hash.startswith(f"{SCRYPT_PREFIX}$"):
+            return True
+
+        try:
+            _, n, r, p, _, _ = stored_hash.split("$")
+        except ValueError:
+            return True
+        return ScryptParameters(int(n), int(r), int(p)) != self.parameters
+
+    @staticmethod
+    def _scrypt(password: str, salt: bytes, parameters: ScryptParameters) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=parameters.n,
+            r=parameters.r,
+            p=parameters.p,
+            maxmem=parameters.max_memory_bytes,
+            dklen=32,
+        )
+
+
+class InFlightLimiter:
+    """Caps concurrent password checks per identifier and across the process."""
+
+    def __init__(self, max_per_identifier: int, max_total: int):
+        self.max_per_identifier = max(1, max_per_identifier)
+        self.max_total = max(1, max_total)
+        self._in_flight: dict[str, int] = {}
+        self._total = 0
+        self._lock = Lock()
+
+    @asynccontextmanager
+    async def slot(self, identifier: str) -> AsyncIterator[None]:
+        with self._lock:
+            current = self._in_flight.get(identifier, 0)
+            if current >= self.max_per_identifier or self._total >= self.max_total:
+                raise CredentialVerificationThrottledError("Too many concurrent sign-in attempts")
+            self._in_flight[identifier] = current + 1
+            self._total += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._total -= 1
+                remaining = self._in_flight[identifier] - 1
+                if remaining:
+                    self._in_flight[identifier] = remaining
+                else:
+                    del self._in_flight[identifier]
+
+
+password_hasher = PasswordHasher(
+    ScryptParameters(
+        n=settings.password_scrypt_n,
+        r=settings.password_scrypt_r,
+        p=settings.password_scrypt_p,
+    )
+)
+password_hash_pool = BlockingCallPool(
+    "password-hash",
+    settings.password_hash_max_workers,
+    always_offload=True,
+)
+verification_limiter = InFlightLimiter(
+    max_per_identifier=settings.password_verify_max_in_flight_per_identifier,
+    max_total=settings.password_verify_max_in_flight,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hash_pool.run(password_hasher.hash, password)
+
+
+async def verify_password(password: str, stored_hash: str) -> bool:
+    return await password_hash_pool.run(password_hasher.verify, password, stored_hash)
@@ -0,0 +1,170 @@
+"""
+认证主体缓存
+按 (用户ID, token签发时间) 缓存已认证用户快照，并按token哈希缓存JWT解码结果
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """Request-scoped view of the user row that authenticated routes rely on."""
+
+    id: Any
+    is_active: bool
+    subscription_tier: Any
+
+    @classmethod
+    def from_user(cls, user: Any) -> "AuthenticatedPrincipal":
+        return cls(
+            id=user.id,
+            is_active=user.is_active,
+            subscription_tier=user.subscription_tier,
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU of principals keyed by (user id, token iat) with a short TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[tuple[str, int], tuple[float, AuthenticatedPrincipal]] = OrderedDict()
+        self._issued_at_by_user: dict[str, set[int]] = {}
+        self._lock = Lock()
+
+    def get(self, user_id: Any, issued_at: int) -> AuthenticatedPrincipal | None:
+        key = (str(user_id), issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, principal = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, principal: AuthenticatedPrincipal, issued_at: int) -> None:
+        if self.ttl_seconds <= 0:
+            return
+
+        key = (str(principal.id), issued_at)
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            self._issued_at_by_user.setdefault(key[0], set()).add(issued_at)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_user(self, user_id: Any) -> None:
+        with self._lock:
+            for issued_at in list(self._issued_at_by_user.get(str(user_id), ())):
+                self._remove((str(user_id), issued_at))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._issued_at_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: tuple[str, int]) -> None:
+        self._entries.pop(key, None)
+        issued_at_values = self._issued_at_by_user.get(key[0])
+        if issued_at_values is None:
+            return
+
+        issued_at_values.discard(key[1])
+        if not issued_at_values:
+            del self._issued_at_by_user[key[0]]
+
+
+class TokenPayloadMemo:
+    """Remembers verified JWT payloads by token digest so repeat requests skip signature checks."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+
+            expires_at, payload = entry
+            if expires_at <= self.clock():
+                del self._entries[digest]
+                return None
+
+            self._entries.move_to_end(digest)
+            return dict(payload)
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        # 仅缓存带过期时间的token，且不超过其过期时间
+        expires_at = payload.get("exp")
+        if not self.enabled or not isinstance(expires_at, (int, float)):
+            return
+
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (float(expires_at), dict(payload))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.auth_principal_cache_max_entries,
+    ttl_seconds=settings.auth_principal_cache_ttl_seconds,
+)
+token_payload_memo = TokenPayloadMemo(
+    max_entries=settings.auth_token_memo_max_entries,
+    enabled=settings.auth_token_memo_enabled,
+)
+
+
+def invalidate_principal(user_id: Any) -> None:
+    """用户被停用、订阅等级变化等情况下调用，使缓存的认证主体立即失效"""
+    principal_cache.invalidate_user(user_id)
@@ -0,0 +1,193 @@
+"""
+外部服务提供方注册表
+首次使用时才初始化（延迟导入重量级SDK），可在应用开始接收流量后后台预热
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ProviderEntry:
+    factory: Callable[[], Any]
+    close: Callable[[Any], Any] | None
+    instance: Any = None
+    initialized: bool = False
+    init_seconds: float | None = None
+    error: str | None = None
+
+
+class ProviderRegistry:
+    """Builds each registered provider once, on first use, and remembers how long that took."""
+
+    def __init__(self):
+        self._entries: dict[str, _ProviderEntry] = {}
+        self._sync_lock = Lock()
+        self._async_locks: dict[str, asyncio.Lock] = {}
+        self._warmup_task: asyncio.Task | None = None
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any] | Callable[[], Awaitable[Any]],
+        close: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self._entries[name] = _ProviderEntry(factory=factory, close=close)
+
+    def get_sync(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.initialized:
+            return entry.instance
+
+        with self._sync_lock:
+            if not entry.initialized:
+                if inspect.iscoroutinefunction(entry.factory):
+                    raise TypeError(f"Provider {name} has an async factory; use await get()")
+                self._initialize(name, entry, entry.factory)
+        return entry.instance
+
+    async def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.initialized:
+            return entry.instance
+
+        lock = self._async_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if not entry.initialized:
+                if inspect.iscoroutinefunction(entry.factory):
+                    started_at = time.perf_counter()
+                    try:
+                        instance = await entry.factory()
+                    except Exception as exc:
+                        entry.error = str(exc)
+                        raise
+                    self._store(name, entry, instance, started_at)
+                else:
+                    # 同步工厂可能触发重量级导入，放到线程中执行避免阻塞事件循环
+                    await asyncio.to_thread(self.get_sync, name)
+        return entry.instance
+
+    def start_warmup(self, names: Iterable[str] | None = None) -> None:
+        """在后台依次初始化提供方；失败只记录日志，首次使用时会重试"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            return
+
+        self._warmup_task = asyncio.get_running_loop().create_task(
+            self._warm_up(list(names) if names is not None else list(self._entries))
+        )
+
+    async def close_all(self) -> None:
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            try:
+                await self._warmup_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._warmup_task = None
+
+        for name, entry in self._entries.items():
+            if not entry.initialized or entry.close is None:
+                continue
+            try:
+                result = entry.close(entry.instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:  # pragma: no cover
+                logger.warning("Failed to close provider %s: %s", name, exc)
+            entry.instance = None
+            entry.initialized = False
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "initialized": entry.initialized,
+                "init_ms": round(entry.init_seconds * 1000, 3) if entry.init_seconds is not None else None,
+                "error": entry.error,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def _initialize(self, name: str, entry: _ProviderEntry, factory: Callable[[], Any]) -> None:
+        started_at = time.perf_counter()
+        try:
+            instance = factory()
+        except Exception as exc:
+            entry.error = str(exc)
+            raise
+        self._store(name, entry, instance, started_at)
+
+    @staticmethod
+    def _store(name: str, entry: _ProviderEntry, instance: Any, started_at: float) -> None:
+        entry.instance = instance
+        entry.init_seconds = time.perf_counter() - started_at
+        entry.error = None
+        entry.initialized = True
+        logger.info("Provider %s initialized in %.1fms", name, entry.init_seconds * 1000)
+
+    async def _warm_up(self, names: list[str]) -> None:
+        for name in names:
+            try:
+                await self.get(name)
+            except Exception as exc:
+                logger.warning("Provider %s warm-up failed: %s", name, exc)
+
+
+async def _create_ai_orchestrator():
+    from app.services.ai_orchestrator import AIOrchestrator
+
+    orchestrator = AIOrchestrator()
+    await orchestrator.initialize()
+    return orchestrator
+
+
+async def _close_ai_orchestrator(orchestrator) -> None:
+    await orchestrator.cleanup()
+
+
+def _create_qwen_image_service():
+    # dashscope 只在实际使用通义千问时导入
+    from app.services.qwen_image_service import QwenImageService
+
+    return QwenImageService(api_key=settings.qwen_api_key, model=settings.qwen_model)
+
+
+def _create_vertex_image_service():
+    # google-cloud-aiplatform 导入开销较大，延迟到首次使用
+    from app.services.vertex_ai_service import VertexAIImageService
+
+    return VertexAIImageService(
+        project_id=settings.google_project_id,
+        location=settings.google_location,
+        credentials_path=settings.google_credentials_path,
+        model=settings.vertex_model,
+    )
+
+
+provider_registry = ProviderRegistry()
+provider_registry.register("ai_orchestrator", _create_ai_orchestrator, close=_close_ai_orchestrator)
+provider_registry.register("qwen_image", _create_qwen_image_service)
+provider_registry.register("vertex_image", _create_vertex_image_service)
+
+
+def warmup_provider_names() -> list[str]:
+    """只预热当前配置实际会用到的提供方"""
+    names = ["ai_orchestrator"]
+    if settings.image_provider == "qwen" and settings.qwen_api_key:
+        names.append("qwen_image")
+    elif settings.image_provider == "vertex":
+        names.append("vertex_image")
+    return names
+
+
+async def get_ai_orchestrator():
+    return await provider_registry.get("ai_orchestrator")
@@ -0,0 +1,261 @@
+"""
+限流引擎
+Redis GCRA单次往返原子限流 + 进程内令牌桶快速路径 + 熔断降级
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 由限流中间件写入，端点级装饰器读取
+current_rate_limit_client: ContextVar[str | None] = ContextVar("current_rate_limit_client", default=None)
+
+# GCRA: KEYS[1]存放理论到达时间(TAT, 毫秒)。一次调用最多预留 requested 个令牌，
+# 不足时按可用量部分授予，返回 {granted, remaining, retry_after_ms}
+GCRA_SCRIPT = """
+local emission_ms = tonumber(ARGV[1])
+local tolerance_ms = tonumber(ARGV[2])
+local now_ms = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now_ms then
+  tat = now_ms
+end
+
+local available = math.floor((now_ms + tolerance_ms - tat) / emission_ms)
+if available < 1 then
+  return {0, 0, math.ceil(tat - tolerance_ms + emission_ms - now_ms)}
+end
+
+local granted = math.min(requested, available)
+local new_tat = tat + granted * emission_ms
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now_ms))
+return {granted, available - granted, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    limit: int
+    window_seconds: float
+
+    @property
+    def emission_interval_seconds(self) -> float:
+        return self.window_seconds / self.limit
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.limit / self.window_seconds
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after_seconds: float = 0.0
+
+
+@dataclass
+class _LocalKeyState:
+    tokens: float
+    updated_at: float
+    leased: int = 0
+    lease_expires_at: float = 0.0
+
+
+class CircuitBreaker:
+    """Stops calling the shared backend after repeated failures and probes it again after a cool-down."""
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "open" if self.is_open(time.monotonic()) else "half_open"
+
+    def is_open(self, now: float) -> bool:
+        return self._opened_at is not None and now - self._opened_at < self.reset_timeout_seconds
+
+    def allow_request(self, now: float) -> bool:
+        if self._opened_at is None:
+            return True
+
+        if now - self._opened_at < self.reset_timeout_seconds or self._probe_in_flight:
+            return False
+
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self, now: float) -> None:
+        self._failures += 1
+        if self._probe_in_flight or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning("限流后端不可用，熔断 %.0f 秒，期间请求直接放行", self.reset_timeout_seconds)
+            self._opened_at = now
+            self._probe_in_flight = False
+
+
+class RateLimiter:
+    """Distributed limiter: local token bucket first, then one atomic GCRA round-trip for a batch of tokens."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        backend_timeout_seconds: float,
+        lease_size: int,
+        max_local_keys: int,
+        breaker: CircuitBreaker,
+        key_prefix: str = "rate_limit:gcra",
+    ):
+        self.redis_url = redis_url
+        self.backend_timeout_seconds = backend_timeout_seconds
+        self.lease_size = max(1, lease_size)
+        self.max_local_keys = max(1, max_local_keys)
+        self.breaker = breaker
+        self.key_prefix = key_prefix
+        self._local: OrderedDict[tuple[str, RateLimitPolicy], _LocalKeyState] = OrderedDict()
+        # redis.asyncio连接绑定事件循环，每个循环各自持有客户端和脚本
+        self._scripts: WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls) -> "RateLimiter":
+        return cls(
+            redis_url=settings.redis_url,
+            backend_timeout_seconds=settings.rate_limit_backend_timeout_seconds,
+            lease_size=settings.rate_limit_local_lease_size,
+            max_local_keys=settings.rate_limit_local_max_keys,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.rate_limit_breaker_failure_threshold,
+                reset_timeout_seconds=settings.rate_limit_breaker_reset_seconds,
+            ),
+        )
+
+    async def check(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        now = time.monotonic()
+        # 与原实现一致：后端不可用时放行，熔断期间不做本地拒绝
+        if self.breaker.is_open(now):
+            return RateLimitDecision(True)
+
+        state = self._local_state(key, policy, now)
+
+        # 单进程已超过全局配额时全局必然超限，直接拒绝，无需访问Redis
+        if state.tokens < 1:
+            return RateLimitDecision(False, (1 - state.tokens) / policy.refill_per_second)
+        state.tokens -= 1
+
+        if state.leased > 0 and now < state.lease_expires_at:
+            state.leased -= 1
+            return RateLimitDecision(True)
+
+        if not self.breaker.allow_request(now):
+            state.tokens += 1
+            return RateLimitDecision(True)
+
+        requested = max(1, min(self.lease_size, policy.limit // 10))
+        try:
+            granted, _, retry_after_ms = await asyncio.wait_for(
+                self._reserve(key, policy, requested),
+                timeout=self.backend_timeout_seconds,
+            )
+        except Exception as exc:
+            logger.debug("Rate limit backend call failed: %s", exc)
+            self.breaker.record_failure(time.monotonic())
+            state.tokens += 1
+            return RateLimitDecision(True)
+
+        self.breaker.record_success()
+        if granted < 1:
+            state.tokens += 1
+            return RateLimitDecision(False, retry_after_ms / 1000)
+
+        state.leased = int(granted) - 1
+        state.lease_expires_at = now + policy.emission_interval_seconds * int(granted)
+        return RateLimitDecision(True)
+
+    def reset_local_state(self) -> None:
+        self._local.clear()
+
+    async def _reserve(self, key: str, policy: RateLimitPolicy, requested: int) -> tuple[int, int, int]:
+        script = self._script()
+        emission_ms = policy.emission_interval_seconds * 1000
+        result = await script(
+            keys=[f"{self.key_prefix}:{key}"],
+            args=[emission_ms, emission_ms * policy.limit, time.time() * 1000, requested],
+        )
+        granted, remaining, retry_after_ms = (int(value) for value in result)
+        return granted, remaining, retry_after_ms
+
+    def _script(self) -> Any:
+        loop = asyncio.get_running_loop()
+        script = self._scripts.get(loop)
+        if script is None:
+            client = redis.from_url(
+                self.redis_url,
+                socket_connect_timeout=self.backend_timeout_seconds,
+                socket_timeout=self.backend_timeout_seconds,
+            )
+            script = client.register_script(GCRA_SCRIPT)
+            self._scripts[loop] = script
+        return script
+
+    def _local_state(self, key: str, policy: RateLimitPolicy, now: float) -> _LocalKeyState:
+        local_key = (key, policy)
+        state = self._local.get(local_key)
+        if state is None:
+            state = _LocalKeyState(tokens=float(policy.limit), updated_at=now)
+            self._local[local_key] = state
+            if len(self._local) > self.max_local_keys:
+                self._local.popitem(last=False)
+            return state
+
+        self._local.move_to_end(local_key)
+        elapsed = now - state.updated_at
+        state.tokens = min(float(policy.limit), state.tokens + elapsed * policy.refill_per_second)
+        state.updated_at = now
+        return state
+
+
+def retry_after_seconds(decision: RateLimitDecision) -> int:
+    return max(1, math.ceil(decision.retry_after_seconds))
+
+
+def client_id_from_scope(scope: dict[str, Any]) -> str:
+    """获取客户端标识（直接读取ASGI scope，不构造Request）"""
+    # 优先使用用户ID（如果已认证）
+    user_id = scope.get("state", {}).get("user_id")
+    if user_id:
+        return f"user:{user_id}"
+
+    # 使用IP地址
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            return f"ip:{value.decode('latin-1').split(',')[0].strip()}"
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+rate_limiter = RateLimiter.from_settings()
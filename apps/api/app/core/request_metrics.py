@@ -0,0 +1,79 @@
+"""
+请求指标
+按路由模板统计请求耗时直方图，以Prometheus文本格式输出
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from threading import Lock
+
+# 桶上界（秒）
+DEFAULT_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class _RouteSeries:
+    bucket_counts: list[int]
+    count: int = 0
+    total_seconds: float = 0.0
+    status_counts: dict[str, int] = field(default_factory=dict)
+
+
+class RouteTimingHistogram:
+    """Per-route latency histogram keyed by method and route template, not raw path."""
+
+    def __init__(self, buckets_seconds: tuple[float, ...] = DEFAULT_BUCKETS_SECONDS):
+        self.buckets_seconds = tuple(sorted(buckets_seconds))
+        self._series: dict[tuple[str, str], _RouteSeries] = {}
+        self._lock = Lock()
+
+    def observe(self, method: str, route: str, status_code: int, duration_seconds: float) -> None:
+        bucket_index = bisect_left(self.buckets_seconds, duration_seconds)
+        status_class = f"{status_code // 100}xx"
+        with self._lock:
+            series = self._series.get((method, route))
+            if series is None:
+                series = _RouteSeries(bucket_counts=[0] * (len(self.buckets_seconds) + 1))
+                self._series[(method, route)] = series
+            series.bucket_counts[bucket_index] += 1
+            series.count += 1
+            series.total_seconds += duration_seconds
+            series.status_counts[status_class] = series.status_counts.get(status_class, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self, metric_name: str = "lumos_http_request_duration_seconds") -> str:
+        lines = [
+            f"# HELP {metric_name} HTTP request latency by route template.",
+            f"# TYPE {metric_name} histogram",
+        ]
+        status_lines = [
+            "# HELP lumos_http_requests_total HTTP requests by route template and status class.",
+            "# TYPE lumos_http_requests_total counter",
+        ]
+
+        with self._lock:
+            series_items = sorted(self._series.items())
+            snapshot = [
+                (key, list(series.bucket_counts), series.count, series.total_seconds, dict(series.status_counts))
+                for key, series in series_items
+            ]
+
+        for (method, route), bucket_counts, count, total_seconds, status_counts in snapshot:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets_seconds, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{metric_name}_bucket{{{labels},le="{upper_bound}"}} {cumulative}')
+            lines.append(f'{metric_name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{metric_name}_sum{{{labels}}} {total_seconds:.6f}")
+            lines.append(f"{metric_name}_count{{{labels}}} {count}")
+            for status_class, status_count in sorted(status_counts.items()):
+                status_lines.append(f'lumos_http_requests_total{{{labels},status="{status_class}"}} {status_count}')
+
+        return "\n".join(lines + status_lines) + "\n"
+
+
+request_timing_histogram = RouteTimingHistogram()
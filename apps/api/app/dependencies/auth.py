@@ -8,10 +8,12 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
+from app.core.principal_cache import AuthenticatedPrincipal, principal_cache, token_payload_memo
 from app.models.user import User
 
 # JWT配置
@@ -25,23 +27,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    # iat参与认证主体缓存键，重新签发的token不会命中旧快照
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
     """验证令牌"""
+    payload = token_payload_memo.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except JWTError:
         return None
 
+    token_payload_memo.put(token, payload)
+    return payload
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前用户"""
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedPrincipal:
+    """获取当前用户（优先命中认证主体缓存，未命中时查询数据库）"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -60,23 +69,32 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    issued_at = int(payload.get("iat") or 0)
+    principal = principal_cache.get(user_id, issued_at)
+    if principal is not None:
+        return principal
+
+    # 缓存未命中时走异步会话，查询不阻塞事件循环
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
     
-    return user
+    principal = AuthenticatedPrincipal.from_user(user)
+    principal_cache.put(principal, issued_at)
+    return principal
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedPrincipal = Depends(get_current_user)
+) -> AuthenticatedPrincipal:
     """获取当前活跃用户"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 async def get_current_premium_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedPrincipal = Depends(get_current_active_user)
+) -> AuthenticatedPrincipal:
     """获取当前高级用户"""
     if current_user.subscription_tier not in ["premium", "family"]:
         raise HTTPException(
@@ -1,20 +1,24 @@
 import importlib
 import logging
 import os
+import secrets
 import time
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.core.database import Base, engine
-from app.middleware.rate_limiting import RateLimitMiddleware
-from app.middleware.security import SecurityMiddleware
+from app.core.database import Base, dispose_async_engine, engine, get_pool_metrics
+from app.core.execution import event_loop_lag_monitor, get_execution_snapshot, shutdown_execution_pools
+from app.core.password_hashing import password_hash_pool
+from app.core.providers import provider_registry, warmup_provider_names
+from app.core.request_metrics import request_timing_histogram
+from app.middleware.request_pipeline import RequestPipelineMiddleware
 from app.routers.v2 import caregiver as v2_caregiver
 from app.routers.v2 import children as v2_children
 from app.routers.v2 import ops as v2_ops
@@ -56,23 +60,22 @@ async def lifespan(app: FastAPI):
     except Exception as exc:  # pragma: no cover
         logger.warning("Skipped metadata initialization: %s", exc)
 
-    ai_orchestrator = None
-    try:
-        from app.services.ai_orchestrator import AIOrchestrator
-
-        ai_orchestrator = AIOrchestrator()
-        await ai_orchestrator.initialize()
-        app.state.ai_orchestrator = ai_orchestrator
-    except Exception as exc:  # pragma: no cover
-        app.state.ai_orchestrator = None
-        logger.warning("AI orchestrator unavailable during startup: %s", exc)
+    # AI提供方在首次使用时初始化，不阻塞启动；预热任务在开始接收流量后于后台执行
+    app.state.providers = provider_registry
+    if settings.provider_warmup_enabled:
+        provider_registry.start_warmup(warmup_provider_names())
 
+    event_loop_lag_monitor.start()
     logger.info("API server started")
     yield
 
     logger.info("Shutting down API server")
-    if ai_orchestrator is not None:
-        await ai_orchestrator.cleanup()
+    await event_loop_lag_monitor.stop()
+    await provider_registry.close_all()
+    shutdown_execution_pools()
+    password_hash_pool.shutdown()
+    await dispose_async_engine()
+    engine.dispose()
 
 
 app = FastAPI(
@@ -97,20 +100,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(SecurityMiddleware)
-app.add_middleware(RateLimitMiddleware)
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    logger.info("Request: %s %s", request.method, request.url)
-
-    response = await call_next(request)
-
-    process_time = time.time() - start_time
-    logger.info("Response: %s - %.3fs", response.status_code, process_time)
-    return response
+# 安全检查、限流、访问日志采样与耗时统计（单层纯ASGI）
+app.add_middleware(RequestPipelineMiddleware)
 
 
 @app.exception_handler(HTTPException)
@@ -145,9 +136,29 @@ async def health_check():
         "service": "lumosreading-api",
         "version": "2.0.0",
         "timestamp": time.time(),
+        "execution": get_execution_snapshot(),
+        "database": get_pool_metrics(),
+        "providers": provider_registry.status(),
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str | None = Header(default=None)):
+    # 未开启时与不存在的路由一致；开启后由 METRICS_TOKEN 限制为内部抓取
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_token and not secrets.compare_digest(
+        authorization or "",
+        f"Bearer {settings.metrics_token}",
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(
+        request_timing_histogram.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 app.include_router(v2_story_packages.router, prefix="/api/v2/story-packages", tags=["v2-story-packages"])
 app.include_router(v2_story_briefs.router, prefix="/api/v2/story-briefs", tags=["v2-story-briefs"])
 app.include_router(
@@ -0,0 +1,100 @@
+"""
+请求管道中间件
+安全检查、限流、访问日志采样与路由耗时统计合并为单层纯ASGI中间件
+"""
+
+import json
+import logging
+import random
+import time
+
+from app.core.config import settings
+from app.core.rate_limiter import RateLimiter, client_id_from_scope, current_rate_limit_client, rate_limiter
+from app.core.request_metrics import RouteTimingHistogram, request_timing_histogram
+from app.middleware.rate_limiting import global_rate_limit_policy, rate_limited_response
+from app.middleware.security import inspect_request, rejection_response
+
+access_logger = logging.getLogger("app.access")
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestPipelineMiddleware:
+    """请求管道中间件"""
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter | None = None,
+        histogram: RouteTimingHistogram | None = None,
+    ):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.histogram = histogram or request_timing_histogram
+        self.policy = global_rate_limit_policy()
+        self.sample_rate = settings.access_log_sample_rate
+        self.slow_request_seconds = settings.access_log_slow_request_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            # 1. 请求大小与恶意模式检查
+            rejection = inspect_request(scope)
+            if rejection is not None:
+                await rejection_response(*rejection)(scope, receive, send_with_status)
+                return
+
+            # 2. 全局限流；端点级策略（@rate_limit）沿用同一客户端标识
+            client_id = client_id_from_scope(scope)
+            decision = await self.limiter.check(f"global:{client_id}", self.policy)
+            if not decision.allowed:
+                await rate_limited_response(decision)(scope, receive, send_with_status)
+                return
+
+            token = current_rate_limit_client.set(client_id)
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                current_rate_limit_client.reset(token)
+        finally:
+            self._record(scope, status_code, time.perf_counter() - started_at)
+
+    def _record(self, scope, status_code: int, duration_seconds: float) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+        self.histogram.observe(scope["method"], route_path, status_code, duration_seconds)
+
+        # 5xx与慢请求全部记录，其余按比例采样
+        if (
+            status_code < 500
+            and duration_seconds < self.slow_request_seconds
+            and random.random() >= self.sample_rate
+        ):
+            return
+
+        client = scope.get("client")
+        access_logger.info(
+            json.dumps(
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_path,
+                    "status": status_code,
+                    "duration_ms": round(duration_seconds * 1000, 3),
+                    "client": client[0] if client else None,
+                },
+                ensure_ascii=False,
+            )
+        )
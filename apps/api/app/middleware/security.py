@@ -1,84 +1,62 @@
 """
-安全中间件
-处理安全相关的请求和响应
+请求安全检查
+供请求管道中间件调用的请求大小与恶意模式检查
 """
 
-import time
-import hashlib
-import hmac
-from typing import Callable
-from fastapi import Request, Response, HTTPException
-from fastapi.responses import JSONResponse
 import logging
+import re
+from urllib.parse import unquote_to_bytes
+
+from fastapi.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
 
-class SecurityMiddleware:
-    """安全中间件"""
-    
-    def __init__(self, app):
-        self.app = app
-    
-    async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
-        
-        request = Request(scope, receive)
-        
-        # 安全检查
-        try:
-            # 1. 检查请求大小
-            await self._check_request_size(request)
-            
-            # 2. 检查恶意请求模式
-            await self._check_malicious_patterns(request)
-            
-            # 3. 添加安全头
-            response = await self._add_security_headers(request)
-            
-            if response:
-                await response(scope, receive, send)
-                return
-                
-        except HTTPException as e:
-            response = JSONResponse(
-                status_code=e.status_code,
-                content={"error": e.detail}
+MAX_REQUEST_BYTES = 10 * 1024 * 1024  # 10MB
+
+SQL_INJECTION_PATTERNS = (
+    "union select", "drop table", "delete from",
+    "insert into", "update set", "exec(", "script>",
+)
+XSS_PATTERNS = ("<script", "javascript:", "onload=", "onerror=")
+
+# 所有恶意模式合并为一个预编译正则，按原始查询串（不区分大小写）一次扫描
+MALICIOUS_QUERY_PATTERN = re.compile(
+    b"(?P<sql>" + b"|".join(re.escape(item.encode()) for item in SQL_INJECTION_PATTERNS) + b")"
+    b"|(?P<xss>" + b"|".join(re.escape(item.encode()) for item in XSS_PATTERNS) + b")",
+    re.IGNORECASE,
+)
+
+
+def inspect_request(scope) -> tuple[int, str] | None:
+    """在scope层面检查请求大小和查询串，返回 (状态码, 错误信息)；通过时返回None"""
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                if int(value) > MAX_REQUEST_BYTES:
+                    return 413, "Request too large"
+            except ValueError:
+                return 400, "Invalid request"
+            break
+
+    query_string = scope.get("query_string", b"")
+    if query_string:
+        # 客户端通常会对查询串编码（"<" -> "%3C"，空格 -> "+"），解码后再匹配
+        if b"%" in query_string or b"+" in query_string:
+            query_string = unquote_to_bytes(query_string.replace(b"+", b" "))
+        match = MALICIOUS_QUERY_PATTERN.search(query_string)
+        if match:
+            kind = "SQL injection" if match.lastgroup == "sql" else "XSS"
+            logger.warning(
+                "Potential %s detected: %s?%s",
+                kind,
+                scope.get("path", ""),
+                query_string.decode("latin-1"),
             )
-            await response(scope, receive, send)
-            return
-        
-        await self.app(scope, receive, send)
-    
-    async def _check_request_size(self, request: Request):
-        """检查请求大小"""
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > 10 * 1024 * 1024:  # 10MB
-            raise HTTPException(status_code=413, detail="Request too large")
-    
-    async def _check_malicious_patterns(self, request: Request):
-        """检查恶意请求模式"""
-        # 检查SQL注入模式
-        sql_patterns = [
-            "union select", "drop table", "delete from", 
-            "insert into", "update set", "exec(", "script>"
-        ]
-        
-        query_string = str(request.url.query).lower()
-        for pattern in sql_patterns:
-            if pattern in query_string:
-                logger.warning(f"Potential SQL injection detected: {request.url}")
-                raise HTTPException(status_code=400, detail="Invalid request")
-        
-        # 检查XSS模式
-        xss_patterns = ["<script", "javascript:", "onload=", "onerror="]
-        for pattern in xss_patterns:
-            if pattern in query_string:
-                logger.warning(f"Potential XSS detected: {request.url}")
-                raise HTTPException(status_code=400, detail="Invalid request")
-    
-    async def _add_security_headers(self, request: Request) -> Response:
-        """添加安全头"""
-        # 这里可以添加安全头，但通常由CORS中间件处理
-        return None
+            return 400, "Invalid request"
+
+    return None
+
+
+def rejection_response(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"error": detail})
+
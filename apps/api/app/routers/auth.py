@@ -11,6 +11,7 @@ import logging
 
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.password_hashing import CredentialVerificationThrottledError
 from app.schemas.auth import (
     Token, UserLogin, UserRegister, WeChatLogin, 
     PasswordReset, VerificationCode
@@ -96,6 +97,11 @@ async def login(
         
     except HTTPException:
         raise
+    except CredentialVerificationThrottledError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"User login failed: {str(e)}")
         raise HTTPException(
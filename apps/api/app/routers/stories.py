@@ -1,21 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import uuid
-import asyncio
 import json
 import logging
 
 from app.core.database import get_db
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER, InvalidCursorError, keyset_paginate, projected_columns
+)
 from app.schemas.story import (
     StoryRequest, StoryResponse, StoryGenerationStatus,
     ProgressiveGenerationRequest, ProgressiveGenerationResponse,
-    StoryCreate, StoryUpdate, StoryDetailResponse
+    StoryCreate, StoryUpdate, StoryDetailResponse, StoryListItemResponse
 )
 from app.models.story import Story, GenerationType, StoryStatus
 from app.models.child_profile import ChildProfile
+from app.services.page_pipeline import pipeline_story_pages
 from app.services.story_generation import StoryGenerationService
-from app.services.ai_orchestrator import AIOrchestrator
+from app.core.providers import get_ai_orchestrator
 from app.dependencies.auth import get_current_user, get_current_active_user
 from app.dependencies.rate_limit import rate_limit
 
@@ -252,93 +255,100 @@ async def story_generation_stream(
         }
 
         # 初始化AI服务
-        ai_orchestrator = AIOrchestrator()
-        await ai_orchestrator.initialize()
+        ai_orchestrator = await get_ai_orchestrator()
 
         # ✅ 初始化插图服务
         from app.services.illustration_service import MultiAIIllustrationService
         illustration_service = MultiAIIllustrationService(db)
 
-        # 逐页生成剩余页面
-        for page_num in range(len(existing_pages) + 1, target_pages + 1):
-            try:
-                # 1. 生成文本页面
-                new_page = await ai_orchestrator.story_creator.create_next_page(
-                    framework=framework,
-                    existing_pages=existing_pages,
-                    page_number=page_num
-                )
-
-                # 2. ✅ 立即生成对应插图
-                illustration_result = None
-                illustration_error = None
-
-                try:
-                    logger.info(f"Generating illustration for story {story_id}, page {page_num}")
-                    illustration_result = await illustration_service.generate_story_illustration(
-                        story_id=str(story_id),
-                        page_number=page_num,
-                        illustration_prompt=new_page.get('illustration_prompt', ''),
-                        character_bible=character_bible
-                    )
-
-                    # 3. ✅ 将插图URL添加到页面数据
-                    new_page['illustration_url'] = illustration_result['url']
-                    new_page['illustration_id'] = illustration_result.get('illustration_id')
-
-                    logger.info(f"Illustration generated successfully: {illustration_result['url']}")
-
-                except Exception as e:
-                    logger.error(f"Illustration generation failed for page {page_num}: {e}")
-                    illustration_error = str(e)
-                    # ✅ 使用fallback图像
-                    new_page['illustration_url'] = '/api/static/illustrations/fallback.png'
-                    new_page['illustration_error'] = illustration_error
-
-                # 4. 更新故事内容
-                existing_pages.append(new_page)
-                story.content = {
-                    'pages': existing_pages,
-                    'characters': character_bible.get('characters', [])
-                }
+        async def render_illustration(page_number: int, page: Dict[str, Any]) -> Dict[str, Any]:
+            logger.info(f"Generating illustration for story {story_id}, page {page_number}")
+            return await illustration_service.generate_story_illustration(
+                story_id=str(story_id),
+                page_number=page_number,
+                illustration_prompt=page.get('illustration_prompt', ''),
+                character_bible=character_bible
+            )
+
+        pages_by_number = {
+            page.get('page_number', index + 1): page for index, page in enumerate(existing_pages)
+        }
 
-                # 5. 计算进度
-                progress = (page_num / target_pages) * 100
+        # AI服务逐页推送文本；文本一到即发给客户端并开始渲染插图，同时预取下一页
+        page_events = ai_orchestrator.stream_story_pages(
+            framework=framework,
+            character_bible=character_bible,
+            existing_pages=existing_pages,
+            total_pages=target_pages
+        )
+        async for event in pipeline_story_pages(page_events, render_illustration):
+            page_num = event.get("page_number")
 
-                # 6. ✅ 发送完整进度更新(文本+插图)
+            if event["type"] == "page_text":
                 await websocket.send_json({
-                    "type": "page_generated",
+                    "type": "page_text",
                     "page_number": page_num,
-                    "page_content": new_page,
-                    "illustration": {
-                        "url": new_page.get('illustration_url'),
-                        "id": new_page.get('illustration_id'),
-                        "error": illustration_error,
-                        "provider": illustration_result.get('provider') if illustration_result else None
-                    } if illustration_result or illustration_error else None,
-                    "progress_percentage": progress,
+                    "page_content": event["page"],
                     "total_pages": target_pages
                 })
+                continue
 
-                # 7. 更新数据库
-                db.commit()
-
-                # 8. ✅ 适当延迟避免过快推送（考虑图像生成时间）
-                await asyncio.sleep(1.5)
-
-            except Exception as e:
-                logger.error(f"Page {page_num} generation failed: {e}")
+            if event["type"] != "page_illustration":
+                # page_error（单页失败）或 error（上游流中断）
+                scope = f"Page {page_num} generation" if page_num else "Generation"
+                logger.error(f"{scope} failed: {event.get('message')}")
                 await websocket.send_json({
                     "type": "error",
                     "page_number": page_num,
-                    "message": f"Page {page_num} generation failed: {str(e)}"
+                    "message": f"{scope} failed: {event.get('message')}"
                 })
+                continue
+
+            new_page = dict(event["page"])
+            illustration_result = event["illustration"]
+            illustration_error = event["error"]
+            if illustration_result:
+                new_page['illustration_url'] = illustration_result['url']
+                new_page['illustration_id'] = illustration_result.get('illustration_id')
+            else:
+                # ✅ 使用fallback图像
+                new_page['illustration_url'] = '/api/static/illustrations/fallback.png'
+                new_page['illustration_error'] = illustration_error
+
+            # 插图可能乱序完成，按页码重建内容
+            pages_by_number[page_num] = new_page
+            existing_pages = [pages_by_number[number] for number in sorted(pages_by_number)]
+            story.content = {
+                'pages': existing_pages,
+                'characters': character_bible.get('characters', [])
+            }
+
+            await websocket.send_json({
+                "type": "page_generated",
+                "page_number": page_num,
+                "page_content": new_page,
+                "illustration": {
+                    "url": new_page.get('illustration_url'),
+                    "id": new_page.get('illustration_id'),
+                    "error": illustration_error,
+                    "provider": illustration_result.get('provider') if illustration_result else None
+                },
+                "progress_percentage": len(existing_pages) / target_pages * 100,
+                "total_pages": target_pages
+            })
+
+            db.commit()
 
         # 故事生成完成
         story.status = StoryStatus.READY
 
         # 进行最终质量检查
-        quality_score = await ai_orchestrator.quality_controller.final_quality_check(story.content)
+        quality_score = None
+        try:
+            quality_report = await ai_orchestrator.conduct_quality_control(story.content, framework)
+            quality_score = quality_report.get('overall_score')
+        except Exception as e:
+            logger.warning(f"Final quality check failed for story {story_id}: {e}")
         story.quality_score = quality_score
 
         db.commit()
@@ -379,16 +389,25 @@ async def create_story(
     db.refresh(db_story)
     return db_story
 
-@router.get("/", response_model=List[StoryDetailResponse])
+@router.get("/", response_model=List[StoryListItemResponse])
 async def get_stories(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_content: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """获取故事列表"""
-    stories = db.query(Story).offset(skip).limit(limit).all()
-    return stories
+    """获取故事列表（按创建时间倒序键集分页，下一页游标见 X-Next-Cursor 响应头）"""
+    columns = projected_columns(Story, exclude=() if include_content else ("content",))
+    try:
+        page = keyset_paginate(db.query(*columns), Story.created_at, Story.id, cursor, limit)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 @router.get("/{story_id}", response_model=StoryDetailResponse)
 async def get_story(
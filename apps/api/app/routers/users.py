@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, keyset_paginate
+from app.core.principal_cache import invalidate_principal
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 
@@ -58,10 +60,24 @@ def update_user(user_id: UUID, user_update: UserUpdate, db: Session = Depends(ge
     
     db.commit()
     db.refresh(user)
+    # 停用、订阅等级变化等需立即生效
+    invalidate_principal(user.id)
     return user
 
 @router.get("/", response_model=List[UserResponse])
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """获取用户列表"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+def list_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """获取用户列表（键集分页，只查询响应所需的列）"""
+    columns = [getattr(User, field) for field in UserResponse.model_fields]
+    try:
+        page = keyset_paginate(db.query(*columns), User.created_at, User.id, cursor, limit)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
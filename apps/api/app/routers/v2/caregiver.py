@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.execution import run_read, run_write
 from app.schemas.v2.caregiver import (
     CaregiverAssignmentCommandV1,
     CaregiverAssignmentResponseV1,
@@ -43,6 +44,7 @@ child_service = DemoChildService()
 entitlement_service = DemoEntitlementService(
     story_package_service=story_package_service,
     clock=lambda: FIXTURE_TIMESTAMP,
+    catalog_revision=_release_service.store.revision,
 )
 plan_service = EntitlementAwarePlanService(
     base_plan_service=DemoPlanService(story_package_service),
@@ -110,7 +112,7 @@ assignment_service = CaregiverAssignmentService(
 async def get_caregiver_household(household_id: UUID) -> CaregiverHouseholdV1:
     """Return the V2 caregiver household read model."""
     try:
-        return household_read_service.get_household(household_id)
+        return await run_read(household_read_service.get_household, household_id)
     except NoEntitledPackagesError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
 
@@ -123,7 +125,7 @@ async def get_caregiver_household(household_id: UUID) -> CaregiverHouseholdV1:
 async def get_caregiver_children(household_id: UUID) -> CaregiverChildrenV1:
     """Return the V2 caregiver child assignment read model."""
     try:
-        return children_read_service.get_children(household_id)
+        return await run_read(children_read_service.get_children, household_id)
     except NoEntitledPackagesError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
 
@@ -146,7 +148,7 @@ async def assign_caregiver_package(
         )
 
     try:
-        return assignment_service.assign_package(command)
+        return await run_write(assignment_service.assign_package, command)
     except CaregiverAssignmentAccessError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except CaregiverAssignmentValidationError as exc:
@@ -163,7 +165,7 @@ async def assign_caregiver_package(
 async def get_caregiver_plan(household_id: UUID) -> CaregiverPlanV1:
     """Return the V2 caregiver weekly plan read model."""
     try:
-        return plan_read_service.get_plan(household_id)
+        return await run_read(plan_read_service.get_plan, household_id)
     except NoEntitledPackagesError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
 
@@ -175,7 +177,7 @@ async def get_caregiver_plan(household_id: UUID) -> CaregiverPlanV1:
 )
 async def get_caregiver_progress(household_id: UUID) -> CaregiverProgressV1:
     """Return the V2 caregiver progress read model."""
-    return progress_read_service.get_progress(household_id)
+    return await run_read(progress_read_service.get_progress, household_id)
 
 
 @router.get(
@@ -185,7 +187,7 @@ async def get_caregiver_progress(household_id: UUID) -> CaregiverProgressV1:
 )
 async def get_household_entitlement(household_id: UUID) -> HouseholdEntitlementV1:
     """Return the household subscription and package access state."""
-    return entitlement_service.get_household_entitlement(household_id)
+    return await run_read(entitlement_service.get_household_entitlement, household_id)
 
 
 @router.get(
@@ -195,7 +197,7 @@ async def get_household_entitlement(household_id: UUID) -> HouseholdEntitlementV
 )
 async def get_weekly_value_report(household_id: UUID) -> WeeklyValueReportV1:
     """Return the weekly value summary derived from reading behavior."""
-    return weekly_value_service.get_weekly_value_report(household_id)
+    return await run_read(weekly_value_service.get_weekly_value_report, household_id)
 
 
 @router.get(
@@ -206,6 +208,6 @@ async def get_weekly_value_report(household_id: UUID) -> WeeklyValueReportV1:
 async def get_caregiver_dashboard(household_id: UUID) -> CaregiverDashboardV1:
     """Return the V2 caregiver household dashboard aggregate."""
     try:
-        return dashboard_service.get_dashboard(household_id)
+        return await run_read(dashboard_service.get_dashboard, household_id)
     except NoEntitledPackagesError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
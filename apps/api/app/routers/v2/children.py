@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.execution import run_read
 from app.schemas.v2.child_home import ChildHomeV1
 from app.schemas.v2.story_package import StoryPackageManifestV1
 from app.services.v2.access_errors import NoEntitledPackagesError
@@ -25,6 +26,7 @@ child_service = DemoChildService()
 entitlement_service = DemoEntitlementService(
     story_package_service=story_package_service,
     clock=lambda: FIXTURE_TIMESTAMP,
+    catalog_revision=_release_service.store.revision,
 )
 plan_service = EntitlementAwarePlanService(
     base_plan_service=DemoPlanService(story_package_service),
@@ -52,7 +54,7 @@ child_package_delivery_service = ChildPackageDeliveryService(
 async def get_child_home(child_id: UUID) -> ChildHomeV1:
     """Return the assigned package shelf for the child runtime."""
     try:
-        return child_home_service.get_home(child_id)
+        return await run_read(child_home_service.get_home, child_id)
     except NoEntitledPackagesError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
     except ValueError as exc:
@@ -70,7 +72,7 @@ async def get_child_scoped_story_package(
 ) -> StoryPackageManifestV1:
     """Return a runtime package only if the child's household is entitled to it."""
     try:
-        return child_package_delivery_service.get_package(child_id, package_id)
+        return await run_read(child_package_delivery_service.get_package, child_id, package_id)
     except ChildPackageDeliveryAccessError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
     except ChildPackageDeliveryNotFoundError as exc:
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.core.execution import run_read
 from app.schemas.v2.monetization import OpsMetricsSnapshotV1
 from app.services.v2.entitlement_service import DemoEntitlementService
 from app.services.v2.fixtures import FIXTURE_TIMESTAMP
@@ -15,6 +16,7 @@ story_package_service, _release_service = create_release_story_package_services(
 entitlement_service = DemoEntitlementService(
     story_package_service=story_package_service,
     clock=lambda: FIXTURE_TIMESTAMP,
+    catalog_revision=_release_service.store.revision,
 )
 progress_service = DemoProgressService()
 weekly_value_service = WeeklyValueService(
@@ -36,4 +38,4 @@ ops_metrics_service = OpsMetricsService(
 )
 async def get_ops_metrics() -> OpsMetricsSnapshotV1:
     """Return the current demo operations snapshot for Phase 6."""
-    return ops_metrics_service.get_snapshot()
+    return await run_read(ops_metrics_service.get_snapshot)
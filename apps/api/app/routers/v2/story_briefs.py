@@ -2,6 +2,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.execution import run_read, run_write
 from app.schemas.v2.story_generation import (
     StoryBriefCommandV1,
     StoryBriefIndexV1,
@@ -29,7 +30,7 @@ generation_service = create_story_generation_service(clock=lambda: FIXTURE_TIMES
 )
 async def list_story_briefs() -> StoryBriefIndexV1:
     """Return the AI brief backlog for studio operations."""
-    return generation_service.list_briefs()
+    return await run_read(generation_service.list_briefs)
 
 
 @router.post(
@@ -39,7 +40,7 @@ async def list_story_briefs() -> StoryBriefIndexV1:
 )
 async def create_story_brief(command: StoryBriefCommandV1) -> StoryBriefV1:
     """Create a new editorial brief for AI-assisted draft generation."""
-    return generation_service.create_brief(command)
+    return await run_write(generation_service.create_brief, command)
 
 
 @router.post(
@@ -53,7 +54,7 @@ async def generate_story_brief_draft(
 ) -> StoryGenerationJobV1:
     """Generate a reviewable draft package from a brief."""
     try:
-        return generation_service.generate_draft(brief_id, command)
+        return await run_write(generation_service.generate_draft, brief_id, command)
     except StoryGenerationValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryGenerationNotFoundError as exc:
@@ -71,7 +72,7 @@ async def generate_story_brief_media(
 ) -> StoryGenerationJobV1:
     """Generate media assets for a previously assembled AI draft."""
     try:
-        return generation_service.generate_media(brief_id, command)
+        return await run_write(generation_service.generate_media, brief_id, command)
     except StoryGenerationValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryGenerationNotFoundError as exc:
@@ -85,4 +86,4 @@ async def generate_story_brief_media(
 )
 async def list_story_generation_jobs() -> StoryGenerationJobIndexV1:
     """Return generation jobs across draft and media stages."""
-    return generation_service.list_jobs()
+    return await run_read(generation_service.list_jobs)
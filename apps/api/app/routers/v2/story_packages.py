@@ -1,12 +1,16 @@
+from typing import Literal, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 
+from app.core.execution import run_read, run_write
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 from app.schemas.v2.story_package import StoryPackageManifestV1
 from app.schemas.v2.story_package_release import (
     StoryPackageBuildCommandV1,
     StoryPackageBuildV1,
     StoryPackageDraftIndexV1,
+    StoryPackageDraftSummaryIndexV1,
     StoryPackageDraftV1,
     StoryPackageHistoryV1,
     StoryPackageRecallCommandV1,
@@ -17,6 +21,7 @@ from app.schemas.v2.story_package_release import (
 )
 from app.services.v2.fixtures import FIXTURE_TIMESTAMP
 from app.services.v2.story_package_release_service import (
+    StoryPackageDraftQuery,
     StoryPackageReleaseNotFoundError,
     StoryPackageReleaseValidationError,
     create_release_story_package_services,
@@ -30,12 +35,47 @@ story_package_service, release_service = create_release_story_package_services(
 
 @router.get(
     "",
-    response_model=StoryPackageDraftIndexV1,
+    response_model=Union[StoryPackageDraftIndexV1, StoryPackageDraftSummaryIndexV1],
     response_model_exclude_none=True,
 )
-async def list_story_package_drafts() -> StoryPackageDraftIndexV1:
-    """Return the package draft list for studio and release surfaces."""
-    return release_service.list_drafts()
+async def list_story_package_drafts(
+    response: Response,
+    workflow_state: Optional[Literal["draft", "built", "released", "recalled"]] = None,
+    audit_status: Optional[
+        Literal["pending", "in_review", "approved", "needs_revision", "rejected", "recalled", "escalated"]
+    ] = None,
+    source_type: Optional[Literal["editorial", "ai_generated"]] = None,
+    sort: Literal[
+        "stored", "-updated_at", "updated_at", "-created_at", "created_at", "title", "-title"
+    ] = "stored",
+    fields: Literal["full", "summary"] = "full",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+) -> Union[StoryPackageDraftIndexV1, StoryPackageDraftSummaryIndexV1]:
+    """Return package drafts for studio and release surfaces.
+
+    Without query parameters every draft is returned in stored order, as
+    before pagination existed. Pass ``limit`` to page; the next page cursor
+    is in the X-Next-Cursor header. ``fields=summary`` skips package
+    previews; fetch a full draft from ``/{package_id}/draft``.
+    """
+    query = StoryPackageDraftQuery(
+        workflow_state=workflow_state,
+        audit_status=audit_status,
+        source_type=source_type,
+        sort=sort,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+    )
+    try:
+        page = await run_read(release_service.query_drafts, query)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.index
 
 
 @router.post(
@@ -49,7 +89,7 @@ async def build_story_package(
 ) -> StoryPackageBuildV1:
     """Create a versioned build record for the requested package."""
     try:
-        return release_service.build_package(package_id, command)
+        return await run_write(release_service.build_package, package_id, command)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
@@ -67,7 +107,7 @@ async def release_story_package(
 ) -> StoryPackageReleaseV1:
     """Promote a build into the active runtime lookup path."""
     try:
-        return release_service.release_package(package_id, command)
+        return await run_write(release_service.release_package, package_id, command)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
@@ -85,7 +125,7 @@ async def recall_story_package_release(
 ) -> StoryPackageReleaseV1:
     """Recall the active release while preserving lookup fallback semantics."""
     try:
-        return release_service.recall_release(package_id, command)
+        return await run_write(release_service.recall_release, package_id, command)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
@@ -103,7 +143,7 @@ async def rollback_story_package_release(
 ) -> StoryPackageReleaseV1:
     """Promote a historical release back into the active runtime path."""
     try:
-        return release_service.rollback_release(package_id, command)
+        return await run_write(release_service.rollback_release, package_id, command)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
@@ -121,13 +161,26 @@ async def review_story_package(
 ) -> StoryPackageDraftV1:
     """Record review state changes for editorial and AI-generated drafts."""
     try:
-        return release_service.review_package(package_id, command)
+        return await run_write(release_service.review_package, package_id, command)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+@router.get(
+    "/{package_id}/draft",
+    response_model=StoryPackageDraftV1,
+    response_model_exclude_none=True,
+)
+async def get_story_package_draft(package_id: UUID) -> StoryPackageDraftV1:
+    """Return one draft with its full package preview."""
+    try:
+        return await run_read(release_service.get_draft, package_id)
+    except StoryPackageReleaseNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
 @router.get(
     "/{package_id}/history",
     response_model=StoryPackageHistoryV1,
@@ -136,7 +189,7 @@ async def review_story_package(
 async def get_story_package_history(package_id: UUID) -> StoryPackageHistoryV1:
     """Return draft, build, and release history for one package."""
     try:
-        return release_service.get_history(package_id)
+        return await run_read(release_service.get_history, package_id)
     except StoryPackageReleaseNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -149,7 +202,7 @@ async def get_story_package_history(package_id: UUID) -> StoryPackageHistoryV1:
 async def get_story_package(package_id: UUID) -> StoryPackageManifestV1:
     """Return the V2 runtime content package skeleton for a story."""
     try:
-        return story_package_service.get_story_package(package_id)
+        return await run_read(story_package_service.get_story_package, package_id)
     except StoryPackageReleaseValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except StoryPackageReleaseNotFoundError as exc:
@@ -101,6 +101,18 @@ class ProgressiveGenerationResponse(BaseModel):
     generated_pages: int
     websocket_url: str
 
+class StoryListItemResponse(StoryBase):
+    """故事列表项（默认不返回content，需要时通过include_content请求）"""
+    id: UUID
+    child_id: UUID
+    series_bible_id: Optional[UUID] = None
+    content: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class StoryDetailResponse(StoryResponse):
     """故事详情响应（继承自StoryResponse）"""
     pass
@@ -94,6 +94,38 @@ class StoryPackageDraftIndexV1(BaseModel):
     drafts: List[StoryPackageDraftV1] = Field(default_factory=list)
 
 
+class StoryPackageDraftSummaryV1(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    schema_version: Literal["story-package-draft-summary.v1"] = "story-package-draft-summary.v1"
+    draft_id: UUID
+    package_id: UUID
+    source_type: Literal["editorial", "ai_generated"]
+    workflow_state: Literal["draft", "built", "released", "recalled"]
+    title: str
+    audit_status: Literal[
+        "pending",
+        "in_review",
+        "approved",
+        "needs_revision",
+        "rejected",
+        "recalled",
+        "escalated",
+    ]
+    latest_build_id: Optional[UUID] = None
+    active_release_id: Optional[UUID] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class StoryPackageDraftSummaryIndexV1(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    schema_version: Literal["story-package-draft-summary-index.v1"] = "story-package-draft-summary-index.v1"
+    generated_at: datetime
+    drafts: List[StoryPackageDraftSummaryV1] = Field(default_factory=list)
+
+
 class StoryPackageBuildV1(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -5,8 +5,9 @@ AI编排器服务
 
 import httpx
 import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime
 
 from app.core.config import settings
@@ -79,6 +80,29 @@ class AIOrchestrator:
             logger.error(f"Failed to generate story content: {str(e)}")
             raise
     
+    async def stream_story_pages(
+        self,
+        framework: Dict[str, Any],
+        character_bible: Dict[str, Any],
+        existing_pages: List[Dict[str, Any]],
+        total_pages: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """逐页获取剩余页面（NDJSON流），每页生成完成即返回"""
+        async with self.client.stream(
+            "POST",
+            "/literature/pages/stream",
+            json={
+                "framework": framework,
+                "character_bible": character_bible,
+                "existing_pages": existing_pages,
+                "total_pages": total_pages
+            }
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
     async def conduct_quality_control(
         self,
         story_content: Dict[str, Any],
@@ -99,6 +123,26 @@ class AIOrchestrator:
             logger.error(f"Failed to conduct quality control: {str(e)}")
             raise
     
+    async def conduct_quality_control_batch(
+        self,
+        items: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """批量质量控制（工作室重新审核），items 为 story_content/framework/child_profile，返回顺序一致"""
+        try:
+            response = await self.client.post(
+                "/quality/check-batch",
+                json={
+                    "items": items,
+                    "batch_size": batch_size
+                }
+            )
+            response.raise_for_status()
+            return response.json()["reports"]
+        except Exception as e:
+            logger.error(f"Failed to conduct batch quality control: {str(e)}")
+            raise
+
     async def analyze_rhythm(
         self,
         story_text: str,
@@ -3,8 +3,6 @@
 处理用户认证相关的业务逻辑
 """
 
-import hashlib
-import secrets
 import random
 import logging
 from typing import Optional
@@ -15,6 +13,8 @@ import redis
 from app.models.user import User, SubscriptionTier
 from app.schemas.auth import UserRegister, WeChatLogin
 from app.core.config import settings
+from app.core.password_hashing import hash_password, password_hasher, verification_limiter, verify_password
+from app.core.principal_cache import invalidate_principal
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +37,7 @@ class AuthService:
     async def create_user(self, user_data: UserRegister) -> User:
         """创建用户"""
         # 生成密码哈希
-        password_hash = self._hash_password(user_data.password)
+        password_hash = await hash_password(user_data.password)
         
         # 创建用户对象
         user = User(
@@ -63,8 +63,18 @@ class AuthService:
             (User.phone == identifier) | (User.email == identifier)
         ).first()
         
-        if not user or not self._verify_password(password, user.password_hash):
+        if not user:
             return None
+
+        # 同一账号的并发校验数受限，超限抛出 CredentialVerificationThrottledError
+        async with verification_limiter.slot(str(user.id)):
+            if not await verify_password(password, user.password_hash):
+                return None
+
+            # 旧的 pbkdf2 "salt:hash" 或过期参数的哈希在登录成功时透明升级
+            if password_hasher.needs_rehash(user.password_hash):
+                user.password_hash = await hash_password(password)
+                self.db.commit()
         
         return user
     
@@ -144,10 +154,11 @@ class AuthService:
                 return False
             
             # 更新密码
-            user.password_hash = self._hash_password(new_password)
+            user.password_hash = await hash_password(new_password)
             user.updated_at = datetime.utcnow()
             
             self.db.commit()
+            invalidate_principal(user.id)
             
             # 删除验证码
             key = f"verification_code:{phone}"
@@ -160,21 +171,6 @@ class AuthService:
             logger.error(f"Failed to reset password: {str(e)}")
             return False
     
-    def _hash_password(self, password: str) -> str:
-        """哈希密码"""
-        salt = secrets.token_hex(16)
-        pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-        return f"{salt}:{pwd_hash.hex()}"
-    
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
-        """验证密码"""
-        try:
-            salt, hash_hex = hashed_password.split(':')
-            pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000)
-            return pwd_hash.hex() == hash_hex
-        except ValueError:
-            return False
-    
     async def _get_wechat_user_info(self, code: str) -> Optional[dict]:
         """获取微信用户信息（简化实现）"""
         # 实际实现需要调用微信API
@@ -16,9 +16,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
-# 导入AI服务
-from app.services.vertex_ai_service import VertexAIImageService
-from app.services.qwen_image_service import QwenImageService
+from app.core.providers import provider_registry
 from app.models.illustration import Illustration, IllustrationStatus, IllustrationStyle
 from app.models.story import Story
 from app.core.config import settings
@@ -34,36 +32,41 @@ class MultiAIIllustrationService:
         self.cache_dir = "/tmp/claude/illustrations"
         self.ensure_cache_dir()
 
-        # 初始化AI服务
-        self._init_ai_services()
-
-    def _init_ai_services(self):
-        """初始化AI服务"""
+        # SDK客户端在首次生成时由提供方注册表异步解析，构造服务不阻塞事件循环
+        self.qwen_service = None
+        self.vertex_service = None
+        self.openai_api_key = settings.openai_api_key  # OpenAI (作为备用)
+        self._ai_services_ready = False
+        # 串行化首次解析，并发渲染（如分页流水线）不会在解析完成前走备用路径
+        self._ai_services_lock = asyncio.Lock()
+
+    async def _ensure_ai_services(self):
+        """解析AI服务（SDK客户端由提供方注册表按需创建并在进程内复用，同步工厂在线程中执行）"""
+        if self._ai_services_ready:
+            return
+
+        async with self._ai_services_lock:
+            if self._ai_services_ready:
+                return
+            await self._resolve_ai_services()
+            self._ai_services_ready = True
+
+    async def _resolve_ai_services(self):
+        """按配置的提供方解析SDK客户端，失败时保留为空并走备用路径"""
         try:
             # 通义千问 (主要服务)
             if self.provider == "qwen":
                 if not settings.qwen_api_key:
                     logger.warning("Qwen API key not configured, will use fallback")
                     return
-                self.qwen_service = QwenImageService(
-                    api_key=settings.qwen_api_key,
-                    model=settings.qwen_model
-                )
+                self.qwen_service = await provider_registry.get("qwen_image")
                 logger.info("Qwen service initialized")
 
             # Google Vertex AI
             elif self.provider == "vertex":
-                self.vertex_service = VertexAIImageService(
-                    project_id=settings.google_project_id,
-                    location=settings.google_location,
-                    credentials_path=settings.google_credentials_path,
-                    model=settings.vertex_model
-                )
+                self.vertex_service = await provider_registry.get("vertex_image")
                 logger.info("Vertex AI service initialized")
 
-            # OpenAI (作为备用)
-            self.openai_api_key = settings.openai_api_key
-
         except Exception as e:
             logger.error(f"Failed to initialize AI services: {e}")
             self.vertex_service = None
@@ -136,18 +139,19 @@ class MultiAIIllustrationService:
     async def _generate_with_provider(self, prompt: str) -> Dict:
         """使用指定的AI提供商生成图像"""
 
-        if self.provider == "qwen" and hasattr(self, 'qwen_service') and self.qwen_service:
+        await self._ensure_ai_services()
+        if self.provider == "qwen" and self.qwen_service:
             return await self._generate_with_qwen(prompt)
-        elif self.provider == "vertex" and hasattr(self, 'vertex_service') and self.vertex_service:
+        elif self.provider == "vertex" and self.vertex_service:
             return await self._generate_with_vertex(prompt)
         elif self.provider == "openai" and self.openai_api_key:
             return await self._generate_with_openai(prompt)
         else:
             # 尝试降级到其他提供商
-            if hasattr(self, 'qwen_service') and self.qwen_service and self.provider != "qwen":
+            if self.qwen_service and self.provider != "qwen":
                 logger.info("Falling back to Qwen")
                 return await self._generate_with_qwen(prompt)
-            elif hasattr(self, 'vertex_service') and self.vertex_service and self.provider != "vertex":
+            elif self.vertex_service and self.provider != "vertex":
                 logger.info("Falling back to Vertex AI")
                 return await self._generate_with_vertex(prompt)
             elif self.openai_api_key and self.provider != "openai":
@@ -315,6 +319,7 @@ class MultiAIIllustrationService:
     async def _check_prompt_safety(self, prompt: str) -> Dict:
         """检查提示词安全性"""
 
+        await self._ensure_ai_services()
         if self.provider == "vertex" and self.vertex_service:
             return await self.vertex_service.check_safety(prompt)
         else:
@@ -0,0 +1,85 @@
+"""
+故事页面流水线
+页面文本就绪立即产出；插图在后台渲染、完成即产出，同时继续读取（预取）下一页文本
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+RenderIllustration = Callable[[int, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+_DONE = object()
+
+
+async def pipeline_story_pages(
+    page_events: AsyncIterator[Dict[str, Any]],
+    render_illustration: RenderIllustration,
+    max_pending_illustrations: int = 2,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    合并文本与插图两条流
+
+    产出事件：
+    - 上游原样透传的 page_text / page_error
+    - page_illustration：插图渲染结束（成功时带 illustration，失败时带 error）
+    - error：上游流中断
+    """
+    output: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(max_pending_illustrations)
+    render_tasks: set[asyncio.Task] = set()
+
+    async def render(event: Dict[str, Any]) -> None:
+        illustration = None
+        error = None
+        try:
+            illustration = await render_illustration(event["page_number"], event["page"])
+        except Exception as exc:
+            logger.error("Illustration for page %s failed: %s", event["page_number"], exc)
+            error = str(exc)
+        finally:
+            slots.release()
+        await output.put(
+            {
+                "type": "page_illustration",
+                "page_number": event["page_number"],
+                "page": event["page"],
+                "illustration": illustration,
+                "error": error,
+            }
+        )
+
+    async def consume() -> None:
+        try:
+            async for event in page_events:
+                await output.put(event)
+                if event.get("type") != "page_text":
+                    continue
+                # 待渲染插图达到上限时暂停读取，文本预取深度随之受限
+                await slots.acquire()
+                task = asyncio.create_task(render(event))
+                render_tasks.add(task)
+                task.add_done_callback(render_tasks.discard)
+        except Exception as exc:
+            logger.error("Story page stream failed: %s", exc)
+            await output.put({"type": "error", "message": str(exc)})
+
+        # 上游结束或中断后，已开始的插图仍然推送给客户端
+        if render_tasks:
+            await asyncio.gather(*list(render_tasks))
+        output.put_nowait(_DONE)
+
+    consumer = asyncio.create_task(consume())
+    try:
+        while True:
+            event = await output.get()
+            if event is _DONE:
+                break
+            yield event
+    finally:
+        consumer.cancel()
+        for task in list(render_tasks):
+            task.cancel()
+        await asyncio.gather(consumer, *render_tasks, return_exceptions=True)
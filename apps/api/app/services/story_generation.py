@@ -13,7 +13,7 @@ from datetime import datetime
 from app.models.story import Story, StoryStatus, GenerationType
 from app.models.child_profile import ChildProfile
 from app.schemas.story import StoryRequest
-from app.services.ai_orchestrator import AIOrchestrator
+from app.core.providers import get_ai_orchestrator
 
 # ✅ P2-2: 导入质量验证器
 import sys
@@ -44,8 +44,7 @@ class StoryGenerationService:
     async def initialize_ai_orchestrator(self):
         """初始化AI编排器"""
         if not self.ai_orchestrator:
-            self.ai_orchestrator = AIOrchestrator()
-            await self.ai_orchestrator.initialize()
+            self.ai_orchestrator = await get_ai_orchestrator()
     
     async def generate_story_async(
         self,
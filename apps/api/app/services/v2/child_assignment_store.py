@@ -0,0 +1,153 @@
+import json
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from inspect import ismethod
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from uuid import UUID
+
+from app.services.v2.revisioned_file import (
+    locked_revision_file,
+    read_revision,
+    replace_file,
+    write_revision,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "v2"
+OVERRIDES_FILE_NAME = "child-package-assignments.runtime.json"
+# Sidecar holding the overrides revision and serving as the cross-process lock
+# target. Workers compare it with the revision of their cached overrides.
+OVERRIDES_REVISION_FILE_NAME = "child-package-assignments.runtime.rev"
+
+OverridesListener = Callable[["ChildAssignmentOverrides"], None]
+
+
+@dataclass(frozen=True)
+class ChildAssignmentOverrides:
+    revision: int
+    package_ids: dict[UUID, UUID]
+
+
+@dataclass
+class _ProcessState:
+    # Per-process copy of the last overrides seen, keyed by revision.
+    cached: ChildAssignmentOverrides | None = None
+    # Weak references, so a subscribed service can still be garbage collected.
+    listeners: list[weakref.ref] = field(default_factory=list)
+
+
+# One state per overrides file, shared by every store instance pointing at it.
+_process_states: dict[Path, _ProcessState] = {}
+_PROCESS_STATES_LOCK = Lock()
+
+
+def _process_state(path: Path) -> _ProcessState:
+    with _PROCESS_STATES_LOCK:
+        return _process_states.setdefault(path, _ProcessState())
+
+
+def reset_child_assignment_overrides() -> None:
+    ChildAssignmentOverrideStore().reset()
+
+
+class ChildAssignmentOverrideStore:
+    """Package assignment overrides shared by every worker through the data directory.
+
+    Writes are serialized by an advisory lock and bump the revision sidecar.
+    Listeners in the writing process are notified directly; other workers see
+    the new revision on their next ``revision()`` check and reload once.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.overrides_file = data_dir / OVERRIDES_FILE_NAME
+        self.revision_file = data_dir / OVERRIDES_REVISION_FILE_NAME
+        self._state = _process_state(self.overrides_file.resolve())
+
+    def revision(self) -> int:
+        with locked_revision_file(self.revision_file, exclusive=False) as handle:
+            return read_revision(handle)
+
+    def load(self) -> ChildAssignmentOverrides:
+        with locked_revision_file(self.revision_file, exclusive=False) as handle:
+            return self._read_overrides(read_revision(handle))
+
+    def set_override(self, child_id: UUID, package_id: UUID | None) -> ChildAssignmentOverrides:
+        """Assign ``package_id`` to the child, or drop its override when ``package_id`` is None."""
+        with locked_revision_file(self.revision_file, exclusive=True) as handle:
+            current = self._read_overrides(read_revision(handle))
+
+            if current.package_ids.get(child_id) == package_id:
+                return current
+
+            package_ids = dict(current.package_ids)
+            if package_id is None:
+                package_ids.pop(child_id)
+            else:
+                package_ids[child_id] = package_id
+            overrides = self._commit_overrides(handle, package_ids)
+
+        self._notify(overrides)
+        return overrides
+
+    def reset(self) -> None:
+        with locked_revision_file(self.revision_file, exclusive=True) as handle:
+            overrides = self._commit_overrides(handle, {})
+        self._notify(overrides)
+
+    def subscribe(self, listener: OverridesListener) -> Callable[[], None]:
+        """Call ``listener`` with the new overrides after every write in this process.
+
+        Only a weak reference to ``listener`` is kept, so subscribing does not keep
+        its owner alive. Returns a callable that removes the listener again.
+        """
+        reference = weakref.WeakMethod(listener) if ismethod(listener) else weakref.ref(listener)
+        listeners = self._state.listeners
+        listeners.append(reference)
+
+        def unsubscribe() -> None:
+            if reference in listeners:
+                listeners.remove(reference)
+
+        return unsubscribe
+
+    def _notify(self, overrides: ChildAssignmentOverrides) -> None:
+        listeners = self._state.listeners
+        for reference in list(listeners):
+            listener = reference()
+            if listener is None:
+                if reference in listeners:
+                    listeners.remove(reference)
+                continue
+            listener(overrides)
+
+    def _read_overrides(self, revision: int) -> ChildAssignmentOverrides:
+        cached = self._state.cached
+        if cached is not None and cached.revision == revision:
+            return cached
+
+        raw: dict[str, str] = {}
+        if self.overrides_file.exists():
+            raw = json.loads(self.overrides_file.read_text(encoding="utf-8"))
+
+        self._state.cached = ChildAssignmentOverrides(
+            revision=revision,
+            package_ids={UUID(child_id): UUID(package_id) for child_id, package_id in raw.items()},
+        )
+        return self._state.cached
+
+    def _commit_overrides(self, handle: Any, package_ids: dict[UUID, UUID]) -> ChildAssignmentOverrides:
+        revision = read_revision(handle) + 1
+        text = json.dumps(
+            {str(child_id): str(package_id) for child_id, package_id in sorted(package_ids.items())},
+            indent=2,
+        ) + "\n"
+
+        # Bump the revision before replacing the file: a crash in between only costs
+        # other processes a reload, never a stale read.
+        write_revision(handle, revision)
+        replace_file(self.overrides_file, text)
+
+        self._state.cached = ChildAssignmentOverrides(revision=revision, package_ids=dict(package_ids))
+        return self._state.cached
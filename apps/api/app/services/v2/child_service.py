@@ -1,9 +1,22 @@
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
+from threading import Lock
 from typing import Protocol
 from uuid import UUID
 
 from app.schemas.v2.caregiver import CaregiverChildSummaryV1
-from app.services.v2.fixtures import DEMO_HOUSEHOLD_ID, HOUSEHOLD_CHILD_FIXTURES
+from app.services.v2.child_assignment_store import (
+    ChildAssignmentOverrides,
+    ChildAssignmentOverrideStore,
+    reset_child_assignment_overrides,
+)
+from app.services.v2.fixtures import DEMO_HOUSEHOLD_ID, HOUSEHOLD_CHILD_FIXTURES, ChildFixture
+
+# How often a service checks the store revision for writes made by other workers.
+# Writes from this process are applied immediately through the store listener, so
+# only cross-worker assignments can be served stale, and by at most this long.
+OVERRIDES_REVISION_CHECK_INTERVAL_SECONDS = 0.5
 
 
 @dataclass(frozen=True)
@@ -28,57 +41,81 @@ class ChildService(Protocol):
         """Update the currently assigned package for a child inside a household."""
 
 
-CHILD_PACKAGE_ASSIGNMENT_OVERRIDES: dict[UUID, UUID] = {}
-
-
-def resolve_child_package_id(child_id: UUID, default_package_id: UUID) -> UUID:
-    return CHILD_PACKAGE_ASSIGNMENT_OVERRIDES.get(child_id, default_package_id)
-
-
 def reset_child_package_assignment_overrides() -> None:
-    CHILD_PACKAGE_ASSIGNMENT_OVERRIDES.clear()
+    reset_child_assignment_overrides()
 
 
-def build_child_summary(fixture) -> CaregiverChildSummaryV1:
+def build_child_summary(fixture, current_package_id: UUID | None = None) -> CaregiverChildSummaryV1:
     return CaregiverChildSummaryV1(
         child_id=fixture.child_id,
         name=fixture.name,
         age_label=fixture.age_label,
         focus=fixture.focus,
         weekly_goal=fixture.weekly_goal,
-        current_package_id=resolve_child_package_id(
-            fixture.child_id,
-            fixture.current_package_id,
-        ),
+        current_package_id=current_package_id or fixture.current_package_id,
     )
 
 
+class _ChildDirectory:
+    """Child fixtures indexed by id, built once per process."""
+
+    def __init__(self, household_children: dict[UUID, tuple[ChildFixture, ...]]):
+        self.households = household_children
+        self.by_id: dict[UUID, tuple[UUID, ChildFixture]] = {}
+        for household_id, fixtures in household_children.items():
+            for fixture in fixtures:
+                # The first household listing a child owns it, as in a linear scan.
+                self.by_id.setdefault(fixture.child_id, (household_id, fixture))
+
+
+_directory: _ChildDirectory | None = None
+
+
+def _get_directory() -> _ChildDirectory:
+    global _directory
+
+    if _directory is None:
+        _directory = _ChildDirectory(HOUSEHOLD_CHILD_FIXTURES)
+    return _directory
+
+
 class DemoChildService:
+    def __init__(
+        self,
+        override_store: ChildAssignmentOverrideStore | None = None,
+        revision_check_interval: float = OVERRIDES_REVISION_CHECK_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.override_store = override_store or ChildAssignmentOverrideStore()
+        self.revision_check_interval = revision_check_interval
+        self.clock = clock
+        # Child summaries with ``_overrides`` applied; replaced whenever the overrides change.
+        self._summaries: dict[UUID, CaregiverChildSummaryV1] = {}
+        self._overrides: ChildAssignmentOverrides | None = None
+        self._next_revision_check = 0.0
+        self._lock = Lock()
+        # The store only holds a weak reference to the listener, so dropping the
+        # service also drops its subscription.
+        self.override_store.subscribe(self._apply_overrides)
+
     def list_children(self, household_id: UUID) -> list[CaregiverChildSummaryV1]:
-        fixtures = HOUSEHOLD_CHILD_FIXTURES.get(
+        directory = _get_directory()
+        fixtures = directory.households.get(
             household_id,
-            HOUSEHOLD_CHILD_FIXTURES.get(DEMO_HOUSEHOLD_ID, ()),
+            directory.households.get(DEMO_HOUSEHOLD_ID, ()),
         )
-        return [build_child_summary(fixture) for fixture in fixtures]
+        return [self._get_summary(fixture) for fixture in fixtures]
 
     def get_child_assignment(self, child_id: UUID) -> ChildAssignmentSnapshot | None:
-        for household_id, fixtures in HOUSEHOLD_CHILD_FIXTURES.items():
-            for fixture in fixtures:
-                if fixture.child_id == child_id:
-                    return ChildAssignmentSnapshot(
-                        household_id=household_id,
-                        child=build_child_summary(fixture),
-                    )
-
-        fallback_fixtures = HOUSEHOLD_CHILD_FIXTURES.get(DEMO_HOUSEHOLD_ID, ())
-        fallback = next((fixture for fixture in fallback_fixtures if fixture.child_id == child_id), None)
+        entry = _get_directory().by_id.get(child_id)
 
-        if fallback is None:
+        if entry is None:
             return None
 
+        household_id, fixture = entry
         return ChildAssignmentSnapshot(
-            household_id=DEMO_HOUSEHOLD_ID,
-            child=build_child_summary(fallback),
+            household_id=household_id,
+            child=self._get_summary(fixture),
         )
 
     def assign_package(
@@ -87,18 +124,52 @@ class DemoChildService:
         child_id: UUID,
         package_id: UUID,
     ) -> ChildAssignmentSnapshot | None:
-        fixtures = HOUSEHOLD_CHILD_FIXTURES.get(household_id, ())
+        fixtures = _get_directory().households.get(household_id, ())
         fixture = next((item for item in fixtures if item.child_id == child_id), None)
 
         if fixture is None:
             return None
 
-        if package_id == fixture.current_package_id:
-            CHILD_PACKAGE_ASSIGNMENT_OVERRIDES.pop(child_id, None)
-        else:
-            CHILD_PACKAGE_ASSIGNMENT_OVERRIDES[child_id] = package_id
+        self.override_store.set_override(
+            child_id,
+            None if package_id == fixture.current_package_id else package_id,
+        )
 
         return ChildAssignmentSnapshot(
             household_id=household_id,
-            child=build_child_summary(fixture),
+            child=self._get_summary(fixture),
         )
+
+    def _get_summary(self, fixture: ChildFixture) -> CaregiverChildSummaryV1:
+        self._refresh_overrides()
+        with self._lock:
+            summaries, overrides = self._summaries, self._overrides
+        summary = summaries.get(fixture.child_id)
+        if summary is None:
+            summary = build_child_summary(fixture, overrides.package_ids.get(fixture.child_id))
+            summaries[fixture.child_id] = summary
+        return summary
+
+    def _refresh_overrides(self) -> None:
+        """Reload overrides once another worker has moved the store revision.
+
+        The revision sidecar is read at most once per ``revision_check_interval``.
+        """
+        now = self.clock()
+        if self._overrides is not None and now < self._next_revision_check:
+            return
+        self._next_revision_check = now + self.revision_check_interval
+
+        revision = self.override_store.revision()
+        if self._overrides is None or self._overrides.revision != revision:
+            self._apply_overrides(self.override_store.load())
+
+    def _apply_overrides(self, overrides: ChildAssignmentOverrides) -> None:
+        """Adopt ``overrides`` unless a newer revision is already in place.
+
+        Also the store listener, so writes by this process apply without a re-read.
+        """
+        with self._lock:
+            if self._overrides is not None and overrides.revision <= self._overrides.revision:
+                return
+            self._overrides, self._summaries = overrides, {}
@@ -1,6 +1,7 @@
-from collections.abc import Callable
+from collections.abc import Callable, Hashable, Iterable
 from dataclasses import dataclass
 from datetime import datetime
+from threading import Lock
 from typing import Protocol
 from uuid import UUID
 
@@ -12,6 +13,7 @@ from app.services.v2.fixtures import (
     DEMO_HOUSEHOLD_ID,
     HOUSEHOLD_ENTITLEMENT_FIXTURES,
     HOUSEHOLD_FIXTURES,
+    HouseholdEntitlementFixture,
 )
 from app.services.v2.story_package_service import StoryPackageService
 
@@ -28,6 +30,102 @@ class PackageAccessResolution:
         return self.access_state == "entitled"
 
 
+@dataclass(frozen=True)
+class PackageCatalogEntry:
+    package_id: UUID
+    title: str
+    language_mode: str
+    age_band: str
+    release_channel: str
+
+
+class PackageCatalogIndex:
+    """Catalog fields of story packages, resolved once instead of per entitlement read.
+
+    Entries are dropped whenever ``revision`` reports a different value, so a
+    release that changes the runtime manifest is picked up on the next read.
+    """
+
+    def __init__(
+        self,
+        story_package_service: StoryPackageService,
+        revision: Callable[[], Hashable] | None = None,
+    ):
+        self.story_package_service = story_package_service
+        self.revision = revision
+        self._entries: dict[UUID, PackageCatalogEntry] = {}
+        self._revision: Hashable = None
+        self._lock = Lock()
+
+    def get_many(self, package_ids: Iterable[UUID]) -> dict[UUID, PackageCatalogEntry]:
+        """Catalog entries for the packages, checking the revision once for the whole call."""
+        revision = self.revision() if self.revision is not None else None
+        with self._lock:
+            # Misses are filled under the lock so a concurrent revision change
+            # cannot be overwritten by an entry read before it.
+            if revision != self._revision:
+                self._entries.clear()
+                self._revision = revision
+            return {package_id: self._get_or_load(package_id) for package_id in package_ids}
+
+    def get(self, package_id: UUID) -> PackageCatalogEntry:
+        return self.get_many([package_id])[package_id]
+
+    def _get_or_load(self, package_id: UUID) -> PackageCatalogEntry:
+        entry = self._entries.get(package_id)
+        if entry is None:
+            story_package = self.story_package_service.get_story_package(package_id)
+            entry = PackageCatalogEntry(
+                package_id=package_id,
+                title=story_package.title,
+                language_mode=story_package.language_mode,
+                age_band=story_package.age_band,
+                release_channel=story_package.release_channel,
+            )
+            self._entries[package_id] = entry
+        return entry
+
+
+_subscription_versions: dict[UUID, int] = {}
+_subscription_versions_lock = Lock()
+
+
+def notify_subscription_changed(household_id: UUID) -> None:
+    """Invalidate precomputed package access for a household after its subscription changes."""
+    with _subscription_versions_lock:
+        _subscription_versions[household_id] = _subscription_versions.get(household_id, 0) + 1
+
+
+def _subscription_version(household_id: UUID) -> int:
+    return _subscription_versions.get(household_id, 0)
+
+
+@dataclass(frozen=True)
+class _HouseholdAccessIndex:
+    fixture: HouseholdEntitlementFixture
+    version: int
+    resolutions: dict[UUID, PackageAccessResolution]
+
+
+def _build_household_access_index(
+    fixture: HouseholdEntitlementFixture,
+    version: int,
+) -> _HouseholdAccessIndex:
+    resolutions: dict[UUID, PackageAccessResolution] = {}
+    for item in fixture.package_access:
+        # First entry wins, matching the order the fixture lists access grants in.
+        resolutions.setdefault(
+            item.package_id,
+            PackageAccessResolution(
+                package_id=item.package_id,
+                access_state=item.access_state,
+                entitlement_source=item.entitlement_source,
+                reason=item.reason,
+            ),
+        )
+    return _HouseholdAccessIndex(fixture=fixture, version=version, resolutions=resolutions)
+
+
 class EntitlementService(Protocol):
     def get_household_entitlement(self, household_id: UUID) -> HouseholdEntitlementV1:
         """Return the household entitlement state."""
@@ -42,6 +140,13 @@ class EntitlementService(Protocol):
     ) -> PackageAccessResolution | None:
         """Resolve package access inside the household scope."""
 
+    def resolve_many(
+        self,
+        household_id: UUID,
+        package_ids: Iterable[UUID],
+    ) -> dict[UUID, PackageAccessResolution | None]:
+        """Resolve access for several packages of one household in a single call."""
+
     def list_household_ids(self) -> list[UUID]:
         """Return all household identifiers in scope for the demo."""
 
@@ -51,26 +156,27 @@ class DemoEntitlementService:
         self,
         story_package_service: StoryPackageService,
         clock: Callable[[], datetime],
+        catalog_revision: Callable[[], Hashable] | None = None,
     ):
         self.story_package_service = story_package_service
         self.clock = clock
+        self.catalog_index = PackageCatalogIndex(story_package_service, catalog_revision)
+        self._access_indexes: dict[UUID, _HouseholdAccessIndex] = {}
 
     def get_household_entitlement(self, household_id: UUID) -> HouseholdEntitlementV1:
-        fixture = HOUSEHOLD_ENTITLEMENT_FIXTURES.get(
-            household_id,
-            HOUSEHOLD_ENTITLEMENT_FIXTURES[DEMO_HOUSEHOLD_ID],
-        )
+        fixture = self._get_fixture(household_id)
+        catalog = self.catalog_index.get_many(item.package_id for item in fixture.package_access)
         package_access = []
 
         for item in fixture.package_access:
-            story_package = self.story_package_service.get_story_package(item.package_id)
+            catalog_entry = catalog[item.package_id]
             package_access.append(
                 HouseholdEntitlementPackageV1(
                     package_id=item.package_id,
-                    title=story_package.title,
-                    language_mode=story_package.language_mode,
-                    age_band=story_package.age_band,
-                    release_channel=story_package.release_channel,
+                    title=catalog_entry.title,
+                    language_mode=catalog_entry.language_mode,
+                    age_band=catalog_entry.age_band,
+                    release_channel=catalog_entry.release_channel,
                     access_state=item.access_state,
                     entitlement_source=item.entitlement_source,
                     reason=item.reason,
@@ -96,24 +202,15 @@ class DemoEntitlementService:
         household_id: UUID,
         package_id: UUID,
     ) -> PackageAccessResolution | None:
-        fixture = HOUSEHOLD_ENTITLEMENT_FIXTURES.get(
-            household_id,
-            HOUSEHOLD_ENTITLEMENT_FIXTURES[DEMO_HOUSEHOLD_ID],
-        )
-        match = next(
-            (item for item in fixture.package_access if item.package_id == package_id),
-            None,
-        )
-
-        if match is None:
-            return None
+        return self._get_access_index(household_id).resolutions.get(package_id)
 
-        return PackageAccessResolution(
-            package_id=match.package_id,
-            access_state=match.access_state,
-            entitlement_source=match.entitlement_source,
-            reason=match.reason,
-        )
+    def resolve_many(
+        self,
+        household_id: UUID,
+        package_ids: Iterable[UUID],
+    ) -> dict[UUID, PackageAccessResolution | None]:
+        resolutions = self._get_access_index(household_id).resolutions
+        return {package_id: resolutions.get(package_id) for package_id in package_ids}
 
     def is_package_entitled(self, household_id: UUID, package_id: UUID) -> bool:
         resolution = self.resolve_package_access(household_id, package_id)
@@ -121,3 +218,27 @@ class DemoEntitlementService:
 
     def list_household_ids(self) -> list[UUID]:
         return list(HOUSEHOLD_FIXTURES.keys())
+
+    @staticmethod
+    def _get_fixture(household_id: UUID) -> HouseholdEntitlementFixture:
+        return HOUSEHOLD_ENTITLEMENT_FIXTURES.get(
+            household_id,
+            HOUSEHOLD_ENTITLEMENT_FIXTURES[DEMO_HOUSEHOLD_ID],
+        )
+
+    def _get_access_index(self, household_id: UUID) -> _HouseholdAccessIndex:
+        """Return the household's package access map, rebuilding it only when it went stale.
+
+        The map is rebuilt when the household's subscription version was bumped
+        through ``notify_subscription_changed`` or its entitlement fixture was replaced.
+        Households without a fixture share the demo household's map, so unknown ids
+        do not add entries.
+        """
+        index_key = household_id if household_id in HOUSEHOLD_ENTITLEMENT_FIXTURES else DEMO_HOUSEHOLD_ID
+        fixture = HOUSEHOLD_ENTITLEMENT_FIXTURES[index_key]
+        version = _subscription_version(index_key)
+        index = self._access_indexes.get(index_key)
+        if index is None or index.fixture is not fixture or index.version != version:
+            index = _build_household_access_index(fixture, version)
+            self._access_indexes[index_key] = index
+        return index
@@ -1,9 +1,11 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Protocol
 from uuid import UUID
 
 from app.schemas.v2.caregiver import CaregiverWeeklyPlanItemV1
 from app.schemas.v2.story_package import StoryPackageManifestV1
+from app.services.v2.entitlement_service import PackageAccessResolution
 from app.services.v2.fixtures import (
     DEMO_HOUSEHOLD_ID,
     HOUSEHOLD_PACKAGE_QUEUE_IDS,
@@ -27,6 +29,9 @@ class PackageAccessPolicy(Protocol):
     def is_package_entitled(self, household_id: UUID, package_id: UUID) -> bool:
         """Return whether the household can currently access the requested package."""
 
+    def resolve_many(self, household_id: UUID, package_ids: Iterable[UUID]) -> dict[UUID, PackageAccessResolution | None]:
+        """Resolve access for several packages of the household in one call."""
+
 
 class DemoPlanService:
     def __init__(self, story_package_service: StoryPackageService):
@@ -67,13 +72,15 @@ class EntitlementAwarePlanService:
 
     def get_household_plan(self, household_id: UUID) -> HouseholdPlanSnapshot:
         plan = self.base_plan_service.get_household_plan(household_id)
+        access = self.package_access_policy.resolve_many(
+            household_id,
+            [story_package.package_id for story_package in plan.package_queue],
+        )
         entitled_queue = [
             story_package
             for story_package in plan.package_queue
-            if self.package_access_policy.is_package_entitled(
-                household_id,
-                story_package.package_id,
-            )
+            if (resolution := access.get(story_package.package_id)) is not None
+            and resolution.is_entitled
         ]
         entitled_package_ids = {
             story_package.package_id for story_package in entitled_queue
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX development hosts
+    fcntl = None
+
+# One in-process lock per revision file; flock alone does not serialize
+# threads of the same process that share the open file description.
+_PROCESS_LOCKS: dict[Path, Lock] = {}
+_PROCESS_LOCKS_GUARD = Lock()
+
+
+def _process_lock(path: Path) -> Lock:
+    with _PROCESS_LOCKS_GUARD:
+        return _PROCESS_LOCKS.setdefault(path, Lock())
+
+
+@contextmanager
+def locked_revision_file(path: Path, exclusive: bool) -> Iterator[Any]:
+    """Hold the in-process lock plus a cross-process advisory lock on a revision sidecar."""
+    with _process_lock(path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+", encoding="utf-8") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield handle
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def read_revision(handle: Any) -> int:
+    handle.seek(0)
+    raw = handle.read().strip()
+    return int(raw) if raw else 0
+
+
+def write_revision(handle: Any, revision: int) -> None:
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(revision))
+    handle.flush()
+
+
+def replace_file(path: Path, text: str) -> None:
+    # Write to a sibling temp file and rename so readers never see a partial document.
+    descriptor, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
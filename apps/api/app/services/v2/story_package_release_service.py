@@ -1,5 +1,8 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from collections.abc import Callable
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -11,11 +14,14 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.append(str(REPO_ROOT))
 
 from apps.workers.jobs.story_package import build_story_package_artifacts
+from app.core.pagination import InvalidCursorError, decode_key_cursor, encode_key_cursor
 from app.schemas.v2.story_package import StoryPackageManifestV1
 from app.schemas.v2.story_package_release import (
     StoryPackageBuildCommandV1,
     StoryPackageBuildV1,
     StoryPackageDraftIndexV1,
+    StoryPackageDraftSummaryIndexV1,
+    StoryPackageDraftSummaryV1,
     StoryPackageDraftV1,
     StoryPackageHistoryV1,
     StoryPackageRecallCommandV1,
@@ -29,10 +35,21 @@ from app.services.v2.object_storage_service import (
     ObjectStorageService,
     PlaceholderOssStorageService,
 )
-from app.services.v2.story_package_release_store import StoryPackageReleaseStore
+from app.services.v2.story_package_release_store import StoryPackageBlobStore, StoryPackageReleaseStore
 from app.services.v2.story_package_service import DemoStoryPackageService, StoryPackageService
 
 
+# Bump when _bootstrap_release_state changes so existing stores are migrated again.
+# v2 moves built_package manifests out of build records into the blob store.
+RELEASE_BOOTSTRAP_VERSION = 2
+
+
+# Draft index sort keys; prefix with "-" for descending order.
+# "stored" is the order drafts are kept in the release state, the listing's historical order.
+DRAFT_SORT_FIELDS = ("stored", "updated_at", "created_at", "title")
+DRAFT_FILTER_FIELDS = ("workflow_state", "audit_status", "source_type")
+
+
 class StoryPackageReleaseNotFoundError(LookupError):
     """Raised when a package, build, or release record is missing."""
 
@@ -55,6 +72,83 @@ def _review_status_from_audit(audit_status: str) -> str:
     return "limited_release"
 
 
+@dataclass(frozen=True)
+class StoryPackageDraftQuery:
+    workflow_state: str | None = None
+    audit_status: str | None = None
+    source_type: str | None = None
+    sort: str = "stored"
+    cursor: str | None = None
+    limit: int | None = None
+    fields: str = "full"
+
+
+@dataclass(frozen=True)
+class StoryPackageDraftPage:
+    index: StoryPackageDraftIndexV1 | StoryPackageDraftSummaryIndexV1
+    next_cursor: str | None
+
+
+class _ReleaseStateIndex:
+    """Lookup tables over one loaded release state, built in a single pass."""
+
+    def __init__(self, state: dict[str, Any], revision: int | None = None):
+        self.state = state
+        self.revision = revision
+        self.drafts: dict[str, dict[str, Any]] = {}
+        self.audits: dict[str, dict[str, Any]] = {}
+        self.builds: dict[str, dict[str, Any]] = {}
+        self.releases: dict[str, dict[str, Any]] = {}
+        self.builds_by_package: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.releases_by_package: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        # Secondary indexes over drafts, built on first use and kept for this revision.
+        self.draft_titles: dict[str, str] = {}
+        self.draft_positions: dict[str, int] = {}
+        self._draft_orders: dict[str, list[tuple[str, str]]] = {}
+        self._draft_groups: dict[str, dict[str, set[str]]] = {}
+
+        # setdefault keeps the first record per id, matching the linear scans this replaces.
+        for draft in state["drafts"]:
+            if self.drafts.setdefault(draft["package_id"], draft) is draft:
+                self.draft_positions[draft["package_id"]] = len(self.draft_positions)
+        for audit in state["audits"]:
+            self.audits.setdefault(audit["audit_id"], audit)
+        for build in state["builds"]:
+            self.add_build(build)
+        for release in state["releases"]:
+            self.add_release(release)
+
+    def add_build(self, build: dict[str, Any]) -> None:
+        self.builds.setdefault(build["build_id"], build)
+        self.builds_by_package[build["package_id"]].append(build)
+
+    def add_release(self, release: dict[str, Any]) -> None:
+        self.releases.setdefault(release["release_id"], release)
+        self.releases_by_package[release["package_id"]].append(release)
+
+    def draft_order(self, field: str, value_of: Callable[[dict[str, Any]], str]) -> list[tuple[str, str]]:
+        """Ascending (sort value, package_id) pairs for every draft."""
+        order = self._draft_orders.get(field)
+        if order is None:
+            order = sorted((value_of(draft), package_id) for package_id, draft in self.drafts.items())
+            self._draft_orders[field] = order
+        return order
+
+    def drafts_with(self, field: str, value: str) -> set[str]:
+        """Package ids of drafts whose workflow_state / audit_status / source_type equals value."""
+        groups = self._draft_groups.get(field)
+        if groups is None:
+            groups = defaultdict(set)
+            for package_id, draft in self.drafts.items():
+                if field == "audit_status":
+                    audit = self.audits.get(draft["safety_audit_id"])
+                    groups[audit["audit_status"] if audit else ""].add(package_id)
+                else:
+                    groups[draft[field]].add(package_id)
+            self._draft_groups[field] = groups
+        return groups.get(value, set())
+
+
 class StoryPackageReleaseService:
     def __init__(
         self,
@@ -62,29 +156,82 @@ class StoryPackageReleaseService:
         store: StoryPackageReleaseStore,
         storage_service: ObjectStorageService,
         clock: Callable[[], datetime],
+        blob_store: StoryPackageBlobStore | None = None,
     ):
         self.base_story_package_service = base_story_package_service
         self.store = store
+        self.blob_store = blob_store or StoryPackageBlobStore()
         self.storage_service = storage_service
         self.clock = clock
+        # Index of the last store revision read; reads at the same revision reuse it.
+        self._read_index: _ReleaseStateIndex | None = None
 
     def list_drafts(self) -> StoryPackageDraftIndexV1:
-        state = self._load_state()
-        drafts = [self._build_draft_payload(draft, state) for draft in state["drafts"]]
-        return StoryPackageDraftIndexV1(
-            generated_at=self.clock(),
-            drafts=drafts,
-        )
+        return self.query_drafts(StoryPackageDraftQuery()).index
+
+    def query_drafts(self, query: StoryPackageDraftQuery) -> StoryPackageDraftPage:
+        """Filter, sort and page drafts through the per-revision secondary indexes.
+
+        ``fields="summary"`` returns title, state and audit status without
+        resolving package previews; full previews are fetched per draft.
+        """
+        field = query.sort.removeprefix("-")
+        if field not in DRAFT_SORT_FIELDS:
+            raise StoryPackageReleaseValidationError(f"Unsupported draft sort key: {query.sort}")
+
+        index = self._load_index()
+        order = index.draft_order(field, lambda draft: self._draft_sort_value(draft, field, index))
+        matching = [
+            index.drafts_with(name, value)
+            for name, value in (
+                ("workflow_state", query.workflow_state),
+                ("audit_status", query.audit_status),
+                ("source_type", query.source_type),
+            )
+            if value is not None
+        ]
+
+        descending = query.sort.startswith("-")
+        step = -1 if descending else 1
+        position = self._draft_cursor_position(order, query, descending)
+        selected: list[tuple[str, str]] = []
+        next_cursor = None
+        while 0 <= position < len(order):
+            entry = order[position]
+            position += step
+            if not all(entry[1] in group for group in matching):
+                continue
+            if query.limit is not None and len(selected) == query.limit:
+                next_cursor = encode_key_cursor(query.sort, *selected[-1])
+                break
+            selected.append(entry)
+
+        drafts = [index.drafts[package_id] for _, package_id in selected]
+        if query.fields == "summary":
+            page_index = StoryPackageDraftSummaryIndexV1(
+                generated_at=self.clock(),
+                drafts=[self._build_draft_summary(draft, index) for draft in drafts],
+            )
+        else:
+            page_index = StoryPackageDraftIndexV1(
+                generated_at=self.clock(),
+                drafts=[self._build_draft_payload(draft, index) for draft in drafts],
+            )
+        return StoryPackageDraftPage(index=page_index, next_cursor=next_cursor)
+
+    def get_draft(self, package_id: UUID) -> StoryPackageDraftV1:
+        index = self._load_index()
+        return self._build_draft_payload(self._find_draft(index, package_id), index)
 
     def get_history(self, package_id: UUID) -> StoryPackageHistoryV1:
-        state = self._load_state()
-        draft = self._find_draft(state, package_id)
-        builds = self._list_builds_for_package(state, package_id)
-        releases = self._list_releases_for_package(state, package_id)
+        index = self._load_index()
+        draft = self._find_draft(index, package_id)
+        builds = self._list_builds_for_package(index, package_id)
+        releases = self._list_releases_for_package(index, package_id)
 
         return StoryPackageHistoryV1(
             package_id=package_id,
-            draft=self._build_draft_payload(draft, state),
+            draft=self._build_draft_payload(draft, index),
             builds=[self._build_build_payload(item) for item in builds],
             releases=[self._build_release_payload(item) for item in releases],
             active_release_id=UUID(draft["active_release_id"]) if draft.get("active_release_id") else None,
@@ -92,12 +239,12 @@ class StoryPackageReleaseService:
         )
 
     def resolve_story_package(self, package_id: UUID) -> StoryPackageManifestV1:
-        state = self._load_state()
-        draft = self._find_draft(state, package_id)
-        release_records = self._list_releases_for_package(state, package_id)
+        index = self._load_index()
+        draft = self._find_draft(index, package_id)
+        release_records = self._list_releases_for_package(index, package_id)
 
         if draft.get("active_release_id") or release_records:
-            return self._resolve_package_preview(draft, state)
+            return self._resolve_package_preview(draft, index)
 
         raise StoryPackageReleaseNotFoundError(
             f"Package {package_id} is not available for runtime lookup until it is released."
@@ -111,11 +258,11 @@ class StoryPackageReleaseService:
         command_time = _isoformat(command.requested_at)
 
         def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            draft = self._find_draft(state, package_id)
+            index = self._index_state(state)
+            draft = self._find_draft(index, package_id)
             build_version = (
                 max(
-                    (item["build_version"] for item in state["builds"] if item["package_id"] == str(package_id)),
+                    (item["build_version"] for item in index.builds_by_package.get(str(package_id), [])),
                     default=0,
                 )
                 + 1
@@ -141,7 +288,7 @@ class StoryPackageReleaseService:
                 "requested_at": command_time,
                 "completed_at": command_time,
                 "failure_message": None,
-                "built_package": built_package,
+                **self._store_built_package(built_package),
             }
             state["builds"].append(build_record)
             draft["latest_build_id"] = build_record["build_id"]
@@ -162,23 +309,23 @@ class StoryPackageReleaseService:
         command_time = _isoformat(command.requested_at)
 
         def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            draft = self._find_draft(state, package_id)
-            build = self._find_build(state, command.build_id)
-            audit = self._find_audit(state, draft["safety_audit_id"])
+            index = self._index_state(state)
+            draft = self._find_draft(index, package_id)
+            build = self._find_build(index, command.build_id)
+            audit = self._find_audit(index, draft["safety_audit_id"])
 
             if build["package_id"] != str(package_id):
                 raise StoryPackageReleaseValidationError("Build does not belong to the requested package.")
 
             self._assert_release_allowed(audit)
 
-            for release in state["releases"]:
-                if release["package_id"] == str(package_id) and release["status"] == "active":
+            for release in index.releases_by_package.get(str(package_id), []):
+                if release["status"] == "active":
                     release["status"] = "superseded"
 
             release_version = (
                 max(
-                    (item["release_version"] for item in state["releases"] if item["package_id"] == str(package_id)),
+                    (item["release_version"] for item in index.releases_by_package.get(str(package_id), [])),
                     default=0,
                 )
                 + 1
@@ -218,9 +365,9 @@ class StoryPackageReleaseService:
         command_time = _isoformat(command.requested_at)
 
         def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            draft = self._find_draft(state, package_id)
-            release = self._find_release(state, command.release_id)
+            index = self._index_state(state)
+            draft = self._find_draft(index, package_id)
+            release = self._find_release(index, command.release_id)
 
             if release["package_id"] != str(package_id):
                 raise StoryPackageReleaseValidationError("Release does not belong to the requested package.")
@@ -235,7 +382,7 @@ class StoryPackageReleaseService:
             fallback_release = next(
                 (
                     item
-                    for item in self._list_releases_for_package(state, package_id)
+                    for item in self._list_releases_for_package(index, package_id)
                     if item["release_id"] != release["release_id"] and item["status"] != "recalled"
                 ),
                 None,
@@ -265,10 +412,10 @@ class StoryPackageReleaseService:
         command_time = _isoformat(command.requested_at)
 
         def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            draft = self._find_draft(state, package_id)
-            target_release = self._find_release(state, command.target_release_id)
-            audit = self._find_audit(state, draft["safety_audit_id"])
+            index = self._index_state(state)
+            draft = self._find_draft(index, package_id)
+            target_release = self._find_release(index, command.target_release_id)
+            audit = self._find_audit(index, draft["safety_audit_id"])
 
             if target_release["package_id"] != str(package_id):
                 raise StoryPackageReleaseValidationError("Target release does not belong to the requested package.")
@@ -278,13 +425,13 @@ class StoryPackageReleaseService:
 
             self._assert_release_allowed(audit)
 
-            for release in state["releases"]:
-                if release["package_id"] == str(package_id) and release["status"] == "active":
+            for release in index.releases_by_package.get(str(package_id), []):
+                if release["status"] == "active":
                     release["status"] = "superseded"
 
             release_version = (
                 max(
-                    (item["release_version"] for item in state["releases"] if item["package_id"] == str(package_id)),
+                    (item["release_version"] for item in index.releases_by_package.get(str(package_id), [])),
                     default=0,
                 )
                 + 1
@@ -324,9 +471,9 @@ class StoryPackageReleaseService:
         command_time = _isoformat(command.requested_at)
 
         def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            draft = self._find_draft(state, package_id)
-            audit = self._find_audit(state, draft["safety_audit_id"])
+            index = self._index_state(state)
+            draft = self._find_draft(index, package_id)
+            audit = self._find_audit(index, draft["safety_audit_id"])
 
             audit["audit_status"] = command.audit_status
             audit["reviewer"] = {
@@ -388,34 +535,58 @@ class StoryPackageReleaseService:
             )
             if command.notes:
                 draft["operator_notes"].append(command.notes)
-            return self._build_draft_payload(draft, state)
+            return self._build_draft_payload(draft, index)
 
         return self.store.update(mutate)
 
-    def _load_state(self) -> dict[str, Any]:
-        def mutate(state: dict[str, Any]) -> dict[str, Any]:
-            self._bootstrap_release_state(state)
-            return state
-
-        return self.store.update(mutate)
-
-    def _bootstrap_release_state(self, state: dict[str, Any]) -> None:
+    def _load_index(self) -> _ReleaseStateIndex:
+        """Return the indexed state for reads.
+
+        Reads only take the shared store lock. The bootstrap migration runs the
+        first time a store without the current marker is seen, and the index is
+        reused until the store revision moves.
+        """
+        revision = self.store.revision()
+        cached = self._read_index
+        if cached is not None and cached.revision == revision:
+            return cached
+
+        snapshot = self.store.load_snapshot()
+        if snapshot.state.get("release_bootstrap_version") != RELEASE_BOOTSTRAP_VERSION:
+            self.store.update(self._migrate_state)
+            snapshot = self.store.load_snapshot()
+
+        index = _ReleaseStateIndex(snapshot.state, snapshot.revision)
+        self._read_index = index
+        return index
+
+    def _migrate_state(self, state: dict[str, Any]) -> None:
+        self._index_state(state)
+
+    def _index_state(self, state: dict[str, Any]) -> _ReleaseStateIndex:
+        """Index a state loaded for a write, bootstrapping it first if its marker is stale."""
+        if state.get("release_bootstrap_version") != RELEASE_BOOTSTRAP_VERSION:
+            return self._bootstrap_release_state(state)
+        return _ReleaseStateIndex(state)
+
+    def _bootstrap_release_state(self, state: dict[str, Any]) -> _ReleaseStateIndex:
         state.setdefault("drafts", [])
         state.setdefault("audits", [])
         state.setdefault("builds", [])
         state.setdefault("releases", [])
         state.setdefault("briefs", [])
         state.setdefault("generation_jobs", [])
+        index = _ReleaseStateIndex(state)
 
         for draft in state["drafts"]:
             package_id = draft["package_id"]
-            if any(item["package_id"] == package_id for item in state["builds"]):
+            if index.builds_by_package.get(package_id):
                 continue
 
             if draft.get("workflow_state") != "released":
                 continue
 
-            audit = self._find_audit(state, draft["safety_audit_id"])
+            audit = self._find_audit(index, draft["safety_audit_id"])
             if audit["audit_status"] != "approved":
                 continue
 
@@ -430,48 +601,60 @@ class StoryPackageReleaseService:
             build_id = str(uuid4())
             release_id = str(uuid4())
             bootstrap_time = _isoformat(FIXTURE_TIMESTAMP)
-            state["builds"].append(
-                {
-                    "schema_version": "story-package-build.v1",
-                    "build_id": build_id,
-                    "draft_id": draft["draft_id"],
-                    "package_id": package_id,
-                    "build_version": 1,
-                    "status": "succeeded",
-                    "build_reason": "bootstrap_release",
-                    "worker_job_id": f"story-package-build:{package_id}:v1",
-                    "manifest_object_key": artifact_plan.manifest_object_key,
-                    "artifact_root_object_key": artifact_plan.artifact_root_object_key,
-                    "requested_by": "bootstrap",
-                    "requested_at": bootstrap_time,
-                    "completed_at": bootstrap_time,
-                    "failure_message": None,
-                    "built_package": built_package,
-                }
-            )
-            state["releases"].append(
-                {
-                    "schema_version": "story-package-release.v1",
-                    "release_id": release_id,
-                    "package_id": package_id,
-                    "draft_id": draft["draft_id"],
-                    "build_id": build_id,
-                    "release_version": 1,
-                    "release_channel": "pilot",
-                    "status": "active",
-                    "runtime_lookup_key": f"/api/v2/story-packages/{package_id}",
-                    "requested_by": "bootstrap",
-                    "released_at": bootstrap_time,
-                    "notes": "Bootstrap release seeded from the V2 fixture package.",
-                    "recalled_at": None,
-                    "rollback_of_release_id": None,
-                }
-            )
+            build_record = {
+                "schema_version": "story-package-build.v1",
+                "build_id": build_id,
+                "draft_id": draft["draft_id"],
+                "package_id": package_id,
+                "build_version": 1,
+                "status": "succeeded",
+                "build_reason": "bootstrap_release",
+                "worker_job_id": f"story-package-build:{package_id}:v1",
+                "manifest_object_key": artifact_plan.manifest_object_key,
+                "artifact_root_object_key": artifact_plan.artifact_root_object_key,
+                "requested_by": "bootstrap",
+                "requested_at": bootstrap_time,
+                "completed_at": bootstrap_time,
+                "failure_message": None,
+                **self._store_built_package(built_package),
+            }
+            release_record = {
+                "schema_version": "story-package-release.v1",
+                "release_id": release_id,
+                "package_id": package_id,
+                "draft_id": draft["draft_id"],
+                "build_id": build_id,
+                "release_version": 1,
+                "release_channel": "pilot",
+                "status": "active",
+                "runtime_lookup_key": f"/api/v2/story-packages/{package_id}",
+                "requested_by": "bootstrap",
+                "released_at": bootstrap_time,
+                "notes": "Bootstrap release seeded from the V2 fixture package.",
+                "recalled_at": None,
+                "rollback_of_release_id": None,
+            }
+            state["builds"].append(build_record)
+            state["releases"].append(release_record)
+            index.add_build(build_record)
+            index.add_release(release_record)
             draft["latest_build_id"] = build_id
             draft["active_release_id"] = release_id
             draft["workflow_state"] = "released"
             draft["updated_at"] = bootstrap_time
 
+        for build in state["builds"]:
+            if "built_package" in build:
+                build.update(self._store_built_package(build.pop("built_package")))
+
+        state["release_bootstrap_version"] = RELEASE_BOOTSTRAP_VERSION
+        return index
+
+    def _store_built_package(self, built_package: dict[str, Any]) -> dict[str, Any]:
+        """Write a built manifest to the blob store and return the fields kept on the build record."""
+        blob = self.blob_store.put(built_package)
+        return {"built_package_digest": blob.digest, "built_package_size": blob.size}
+
     def _resolve_source_package(self, draft: dict[str, Any]) -> dict[str, Any]:
         preview_override = draft.get("package_preview_override")
         if preview_override:
@@ -484,25 +667,25 @@ class StoryPackageReleaseService:
     def _resolve_package_preview(
         self,
         draft: dict[str, Any],
-        state: dict[str, Any],
+        index: _ReleaseStateIndex,
     ) -> StoryPackageManifestV1:
-        audit = self._find_audit(state, draft["safety_audit_id"])
+        audit = self._find_audit(index, draft["safety_audit_id"])
         active_release_id = draft.get("active_release_id")
         release_records = self._list_releases_for_package(
-            state,
+            index,
             UUID(draft["package_id"]),
         )
 
         if active_release_id:
-            release = self._find_release(state, UUID(active_release_id))
-            build = self._find_build(state, UUID(release["build_id"]))
-            package_payload = deepcopy(build["built_package"])
+            release = self._find_release(index, UUID(active_release_id))
+            build = self._find_build(index, UUID(release["build_id"]))
+            package_payload = self.blob_store.get(build["built_package_digest"])
             package_payload["release_channel"] = release["release_channel"]
             review_status = _review_status_from_audit(audit["audit_status"])
         elif release_records:
             release = release_records[0]
-            build = self._find_build(state, UUID(release["build_id"]))
-            package_payload = deepcopy(build["built_package"])
+            build = self._find_build(index, UUID(release["build_id"]))
+            package_payload = self.blob_store.get(build["built_package_digest"])
             package_payload["release_channel"] = release["release_channel"]
             review_status = (
                 "recalled"
@@ -521,7 +704,7 @@ class StoryPackageReleaseService:
     def _build_draft_payload(
         self,
         draft: dict[str, Any],
-        state: dict[str, Any],
+        index: _ReleaseStateIndex,
     ) -> StoryPackageDraftV1:
         return StoryPackageDraftV1.model_validate(
             {
@@ -529,8 +712,8 @@ class StoryPackageReleaseService:
                 "package_id": draft["package_id"],
                 "source_type": draft["source_type"],
                 "workflow_state": draft["workflow_state"],
-                "package_preview": self._resolve_package_preview(draft, state).model_dump(mode="json"),
-                "safety_audit": self._find_audit(state, draft["safety_audit_id"]),
+                "package_preview": self._resolve_package_preview(draft, index).model_dump(mode="json"),
+                "safety_audit": self._find_audit(index, draft["safety_audit_id"]),
                 "operator_notes": list(draft.get("operator_notes", [])),
                 "latest_build_id": draft.get("latest_build_id"),
                 "active_release_id": draft.get("active_release_id"),
@@ -539,31 +722,88 @@ class StoryPackageReleaseService:
             }
         )
 
+    def _build_draft_summary(
+        self,
+        draft: dict[str, Any],
+        index: _ReleaseStateIndex,
+    ) -> StoryPackageDraftSummaryV1:
+        return StoryPackageDraftSummaryV1.model_validate(
+            {
+                "draft_id": draft["draft_id"],
+                "package_id": draft["package_id"],
+                "source_type": draft["source_type"],
+                "workflow_state": draft["workflow_state"],
+                "title": self._draft_title(draft, index),
+                "audit_status": self._find_audit(index, draft["safety_audit_id"])["audit_status"],
+                "latest_build_id": draft.get("latest_build_id"),
+                "active_release_id": draft.get("active_release_id"),
+                "created_at": draft["created_at"],
+                "updated_at": draft["updated_at"],
+            }
+        )
+
+    def _draft_title(self, draft: dict[str, Any], index: _ReleaseStateIndex) -> str:
+        """Title of the draft's source package, resolved once per store revision."""
+        package_id = draft["package_id"]
+        title = index.draft_titles.get(package_id)
+        if title is None:
+            preview_override = draft.get("package_preview_override")
+            if preview_override:
+                title = preview_override["title"]
+            else:
+                title = self.base_story_package_service.get_story_package(UUID(package_id)).title
+            index.draft_titles[package_id] = title
+        return title
+
+    def _draft_sort_value(self, draft: dict[str, Any], field: str, index: _ReleaseStateIndex) -> str:
+        if field == "title":
+            return self._draft_title(draft, index)
+        if field == "stored":
+            return f"{index.draft_positions[draft['package_id']]:08d}"
+        return draft[field]
+
     @staticmethod
-    def _build_build_payload(build: dict[str, Any]) -> StoryPackageBuildV1:
-        return StoryPackageBuildV1.model_validate(build)
+    def _draft_cursor_position(
+        order: list[tuple[str, str]],
+        query: StoryPackageDraftQuery,
+        descending: bool,
+    ) -> int:
+        if not query.cursor:
+            return len(order) - 1 if descending else 0
+
+        sort, value, package_id = decode_key_cursor(query.cursor, 3)
+        if sort != query.sort:
+            raise InvalidCursorError("Pagination cursor was issued for a different sort order")
+        if descending:
+            return bisect_left(order, (value, package_id)) - 1
+        return bisect_right(order, (value, package_id))
+
+    def _build_build_payload(self, build: dict[str, Any]) -> StoryPackageBuildV1:
+        payload = {key: value for key, value in build.items() if key not in {"built_package_digest", "built_package_size"}}
+        payload["built_package"] = self.blob_store.get(build["built_package_digest"])
+        return StoryPackageBuildV1.model_validate(payload)
 
     @staticmethod
     def _build_release_payload(release: dict[str, Any]) -> StoryPackageReleaseV1:
         return StoryPackageReleaseV1.model_validate(release)
 
     @staticmethod
-    def _find_draft(state: dict[str, Any], package_id: UUID) -> dict[str, Any]:
-        draft = next((item for item in state["drafts"] if item["package_id"] == str(package_id)), None)
+    def _find_draft(index: _ReleaseStateIndex, package_id: UUID) -> dict[str, Any]:
+        draft = index.drafts.get(str(package_id))
         if draft is None:
             raise StoryPackageReleaseNotFoundError(f"Unknown package id: {package_id}")
         return draft
 
     @staticmethod
-    def _find_build(state: dict[str, Any], build_id: UUID) -> dict[str, Any]:
-        build = next((item for item in state["builds"] if item["build_id"] == str(build_id)), None)
+    def _find_build(index: _ReleaseStateIndex, build_id: UUID) -> dict[str, Any]:
+        build = index.builds.get(str(build_id))
         if build is None:
             raise StoryPackageReleaseNotFoundError(f"Unknown build id: {build_id}")
         return build
 
     @staticmethod
-    def _find_release(state: dict[str, Any], release_id: UUID) -> dict[str, Any]:
-        release = next((item for item in state["releases"] if item["release_id"] == str(release_id)), None)
+    def _find_release(index: _ReleaseStateIndex, release_id: UUID) -> dict[str, Any]:
+        release = index.releases.get(str(release_id))
         if release is None:
             raise StoryPackageReleaseNotFoundError(f"Unknown release id: {release_id}")
         return release
@@ -581,24 +821,24 @@ class StoryPackageReleaseService:
             )
 
     @staticmethod
-    def _find_audit(state: dict[str, Any], audit_id: str) -> dict[str, Any]:
-        audit = next((item for item in state["audits"] if item["audit_id"] == audit_id), None)
+    def _find_audit(index: _ReleaseStateIndex, audit_id: str) -> dict[str, Any]:
+        audit = index.audits.get(audit_id)
         if audit is None:
             raise StoryPackageReleaseNotFoundError(f"Unknown audit id: {audit_id}")
         return audit
 
     @staticmethod
-    def _list_builds_for_package(state: dict[str, Any], package_id: UUID) -> list[dict[str, Any]]:
+    def _list_builds_for_package(index: _ReleaseStateIndex, package_id: UUID) -> list[dict[str, Any]]:
         return sorted(
-            [item for item in state["builds"] if item["package_id"] == str(package_id)],
+            index.builds_by_package.get(str(package_id), []),
             key=lambda current: current["build_version"],
             reverse=True,
         )
 
     @staticmethod
-    def _list_releases_for_package(state: dict[str, Any], package_id: UUID) -> list[dict[str, Any]]:
+    def _list_releases_for_package(index: _ReleaseStateIndex, package_id: UUID) -> list[dict[str, Any]]:
         return sorted(
-            [item for item in state["releases"] if item["package_id"] == str(package_id)],
+            index.releases_by_package.get(str(package_id), []),
             key=lambda current: current["release_version"],
             reverse=True,
         )
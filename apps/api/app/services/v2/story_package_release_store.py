@@ -1,59 +1,209 @@
+import hashlib
 import json
 import shutil
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from copy import deepcopy
+from dataclasses import dataclass
 from pathlib import Path
 from threading import Lock
 from typing import Any, TypeVar
 
+from app.services.v2.revisioned_file import (
+    locked_revision_file,
+    read_revision,
+    replace_file,
+    write_revision,
+)
+
 T = TypeVar("T")
 
 DATA_DIR = Path(__file__).resolve().parents[2] / "data" / "v2"
 SEED_FILE = DATA_DIR / "story-package-release.seed.json"
 RUNTIME_FILE = DATA_DIR / "story-package-release.runtime.json"
+# Sidecar holding the store revision. It doubles as the cross-process lock
+# target so the revision can be read without parsing the runtime file.
+REVISION_FILE = DATA_DIR / "story-package-release.runtime.rev"
+# Built package manifests live outside the state document, one file per
+# SHA-256 of their canonical JSON. Blobs are immutable and never rewritten.
+BLOB_DIR = DATA_DIR / "story-package-blobs"
+BLOB_CACHE_SIZE = 16
 
-_STORE_LOCK = Lock()
 
+class StoryPackageReleaseConflictError(RuntimeError):
+    """Raised when a save is based on a revision another writer has replaced."""
 
-def _ensure_runtime_file() -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    if RUNTIME_FILE.exists():
-        return
+@dataclass(frozen=True)
+class StoryPackageReleaseSnapshot:
+    revision: int
+    state: dict[str, Any]
 
-    shutil.copyfile(SEED_FILE, RUNTIME_FILE)
 
+@dataclass
+class _CachedState:
+    revision: int
+    text: str
 
-def reset_story_package_release_state() -> None:
-    with _STORE_LOCK:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+# Per-process copy of the last runtime file text seen, keyed by revision.
+_cached_state: _CachedState | None = None
+
+# Per-process LRU of recently used blobs, keyed by digest.
+_blob_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_blob_cache_stats = {"hits": 0, "misses": 0}
+_BLOB_CACHE_LOCK = Lock()
+
+
+@contextmanager
+def _locked_revision_file(exclusive: bool) -> Iterator[Any]:
+    with locked_revision_file(REVISION_FILE, exclusive) as handle:
+        yield handle
+
+
+def _write_runtime_text(text: str) -> None:
+    replace_file(RUNTIME_FILE, text)
+
+
+def _serialize(state: dict[str, Any]) -> str:
+    return json.dumps(state, indent=2, ensure_ascii=False) + "\n"
+
+
+def _read_state_text(revision: int) -> str:
+    global _cached_state
+
+    if _cached_state is not None and _cached_state.revision == revision and RUNTIME_FILE.exists():
+        return _cached_state.text
+
+    if not RUNTIME_FILE.exists():
         shutil.copyfile(SEED_FILE, RUNTIME_FILE)
 
+    text = RUNTIME_FILE.read_text(encoding="utf-8")
+    _cached_state = _CachedState(revision=revision, text=text)
+    return text
+
+
+def _commit_state_text(handle: Any, revision: int, text: str) -> int:
+    global _cached_state
+
+    next_revision = revision + 1
+    # Bump the revision before replacing the file: a crash in between only costs
+    # other processes a cache miss, never a stale read.
+    write_revision(handle, next_revision)
+    _write_runtime_text(text)
+    _cached_state = _CachedState(revision=next_revision, text=text)
+    return next_revision
+
+
+def reset_story_package_release_state() -> None:
+    with _locked_revision_file(exclusive=True) as handle:
+        _commit_state_text(handle, read_revision(handle), SEED_FILE.read_text(encoding="utf-8"))
+
 
 class StoryPackageReleaseStore:
+    def revision(self) -> int:
+        """Return the current store revision without reading the runtime file."""
+        with _locked_revision_file(exclusive=False) as handle:
+            return read_revision(handle)
+
     def load(self) -> dict[str, Any]:
-        with _STORE_LOCK:
-            _ensure_runtime_file()
-            with RUNTIME_FILE.open("r", encoding="utf-8") as handle:
-                return json.load(handle)
-
-    def save(self, state: dict[str, Any]) -> None:
-        with _STORE_LOCK:
-            _ensure_runtime_file()
-            with RUNTIME_FILE.open("w", encoding="utf-8") as handle:
-                json.dump(state, handle, indent=2, ensure_ascii=False)
-                handle.write("\n")
+        return self.load_snapshot().state
+
+    def load_snapshot(self) -> StoryPackageReleaseSnapshot:
+        with _locked_revision_file(exclusive=False) as handle:
+            revision = read_revision(handle)
+            return StoryPackageReleaseSnapshot(
+                revision=revision,
+                state=json.loads(_read_state_text(revision)),
+            )
+
+    def save(self, state: dict[str, Any], expected_revision: int | None = None) -> int:
+        with _locked_revision_file(exclusive=True) as handle:
+            revision = read_revision(handle)
+            if expected_revision is not None and revision != expected_revision:
+                raise StoryPackageReleaseConflictError(
+                    f"Release store moved from revision {expected_revision} to {revision}."
+                )
+
+            return _commit_state_text(handle, revision, _serialize(state))
 
     def update(self, mutator: Callable[[dict[str, Any]], T]) -> T:
-        with _STORE_LOCK:
-            _ensure_runtime_file()
-            with RUNTIME_FILE.open("r", encoding="utf-8") as handle:
-                state = json.load(handle)
+        with _locked_revision_file(exclusive=True) as handle:
+            revision = read_revision(handle)
+            original_text = _read_state_text(revision)
+            state = json.loads(original_text)
 
             result = mutator(state)
 
-            with RUNTIME_FILE.open("w", encoding="utf-8") as handle:
-                json.dump(state, handle, indent=2, ensure_ascii=False)
-                handle.write("\n")
+            text = _serialize(state)
+            if text != original_text:
+                _commit_state_text(handle, revision, text)
 
             return deepcopy(result)
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    digest: str
+    size: int
+
+
+def _canonical_json(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _remember_blob(digest: str, payload: dict[str, Any]) -> None:
+    with _BLOB_CACHE_LOCK:
+        _blob_cache[digest] = payload
+        _blob_cache.move_to_end(digest)
+        while len(_blob_cache) > BLOB_CACHE_SIZE:
+            _blob_cache.popitem(last=False)
+
+
+class StoryPackageBlobStore:
+    """Content-addressed storage for built package manifests.
+
+    Identical payloads hash to the same digest, so rebuilding unchanged
+    content reuses the existing blob. Reads go through a small per-process
+    LRU and always return a copy the caller may mutate.
+    """
+
+    def put(self, payload: dict[str, Any]) -> StoredBlob:
+        text = _canonical_json(payload)
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            replace_file(path, text)
+
+        _remember_blob(digest, json.loads(text))
+        return StoredBlob(digest=digest, size=len(data))
+
+    def get(self, digest: str) -> dict[str, Any]:
+        with _BLOB_CACHE_LOCK:
+            payload = _blob_cache.get(digest)
+            if payload is not None:
+                _blob_cache.move_to_end(digest)
+                _blob_cache_stats["hits"] += 1
+            else:
+                _blob_cache_stats["misses"] += 1
+
+        if payload is None:
+            path = self._path(digest)
+            if not path.exists():
+                raise FileNotFoundError(f"Missing story package blob: {digest}")
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            _remember_blob(digest, payload)
+
+        return deepcopy(payload)
+
+    @staticmethod
+    def cache_info() -> dict[str, int]:
+        with _BLOB_CACHE_LOCK:
+            return {**_blob_cache_stats, "size": len(_blob_cache), "max_size": BLOB_CACHE_SIZE}
+
+    @staticmethod
+    def _path(digest: str) -> Path:
+        return BLOB_DIR / digest[:2] / f"{digest}.json"
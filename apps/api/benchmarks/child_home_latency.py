@@ -0,0 +1,110 @@
+"""
+Child home latency under concurrent package builds.
+
+Samples GET /api/v2/child-home/{child_id} while story package builds run in
+parallel, then reports p50/p95/p99 latency and the worst event loop lag.
+
+    python apps/api/benchmarks/child_home_latency.py --builds 8 --reads 200
+    python apps/api/benchmarks/child_home_latency.py --inline   # baseline without offloading
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(API_DIR))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.execution import event_loop_lag_monitor, get_execution_snapshot, shutdown_execution_pools  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.v2.story_package_release_store import reset_story_package_release_state  # noqa: E402
+
+CHILD_ID = "55555555-5555-5555-5555-555555555555"
+PACKAGE_ID = "33333333-3333-3333-3333-333333333333"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_builds(client: httpx.AsyncClient, count: int) -> None:
+    for step in range(count):
+        response = await client.post(
+            f"/api/v2/story-packages/{PACKAGE_ID}:build",
+            json={
+                "schema_version": "story-package-build-command.v1",
+                "build_reason": "editorial_release",
+                "requested_by": "benchmark.operator",
+                "requested_at": f"2026-03-31T11:{step % 60:02d}:00Z",
+            },
+        )
+        response.raise_for_status()
+
+
+async def sample_child_home(client: httpx.AsyncClient, count: int) -> list[float]:
+    latencies_ms: list[float] = []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        response = await client.get(f"/api/v2/child-home/{CHILD_ID}")
+        response.raise_for_status()
+        latencies_ms.append((time.perf_counter() - started_at) * 1000)
+    return latencies_ms
+
+
+async def main(builds: int, build_workers: int, reads: int) -> None:
+    event_loop_lag_monitor.interval_seconds = 0.01
+    event_loop_lag_monitor.start()
+
+    async with httpx.AsyncClient(app=app, base_url="http://localhost") as client:
+        _, latencies_ms = await asyncio.gather(
+            asyncio.gather(*(run_builds(client, builds) for _ in range(build_workers))),
+            sample_child_home(client, reads),
+        )
+
+    await event_loop_lag_monitor.stop()
+    snapshot = get_execution_snapshot()
+
+    mode = "offloaded" if settings.v2_offload_blocking_calls else "inline"
+    print(f"mode={mode} builds={builds * build_workers} reads={reads}")
+    print(
+        "child-home latency ms: "
+        f"p50={percentile(latencies_ms, 0.50):.2f} "
+        f"p95={percentile(latencies_ms, 0.95):.2f} "
+        f"p99={percentile(latencies_ms, 0.99):.2f} "
+        f"mean={statistics.fmean(latencies_ms):.2f}"
+    )
+    print(f"event loop lag ms: max={snapshot['event_loop']['max_lag_ms']:.2f}")
+    for pool in snapshot["pools"]:
+        print(
+            f"{pool['name']}: completed={pool['completed']} failed={pool['failed']} "
+            f"max_queue_wait_ms={pool['max_queue_wait_ms']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=5, help="builds per build worker")
+    parser.add_argument("--build-workers", type=int, default=4)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--inline", action="store_true", help="run service calls on the event loop")
+    args = parser.parse_args()
+
+    settings.v2_offload_blocking_calls = not args.inline
+    reset_story_package_release_state()
+    try:
+        asyncio.run(main(args.builds, args.build_workers, args.reads))
+    finally:
+        shutdown_execution_pools()
+        reset_story_package_release_state()
@@ -0,0 +1,103 @@
+"""
+Middleware stack overhead on a no-op route.
+
+Drives the ASGI app directly (no HTTP client or socket in the loop) and
+compares the full API middleware stack with a bare FastAPI app serving the
+same route.
+
+    python apps/api/benchmarks/middleware_overhead.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(API_DIR))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+NOOP_PATH = "/__benchmark/noop"
+
+
+async def noop() -> dict:
+    return {"ok": True}
+
+
+def build_scope(query_string: bytes) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": NOOP_PATH,
+        "raw_path": NOOP_PATH.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost"), (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+
+
+def build_receive():
+    delivered = False
+
+    async def receive() -> dict:
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a live connection: block until the server stops listening for a disconnect.
+        await asyncio.Future()
+
+    return receive
+
+
+async def send(message: dict) -> None:
+    if message["type"] == "http.response.start" and message["status"] != 200:
+        raise RuntimeError(f"unexpected status {message['status']}")
+
+
+async def measure(target, requests: int, query_string: bytes) -> float:
+    for _ in range(min(200, requests)):
+        await target(build_scope(query_string), build_receive(), send)
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await target(build_scope(query_string), build_receive(), send)
+    return (time.perf_counter() - started_at) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    bare_app = FastAPI()
+    bare_app.add_api_route(NOOP_PATH, noop)
+    app.add_api_route(NOOP_PATH, noop)
+
+    query_string = b"page=2&filter=bedtime+stories&sort=recent"
+    bare_us = await measure(bare_app, requests, query_string)
+    stack_us = await measure(app, requests, query_string)
+
+    print(f"requests={requests}")
+    print(f"bare route:        {bare_us:8.1f} us/request")
+    print(f"full stack:        {stack_us:8.1f} us/request")
+    print(f"middleware overhead: {stack_us - bare_us:6.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(main(args.requests))
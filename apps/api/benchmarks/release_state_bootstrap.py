@@ -0,0 +1,94 @@
+"""
+Release-service read cost as the number of package builds grows.
+
+Seeds extra builds for one package directly in the release store, then times
+runtime lookups and history reads for another package. Warm reads reuse the
+index of the current store revision; the first read after a write re-reads
+and re-indexes the store once. The bootstrap migration only runs on the first
+read after a reset.
+
+    python apps/api/benchmarks/release_state_bootstrap.py --builds 0 50 200 800 --reads 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+from uuid import UUID, uuid4
+
+API_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(API_DIR))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from app.services.v2.story_package_release_service import create_release_story_package_services  # noqa: E402
+from app.services.v2.story_package_release_store import (  # noqa: E402
+    RUNTIME_FILE,
+    StoryPackageReleaseStore,
+    reset_story_package_release_state,
+)
+
+READ_PACKAGE_ID = UUID("33333333-3333-3333-3333-333333333333")
+BUILD_PACKAGE_ID = "66666666-6666-6666-6666-666666666666"
+
+
+def seed_builds(store: StoryPackageReleaseStore, target: int) -> None:
+    def mutate(state: dict) -> None:
+        builds = [item for item in state["builds"] if item["package_id"] == BUILD_PACKAGE_ID]
+        template = builds[0]
+        for version in range(len(builds) + 1, target + 2):
+            build = deepcopy(template)
+            build["build_id"] = str(uuid4())
+            build["build_version"] = version
+            build["build_reason"] = "benchmark"
+            state["builds"].append(build)
+
+    store.update(mutate)
+
+
+def time_ms(call, count: int) -> list[float]:
+    samples = []
+    for _ in range(count):
+        started_at = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return samples
+
+
+def main(build_counts: list[int], reads: int) -> None:
+    store = StoryPackageReleaseStore()
+    _, release_service = create_release_story_package_services()
+
+    started_at = time.perf_counter()
+    release_service.get_history(READ_PACKAGE_ID)
+    print(f"first read incl. bootstrap migration: {(time.perf_counter() - started_at) * 1000:.2f} ms")
+
+    print(f"{'builds':>7} {'state KB':>9} {'cold read ms':>13} {'lookup ms':>10} {'history ms':>11}")
+    for count in build_counts:
+        seed_builds(store, count)
+        state_kb = RUNTIME_FILE.stat().st_size / 1024
+
+        started_at = time.perf_counter()
+        release_service.resolve_story_package(READ_PACKAGE_ID)
+        cold_ms = (time.perf_counter() - started_at) * 1000
+
+        lookup_ms = statistics.median(time_ms(lambda: release_service.resolve_story_package(READ_PACKAGE_ID), reads))
+        history_ms = statistics.median(time_ms(lambda: release_service.get_history(READ_PACKAGE_ID), reads))
+        print(f"{count:>7} {state_kb:>9.1f} {cold_ms:>13.2f} {lookup_ms:>10.3f} {history_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, nargs="+", default=[0, 50, 200, 800], help="extra builds to seed")
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    reset_story_package_release_state()
+    try:
+        main(args.builds, args.reads)
+    finally:
+        reset_story_package_release_state()
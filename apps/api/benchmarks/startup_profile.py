@@ -0,0 +1,73 @@
+"""
+Cold-start import profile.
+
+Imports an entrypoint in a fresh interpreter under ``-X importtime`` and
+reports the slowest modules by cumulative import time, plus the total. Run it
+before and after touching module-level imports to see what moved.
+
+    python apps/api/benchmarks/startup_profile.py --target api --top 25
+    python apps/api/benchmarks/startup_profile.py --target ai-service
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+
+TARGETS = {
+    "api": (APPS_DIR / "api", "app.main"),
+    "ai-service": (APPS_DIR / "ai-service", "main"),
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def profile_imports(workdir: Path, module: str) -> tuple[list[tuple[str, int, int, int]], str]:
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "benchmark-secret")
+    env.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    errors = "" if completed.returncode == 0 else completed.stderr.splitlines()[-1]
+    return rows, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="api")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir, module = TARGETS[args.target]
+    rows, error = profile_imports(workdir, module)
+    if error:
+        print(f"import {module} failed: {error}")
+    if not rows:
+        return
+
+    # Top-level rows (depth 0) already include everything they pulled in.
+    total_us = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+    print(f"target={args.target} module={module} modules={len(rows)} total={total_us / 1000:.1f}ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: row[2], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+OFFSET vs keyset pagination on a seeded story table.
+
+Seeds a SQLite table shaped like ``stories`` (a few KB of JSON ``content``
+per row plus the ``(created_at, id)`` index from the keyset migration) and
+times fetching one page at increasing depths in two ways: full rows with
+OFFSET, and projected columns with a cursor.
+
+    python apps/api/benchmarks/story_listing_pagination.py --rows 50000 --page-size 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(API_DIR))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import JSON, Column, DateTime, Index, String, create_engine  # noqa: E402
+from sqlalchemy.orm import declarative_base, sessionmaker  # noqa: E402
+
+from app.core.pagination import encode_cursor, keyset_paginate, projected_columns  # noqa: E402
+
+Base = declarative_base()
+
+
+class BenchmarkStory(Base):
+    __tablename__ = "benchmark_stories"
+    __table_args__ = (Index("ix_benchmark_stories_created_at_id", "created_at", "id"),)
+
+    id = Column(String(36), primary_key=True)
+    child_id = Column(String(36), nullable=False)
+    title = Column(String(200), nullable=False)
+    content = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+def seed(session, rows: int) -> None:
+    started_at = datetime(2025, 1, 1)
+    pages = [{"page_number": number, "text": "小狐狸在森林里寻找星星。" * 20} for number in range(8)]
+    batch = []
+    for index in range(rows):
+        batch.append(
+            {
+                "id": str(uuid.uuid4()),
+                "child_id": str(uuid.UUID(int=index % 500)),
+                "title": f"Story {index}",
+                "content": {"pages": pages},
+                # Ten rows share each timestamp so ties are broken by id.
+                "created_at": started_at + timedelta(seconds=index // 10),
+            }
+        )
+        if len(batch) == 5000:
+            session.bulk_insert_mappings(BenchmarkStory, batch)
+            batch = []
+    if batch:
+        session.bulk_insert_mappings(BenchmarkStory, batch)
+    session.commit()
+
+
+def time_call(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started_at)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database", default="./benchmark.db")
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    engine = create_engine(f"sqlite:///{args.database}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    seed(session, args.rows)
+
+    ordered = (
+        session.query(BenchmarkStory.created_at, BenchmarkStory.id)
+        .order_by(BenchmarkStory.created_at.desc(), BenchmarkStory.id.desc())
+        .all()
+    )
+    summary_columns = projected_columns(BenchmarkStory, exclude=("content",))
+
+    print(f"rows={args.rows} page_size={args.page_size}")
+    print(f"{'offset':>8} {'OFFSET full rows ms':>20} {'keyset projected ms':>20}")
+    for offset in (0, args.rows // 10, args.rows // 2, args.rows - args.page_size):
+        cursor = encode_cursor(*ordered[offset - 1]) if offset else None
+
+        def offset_page():
+            session.expunge_all()
+            return (
+                session.query(BenchmarkStory)
+                .order_by(BenchmarkStory.created_at.desc(), BenchmarkStory.id.desc())
+                .offset(offset)
+                .limit(args.page_size)
+                .all()
+            )
+
+        def keyset_page():
+            return keyset_paginate(
+                session.query(*summary_columns),
+                BenchmarkStory.created_at,
+                BenchmarkStory.id,
+                cursor,
+                args.page_size,
+            )
+
+        assert [row.id for row in offset_page()] == [row.id for row in keyset_page().items]
+        print(
+            f"{offset:>8} {time_call(offset_page, args.repeats):>20.2f} "
+            f"{time_call(keyset_page, args.repeats):>20.2f}"
+        )
+
+    session.close()
+    engine.dispose()
+    os.remove(args.database)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Add composite indexes for keyset listing of stories and users
+
+Revision ID: 3b9d2c7a41e5
+Revises: ffed9410466b
+Create Date: 2026-10-19 10:12:04.418273
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d2c7a41e5'
+down_revision = 'ffed9410466b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (created_at, id) 与列表接口的排序及游标比较一致，翻页只做索引范围扫描
+    op.create_index('ix_stories_created_at_id', 'stories', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_stories_child_id_created_at_id', 'stories', ['child_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_stories_child_id_created_at_id', table_name='stories')
+    op.drop_index('ix_stories_created_at_id', table_name='stories')
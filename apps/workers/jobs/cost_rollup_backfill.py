@@ -0,0 +1,45 @@
+"""Rebuild cost analytics rollups from the raw ``cost:log:*`` usage logs.
+
+Settlement keeps the per-user/day and global per-hour rollup hashes current;
+this job is for backfilling history written before the rollups existed, or
+repairing them after an incident. Rebuilding is idempotent.
+
+    python -m apps.workers.jobs.cost_rollup_backfill --days 7
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _load_rollups():
+    ai_service_dir = Path(__file__).resolve().parents[2] / "ai-service"
+    if str(ai_service_dir) not in sys.path:
+        sys.path.insert(0, str(ai_service_dir))
+
+    from core import cost_rollups
+
+    return cost_rollups
+
+
+def run_cost_rollup_backfill(redis_client, days: int = 7) -> dict[str, Any]:
+    return _load_rollups().rebuild_rollups(redis_client, days=days)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7, help="how many recent days of logs to rebuild")
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    import redis
+
+    report = run_cost_rollup_backfill(redis.Redis.from_url(args.redis_url), days=args.days)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
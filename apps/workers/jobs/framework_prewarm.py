@@ -0,0 +1,224 @@
+"""Offline pre-warmer for the psychology framework cache.
+
+Enumerates the age-band x theme x neuro-profile grid, orders cells by observed
+request frequency, and generates the missing frameworks with bounded
+concurrency under a cost ceiling. Cells are written through
+``PsychologyExpert.warm_framework`` so they land under the same normalized keys
+live requests use.
+
+    python -m apps.workers.jobs.framework_prewarm --concurrency 4 --cost-ceiling-usd 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+DEFAULT_NEURO_SHAPES: tuple[tuple[str, ...], ...] = ((), ("adhd",), ("autism",))
+# Claude framework call at config.max_framework_tokens, rounded up.
+DEFAULT_ESTIMATED_CELL_COST_USD = 0.04
+
+
+@dataclass(frozen=True)
+class PrewarmCell:
+    age_band: str
+    theme: str
+    neuro_conditions: tuple[str, ...]
+    weight: float = 1.0
+
+    @property
+    def cell_id(self) -> str:
+        return f"{self.age_band}|{self.theme}|{'+'.join(self.neuro_conditions) or 'none'}"
+
+    def as_request(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        representative_age = int(self.age_band.split("-")[0]) + 1
+        child_profile = {
+            "age": representative_age,
+            "neuro_profile": {condition: True for condition in self.neuro_conditions},
+            "preferences": {},
+        }
+        return child_profile, {"theme": self.theme}
+
+
+@dataclass
+class PrewarmReport:
+    total_cells: int
+    already_warm: int = 0
+    warmed: int = 0
+    failed: int = 0
+    skipped_for_budget: int = 0
+    spent_usd: float = 0.0
+    total_weight: float = 0.0
+    warm_weight: float = 0.0
+    band_coverage: dict[str, dict[str, int]] = field(default_factory=dict)
+    failures: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def coverage(self) -> float:
+        return (self.already_warm + self.warmed) / self.total_cells if self.total_cells else 0.0
+
+    @property
+    def weighted_coverage(self) -> float:
+        return self.warm_weight / self.total_weight if self.total_weight else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total_cells": self.total_cells,
+            "already_warm": self.already_warm,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "skipped_for_budget": self.skipped_for_budget,
+            "spent_usd": round(self.spent_usd, 4),
+            "coverage": round(self.coverage, 4),
+            "weighted_coverage": round(self.weighted_coverage, 4),
+            "band_coverage": self.band_coverage,
+            "failures": self.failures,
+        }
+
+
+def build_prewarm_grid(
+    themes_by_band: Mapping[str, Iterable[str]],
+    neuro_shapes: Iterable[Iterable[str]] = DEFAULT_NEURO_SHAPES,
+    request_counts: Mapping[str, int] | None = None,
+    max_cells: int | None = None,
+) -> list[PrewarmCell]:
+    # Unobserved cells keep weight 1 so a cold start still covers the catalogue evenly.
+    counts = request_counts or {}
+    shapes = [tuple(sorted(set(shape))) for shape in neuro_shapes]
+    cells = []
+    for age_band, themes in themes_by_band.items():
+        for theme in dict.fromkeys(themes):
+            for shape in shapes:
+                cell = PrewarmCell(age_band=age_band, theme=theme, neuro_conditions=shape)
+                cells.append(replace(cell, weight=1.0 + counts.get(cell.cell_id, 0)))
+
+    cells.sort(key=lambda cell: (-cell.weight, cell.cell_id))
+    return cells[:max_cells] if max_cells is not None else cells
+
+
+async def run_framework_prewarm(
+    cells: list[PrewarmCell],
+    is_warm: Callable[[PrewarmCell], Awaitable[bool]],
+    warm: Callable[[PrewarmCell], Awaitable[float]],
+    max_concurrency: int = 4,
+    cost_ceiling_usd: float = 5.0,
+    estimated_cell_cost_usd: float = DEFAULT_ESTIMATED_CELL_COST_USD,
+) -> PrewarmReport:
+    report = PrewarmReport(total_cells=len(cells))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    # Cost reserved for calls in flight; a cell only starts if spent + reserved stays under the ceiling.
+    reserved_usd = 0.0
+    budget_lock = asyncio.Lock()
+
+    for cell in cells:
+        band = report.band_coverage.setdefault(cell.age_band, {"cells": 0, "warm": 0})
+        band["cells"] += 1
+        report.total_weight += cell.weight
+
+    def mark_warm(cell: PrewarmCell) -> None:
+        report.band_coverage[cell.age_band]["warm"] += 1
+        report.warm_weight += cell.weight
+
+    async def process(cell: PrewarmCell) -> None:
+        nonlocal reserved_usd
+        async with semaphore:
+            if await is_warm(cell):
+                report.already_warm += 1
+                mark_warm(cell)
+                return
+
+            async with budget_lock:
+                if report.spent_usd + reserved_usd + estimated_cell_cost_usd > cost_ceiling_usd:
+                    report.skipped_for_budget += 1
+                    return
+                reserved_usd += estimated_cell_cost_usd
+
+            try:
+                cost = await warm(cell)
+            except Exception as exc:
+                report.failed += 1
+                report.failures[cell.cell_id] = str(exc)
+                # The upstream call may still have been billed; count it against the ceiling.
+                cost = estimated_cell_cost_usd
+            else:
+                report.warmed += 1
+                mark_warm(cell)
+
+            async with budget_lock:
+                reserved_usd -= estimated_cell_cost_usd
+                report.spent_usd += cost
+
+    await asyncio.gather(*(process(cell) for cell in cells))
+    return report
+
+
+def _load_ai_service_expert():
+    ai_service_dir = Path(__file__).resolve().parents[2] / "ai-service"
+    if str(ai_service_dir) not in sys.path:
+        sys.path.insert(0, str(ai_service_dir))
+
+    from agents.psychology.age_parameters import AgeGroupParameters
+    from agents.psychology.expert import PsychologyExpert
+
+    themes_by_band = {
+        band: AgeGroupParameters.get_parameters(age)["suitable_themes"]
+        for band, age in AgeGroupParameters.AGE_BANDS.items()
+    }
+    return PsychologyExpert(), themes_by_band
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    expert, themes_by_band = _load_ai_service_expert()
+
+    neuro_shapes: Iterable[Iterable[str]] = DEFAULT_NEURO_SHAPES
+    if args.grid:
+        grid = json.loads(Path(args.grid).read_text(encoding="utf-8"))
+        themes_by_band = grid.get("themes_by_band", themes_by_band)
+        neuro_shapes = grid.get("neuro_shapes", neuro_shapes)
+
+    cells = build_prewarm_grid(
+        themes_by_band,
+        neuro_shapes,
+        request_counts=await expert.get_cell_request_counts(),
+        max_cells=args.max_cells,
+    )
+
+    async def is_warm(cell: PrewarmCell) -> bool:
+        return await expert.is_framework_cached(*cell.as_request())
+
+    async def warm(cell: PrewarmCell) -> float:
+        return await expert.warm_framework(*cell.as_request())
+
+    report = await run_framework_prewarm(
+        cells,
+        is_warm,
+        warm,
+        max_concurrency=args.concurrency,
+        cost_ceiling_usd=args.cost_ceiling_usd,
+        estimated_cell_cost_usd=args.estimated_cell_cost_usd,
+    )
+    return report.as_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("FRAMEWORK_PREWARM_CONCURRENCY", 4)))
+    parser.add_argument(
+        "--cost-ceiling-usd",
+        type=float,
+        default=float(os.environ.get("FRAMEWORK_PREWARM_COST_CEILING_USD", 5.0)),
+    )
+    parser.add_argument("--estimated-cell-cost-usd", type=float, default=DEFAULT_ESTIMATED_CELL_COST_USD)
+    parser.add_argument("--max-cells", type=int, default=None)
+    parser.add_argument("--grid", help="JSON file with themes_by_band and neuro_shapes overrides")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_main(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
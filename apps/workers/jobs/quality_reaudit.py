@@ -0,0 +1,97 @@
+"""Batch re-audit of story drafts through the AI quality controller.
+
+Reads a JSON list of ``{draft_id, story_content, framework, child_profile}``
+items and runs them through ``QualityController.batch_quality_check``: every
+``--batch-size`` drafts share one safety + educational-alignment model call,
+and only drafts whose result fails validation are re-checked individually.
+
+    python -m apps.workers.jobs.quality_reaudit drafts.json --batch-size 4
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def _load_ai_service():
+    ai_service_dir = Path(__file__).resolve().parents[2] / "ai-service"
+    if str(ai_service_dir) not in sys.path:
+        sys.path.insert(0, str(ai_service_dir))
+
+    from agents.psychology.expert import EducationalFramework
+    from agents.quality_control.expert import QualityController
+    from agents.story_creation.expert import StoryContent
+    from config import config
+
+    return QualityController, StoryContent, EducationalFramework, config
+
+
+async def run_quality_reaudit(
+    controller: Any,
+    drafts: Iterable[dict[str, Any]],
+    batch_size: int,
+    story_model: Any,
+    framework_model: Any,
+) -> dict[str, Any]:
+    drafts = list(drafts)
+    items = [
+        (
+            story_model(**draft["story_content"]),
+            framework_model(**draft["framework"]),
+            draft.get("child_profile", {}),
+        )
+        for draft in drafts
+    ]
+    retries_before = controller.batch_stats.individual_retries
+    reports = await controller.batch_quality_check(items, batch_size)
+
+    results = {
+        str(draft.get("draft_id", index)): {
+            "approval_status": report.approval_status,
+            "overall_quality_score": round(report.overall_quality_score, 4),
+            "revision_requirements": report.revision_requirements,
+        }
+        for index, (draft, report) in enumerate(zip(drafts, reports))
+    }
+    return {
+        "drafts": len(drafts),
+        "batch_size": batch_size,
+        "individual_retries": controller.batch_stats.individual_retries - retries_before,
+        "status_counts": {
+            status: sum(1 for result in results.values() if result["approval_status"] == status)
+            for status in ("approved", "needs_revision", "rejected")
+        },
+        "results": results,
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    QualityController, StoryContent, EducationalFramework, config = _load_ai_service()
+
+    import redis
+
+    drafts = json.loads(Path(args.drafts).read_text(encoding="utf-8"))
+    controller = QualityController(redis.Redis.from_url(config.redis_url))
+    return await run_quality_reaudit(
+        controller,
+        drafts,
+        args.batch_size or config.quality_batch_size,
+        StoryContent,
+        EducationalFramework,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("drafts", help="JSON file with the drafts to re-audit")
+    parser.add_argument("--batch-size", type=int, default=None, help="drafts per model call (default: config)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_main(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,10 @@ export const STORY_PACKAGE_BUILD_SCHEMA_VERSION = "story-package-build.v1" as co
 export const STORY_PACKAGE_DRAFT_INDEX_SCHEMA_VERSION =
   "story-package-draft-index.v1" as const;
 export const STORY_PACKAGE_DRAFT_SCHEMA_VERSION = "story-package-draft.v1" as const;
+export const STORY_PACKAGE_DRAFT_SUMMARY_SCHEMA_VERSION =
+  "story-package-draft-summary.v1" as const;
+export const STORY_PACKAGE_DRAFT_SUMMARY_INDEX_SCHEMA_VERSION =
+  "story-package-draft-summary-index.v1" as const;
 export const STORY_PACKAGE_HISTORY_SCHEMA_VERSION = "story-package-history.v1" as const;
 export const STORY_PACKAGE_RECALL_COMMAND_SCHEMA_VERSION =
   "story-package-recall-command.v1" as const;
@@ -577,6 +581,26 @@ export interface StoryPackageDraftIndexV1 {
   drafts: StoryPackageDraftV1[];
 }
 
+export interface StoryPackageDraftSummaryV1 {
+  schema_version: typeof STORY_PACKAGE_DRAFT_SUMMARY_SCHEMA_VERSION;
+  draft_id: string;
+  package_id: string;
+  source_type: StoryPackageSourceType;
+  workflow_state: StoryPackageWorkflowState;
+  title: string;
+  audit_status: SafetyAuditStatus;
+  latest_build_id?: string | null;
+  active_release_id?: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface StoryPackageDraftSummaryIndexV1 {
+  schema_version: typeof STORY_PACKAGE_DRAFT_SUMMARY_INDEX_SCHEMA_VERSION;
+  generated_at: string;
+  drafts: StoryPackageDraftSummaryV1[];
+}
+
 export interface StoryPackageBuildCommandV1 {
   schema_version: typeof STORY_PACKAGE_BUILD_COMMAND_SCHEMA_VERSION;
   build_reason: string;
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from core.budget_reservation import RESERVE_SCRIPT, SETTLE_SCRIPT  # noqa: E402
+from core.cost_control import EnhancedCostController  # noqa: E402
+
+
+class InMemoryBudgetRedis:
+    """Runs the reservation and settlement scripts' logic in-process so budgeting can be checked without Redis."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.lists = {}
+        self.script_calls = 0
+        self.lrange_calls = 0
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def lrange(self, key, start, end):
+        self.lrange_calls += 1
+        return self.lists.get(key, [])[start:end + 1]
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def hgetall(self, key):
+        return {field: str(value) for field, value in self.hashes.get(key, {}).items()}
+
+    def register_script(self, script):
+        handler = {RESERVE_SCRIPT: self._reserve, SETTLE_SCRIPT: self._settle}[script]
+
+        def call(keys, args):
+            self.script_calls += 1
+            return handler(keys, args)
+
+        return call
+
+    def _reserve(self, keys, args):
+        tier_key, daily_key, monthly_key, hash_key, zset_key, *previous_keys = keys
+        declared = {daily_key, monthly_key, *previous_keys}
+        limits = json.loads(args[0])
+        tier = self.values.get(tier_key)
+        if tier not in limits:
+            tier = args[1]
+        reservation_id, amount, now, ttl = args[2], float(args[3]), float(args[4]), float(args[5])
+
+        reservations = self.hashes.setdefault(hash_key, {})
+        expiry = self.zsets.setdefault(zset_key, {})
+        for expired_id in [member for member, score in expiry.items() if score <= now]:
+            reservation = reservations.pop(expired_id, None)
+            if reservation:
+                for key in (reservation["daily_key"], reservation["monthly_key"]):
+                    if key in declared and key in self.values:
+                        self.values[key] -= reservation["amount"]
+            del expiry[expired_id]
+
+        daily = self.values.get(daily_key, 0.0)
+        monthly = self.values.get(monthly_key, 0.0)
+        result = [str(daily), str(monthly), str(limits[tier]["daily"]), str(limits[tier]["monthly"]), tier]
+        if daily + amount > limits[tier]["daily"] or monthly + amount > limits[tier]["monthly"]:
+            return [0, *result]
+
+        self.values[daily_key] = daily + amount
+        self.values[monthly_key] = monthly + amount
+        reservations[reservation_id] = {"amount": amount, "daily_key": daily_key, "monthly_key": monthly_key}
+        expiry[reservation_id] = now + ttl
+        return [1, *result]
+
+    def _settle(self, keys, args):
+        hash_key, zset_key, daily_key, monthly_key, log_key, calibration_key, *rollup_keys = keys[:8]
+        reserved_daily_key, reserved_monthly_key = keys[8:]
+        actual = float(args[1])
+        delta = actual
+        reservation = self.hashes.get(hash_key, {}).pop(args[0], None) if args[0] else None
+        if reservation:
+            delta = actual - reservation["amount"]
+            daily_key, monthly_key = reserved_daily_key, reserved_monthly_key
+            self.zsets[zset_key].pop(args[0], None)
+
+        for key in (daily_key, monthly_key):
+            self.values[key] = self.values.get(key, 0.0) + delta
+        self.lists.setdefault(log_key, []).insert(0, args[4])
+        if args[6] != "":
+            self.lists.setdefault(calibration_key, []).insert(0, str(args[6]))
+        for rollup_key in rollup_keys:
+            rollup = self.hashes.setdefault(rollup_key, {})
+            for field, amount in (("total", actual), (args[8], actual), ("requests", 1)):
+                rollup[field] = rollup.get(field, 0) + amount
+        return str(delta)
+
+
+class InMemoryPipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        self.redis.pipeline_executions = getattr(self.redis, "pipeline_executions", 0) + 1
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+def make_controller(redis_client, tier="free") -> EnhancedCostController:
+    controller = EnhancedCostController(redis_client)
+    redis_client.values["user:tier:family-1"] = tier
+    return controller
+
+
+def daily_usage(controller, redis_client) -> float:
+    daily_key, _ = controller.reservations.usage_keys("family-1")
+    return redis_client.values.get(daily_key, 0.0)
+
+
+def test_concurrent_requests_cannot_overspend_the_daily_limit() -> None:
+    redis_client = InMemoryBudgetRedis()
+    controller = make_controller(redis_client)
+    request = {"model": "claude-3-sonnet", "content_length": 5000, "type": "story_generation"}
+    p95_cost = controller._estimate_request_cost(request).p95_cost
+
+    async def scenario():
+        return await asyncio.gather(
+            *(controller.pre_request_budget_check("family-1", request) for _ in range(10))
+        )
+
+    decisions = asyncio.run(scenario())
+    granted = [info for allowed, info in decisions if allowed]
+
+    # free 档日限额 5.0
+    assert len(granted) == int(5.0 // p95_cost)
+    assert daily_usage(controller, redis_client) <= 5.0
+    assert all(info["reservation_id"] for info in granted)
+    assert redis_client.script_calls == 10
+
+
+def test_settlement_refunds_the_unused_reservation_and_logs_usage() -> None:
+    redis_client = InMemoryBudgetRedis()
+    controller = make_controller(redis_client)
+    request = {"model": "qwen-max", "content_length": 1000, "type": "story_generation"}
+
+    async def scenario():
+        allowed, info = await controller.pre_request_budget_check("family-1", request)
+        reserved = daily_usage(controller, redis_client)
+        await controller.record_actual_cost("family-1", request, 0.01, info["reservation_id"])
+        return allowed, reserved
+
+    allowed, reserved = asyncio.run(scenario())
+
+    assert allowed and reserved > 0.01
+    assert abs(daily_usage(controller, redis_client) - 0.01) < 1e-9
+    assert redis_client.script_calls == 2
+    # 结算不会让下一次估算重新读取校准窗口：稳态下每个请求只有预留与结算两次往返
+    lrange_calls = redis_client.lrange_calls
+    asyncio.run(controller.pre_request_budget_check("family-1", request))
+    assert redis_client.lrange_calls == lrange_calls and redis_client.script_calls == 3
+    log_key = next(key for key in redis_client.lists if key.startswith("cost:log:family-1:"))
+    assert json.loads(redis_client.lists[log_key][0])["actual_cost"] == 0.01
+
+
+def test_orphaned_reservations_expire_and_late_settlement_charges_in_full() -> None:
+    redis_client = InMemoryBudgetRedis()
+    controller = make_controller(redis_client)
+    controller.reservations.reservation_ttl_seconds = 0
+    # p95 约 3.75，free 档日限额 5.0 只够一次预留
+    request = {"model": "claude-3-opus", "content_length": 2000, "type": "story_generation"}
+
+    async def scenario():
+        _, orphan = await controller.pre_request_budget_check("family-1", request)
+        # 下一次预留先退回已过期的预留
+        allowed, _ = await controller.pre_request_budget_check("family-1", request)
+        after_sweep = daily_usage(controller, redis_client)
+        await controller.record_actual_cost("family-1", request, 0.5, orphan["reservation_id"])
+        return orphan, allowed, after_sweep
+
+    orphan, allowed, after_sweep = asyncio.run(scenario())
+
+    assert orphan["can_proceed"] and allowed
+    assert after_sweep == controller._estimate_request_cost(request).p95_cost
+    assert abs(daily_usage(controller, redis_client) - (after_sweep + 0.5)) < 1e-9
+
+
+def test_analytics_read_settlement_rollups_in_one_pipeline() -> None:
+    redis_client = InMemoryBudgetRedis()
+    controller = make_controller(redis_client, tier="premium")
+
+    async def scenario():
+        for model, cost in (("qwen-max", 0.02), ("qwen-max", 0.03), ("claude-3-sonnet", 0.1)):
+            await controller.record_actual_cost("family-1", {"model": model, "type": "story_generation"}, cost)
+        return await controller.get_cost_analytics("family-1")
+
+    analytics = asyncio.run(scenario())
+    today = next(iter(analytics["daily_breakdown"]))
+
+    assert redis_client.pipeline_executions == 1
+    assert abs(analytics["daily_breakdown"][today] - 0.15) < 1e-9
+    assert analytics["daily_requests"][today] == 3
+    assert analytics["model_usage"] == {"qwen-max": 0.05, "claude-3-sonnet": 0.1}
+    hour_rollups = [key for key in redis_client.hashes if key.startswith("cost:rollup:hour:")]
+    assert len(hour_rollups) == 1 and redis_client.hashes[hour_rollups[0]]["requests"] == 3
+
+
+def test_settlement_declares_the_reservation_day_keys() -> None:
+    redis_client = InMemoryBudgetRedis()
+    controller = make_controller(redis_client)
+    manager = controller.reservations
+
+    reservation = manager.reserve("family-1", 1.0)
+    day = reservation.reservation_id.rsplit(":", 1)[-1]
+    assert manager._reserved_keys("family-1", reservation.reservation_id, "d", "m") == (
+        f"cost:daily:family-1:{day}",
+        f"cost:monthly:family-1:{day[:7]}",
+    )
+    assert manager._reserved_keys("family-1", "legacy-id", "d", "m") == ("d", "m")
+
+    # 跨天结算：预留计在前一天的键上，差额退回前一天而不是今天
+    yesterday_key = "cost:daily:family-1:2026-01-31"
+    redis_client.values[yesterday_key] = 2.0
+    redis_client.hashes["cost:reservations:family-1"]["old:2026-01-31"] = {
+        "amount": 2.0, "daily_key": yesterday_key, "monthly_key": "cost:monthly:family-1:2026-01",
+    }
+    manager.settle("family-1", "old:2026-01-31", 0.5, {"model": "qwen-max"})
+    assert redis_client.values[yesterday_key] == 0.5
+    assert daily_usage(controller, redis_client) == 1.0
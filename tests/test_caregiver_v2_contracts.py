@@ -1,7 +1,10 @@
 import json
 import os
+import subprocess
 import sys
+import weakref
 from pathlib import Path
+from uuid import UUID
 
 import pytest
 from fastapi.testclient import TestClient
@@ -18,7 +21,12 @@ os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
 sys.path.insert(0, str(API_DIR))
 
 from app.main import app  # noqa: E402
-from app.services.v2.child_service import reset_child_package_assignment_overrides  # noqa: E402
+from app.services.v2.child_assignment_store import ChildAssignmentOverrideStore  # noqa: E402
+from app.services.v2.child_service import (  # noqa: E402
+    OVERRIDES_REVISION_CHECK_INTERVAL_SECONDS,
+    DemoChildService,
+    reset_child_package_assignment_overrides,
+)
 from app.services.v2.package_access_store import reset_package_access_events  # noqa: E402
 from app.services.v2.reading_event_store import reset_ingested_reading_events  # noqa: E402
 from app.services.v2.story_package_release_store import reset_story_package_release_state  # noqa: E402
@@ -339,6 +347,66 @@ def test_invalid_assignment_does_not_mutate_child_state() -> None:
     assert child_home_payload["package_queue"][0]["package_id"] == PACKAGE_ID
 
 
+def test_child_assignment_overrides_are_shared_across_services_and_workers(tmp_path: Path) -> None:
+    now = [0.0]
+    store = ChildAssignmentOverrideStore(tmp_path)
+    caregiver_side = DemoChildService(ChildAssignmentOverrideStore(tmp_path), clock=lambda: now[0])
+    reading_side = DemoChildService(ChildAssignmentOverrideStore(tmp_path), clock=lambda: now[0])
+    child_id = UUID(CHILD_ID)
+
+    first = reading_side.get_child_assignment(child_id)
+    assert first.household_id == UUID(HOUSEHOLD_ID)
+    assert reading_side.get_child_assignment(child_id).child is first.child
+    assert reading_side.get_child_assignment(UUID(SESSION_ID)) is None
+
+    # Writes from this process reach other services without waiting for a revision check.
+    caregiver_side.assign_package(UUID(HOUSEHOLD_ID), child_id, UUID(ENGLISH_PACKAGE_ID))
+    assert reading_side.get_child_assignment(child_id).child.current_package_id == UUID(ENGLISH_PACKAGE_ID)
+
+    # Another worker process writes through the same store.
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from pathlib import Path\n"
+            "from uuid import UUID\n"
+            "from app.services.v2.child_assignment_store import ChildAssignmentOverrideStore\n"
+            "ChildAssignmentOverrideStore(Path(sys.argv[1]))"
+            f".set_override(UUID('{CHILD_ID}'), UUID('{SECOND_ENGLISH_PACKAGE_ID}'))\n",
+            str(tmp_path),
+        ],
+        cwd=API_DIR,
+        check=True,
+    )
+    assert reading_side.list_children(UUID(HOUSEHOLD_ID))[0].current_package_id == UUID(ENGLISH_PACKAGE_ID)
+    now[0] += OVERRIDES_REVISION_CHECK_INTERVAL_SECONDS
+    assert reading_side.list_children(UUID(HOUSEHOLD_ID))[0].current_package_id == UUID(SECOND_ENGLISH_PACKAGE_ID)
+
+    store.reset()
+    assert reading_side.get_child_assignment(child_id).child.current_package_id == first.child.current_package_id
+
+    # Services are not kept alive by their store subscription.
+    reference = weakref.ref(caregiver_side)
+    del caregiver_side
+    assert reference() is None
+
+
+def test_reloaded_overrides_do_not_replace_a_newer_local_write(tmp_path: Path) -> None:
+    child_id = UUID(CHILD_ID)
+
+    class RacingStore(ChildAssignmentOverrideStore):
+        def load(self):
+            stale = super().load()
+            # A write from this process lands before the reload is adopted.
+            self.set_override(child_id, UUID(ENGLISH_PACKAGE_ID))
+            return stale
+
+    service = DemoChildService(RacingStore(tmp_path))
+
+    assert service.get_child_assignment(child_id).child.current_package_id == UUID(ENGLISH_PACKAGE_ID)
+
+
 def test_reading_session_contract_matches_schema() -> None:
     client = TestClient(app)
     request_payload = {
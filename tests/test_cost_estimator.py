@@ -0,0 +1,70 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from core.cost_control import EnhancedCostController  # noqa: E402
+from core.token_estimator import PromptTokenCounter  # noqa: E402
+
+
+class InMemoryRedis:
+    def __init__(self):
+        self.lists = {}
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, str(value))
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def register_script(self, script):
+        return None
+
+
+def test_prompt_tokens_are_counted_locally() -> None:
+    counter = PromptTokenCounter()
+    prompt = "请为5岁的孩子写一个关于友谊的故事。Keep it gentle."
+
+    # 请为 / 5 / 岁的孩子写一个关于友谊的故事 / 。 / Keep / it / gentle / .
+    assert counter.count(prompt, "qwen-max") == 2 + 1 + 10 + 1 + 1 + 1 + 2 + 1
+    assert 0 < counter.count(prompt, "claude-3-sonnet") < len(prompt)
+    assert counter.count("", "qwen-max") == 0
+
+
+def test_uncalibrated_estimate_reserves_prior_margin_on_output() -> None:
+    controller = EnhancedCostController(InMemoryRedis())
+
+    estimate = controller._estimate_request_cost({"model": "qwen-max", "content_length": 1000})
+
+    assert estimate.calibration_samples == 0
+    assert estimate.output_tokens_p50 == 2000
+    assert estimate.output_tokens_p95 == 2400
+    assert estimate.p95_cost > estimate.estimated_cost
+
+
+def test_recorded_samples_calibrate_p95_and_avoid_unnecessary_downgrades() -> None:
+    redis_client = InMemoryRedis()
+    controller = EnhancedCostController(redis_client)
+    request = {"model": "claude-3-opus", "content_length": 1000, "type": "story_generation"}
+
+    uncalibrated = controller._estimate_request_cost(request)
+
+    # 实际输出约为先验的 45%-60%
+    calibration_key = controller.output_calibrator.redis_key("claude-3-opus", "story_generation")
+    for index in range(40):
+        redis_client.lpush(calibration_key, (900 + (index % 4) * 100) / 2000)
+    controller.output_calibrator.invalidate("claude-3-opus", "story_generation")
+    calibrated = controller._estimate_request_cost(request)
+
+    assert calibrated.calibration_samples == 40
+    assert calibrated.output_tokens_p50 < uncalibrated.output_tokens_p50
+    assert calibrated.output_tokens_p95 <= 1200
+    assert calibrated.confidence > 0.5
+
+    remaining = (calibrated.p95_cost + uncalibrated.p95_cost) / 2
+    budget_info = SimpleNamespace(remaining_daily=remaining, remaining_monthly=remaining)
+
+    assert controller._check_budget_sufficiency(budget_info, calibrated)
+    assert not controller._check_budget_sufficiency(budget_info, uncalibrated)
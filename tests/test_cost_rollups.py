@@ -0,0 +1,72 @@
+import fnmatch
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from core.cost_rollups import hour_key, parse_rollup, rebuild_rollups, user_day_key  # noqa: E402
+
+
+class InMemoryRedis:
+    def __init__(self):
+        self.lists = {}
+        self.hashes = {}
+
+    def scan_iter(self, match, count=None):
+        return [key for key in list(self.lists) + list(self.hashes) if fnmatch.fnmatch(key, match)]
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, seconds):
+        pass
+
+
+class InMemoryPipeline:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+def log_entry(model, cost, timestamp):
+    return json.dumps({"model": model, "actual_cost": cost, "timestamp": timestamp})
+
+
+def test_rebuild_replaces_rollups_from_raw_logs() -> None:
+    redis_client = InMemoryRedis()
+    redis_client.lists["cost:log:family:1:2024-05-02"] = [
+        log_entry("qwen-max", 0.25, "2024-05-02T09:15:00"),
+        log_entry("qwen-max", 0.5, "2024-05-02T09:40:00"),
+        log_entry("claude-3-sonnet", 1.0, "2024-05-02T10:05:00"),
+        "not json",
+    ]
+    redis_client.lists["cost:log:family:2:2024-05-02"] = [log_entry(None, 0.25, "2024-05-02T10:30:00")]
+    redis_client.lists["cost:log:family:1:2024-04-01"] = [log_entry("qwen-max", 9.0, "2024-04-01T10:00:00")]
+    # 已有但不准确的汇总会被整体覆盖
+    redis_client.hashes[user_day_key("family:1", "2024-05-02")] = {"total": 99.0, "model:gpt-4-turbo": 99.0}
+
+    report = rebuild_rollups(redis_client, days=7, now=datetime(2024, 5, 3, 12))
+    family_one = parse_rollup(redis_client.hashes[user_day_key("family:1", "2024-05-02")])
+    ten_o_clock = parse_rollup(redis_client.hashes[hour_key("2024-05-02T10")])
+
+    assert report == {"user_day_rollups": 2, "hour_rollups": 2, "log_entries": 4}
+    assert family_one == {"total": 1.75, "requests": 3, "models": {"qwen-max": 0.75, "claude-3-sonnet": 1.0}}
+    assert ten_o_clock == {"total": 1.25, "requests": 2, "models": {"claude-3-sonnet": 1.0, "unknown": 0.25}}
+    assert user_day_key("family:1", "2024-04-01") not in redis_client.hashes
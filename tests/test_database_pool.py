@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.database import (  # noqa: E402
+    _POOL_WAIT_STATS,
+    InstrumentedQueuePool,
+    dispose_async_engine,
+    engine,
+    get_async_db,
+    get_pool_metrics,
+    to_async_database_url,
+)
+
+
+def test_sync_engine_uses_sized_queue_pool_and_reports_checkouts() -> None:
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    checkouts_before = get_pool_metrics()["sync"]["checkouts"]
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        assert get_pool_metrics()["sync"]["checked_out"] == 2
+
+    metrics = get_pool_metrics()["sync"]
+    assert metrics["checked_out"] == 0
+    assert metrics["checkouts"] >= checkouts_before + 2
+    assert metrics["size"] > 0
+
+
+def test_pool_timeouts_are_counted(tmp_path: Path) -> None:
+    small_engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_logging_name="test-timeout",
+    )
+
+    with small_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            small_engine.connect()
+
+    small_engine.dispose()
+    assert _POOL_WAIT_STATS["test-timeout"].timeouts == 1
+
+
+def test_async_session_runs_against_async_driver() -> None:
+    assert to_async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert to_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+    async def scenario() -> int:
+        try:
+            async for session in get_async_db():
+                result = await session.execute(text("SELECT 1"))
+                value = result.scalar_one()
+            assert get_pool_metrics()["async"]["checkouts"] >= 1
+            return value
+        finally:
+            await dispose_async_engine()
+
+    assert asyncio.run(scenario()) == 1
+    assert "async" not in get_pool_metrics()
@@ -0,0 +1,49 @@
+import dataclasses
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.emotional_regulation import (  # noqa: E402
+    SKILL_TABLE,
+    EmotionalDevelopmentStage,
+    EmotionalRegulationFramework,
+)
+
+
+def test_skill_table_is_precomputed_and_immutable() -> None:
+    skills = SKILL_TABLE[(EmotionalDevelopmentStage.EARLY_CHILDHOOD, ("adhd", "autism"))]
+
+    assert [skill.skill_name for skill in skills][-2:] == ["情绪-注意力管理", "社交情绪脚本"]
+    assert skills[0].practice_methods[-3:] == ("结构化练习", "情绪规则卡", "预测性提示")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        skills[0].skill_name = "changed"
+    with pytest.raises(TypeError):
+        SKILL_TABLE[(EmotionalDevelopmentStage.EARLY_CHILDHOOD, ())] = ()
+
+
+def test_neuro_profile_aliases_resolve_to_the_same_skills() -> None:
+    framework = EmotionalRegulationFramework()
+
+    legacy = framework.get_neuro_adapted_skills("6-8", {"ADHD": True})
+    canonical = framework.get_neuro_adapted_skills("6-7", {"adhd_indicators": True, "autism": {"reduceAnimations": False}})
+
+    assert legacy == canonical
+    assert len(legacy) == 4
+
+
+def test_framework_outputs_are_memoized_with_lru_eviction() -> None:
+    framework = EmotionalRegulationFramework(framework_cache_size=2)
+    profile = {"age_group": "6-8", "neuro_profile": {"ADHD": True}}
+
+    first = framework.generate_story_emotional_framework(profile, {"theme": "友谊"})
+    # 主题里同样只命中"友谊"，归入同一缓存项
+    assert framework.generate_story_emotional_framework(profile, {"theme": "友谊与分享"}) is first
+    assert first["target_skills"][0]["skill_name"] == "社交情绪认知"
+
+    framework.generate_story_emotional_framework(profile, {"theme": "挑战"})
+    framework.generate_story_emotional_framework(profile, {"theme": "成长"})
+
+    assert framework.generate_story_emotional_framework(profile, {"theme": "友谊"}) is not first
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.execution import BlockingCallPool, read_pool, run_read  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def test_run_read_executes_off_the_event_loop_thread() -> None:
+    async def scenario() -> tuple[int, str]:
+        return threading.get_ident(), await run_read(lambda: threading.current_thread().name)
+
+    loop_thread_id, worker_name = asyncio.run(scenario())
+
+    assert loop_thread_id == threading.get_ident()
+    assert worker_name.startswith("v2-read")
+
+
+def test_blocking_call_pool_propagates_errors_and_counts_failures() -> None:
+    pool = BlockingCallPool("test-pool", max_workers=1)
+
+    def fail() -> None:
+        raise LookupError("missing")
+
+    with pytest.raises(LookupError, match="missing"):
+        asyncio.run(pool.run(fail))
+
+    snapshot = pool.snapshot()
+    assert snapshot.failed == 1
+    assert snapshot.in_flight == 0
+    pool.shutdown()
+
+
+def test_health_exposes_execution_pool_snapshot() -> None:
+    client = TestClient(app)
+    completed_before = read_pool.snapshot().completed
+
+    response = client.get(
+        "/api/v2/child-home/55555555-5555-5555-5555-555555555555",
+        headers={"host": "localhost"},
+    )
+    assert response.status_code == 200
+
+    health = client.get("/health", headers={"host": "localhost"}).json()
+    pools = {pool["name"]: pool for pool in health["execution"]["pools"]}
+    assert pools["v2-read"]["completed"] >= completed_before + 1
+    assert set(pools) == {"v2-read", "v2-write"}
+    assert "max_lag_ms" in health["execution"]["event_loop"]
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.framework_keys import framework_cache_key, framework_cell_id  # noqa: E402
+from apps.workers.jobs.framework_prewarm import build_prewarm_grid, run_framework_prewarm  # noqa: E402
+
+
+def test_cache_key_ignores_fields_that_do_not_shape_the_framework() -> None:
+    base = framework_cache_key(
+        {"age": 4, "neuro_profile": {"adhd_indicators": True}, "preferences": {"reading_style": "visual"}},
+        {"theme": "分享玩具"},
+    )
+    same_cell = framework_cache_key(
+        {
+            "age": 5,
+            "neuro_profile": {"adhd": {"shortAttentionBlocks": True}, "autism": {"reduceAnimations": False}},
+            "preferences": {"reading_style": "visual", "favorite_characters": ["小熊"]},
+        },
+        {"theme": " 分享玩具 "},
+    )
+    other_band = framework_cache_key(
+        {"age": 7, "neuro_profile": {"adhd_indicators": True}, "preferences": {"reading_style": "visual"}},
+        {"theme": "分享玩具"},
+    )
+
+    assert base == same_cell
+    assert base != other_band
+
+
+def test_grid_is_ordered_by_observed_request_frequency() -> None:
+    hot = framework_cell_id("6-8", "友谊", ["adhd"])
+    cells = build_prewarm_grid(
+        {"3-5": ["日常生活", "分享玩具"], "6-8": ["友谊"]},
+        neuro_shapes=[(), ("adhd",)],
+        request_counts={hot: 40},
+    )
+
+    assert len(cells) == 6
+    assert cells[0].cell_id == hot
+    assert cells[0].weight == 41
+
+
+def test_prewarm_respects_concurrency_and_cost_ceiling_and_reports_coverage() -> None:
+    cells = build_prewarm_grid({"3-5": ["a", "b", "c", "d", "e", "f"]}, neuro_shapes=[()])
+    cached = {cells[0].cell_id}
+    warmed = []
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def is_warm(cell):
+        return cell.cell_id in cached
+
+    async def warm(cell):
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        warmed.append(cell.cell_id)
+        return 0.03
+
+    report = asyncio.run(
+        run_framework_prewarm(
+            cells,
+            is_warm,
+            warm,
+            max_concurrency=2,
+            cost_ceiling_usd=0.1,
+            estimated_cell_cost_usd=0.04,
+        )
+    )
+
+    assert peak_in_flight <= 2
+    assert report.spent_usd <= 0.1
+    assert report.already_warm == 1
+    assert report.warmed == len(warmed) == 3
+    assert report.skipped_for_budget == 2
+    assert report.as_dict()["coverage"] == round(4 / 6, 4)
+    assert report.band_coverage == {"3-5": {"cells": 6, "warm": 4}}
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.story_creation.incremental import IncrementalStoryEngine  # noqa: E402
+
+
+class RecordingClient:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, model, prompt, max_tokens, temperature):
+        self.prompts.append(prompt)
+        page_number = len(self.prompts)
+        return {"text": json.dumps({"text": f"第{page_number}页。小兔子继续冒险。", "illustration_prompt": "森林"})}
+
+
+def make_engine(client, **kwargs) -> IncrementalStoryEngine:
+    expert = SimpleNamespace(
+        qwen_client=client,
+        enhance_illustration_prompt_for_page=lambda **_: "场景: 森林",
+    )
+    return IncrementalStoryEngine(expert, **kwargs)
+
+
+def test_prompt_keeps_a_rolling_window_of_recent_pages() -> None:
+    engine = make_engine(RecordingClient(), context_window=2)
+    prior_pages = [{"page_number": number, "text": f"第{number}页原文。后续内容{number}"} for number in range(1, 6)]
+
+    prompt = engine.build_page_prompt(
+        {"age_group": "3-5"},
+        {"characters": [{"name": "小兔", "description": "勇敢", "visual_description": "白色"}]},
+        prior_pages,
+        page_number=6,
+        total_pages=8,
+    )
+
+    assert "小兔" in prompt
+    assert "后续内容5" in prompt and "后续内容4" in prompt
+    assert "后续内容3" not in prompt
+    assert "第1页：第1页原文。" in prompt
+
+
+def test_next_page_is_prefetched_while_consumer_handles_current_page() -> None:
+    client = RecordingClient()
+    engine = make_engine(client, prefetch_pages=1)
+
+    async def scenario():
+        events = []
+        prompts_seen_while_holding_first_page = None
+        async for event in engine.generate_pages({"age_group": "3-5"}, {}, [], total_pages=3):
+            events.append(event)
+            if len(events) == 1:
+                await asyncio.sleep(0.01)
+                prompts_seen_while_holding_first_page = len(client.prompts)
+        return events, prompts_seen_while_holding_first_page
+
+    events, prompts_while_holding = asyncio.run(scenario())
+
+    assert [event["page_number"] for event in events] == [1, 2, 3]
+    assert all(event["type"] == "page_text" for event in events)
+    assert prompts_while_holding >= 2
+    assert "第1页。小兔子继续冒险。" in client.prompts[1]
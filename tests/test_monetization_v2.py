@@ -20,14 +20,20 @@ sys.path.insert(0, str(API_DIR))
 
 from app.main import app  # noqa: E402
 from app.services.v2.child_service import reset_child_package_assignment_overrides  # noqa: E402
+from app.services.v2.entitlement_service import (  # noqa: E402
+    DemoEntitlementService,
+    notify_subscription_changed,
+)
 from app.services.v2.fixtures import (  # noqa: E402
     DEMO_HOUSEHOLD_ID,
+    FIXTURE_TIMESTAMP,
     HOUSEHOLD_ENTITLEMENT_FIXTURES,
     HouseholdEntitlementFixture,
     PackageAccessFixture,
 )
 from app.services.v2.package_access_store import reset_package_access_events  # noqa: E402
 from app.services.v2.reading_event_store import reset_ingested_reading_events  # noqa: E402
+from app.services.v2.story_package_service import DemoStoryPackageService  # noqa: E402
 from app.services.v2.story_package_release_store import reset_story_package_release_state  # noqa: E402
 
 
@@ -132,6 +138,70 @@ def test_household_entitlement_contract_matches_schema() -> None:
     assert package_access_by_id[LOCKED_PACKAGE_ID]["access_state"] == "locked"
 
 
+class CountingStoryPackageService(DemoStoryPackageService):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def get_story_package(self, package_id):
+        self.lookups += 1
+        return super().get_story_package(package_id)
+
+
+def test_entitlement_index_resolves_in_bulk_and_rebuilds_on_subscription_change() -> None:
+    story_package_service = CountingStoryPackageService()
+    catalog_revision = [1]
+    revision_reads = []
+    service = DemoEntitlementService(
+        story_package_service=story_package_service,
+        clock=lambda: FIXTURE_TIMESTAMP,
+        catalog_revision=lambda: revision_reads.append(1) or catalog_revision[0],
+    )
+    household_id = UUID(HOUSEHOLD_ID)
+    package_count = len(HOUSEHOLD_ENTITLEMENT_FIXTURES[DEMO_HOUSEHOLD_ID].package_access)
+
+    first = service.get_household_entitlement(household_id)
+    second = service.get_household_entitlement(household_id)
+    assert first.package_access == second.package_access
+    assert story_package_service.lookups == package_count
+    assert len(revision_reads) == 2
+
+    catalog_revision[0] = 2
+    service.get_household_entitlement(household_id)
+    assert story_package_service.lookups == 2 * package_count
+
+    unknown_package_id = UUID("00000000-0000-0000-0000-000000000000")
+    resolutions = service.resolve_many(
+        household_id,
+        [UUID(ACCESSIBLE_PACKAGE_ID), UUID(LOCKED_PACKAGE_ID), unknown_package_id],
+    )
+    assert resolutions[UUID(ACCESSIBLE_PACKAGE_ID)].is_entitled
+    assert not resolutions[UUID(LOCKED_PACKAGE_ID)].is_entitled
+    assert resolutions[unknown_package_id] is None
+    index = service._get_access_index(household_id)
+    assert service._get_access_index(household_id) is index
+
+    notify_subscription_changed(household_id)
+    assert service._get_access_index(household_id) is not index
+
+    unknown_household_ids = [UUID(int=value) for value in range(1, 50)]
+    for unknown_household_id in unknown_household_ids:
+        assert service.is_package_entitled(unknown_household_id, UUID(ACCESSIBLE_PACKAGE_ID))
+    assert len(service._access_indexes) == 1
+
+    original_fixture = override_household_entitlement(
+        subscription_status="canceled",
+        access_state="lost",
+        package_access=(),
+    )
+    try:
+        assert service.resolve_package_access(household_id, UUID(ACCESSIBLE_PACKAGE_ID)) is None
+    finally:
+        HOUSEHOLD_ENTITLEMENT_FIXTURES[DEMO_HOUSEHOLD_ID] = original_fixture
+
+    assert service.is_package_entitled(household_id, UUID(ACCESSIBLE_PACKAGE_ID))
+
+
 def test_weekly_value_report_contract_matches_schema() -> None:
     client = TestClient(app)
     response = client.get(
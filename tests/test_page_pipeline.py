@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.services.page_pipeline import pipeline_story_pages  # noqa: E402
+
+TEXT_SECONDS = 0.03
+ILLUSTRATION_SECONDS = 0.06
+
+
+async def page_texts(count: int, failing_page: int | None = None):
+    for page_number in range(1, count + 1):
+        await asyncio.sleep(TEXT_SECONDS)
+        if page_number == failing_page:
+            yield {"type": "page_error", "page_number": page_number, "message": "model timeout"}
+            continue
+        yield {"type": "page_text", "page_number": page_number, "page": {"text": f"page {page_number}"}}
+
+
+async def render(page_number: int, page: dict) -> dict:
+    await asyncio.sleep(ILLUSTRATION_SECONDS)
+    if page_number == 2:
+        raise RuntimeError("image provider unavailable")
+    return {"url": f"/illustrations/{page_number}.png"}
+
+
+async def collect(events):
+    started_at = time.perf_counter()
+    timeline = []
+    async for event in events:
+        timeline.append((time.perf_counter() - started_at, event))
+    return timeline
+
+
+def test_text_is_pushed_before_its_illustration_and_pages_overlap() -> None:
+    pages = 6
+    timeline = asyncio.run(collect(pipeline_story_pages(page_texts(pages), render)))
+
+    first_text_at, first_event = timeline[0]
+    assert first_event["type"] == "page_text"
+    assert first_text_at < TEXT_SECONDS + ILLUSTRATION_SECONDS
+
+    illustrations = [event for _, event in timeline if event["type"] == "page_illustration"]
+    assert sorted(event["page_number"] for event in illustrations) == list(range(1, pages + 1))
+
+    sequential_seconds = pages * (TEXT_SECONDS + ILLUSTRATION_SECONDS)
+    total_seconds = timeline[-1][0]
+    assert total_seconds < sequential_seconds * 0.75
+
+
+def test_failures_are_reported_per_page_without_stopping_the_stream() -> None:
+    timeline = asyncio.run(collect(pipeline_story_pages(page_texts(4, failing_page=3), render)))
+    events = [event for _, event in timeline]
+
+    assert {"type": "page_error", "page_number": 3, "message": "model timeout"} in events
+    by_page = {event["page_number"]: event for event in events if event["type"] == "page_illustration"}
+    assert set(by_page) == {1, 2, 4}
+    assert by_page[2]["illustration"] is None
+    assert by_page[2]["error"] == "image provider unavailable"
+    assert by_page[4]["illustration"] == {"url": "/illustrations/4.png"}
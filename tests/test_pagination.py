@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import JSON, Column, DateTime, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.pagination import InvalidCursorError, keyset_paginate, projected_columns  # noqa: E402
+
+Base = declarative_base()
+
+
+class ListedStory(Base):
+    __tablename__ = "listed_stories"
+
+    id = Column(String(36), primary_key=True)
+    title = Column(String(200), nullable=False)
+    content = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    started_at = datetime(2026, 1, 1)
+    db.add_all(
+        ListedStory(
+            id=f"story-{index:03d}",
+            title=f"Story {index}",
+            content={"pages": ["..."]},
+            # 三行一组共享时间戳，验证同一 created_at 内按 id 继续翻页
+            created_at=started_at + timedelta(minutes=index // 3),
+        )
+        for index in range(25)
+    )
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_keyset_pages_cover_every_row_once_in_order(session) -> None:
+    columns = projected_columns(ListedStory, exclude=("content",))
+    seen = []
+    cursor = None
+    while True:
+        page = keyset_paginate(session.query(*columns), ListedStory.created_at, ListedStory.id, cursor, 7)
+        seen.extend(row.id for row in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    expected = [
+        row.id
+        for row in session.query(ListedStory).order_by(ListedStory.created_at.desc(), ListedStory.id.desc())
+    ]
+    assert seen == expected
+    assert len(seen) == 25
+
+
+def test_projection_skips_content_column(session) -> None:
+    columns = projected_columns(ListedStory, exclude=("content",))
+    page = keyset_paginate(session.query(*columns), ListedStory.created_at, ListedStory.id, None, 3)
+
+    assert "content" not in page.items[0]._fields
+    assert page.next_cursor is not None
+
+
+def test_invalid_cursor_is_rejected(session) -> None:
+    with pytest.raises(InvalidCursorError):
+        keyset_paginate(session.query(ListedStory), ListedStory.created_at, ListedStory.id, "not-a-cursor", 5)
@@ -0,0 +1,88 @@
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.password_hashing import (  # noqa: E402
+    CredentialVerificationThrottledError,
+    InFlightLimiter,
+    PasswordHasher,
+    ScryptParameters,
+    hash_password,
+    password_hash_pool,
+    verify_password,
+)
+
+FAST_PARAMETERS = ScryptParameters(n=2 ** 10, r=8, p=1)
+
+
+def legacy_hash(password: str, salt: str = "a1b2c3") -> str:
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), 100000)
+    return f"{salt}:{digest.hex()}"
+
+
+def test_scrypt_hash_round_trip_and_rejects_wrong_password() -> None:
+    hasher = PasswordHasher(FAST_PARAMETERS)
+    stored = hasher.hash("correct horse")
+
+    assert stored.startswith("scrypt$1024$8$1$")
+    assert hasher.verify("correct horse", stored)
+    assert not hasher.verify("wrong horse", stored)
+    assert not hasher.needs_rehash(stored)
+    assert PasswordHasher(ScryptParameters(n=2 ** 11, r=8, p=1)).needs_rehash(stored)
+
+
+def test_legacy_pbkdf2_hashes_verify_and_need_rehash() -> None:
+    hasher = PasswordHasher(FAST_PARAMETERS)
+    stored = legacy_hash("s3cret")
+
+    assert hasher.verify("s3cret", stored)
+    assert not hasher.verify("S3cret", stored)
+    assert hasher.needs_rehash(stored)
+    assert not hasher.verify("s3cret", "not-a-hash")
+
+
+def test_hashing_runs_on_the_password_pool() -> None:
+    seen_threads: list[str] = []
+
+    async def scenario() -> bool:
+        stored = await hash_password("pool-check")
+        seen_threads.append(
+            await password_hash_pool.run(lambda: threading.current_thread().name)
+        )
+        return await verify_password("pool-check", stored)
+
+    assert asyncio.run(scenario())
+    assert seen_threads[0].startswith("password-hash")
+
+
+def test_in_flight_limiter_throttles_per_identifier_and_overall() -> None:
+    limiter = InFlightLimiter(max_per_identifier=1, max_total=2)
+
+    async def scenario() -> None:
+        async with limiter.slot("user-1"):
+            with pytest.raises(CredentialVerificationThrottledError):
+                async with limiter.slot("user-1"):
+                    pass
+
+            async with limiter.slot("user-2"):
+                with pytest.raises(CredentialVerificationThrottledError):
+                    async with limiter.slot("user-3"):
+                        pass
+
+        async with limiter.slot("user-1"):
+            pass
+
+    asyncio.run(scenario())
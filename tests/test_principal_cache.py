@@ -0,0 +1,73 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.principal_cache import (  # noqa: E402
+    AuthenticatedPrincipal,
+    PrincipalCache,
+    TokenPayloadMemo,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_principal_cache_is_keyed_by_user_and_issued_at_and_expires() -> None:
+    clock = FakeClock()
+    cache = PrincipalCache(max_entries=10, ttl_seconds=30, clock=clock)
+    principal = AuthenticatedPrincipal(id="user-1", is_active=True, subscription_tier="premium")
+
+    cache.put(principal, issued_at=100)
+
+    assert cache.get("user-1", 100) == principal
+    assert cache.get("user-1", 200) is None
+
+    clock.now += 31
+    assert cache.get("user-1", 100) is None
+    assert len(cache) == 0
+
+
+def test_principal_cache_invalidates_every_token_of_a_user_and_evicts_lru() -> None:
+    cache = PrincipalCache(max_entries=2, ttl_seconds=30, clock=FakeClock())
+    first = AuthenticatedPrincipal(id="user-1", is_active=True, subscription_tier="free")
+    second = AuthenticatedPrincipal(id="user-2", is_active=True, subscription_tier="free")
+
+    cache.put(first, issued_at=1)
+    cache.put(first, issued_at=2)
+    cache.invalidate_user("user-1")
+    assert cache.get("user-1", 1) is None
+    assert cache.get("user-1", 2) is None
+
+    cache.put(first, issued_at=1)
+    cache.put(second, issued_at=1)
+    cache.get("user-1", 1)
+    cache.put(second, issued_at=2)
+    assert cache.get("user-1", 1) == first
+    assert cache.get("user-2", 1) is None
+
+
+def test_token_payload_memo_honours_token_expiry() -> None:
+    clock = FakeClock(now=1000.0)
+    memo = TokenPayloadMemo(max_entries=10, clock=clock)
+
+    memo.put("token-a", {"sub": "user-1", "exp": 1060})
+    memo.put("token-b", {"sub": "user-1"})
+
+    assert memo.get("token-a") == {"sub": "user-1", "exp": 1060}
+    assert memo.get("token-b") is None
+
+    clock.now = 1060
+    assert memo.get("token-a") is None
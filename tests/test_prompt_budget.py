@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.expert import CROWDStrategy, EducationalFramework  # noqa: E402
+from agents.quality_control.expert import QualityController  # noqa: E402
+from agents.story_creation.expert import StoryContent, StoryPage  # noqa: E402
+from core.prompt_budget import TRUNCATION_MARKER, PromptBudgeter, PromptSection  # noqa: E402
+
+PAGE_TEXT = "小兔子在花园里跳来跳去，它看到了一只美丽的蝴蝶，于是想和蝴蝶一起玩耍。"
+
+
+def _story(pages: int) -> StoryContent:
+    return StoryContent(
+        title="小兔子找朋友",
+        moral_theme="友谊",
+        pages=[
+            StoryPage(page_number=number, text=f"第{number}页。{PAGE_TEXT * 3}", illustration_prompt="")
+            for number in range(1, pages + 1)
+        ],
+        characters=[],
+        vocabulary_targets=[],
+        extension_activities=[],
+        cultural_elements=[],
+    )
+
+
+def _framework() -> EducationalFramework:
+    return EducationalFramework(
+        age_group="3-5岁",
+        cognitive_stage="前运算阶段",
+        attention_span_target=5,
+        learning_objectives=["学会分享"],
+        crowd_strategy=CROWDStrategy(completion_prompts=["小兔子把胡萝卜分给了___"] * 8),
+        interaction_density="medium",
+        safety_considerations=["避免恐怖元素"] * 10,
+        cultural_adaptations=[],
+        parent_guidance=["和孩子讨论分享的感受"] * 10,
+        emotional_development={"skills": [{"skill_name": "情绪识别", "practice_methods": ["表情卡片"] * 20}] * 10},
+    )
+
+
+class RecordingQwenClient:
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = []
+
+    async def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"text": self.text, "usage": {"input_tokens": 900, "output_tokens": 80}}
+
+
+def test_sections_are_trimmed_lowest_priority_first() -> None:
+    budgeter = PromptBudgeter("qwen-plus", input_budget_tokens=120, baseline_max_tokens=1500)
+    pages = [f"第{number}页{PAGE_TEXT}" for number in range(1, 11)]
+
+    budgeted = budgeter.build(
+        "demo",
+        [
+            PromptSection("task", "请评估以下故事："),
+            PromptSection("story", " ".join(pages), priority=1, summarize=budgeter.segment_summarizer(pages)),
+            PromptSection("extras", "补充资料" * 100, priority=2),
+            PromptSection("rubric", "只输出JSON"),
+        ],
+        {"score": 0.8, "suggestions": ["建议"]},
+    )
+
+    report = budgeted.report
+    assert report.input_tokens <= 120
+    assert "extras" in report.trimmed_sections and "补充资料" not in budgeted.prompt
+    assert budgeted.prompt.startswith("请评估以下故事：") and budgeted.prompt.endswith("只输出JSON")
+    assert "第1页" in budgeted.prompt and "第10页" in budgeted.prompt and TRUNCATION_MARKER in budgeted.prompt
+    assert report.input_tokens_saved == report.original_input_tokens - report.input_tokens > 0
+    assert budgeted.max_tokens < 1500 and report.output_tokens_saved == 1500 - budgeted.max_tokens
+
+
+def test_educational_check_sends_a_compact_framework_and_sized_max_tokens() -> None:
+    controller = QualityController(None)
+    client = RecordingQwenClient('{"learning_objective_coverage": 0.9, "improvement_suggestions": []}')
+    controller.qwen_client = client
+
+    alignment = asyncio.run(controller._educational_alignment_check(_story(30), _framework()))
+
+    assert alignment.learning_objective_coverage == 0.9
+    call = client.calls[0]
+    prompt_tokens = controller.prompt_budgeter.count(call["prompt"])
+    assert prompt_tokens <= controller.prompt_budgeter.input_budget_tokens
+    assert "学会分享" in call["prompt"] and "第1页" in call["prompt"] and "第30页" in call["prompt"]
+    assert "和孩子讨论分享的感受" not in call["prompt"]
+    assert 128 <= call["max_tokens"] < 1500
+
+    stats = controller.prompt_budgeter.stats()["educational_alignment_check"]
+    assert stats["calls"] == 1 and stats["trimmed_calls"] == 1 and stats["input_tokens_saved"] > 0
+
+
+def test_safety_check_keeps_the_full_story_text() -> None:
+    controller = QualityController(None)
+    client = RecordingQwenClient('{"violence_level": 0.0, "inappropriate_content": false}')
+    controller.qwen_client = client
+    story = _story(40)
+
+    safety = asyncio.run(controller._safety_check(story, {"age": 4}))
+
+    assert safety.overall_safety_score > 0.5
+    assert controller._extract_story_text(story) in client.calls[0]["prompt"]
+    assert client.calls[0]["max_tokens"] < 1500
+    assert controller.prompt_budgeter.stats()["safety_check"]["trimmed_calls"] == 0
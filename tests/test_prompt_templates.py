@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.expert import CROWDStrategy, EducationalFramework, PsychologyExpert  # noqa: E402
+from agents.story_creation.expert import ChildrenLiteratureExpert, _plot_point_guidance  # noqa: E402
+from core.prompt_templates import PromptTemplate, prompt_size_report, register_template  # noqa: E402
+
+
+def _framework(**overrides) -> EducationalFramework:
+    fields = {
+        "age_group": "6-8岁",
+        "cognitive_stage": "具体运算阶段",
+        "attention_span_target": 7,
+        "learning_objectives": ["学会分享"],
+        "crowd_strategy": CROWDStrategy(completion_prompts=["小熊把蜂蜜分给了___"]),
+        "interaction_density": "medium",
+        "safety_considerations": [],
+        "cultural_adaptations": [],
+        "parent_guidance": [],
+    }
+    fields.update(overrides)
+    return EducationalFramework(**fields)
+
+
+def test_psychology_prompts_in_one_age_band_share_a_stable_prefix() -> None:
+    expert = PsychologyExpert()
+
+    first = asyncio.run(expert._build_psychology_prompt({"age": 6}, {"theme": "友谊"}))
+    second = asyncio.run(
+        expert._build_psychology_prompt({"age": 8, "neuro_profile": {"adhd_indicators": True}}, {"theme": "第一次坐火车"})
+    )
+
+    prefix = expert.prompt_template.prefix(("6-8",))
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert "第一次坐火车" not in prefix and "ADHD专项适配" in second[len(prefix):]
+    assert "**注意力时长目标**: 8分钟" in second[len(prefix):]
+    assert expert.prompt_template.stats.prefix_misses == 1
+
+
+def test_literature_prompt_prefix_is_keyed_by_story_parameters() -> None:
+    expert = ChildrenLiteratureExpert(None)
+
+    first = asyncio.run(expert._build_literature_prompt(_framework(), "月亮上的兔子", None, None))
+    second = asyncio.run(
+        expert._build_literature_prompt(
+            _framework(learning_objectives=["面对恐惧"]), "勇气", {"characters": [{"name": "小熊"}]}, None
+        )
+    )
+    younger = asyncio.run(expert._build_literature_prompt(_framework(age_group="3-5岁"), "友谊", None, None))
+
+    shared = os.path.commonprefix([first, second])
+    assert "以下是本次创作的具体任务：" in shared and "第12页: 圆满结局" in shared
+    assert "学会分享" not in shared and "月亮上的兔子" not in shared
+    assert not younger.startswith(shared)
+    assert expert.prompt_template.stats.prefix_misses == 2
+    assert _plot_point_guidance(5, 12) is _plot_point_guidance(5, 12)
+
+
+def test_prompt_size_report_tracks_renders_and_evicts_old_prefixes() -> None:
+    built = []
+
+    def build_prefix(band: str) -> str:
+        built.append(band)
+        return f"static section for {band}\n"
+
+    template = register_template(PromptTemplate("test_template", "qwen-plus", build_prefix, max_prefixes=2))
+    for band in ("3-5", "6-8", "3-5", "9-11", "6-8"):
+        template.render((band,), "theme: 友谊\n")
+
+    assert built == ["3-5", "6-8", "9-11", "6-8"]
+    report = template.size_report()
+    assert report["renders"] == 5
+    assert report["cached_prefixes"] == 2
+    assert report["prefix_hit_rate"] == 0.2
+    assert 0 < report["prefix_token_share"] < 1
+    assert report["max_chars"] == len("static section for 9-11\ntheme: 友谊\n")
+    assert prompt_size_report()["test_template"] == report
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+sys.path.insert(0, str(ROOT_DIR / "apps" / "ai-service"))
+
+from app.core.providers import ProviderRegistry  # noqa: E402
+from core.providers import ProviderRegistry as AIServiceProviderRegistry  # noqa: E402
+
+
+def test_provider_is_built_once_on_first_use() -> None:
+    registry = ProviderRegistry()
+    calls = []
+    registry.register("client", lambda: calls.append(1) or object())
+
+    assert registry.status()["client"]["initialized"] is False
+    first = registry.get_sync("client")
+
+    assert registry.get_sync("client") is first
+    assert calls == [1]
+    status = registry.status()["client"]
+    assert status["initialized"] is True
+    assert status["init_ms"] is not None
+
+
+def test_concurrent_async_access_shares_one_initialization() -> None:
+    registry = ProviderRegistry()
+    calls = []
+    closed = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    registry.register("orchestrator", create, close=closed.append)
+
+    async def scenario():
+        instances = await asyncio.gather(*(registry.get("orchestrator") for _ in range(5)))
+        await registry.close_all()
+        return instances
+
+    instances = asyncio.run(scenario())
+
+    assert calls == [1]
+    assert all(instance is instances[0] for instance in instances)
+    assert closed == [instances[0]]
+    assert registry.status()["orchestrator"]["initialized"] is False
+
+
+def test_warmup_initializes_in_background_and_tolerates_failures() -> None:
+    registry = ProviderRegistry()
+
+    def broken():
+        raise RuntimeError("sdk unavailable")
+
+    registry.register("broken", broken)
+    registry.register("tokenizer", dict)
+
+    async def scenario():
+        registry.start_warmup()
+        await registry._warmup_task
+
+    asyncio.run(scenario())
+
+    status = registry.status()
+    assert status["tokenizer"]["initialized"] is True
+    assert status["broken"] == {"initialized": False, "init_ms": None, "error": "sdk unavailable"}
+
+
+def test_ai_service_async_get_waits_for_warmup_without_blocking_the_loop() -> None:
+    registry = AIServiceProviderRegistry()
+    release = threading.Event()
+    registry.register("orchestrator", lambda: release.wait(5) and object())
+    registry.start_warmup()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        async def unblock_later():
+            await asyncio.sleep(0.05)
+            release.set()
+
+        ticking = asyncio.create_task(ticker())
+        instance, _ = await asyncio.gather(registry.aget("orchestrator"), unblock_later())
+        await ticking
+        return instance, ticks
+
+    instance, ticks = asyncio.run(scenario())
+
+    assert ticks > 1
+    assert instance is registry.get("orchestrator")
+    assert registry.status()["orchestrator"]["initialized"] is True
+
+
+def test_illustration_service_concurrent_first_calls_wait_for_provider_resolution(monkeypatch) -> None:
+    # The illustration service depends on the ORM models, which are not part of every checkout.
+    module = pytest.importorskip("app.services.illustration_service")
+
+    vertex_client = object()
+    calls = []
+
+    async def get(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return vertex_client
+
+    monkeypatch.setattr(module.provider_registry, "get", get)
+    monkeypatch.setattr(module.settings, "image_provider", "vertex")
+    service = module.MultiAIIllustrationService(db=None)
+
+    async def first_use():
+        await service._ensure_ai_services()
+        return service.vertex_service
+
+    async def scenario():
+        return await asyncio.gather(first_use(), first_use())
+
+    assert asyncio.run(scenario()) == [vertex_client, vertex_client]
+    assert calls == ["vertex_image"]
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.expert import CROWDStrategy, EducationalFramework  # noqa: E402
+from agents.quality_control.expert import QualityController  # noqa: E402
+from agents.story_creation.expert import StoryContent  # noqa: E402
+from apps.workers.jobs.quality_reaudit import run_quality_reaudit  # noqa: E402
+
+SCORES = {
+    "violence_level": 0.0,
+    "inappropriate_content": False,
+    "age_appropriateness": 0.9,
+    "cultural_sensitivity": 0.9,
+    "learning_objective_coverage": 0.8,
+    "cognitive_development_support": 0.8,
+    "attention_span_appropriateness": 0.9,
+    "interaction_effectiveness": 0.8,
+}
+
+
+def _story_dict(title: str) -> dict:
+    return {
+        "title": title,
+        "moral_theme": "友谊",
+        "pages": [
+            {"page_number": 1, "text": "从前，小熊和小兔是好朋友。", "illustration_prompt": ""},
+            {"page_number": 2, "text": "它们一起分享蜂蜜。", "illustration_prompt": ""},
+            {"page_number": 3, "text": "最后，大家都很开心。", "illustration_prompt": ""},
+        ],
+        "characters": [],
+        "vocabulary_targets": [],
+        "extension_activities": [],
+        "cultural_elements": ["分享"],
+    }
+
+
+def _framework_dict() -> dict:
+    return EducationalFramework(
+        age_group="3-5岁",
+        cognitive_stage="前运算阶段",
+        attention_span_target=5,
+        learning_objectives=["学会分享"],
+        crowd_strategy=CROWDStrategy(),
+        interaction_density="medium",
+        safety_considerations=[],
+        cultural_adaptations=[],
+        parent_guidance=[],
+    ).dict()
+
+
+class ScriptedQwenClient:
+    """批量请求返回预设数组，单篇请求返回合法结果"""
+
+    def __init__(self, batch_entries):
+        self.batch_entries = batch_entries
+        self.calls = []
+
+    async def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        if "故事 S1" in kwargs["prompt"]:
+            text = "审核结果如下：\n" + json.dumps(self.batch_entries, ensure_ascii=False)
+        else:
+            text = json.dumps({**SCORES, "violence_level": 0.1})
+        return {"text": text, "usage": {}}
+
+
+def _items(count: int):
+    return [
+        (StoryContent(**_story_dict(f"故事{index}")), EducationalFramework(**_framework_dict()), {"age": 4})
+        for index in range(count)
+    ]
+
+
+def test_batch_splits_results_and_retries_only_invalid_stories() -> None:
+    controller = QualityController(None)
+    client = ScriptedQwenClient([
+        {"story_id": "S1", **SCORES},
+        {"story_id": "S2", **SCORES, "age_appropriateness": 1.5},
+        {"story_id": "S1", **SCORES, "violence_level": 0.9},
+    ])
+    controller.qwen_client = client
+
+    reports = asyncio.run(controller.batch_quality_check(_items(3), batch_size=3))
+
+    assert len(reports) == 3
+    assert reports[0].safety_check.violence_level == 0.0
+    assert reports[1].safety_check.violence_level == 0.1 and reports[2].safety_check.violence_level == 0.1
+    assert all(report.approval_status == "approved" for report in reports)
+    # 1 次批量调用 + 2 篇各自重试（安全检查、教育对齐各一次）
+    assert len(client.calls) == 5
+    assert controller.batch_stats.batches == 1 and controller.batch_stats.individual_retries == 2
+    batch_call = client.calls[0]
+    assert batch_call["prompt"].count("你是专业的儿童内容安全审核专家") == 1
+    assert batch_call["max_tokens"] < 3 * 2 * 1500
+
+
+def test_malformed_batch_entry_falls_back_to_an_individual_retry() -> None:
+    controller = QualityController(None)
+    client = ScriptedQwenClient([
+        {"story_id": "S1", **SCORES, "safety_issues": "无"},
+        {"story_id": "S2", **SCORES, "improvement_suggestions": ["多一些提问"]},
+    ])
+    controller.qwen_client = client
+
+    reports = asyncio.run(controller.batch_quality_check(_items(2), batch_size=2))
+
+    assert reports[0].safety_check.violence_level == 0.1
+    assert reports[1].safety_check.violence_level == 0.0
+    assert controller.batch_stats.individual_retries == 1
+    assert len(client.calls) == 3
+
+    # 校验放行的条目若在构建报告时仍失败，同样只重试该故事
+    controller = QualityController(None)
+    controller.qwen_client = ScriptedQwenClient([{"story_id": "S1", **SCORES}, {"story_id": "S2", **SCORES}])
+    build = controller._build_quality_report
+    calls = []
+
+    def flaky_build(*args):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("bad entry")
+        return build(*args)
+
+    controller._build_quality_report = flaky_build
+    reports = asyncio.run(controller.batch_quality_check(_items(2), batch_size=2))
+    assert len(reports) == 2 and controller.batch_stats.individual_retries == 1
+
+
+def test_reaudit_job_uses_the_configured_batch_size() -> None:
+    controller = QualityController(None)
+    client = ScriptedQwenClient([{"story_id": "S1", **SCORES}, {"story_id": "S2", **SCORES}])
+    controller.qwen_client = client
+    drafts = [
+        {"draft_id": f"draft-{index}", "story_content": _story_dict(f"故事{index}"), "framework": _framework_dict()}
+        for index in range(3)
+    ]
+
+    report = asyncio.run(run_quality_reaudit(controller, drafts, 2, StoryContent, EducationalFramework))
+
+    assert report["drafts"] == 3 and report["individual_retries"] == 0
+    assert list(report["results"]) == ["draft-0", "draft-1", "draft-2"]
+    assert report["status_counts"]["approved"] == 3
+    # 两篇一批 + 最后一篇单独检查（两次调用）
+    assert len(client.calls) == 3
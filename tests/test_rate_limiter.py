@@ -0,0 +1,133 @@
+import asyncio
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.rate_limiter import (  # noqa: E402
+    CircuitBreaker,
+    RateLimiter,
+    RateLimitPolicy,
+    current_rate_limit_client,
+)
+from app.dependencies.rate_limit import ROUTE_RATE_LIMIT_POLICIES, rate_limit  # noqa: E402
+
+
+class InMemoryGcraLimiter(RateLimiter):
+    """Runs the GCRA script's arithmetic in-process so engine behaviour can be checked without Redis."""
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            redis_url="redis://127.0.0.1:1",
+            backend_timeout_seconds=0.5,
+            max_local_keys=100,
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30),
+            **kwargs,
+        )
+        self.tat_ms: dict[str, float] = {}
+        self.backend_calls = 0
+
+    async def _reserve(self, key, policy, requested):
+        self.backend_calls += 1
+        emission_ms = policy.emission_interval_seconds * 1000
+        tolerance_ms = emission_ms * policy.limit
+        now_ms = time.time() * 1000
+        tat = max(self.tat_ms.get(key, now_ms), now_ms)
+        available = math.floor((now_ms + tolerance_ms - tat) / emission_ms)
+        if available < 1:
+            return 0, 0, math.ceil(tat - tolerance_ms + emission_ms - now_ms)
+
+        granted = min(requested, available)
+        self.tat_ms[key] = tat + granted * emission_ms
+        return granted, available - granted, 0
+
+
+def test_leased_tokens_absorb_traffic_and_the_limit_still_holds() -> None:
+    limiter = InMemoryGcraLimiter(lease_size=10)
+    policy = RateLimitPolicy(limit=100, window_seconds=60)
+
+    async def scenario() -> list[bool]:
+        return [(await limiter.check("ip:1.2.3.4", policy)).allowed for _ in range(120)]
+
+    decisions = asyncio.run(scenario())
+
+    assert decisions[:100] == [True] * 100
+    assert not any(decisions[100:])
+    assert limiter.backend_calls == 10
+
+
+def test_denial_reports_retry_after() -> None:
+    limiter = InMemoryGcraLimiter(lease_size=1)
+    policy = RateLimitPolicy(limit=2, window_seconds=60)
+
+    async def scenario():
+        for _ in range(2):
+            assert (await limiter.check("ip:5.6.7.8", policy)).allowed
+        return await limiter.check("ip:5.6.7.8", policy)
+
+    decision = asyncio.run(scenario())
+
+    assert not decision.allowed
+    assert 0 < decision.retry_after_seconds <= 30
+
+
+def test_unreachable_backend_opens_breaker_and_fails_open() -> None:
+    limiter = RateLimiter(
+        redis_url="redis://127.0.0.1:1",
+        backend_timeout_seconds=0.2,
+        lease_size=1,
+        max_local_keys=100,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout_seconds=60),
+    )
+    policy = RateLimitPolicy(limit=1, window_seconds=60)
+
+    async def scenario() -> list[bool]:
+        return [(await limiter.check("ip:9.9.9.9", policy)).allowed for _ in range(5)]
+
+    assert asyncio.run(scenario()) == [True] * 5
+    assert limiter.breaker.state == "open"
+
+
+def test_rate_limit_decorator_declares_route_policy() -> None:
+    @rate_limit(requests=3, per_minutes=2)
+    async def generate() -> str:
+        return "ok"
+
+    policy = ROUTE_RATE_LIMIT_POLICIES[f"{generate.__module__}.generate"]
+    assert generate.rate_limit_policy == policy == RateLimitPolicy(limit=3, window_seconds=120)
+
+
+def test_rate_limit_decorator_rejects_over_limit_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    import app.dependencies.rate_limit as rate_limit_module
+
+    monkeypatch.setattr(rate_limit_module, "rate_limiter", InMemoryGcraLimiter(lease_size=1))
+
+    @rate_limit(requests=1, per_minutes=1)
+    async def generate() -> str:
+        return "ok"
+
+    async def scenario() -> None:
+        token = current_rate_limit_client.set("user:42")
+        try:
+            assert await generate() == "ok"
+            with pytest.raises(HTTPException) as exc_info:
+                await generate()
+        finally:
+            current_rate_limit_client.reset(token)
+
+        assert exc_info.value.status_code == 429
+        assert "Retry-After" in exc_info.value.headers
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+import os
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.core.config import settings  # noqa: E402
+from app.main import app  # noqa: E402
+from app.middleware.security import inspect_request  # noqa: E402
+
+
+def http_scope(query_string: bytes = b"", headers: list | None = None) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": query_string,
+        "headers": headers or [],
+    }
+
+
+def test_inspect_request_matches_patterns_case_insensitively() -> None:
+    assert inspect_request(http_scope(b"q=1%20UNION SELECT password")) == (400, "Invalid request")
+    assert inspect_request(http_scope(b"next=JavaScript:alert(1)")) == (400, "Invalid request")
+    assert inspect_request(http_scope(b"page=2&sort=recent")) is None
+    assert inspect_request(http_scope(headers=[(b"content-length", b"20971520")])) == (413, "Request too large")
+
+
+def test_pipeline_rejects_malicious_query_before_routing() -> None:
+    client = TestClient(app)
+
+    response = client.get("/health?q=<script>alert(1)</script>", headers={"host": "localhost"})
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid request"}
+
+
+def test_metrics_endpoint_is_off_by_default_and_token_protected(monkeypatch) -> None:
+    client = TestClient(app)
+
+    assert client.get("/metrics", headers={"host": "localhost"}).status_code == 404
+
+    monkeypatch.setattr(settings, "enable_metrics", True)
+    monkeypatch.setattr(settings, "metrics_token", "scrape-token")
+    assert client.get("/metrics", headers={"host": "localhost"}).status_code == 401
+    response = client.get(
+        "/metrics",
+        headers={"host": "localhost", "authorization": "Bearer scrape-token"},
+    )
+    assert response.status_code == 200
+
+
+def test_metrics_endpoint_reports_route_template_histograms(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "enable_metrics", True)
+    client = TestClient(app)
+    child_id = "55555555-5555-5555-5555-555555555555"
+
+    assert client.get(f"/api/v2/child-home/{child_id}", headers={"host": "localhost"}).status_code == 200
+
+    metrics = client.get("/metrics", headers={"host": "localhost"})
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    body = metrics.text
+    assert 'route="/api/v2/child-home/{child_id}"' in body
+    assert child_id not in body
+    assert 'lumos_http_request_duration_seconds_bucket{method="GET",route="/api/v2/child-home/{child_id}",le="+Inf"}' in body
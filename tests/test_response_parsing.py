@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from agents.psychology.expert import PsychologyExpert  # noqa: E402
+from agents.quality_control.expert import QualityController  # noqa: E402
+from agents.story_creation.expert import ChildrenLiteratureExpert  # noqa: E402
+from core.response_parsing import ResponseParseError, extract_json, parse_json, parse_stats  # noqa: E402
+
+STORY = {
+    "title": "小兔子找朋友",
+    "moral_theme": "友谊",
+    "pages": [
+        {"page_number": 1, "text": "小兔子在花园里。", "illustration_prompt": "花园", "complexity_check": {"ok": True}},
+        {"page_number": 2, "text": "它遇到了小熊。", "illustration_prompt": "小熊"},
+    ],
+    "characters": [{"name": "小兔子", "description": "白色的兔子", "character_arc": "学会分享"}],
+    "vocabulary_targets": ["花园"],
+    "extension_activities": [],
+    "cultural_elements": [],
+}
+
+
+def test_scanner_finds_the_first_complete_object_and_repairs_common_errors() -> None:
+    # 说明文字里的花括号、对象后面的附加说明都会让 find/rfind 取错范围
+    assert extract_json('按照{格式}输出：\n```json\n{"a": {"b": [1, 2]}}\n```\n注：{略}') == {"a": {"b": [1, 2]}}
+    assert extract_json('{"a": "含有 } 和 \\" 的字符串"} 然后 {"b": 2}') == {"a": '含有 } 和 " 的字符串'}
+    assert extract_json('{"a": [1, 2,], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+    assert extract_json('{"a": "第一行\n第二行"}') == {"a": "第一行\n第二行"}
+
+    # 被 max_tokens 截断：补全字符串和括号，或回退到上一个完整元素
+    assert extract_json('{"pages": [{"text": "小兔子在') == {"pages": [{"text": "小兔子在"}]}
+    assert extract_json('{"a": 1, "b": [1, 2], "c"') == {"a": 1, "b": [1, 2]}
+    assert extract_json('{"a": 1, "b":') == {"a": 1, "b": None}
+    assert extract_json('说明 [注意] 结果：[{"id": "S1"}, {"id": "S2"', container='[') == [{"id": "S1"}, {"id": "S2"}]
+
+    with pytest.raises(ResponseParseError):
+        extract_json("没有任何JSON")
+
+
+def test_story_and_framework_responses_validate_in_one_pass_and_count_recoveries() -> None:
+    before = parse_stats().get("story_content", {}).get("failures_avoided", 0)
+    expert = ChildrenLiteratureExpert.__new__(ChildrenLiteratureExpert)
+
+    text = "好的，故事如下：\n" + json.dumps(STORY, ensure_ascii=False) + "\n希望你喜欢{这个故事}。"
+    story = asyncio.run(expert._parse_story_response({"text": text}))
+    assert [page.text for page in story.pages] == ["小兔子在花园里。", "它遇到了小熊。"]
+    assert story.characters[0].personality == "" and story.pages[1].reading_time_seconds == 30
+
+    truncated = json.dumps({"pages": STORY["pages"]}, ensure_ascii=False)[:-30]
+    story = asyncio.run(expert._parse_story_response({"text": truncated}))
+    assert story.title == "未命名故事" and story.pages[0].page_number == 1
+
+    assert parse_stats()["story_content"]["failures_avoided"] == before + 2
+
+    psychology = PsychologyExpert.__new__(PsychologyExpert)
+    framework = asyncio.run(psychology._parse_framework_response(
+        '{"learning_objectives": ["分享"], "crowd_strategy": {"recall_questions": ["谁来了？"],}, "neuro_adaptations": {}}'
+    ))
+    assert framework.age_group == "3-5" and framework.crowd_strategy.recall_questions == ["谁来了？"]
+    assert framework.neuro_adaptations is None
+
+    with pytest.raises(ValueError):
+        asyncio.run(psychology._parse_framework_response('{"attention_span_target": "很长"}'))
+    assert parse_stats()["educational_framework"]["validation_errors"] >= 1
+
+
+def test_quality_check_parses_trailing_comma_and_truncated_batch() -> None:
+    controller = QualityController(None)
+
+    safety = controller._safety_from_data(
+        controller._parse_json_response('{"violence_level": "0.2", "inappropriate_content": false,}', "safety_check")
+    )
+    assert safety.violence_level == 0.2 and safety.age_appropriateness == 0.5
+    assert safety.overall_safety_score == pytest.approx(0.8 * 0.3 + 0.3 + 0.1 + 0.1)
+
+    entry = {
+        "violence_level": 0.0, "inappropriate_content": False, "age_appropriateness": 0.9,
+        "cultural_sensitivity": 0.9, "learning_objective_coverage": 0.8, "cognitive_development_support": 0.8,
+        "attention_span_appropriateness": 0.9, "interaction_effectiveness": 0.8,
+    }
+    text = json.dumps([{"story_id": "S1", **entry}, {"story_id": "S2", **entry}])[:-40]
+    assert list(controller._parse_batch_response(text, 2)) == [0]
+
+    assert parse_json('{"a": 1}', "demo") == {"a": 1}
+    assert parse_stats()["demo"]["clean"] >= 1
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'ai-service'))
+
+from core.single_flight_cache import CachedFailure, SingleFlightCache  # noqa: E402
+
+
+class InMemoryRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"upstream {status_code}")
+        self.status_code = status_code
+
+
+def make_cache(redis_client, **kwargs) -> SingleFlightCache:
+    options = {
+        "namespace": "framework",
+        "fresh_ttl_seconds": 60,
+        "stale_ttl_seconds": 60,
+        "early_expiry_beta": 0,
+        "is_deterministic_failure": lambda exc: getattr(exc, "status_code", None) == 400,
+    }
+    options.update(kwargs)
+    return SingleFlightCache(redis_client, **options)
+
+
+def test_concurrent_misses_share_one_generation() -> None:
+    cache = make_cache(InMemoryRedis())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"age_group": "3-5"}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("featured", compute) for _ in range(20)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == [1]
+    assert all(result == {"age_group": "3-5"} for result in results)
+    stats = cache.stats()
+    assert stats["misses"] == 20
+    assert stats["stampede_collapses"] == 19
+    assert stats["refreshes"] == 1
+
+
+def test_stale_entry_is_served_while_refreshing_in_background() -> None:
+    redis_client = InMemoryRedis()
+    cache = make_cache(redis_client)
+    redis_client.values["framework:key"] = json.dumps(
+        {"value": {"version": 1}, "fresh_until": 0, "compute_seconds": 0.01}
+    )
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return {"version": 2}
+
+    async def scenario():
+        stale = await cache.get_or_compute("key", compute)
+        await asyncio.gather(*cache._background)
+        fresh = await cache.get_or_compute("key", compute)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+
+    assert stale == {"version": 1}
+    assert fresh == {"version": 2}
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_probabilistic_early_expiry_refreshes_hot_keys_before_they_expire() -> None:
+    redis_client = InMemoryRedis()
+    cache = make_cache(redis_client, early_expiry_beta=1.0)
+
+    async def compute():
+        return {"version": 2}
+
+    async def scenario():
+        now = time.time()
+        # 生成耗时远大于剩余新鲜期，XFetch 几乎必然提前刷新
+        redis_client.values["framework:key"] = json.dumps(
+            {"value": {"version": 1}, "fresh_until": now + 0.001, "compute_seconds": 1000}
+        )
+        served = await cache.get_or_compute("key", compute)
+        await asyncio.gather(*cache._background)
+        return served
+
+    assert asyncio.run(scenario()) == {"version": 1}
+    assert cache.stats()["early_refreshes"] == 1
+    assert json.loads(redis_client.values["framework:key"])["value"] == {"version": 2}
+
+
+def test_deterministic_failures_are_negatively_cached() -> None:
+    cache = make_cache(InMemoryRedis())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        raise UpstreamError(400)
+
+    async def scenario():
+        with pytest.raises(UpstreamError):
+            await cache.get_or_compute("bad", compute)
+        with pytest.raises(CachedFailure):
+            await cache.get_or_compute("bad", compute)
+
+    asyncio.run(scenario())
+
+    assert calls == [1]
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_transient_failures_are_not_cached() -> None:
+    cache = make_cache(InMemoryRedis())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        raise UpstreamError(503)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                await cache.get_or_compute("flaky", compute)
+
+    asyncio.run(scenario())
+
+    assert calls == [1, 1]
+
+
+def test_cancelled_owner_does_not_strand_collapsed_waiters() -> None:
+    cache = make_cache(InMemoryRedis())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return {"attempt": len(calls)}
+
+    async def scenario():
+        owner = asyncio.create_task(cache.get_or_compute("featured", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("featured", compute))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(scenario()) == {"attempt": 2}
+    assert calls == [1, 1]
+    assert cache.stats()["in_flight"] == 0
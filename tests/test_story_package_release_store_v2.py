@@ -0,0 +1,214 @@
+import multiprocessing
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "apps" / "api"
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
+sys.path.insert(0, str(API_DIR))
+
+from app.schemas.v2.story_package_release import (  # noqa: E402
+    StoryPackageBuildCommandV1,
+    StoryPackageRecallCommandV1,
+    StoryPackageReleaseCommandV1,
+)
+from app.services.v2.story_package_release_service import (  # noqa: E402
+    RELEASE_BOOTSTRAP_VERSION,
+    StoryPackageReleaseValidationError,
+    create_release_story_package_services,
+)
+from app.services.v2.story_package_release_store import (  # noqa: E402
+    BLOB_CACHE_SIZE,
+    StoryPackageBlobStore,
+    StoryPackageReleaseConflictError,
+    StoryPackageReleaseStore,
+    reset_story_package_release_state,
+)
+
+
+PACKAGE_ID = UUID("33333333-3333-3333-3333-333333333333")
+WORKER_PROCESSES = 6
+CYCLES_PER_WORKER = 5
+COMMAND_TIME = datetime(2026, 3, 31, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def reset_release_store() -> None:
+    reset_story_package_release_state()
+    yield
+    reset_story_package_release_state()
+
+
+def release_and_recall(worker_index: int, build_id: str, cycles: int) -> int:
+    _, release_service = create_release_story_package_services()
+    rejected_recalls = 0
+
+    for _ in range(cycles):
+        release = release_service.release_package(
+            PACKAGE_ID,
+            StoryPackageReleaseCommandV1(
+                build_id=UUID(build_id),
+                release_channel="pilot",
+                requested_by=f"stress.worker-{worker_index}",
+                requested_at=COMMAND_TIME,
+            ),
+        )
+        try:
+            release_service.recall_release(
+                PACKAGE_ID,
+                StoryPackageRecallCommandV1(
+                    release_id=release.release_id,
+                    requested_by=f"stress.worker-{worker_index}",
+                    requested_at=COMMAND_TIME,
+                ),
+            )
+        except StoryPackageReleaseValidationError:
+            # Another worker released in between, so this release is no longer active.
+            rejected_recalls += 1
+
+    return rejected_recalls
+
+
+def test_update_without_changes_keeps_revision() -> None:
+    store = StoryPackageReleaseStore()
+    revision = store.revision()
+
+    store.update(lambda state: len(state["drafts"]))
+
+    assert store.revision() == revision
+
+
+def test_save_rejects_stale_revision() -> None:
+    store = StoryPackageReleaseStore()
+    snapshot = store.load_snapshot()
+
+    store.update(lambda state: state["drafts"][0]["operator_notes"].append("Concurrent edit."))
+
+    with pytest.raises(StoryPackageReleaseConflictError):
+        store.save(snapshot.state, expected_revision=snapshot.revision)
+
+    assert store.load()["drafts"][0]["operator_notes"][-1] == "Concurrent edit."
+
+
+def test_release_bootstrap_runs_once_per_store_and_reads_skip_it() -> None:
+    store = StoryPackageReleaseStore()
+    _, release_service = create_release_story_package_services()
+    _, other_service = create_release_story_package_services()
+    bootstraps: list[int] = []
+    for service in (release_service, other_service):
+        original = service._bootstrap_release_state
+        service._bootstrap_release_state = lambda state, original=original: bootstraps.append(1) or original(state)
+
+    history = release_service.get_history(PACKAGE_ID)
+    revision = store.revision()
+    assert store.load()["release_bootstrap_version"] == RELEASE_BOOTSTRAP_VERSION
+    assert [build.build_reason for build in history.builds] == ["bootstrap_release"]
+
+    for service in (release_service, other_service, release_service):
+        service.list_drafts()
+        service.get_history(PACKAGE_ID)
+    assert store.revision() == revision
+
+    other_service.build_package(
+        PACKAGE_ID,
+        StoryPackageBuildCommandV1(
+            build_reason="editorial_release",
+            requested_by="bootstrap.check",
+            requested_at=COMMAND_TIME,
+        ),
+    )
+    assert [build.build_version for build in release_service.get_history(PACKAGE_ID).builds] == [2, 1]
+    assert bootstraps == [1]
+
+
+def test_built_packages_are_stored_once_by_digest_outside_the_state() -> None:
+    store = StoryPackageReleaseStore()
+    _, release_service = create_release_story_package_services()
+    command = StoryPackageBuildCommandV1(
+        build_reason="editorial_release",
+        requested_by="blob.check",
+        requested_at=COMMAND_TIME,
+    )
+    first = release_service.build_package(PACKAGE_ID, command)
+    history = release_service.get_history(PACKAGE_ID)
+
+    records = {item["build_id"]: item for item in store.load()["builds"]}
+    record = records[str(first.build_id)]
+    assert "built_package" not in record and record["built_package_size"] > 0
+    assert history.builds[0].built_package == first.built_package
+
+    # Build artifacts are keyed by build version, so rebuilding the same package
+    # only dedups when the manifest is byte-identical; a copy of a build always is.
+    blob_store = StoryPackageBlobStore()
+    manifest = first.built_package.model_dump(mode="json")
+    assert blob_store.put(manifest) == blob_store.put({key: manifest[key] for key in reversed(manifest)})
+    assert blob_store.put(manifest).digest == record["built_package_digest"]
+
+    copy = blob_store.get(record["built_package_digest"])
+    copy["title"] = "mutated"
+    assert blob_store.get(record["built_package_digest"])["title"] == manifest["title"]
+
+
+def test_legacy_embedded_built_packages_are_migrated_to_blobs() -> None:
+    store = StoryPackageReleaseStore()
+    _, release_service = create_release_story_package_services()
+    release_service.get_history(PACKAGE_ID)
+    blob_store = StoryPackageBlobStore()
+
+    def embed(state: dict) -> None:
+        for build in state["builds"]:
+            build["built_package"] = blob_store.get(build.pop("built_package_digest"))
+            del build["built_package_size"]
+        state["release_bootstrap_version"] = 1
+
+    store.update(embed)
+    _, fresh_service = create_release_story_package_services()
+    package = fresh_service.resolve_story_package(PACKAGE_ID)
+
+    builds = store.load()["builds"]
+    assert builds and all("built_package" not in build and "built_package_digest" in build for build in builds)
+    assert package.release_channel == "pilot"
+    assert StoryPackageBlobStore.cache_info()["size"] <= BLOB_CACHE_SIZE
+
+
+def test_concurrent_release_and_recall_across_processes_keeps_every_write() -> None:
+    store = StoryPackageReleaseStore()
+    _, release_service = create_release_story_package_services()
+    build = release_service.build_package(
+        PACKAGE_ID,
+        StoryPackageBuildCommandV1(
+            build_reason="editorial_release",
+            requested_by="stress.operator",
+            requested_at=COMMAND_TIME,
+        ),
+    )
+    releases_before = len(release_service.get_history(PACKAGE_ID).releases)
+    revision_before = store.revision()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(WORKER_PROCESSES) as pool:
+        rejected_recalls = pool.starmap(
+            release_and_recall,
+            [(index, str(build.build_id), CYCLES_PER_WORKER) for index in range(WORKER_PROCESSES)],
+        )
+
+    total_releases = WORKER_PROCESSES * CYCLES_PER_WORKER
+    successful_recalls = total_releases - sum(rejected_recalls)
+    history = release_service.get_history(PACKAGE_ID)
+    new_releases = [release for release in history.releases if release.build_id == build.build_id]
+    release_versions = sorted(release.release_version for release in history.releases)
+
+    assert len(history.releases) == releases_before + total_releases
+    assert len(new_releases) == total_releases
+    assert release_versions == list(range(1, len(release_versions) + 1))
+    assert sum(release.status == "recalled" for release in new_releases) == successful_recalls
+    assert sum(release.status == "active" for release in history.releases) <= 1
+    assert store.revision() == revision_before + total_releases + successful_recalls
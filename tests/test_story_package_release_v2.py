@@ -485,3 +485,62 @@ def test_unknown_story_package_history_returns_404() -> None:
         headers={"host": "localhost"},
     )
     assert history_response.status_code == 404
+
+
+def test_story_package_draft_summaries_page_filter_and_sort() -> None:
+    client = TestClient(app)
+    seed_drafts = StoryPackageReleaseStore().load()["drafts"]
+
+    # Without query parameters the listing keeps its stored order and is not truncated.
+    unpaged = client.get("/api/v2/story-packages", headers={"host": "localhost"})
+    assert unpaged.status_code == 200
+    assert "X-Next-Cursor" not in unpaged.headers
+    assert [item["package_id"] for item in unpaged.json()["drafts"]] == [item["package_id"] for item in seed_drafts]
+
+    first_page = client.get(
+        "/api/v2/story-packages",
+        headers={"host": "localhost"},
+        params={"fields": "summary", "sort": "created_at", "limit": 2},
+    )
+    assert first_page.status_code == 200
+    payload = first_page.json()
+    validate_payload(payload, "story-package-draft-summary-index.v1.schema.json")
+    assert all("package_preview" not in item for item in payload["drafts"])
+    assert all(item["title"] for item in payload["drafts"])
+
+    package_ids = [item["package_id"] for item in payload["drafts"]]
+    cursor = first_page.headers["X-Next-Cursor"]
+    while cursor:
+        next_page = client.get(
+            "/api/v2/story-packages",
+            headers={"host": "localhost"},
+            params={"fields": "summary", "sort": "created_at", "limit": 2, "cursor": cursor},
+        )
+        assert next_page.status_code == 200
+        package_ids += [item["package_id"] for item in next_page.json()["drafts"]]
+        cursor = next_page.headers.get("X-Next-Cursor")
+
+    expected = [item["package_id"] for item in sorted(seed_drafts, key=lambda item: (item["created_at"], item["package_id"]))]
+    assert package_ids == expected
+
+    pending = client.get(
+        "/api/v2/story-packages",
+        headers={"host": "localhost"},
+        params={"fields": "summary", "audit_status": "pending", "source_type": "ai_generated"},
+    ).json()["drafts"]
+    assert pending and all(item["audit_status"] == "pending" for item in pending)
+
+    draft_response = client.get(
+        f"/api/v2/story-packages/{pending[0]['package_id']}/draft",
+        headers={"host": "localhost"},
+    )
+    assert draft_response.status_code == 200
+    validate_payload(draft_response.json(), "story-package-draft.v1.schema.json")
+    assert draft_response.json()["package_preview"]["title"] == pending[0]["title"]
+
+    stale_cursor = client.get(
+        "/api/v2/story-packages",
+        headers={"host": "localhost"},
+        params={"fields": "summary", "sort": "title", "cursor": first_page.headers["X-Next-Cursor"]},
+    )
+    assert stale_cursor.status_code == 400